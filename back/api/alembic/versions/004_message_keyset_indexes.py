@@ -0,0 +1,30 @@
+"""Index messages by (conversation, created_at, id) for keyset pagination
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+
+
+def upgrade() -> None:
+    # Match the (created_at, id) order used by message history cursors
+    op.create_index('idx_messages_conv_time_id', 'messages', ['conversation_id', 'created_at', 'id'])
+    op.drop_index('idx_messages_conv_time', table_name='messages')
+    op.create_index('idx_group_messages_conv_time_id', 'group_messages', ['group_conversation_id', 'created_at', 'id'])
+    op.drop_index('idx_group_messages_conv_time', table_name='group_messages')
+
+
+def downgrade() -> None:
+    op.create_index('idx_group_messages_conv_time', 'group_messages', ['group_conversation_id', 'created_at'])
+    op.drop_index('idx_group_messages_conv_time_id', table_name='group_messages')
+    op.create_index('idx_messages_conv_time', 'messages', ['conversation_id', 'created_at'])
+    op.drop_index('idx_messages_conv_time_id', table_name='messages')
@@ -0,0 +1,27 @@
+"""Index live projects by created_at for the project listing
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+
+
+def upgrade() -> None:
+    # Lets the newest-first listing stop after one page instead of sorting every project
+    op.create_index(
+        'idx_projects_live_created', 'projects', ['created_at'],
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_projects_live_created', table_name='projects')
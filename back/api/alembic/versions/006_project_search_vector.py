@@ -0,0 +1,42 @@
+"""Add a stored, weighted search_vector column to projects
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+
+
+def upgrade() -> None:
+    # Title matches weigh more than description matches in ts_rank_cd
+    op.add_column('projects', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', unaccent_immutable(coalesce(title, ''))), 'A') || "
+            "setweight(to_tsvector('simple', unaccent_immutable(coalesce(description, ''))), 'B')",
+            persisted=True
+        )
+    ))
+    op.create_index('idx_projects_search_vector', 'projects', ['search_vector'], postgresql_using='gin')
+    
+    # The expression index is replaced by the stored column
+    op.drop_index('idx_projects_search', table_name='projects')
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE INDEX idx_projects_search ON projects 
+        USING GIN (to_tsvector('simple', unaccent_immutable(coalesce(title,'')||' '||coalesce(description,''))))
+    """)
+    op.drop_index('idx_projects_search_vector', table_name='projects')
+    op.drop_column('projects', 'search_vector')
@@ -0,0 +1,29 @@
+"""Trigram index on skill names for autocomplete
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+
+
+def upgrade() -> None:
+    # Serves ILIKE '%query%' when the skill table is too large for the in-memory index
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'idx_skills_name_trgm', 'skills', ['name'],
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_skills_name_trgm', table_name='skills')
@@ -0,0 +1,35 @@
+"""Index user handles for ranked user search
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+
+
+def upgrade() -> None:
+    # Prefix matches: ordered range scan on lower(handle), byte order so an exact match sorts first
+    op.execute("""
+        CREATE INDEX idx_users_handle_prefix ON users ((lower(handle) COLLATE "C"))
+        WHERE deleted_at IS NULL
+    """)
+    
+    # Substring matches: LIKE '%q%' on lower(handle)
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute("""
+        CREATE INDEX idx_users_handle_trgm ON users USING GIN (lower(handle) gin_trgm_ops)
+        WHERE deleted_at IS NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_users_handle_trgm', table_name='users')
+    op.drop_index('idx_users_handle_prefix', table_name='users')
@@ -0,0 +1,98 @@
+"""Conversation summaries and per-member read cursors
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+
+
+def upgrade() -> None:
+    # Last message and message count, maintained on message insert
+    for table in ('conversations', 'group_conversations'):
+        op.add_column(table, sa.Column('message_count', sa.BigInteger(), nullable=False, server_default='0'))
+        op.add_column(table, sa.Column('last_message_id', sa.BigInteger(), nullable=True))
+        op.add_column(table, sa.Column('last_sender_id', postgresql.UUID(as_uuid=True), nullable=True))
+        op.add_column(table, sa.Column('last_message_preview', sa.Text(), nullable=True))
+        op.add_column(table, sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True))
+    
+    # Read cursors: group members keep theirs on the membership row
+    op.add_column('group_members', sa.Column('read_count', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('group_members', sa.Column('last_read_message_id', sa.BigInteger(), nullable=True))
+    op.create_table(
+        'conversation_reads',
+        sa.Column('conversation_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('read_count', sa.BigInteger(), nullable=False),
+        sa.Column('last_read_message_id', sa.BigInteger(), nullable=True),
+        sa.Column('read_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('conversation_id', 'user_id')
+    )
+    
+    # Conversation list lookups by member
+    op.create_index('idx_matches_user_a', 'matches', ['user_a'])
+    op.create_index('idx_matches_user_b', 'matches', ['user_b'])
+    op.create_index('idx_group_members_user', 'group_members', ['user_id'])
+    
+    # Backfill summaries from existing messages
+    for table, messages, key in (
+        ('conversations', 'messages', 'conversation_id'),
+        ('group_conversations', 'group_messages', 'group_conversation_id'),
+    ):
+        op.execute(f"""
+            UPDATE {table} c
+            SET message_count = s.message_count,
+                last_message_id = s.last_message_id,
+                last_sender_id = m.sender_id,
+                last_message_preview = left(m.body, 200),
+                last_message_at = m.created_at
+            FROM (
+                SELECT {key} AS id, count(*) AS message_count, max(id) AS last_message_id
+                FROM {messages}
+                GROUP BY {key}
+            ) s
+            JOIN {messages} m ON m.id = s.last_message_id
+            WHERE c.id = s.id
+        """)
+    
+    # Existing history starts out read, so nobody sees every old message as new
+    op.execute("""
+        UPDATE group_members gm
+        SET read_count = gc.message_count, last_read_message_id = gc.last_message_id
+        FROM group_conversations gc
+        WHERE gc.id = gm.group_conversation_id
+    """)
+    op.execute("""
+        INSERT INTO conversation_reads (conversation_id, user_id, read_count, last_read_message_id, read_at)
+        SELECT c.id, u.user_id, c.message_count, c.last_message_id, now()
+        FROM conversations c
+        JOIN matches mt ON mt.id = c.match_id
+        CROSS JOIN LATERAL (VALUES (mt.user_a), (mt.user_b)) AS u(user_id)
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_group_members_user', table_name='group_members')
+    op.drop_index('idx_matches_user_b', table_name='matches')
+    op.drop_index('idx_matches_user_a', table_name='matches')
+    op.drop_table('conversation_reads')
+    op.drop_column('group_members', 'last_read_message_id')
+    op.drop_column('group_members', 'read_count')
+    for table in ('group_conversations', 'conversations'):
+        op.drop_column(table, 'last_message_at')
+        op.drop_column(table, 'last_message_preview')
+        op.drop_column(table, 'last_sender_id')
+        op.drop_column(table, 'last_message_id')
+        op.drop_column(table, 'message_count')
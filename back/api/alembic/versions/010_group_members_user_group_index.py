@@ -0,0 +1,26 @@
+"""Cover group membership lookups by user
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+
+
+def upgrade() -> None:
+    # (user_id, group_conversation_id) answers "which groups is this user in" from the index alone
+    op.create_index('idx_group_members_user_group', 'group_members', ['user_id', 'group_conversation_id'])
+    op.drop_index('idx_group_members_user', table_name='group_members')
+
+
+def downgrade() -> None:
+    op.create_index('idx_group_members_user', 'group_members', ['user_id'])
+    op.drop_index('idx_group_members_user_group', table_name='group_members')
@@ -0,0 +1,33 @@
+"""Per-user GitHub repository sync state
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+
+
+def upgrade() -> None:
+    # ETag and repo names of every listing page, so an unchanged listing costs only 304s
+    op.create_table(
+        'github_sync_states',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('pages', postgresql.JSONB(), nullable=False, server_default='[]'),
+        sa.Column('repo_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_synced_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('github_sync_states')
@@ -0,0 +1,54 @@
+"""Background job queue
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+
+
+def upgrade() -> None:
+    # Slow side effects (GitHub sync, ...) queued by requests and run by the in-process job runner
+    op.create_table(
+        'jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('kind', sa.Text(), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('dedupe_key', sa.Text(), nullable=True),
+        sa.Column('status', sa.Text(), nullable=False, server_default='queued'),
+        sa.Column('payload', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('result', postgresql.JSONB(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Deduplication: one queued or running job per key
+    op.create_index(
+        'uq_jobs_active_dedupe_key', 'jobs', ['dedupe_key'],
+        unique=True, postgresql_where=sa.text("status IN ('queued', 'running')")
+    )
+    # Claiming due jobs, and re-queueing jobs whose worker died
+    op.create_index('idx_jobs_queued_run_at', 'jobs', ['run_at'], postgresql_where=sa.text("status = 'queued'"))
+    op.create_index('idx_jobs_running_lease', 'jobs', ['locked_until'], postgresql_where=sa.text("status = 'running'"))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_jobs_running_lease', table_name='jobs')
+    op.drop_index('idx_jobs_queued_run_at', table_name='jobs')
+    op.drop_index('uq_jobs_active_dedupe_key', table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,113 @@
+"""Partition audit_logs, messages and group_messages by month
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+
+# Future months created with the tables; scripts/maintain_partitions.py keeps them coming
+MONTHS_AHEAD = 3
+
+# Indexes and foreign keys recreated on the new tables, per table
+TABLES = {
+    'audit_logs': {
+        'indexes': [],
+        'foreign_keys': [
+            ('audit_logs_user_id_fkey', 'user_id', 'users(id)', ''),
+        ],
+    },
+    'messages': {
+        'indexes': [
+            ('idx_messages_conv_time_id', 'conversation_id, created_at, id'),
+        ],
+        'foreign_keys': [
+            ('messages_conversation_id_fkey', 'conversation_id', 'conversations(id)', ' ON DELETE CASCADE'),
+            ('messages_sender_id_fkey', 'sender_id', 'users(id)', ''),
+        ],
+    },
+    'group_messages': {
+        'indexes': [
+            ('idx_group_messages_conv_time_id', 'group_conversation_id, created_at, id'),
+        ],
+        'foreign_keys': [
+            ('group_messages_group_conversation_id_fkey', 'group_conversation_id', 'group_conversations(id)', ' ON DELETE CASCADE'),
+            ('group_messages_sender_id_fkey', 'sender_id', 'users(id)', ''),
+        ],
+    },
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _replace_table(table: str, partitioned: bool) -> None:
+    """Rebuild a table as partitioned (or back to plain), keeping its rows, ID sequence, indexes and foreign keys"""
+    conn = op.get_bind()
+    spec = TABLES[table]
+
+    # Free the names of the old table's indexes for the new one
+    op.execute(f'ALTER TABLE {table} RENAME TO {table}_old')
+    op.execute(f'ALTER TABLE {table}_old RENAME CONSTRAINT {table}_pkey TO {table}_old_pkey')
+    for name, _ in spec['indexes']:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+    if partitioned:
+        # The primary key of a partitioned table must include the partition key
+        op.execute(f'CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)')
+
+        oldest = conn.execute(sa.text(f'SELECT min(created_at) FROM {table}_old')).scalar()
+        today = datetime.now(timezone.utc).date()
+        month = date((oldest or today).year, (oldest or today).month, 1)
+        last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+        while month <= last:
+            end = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{month.year:04d}_{month.month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+            )
+            month = end
+        # Rows of months without a partition (until the maintenance script creates it)
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+    else:
+        op.execute(f'CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS)')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)')
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {table}_old')
+
+    # The ID sequence belongs to the old table's column: hand it over before the drop
+    sequence = conn.execute(sa.text(f"SELECT pg_get_serial_sequence('{table}_old', 'id')")).scalar()
+    op.execute(f'ALTER SEQUENCE {sequence} OWNED BY {table}.id')
+    op.execute(f'DROP TABLE {table}_old')
+
+    for name, columns in spec['indexes']:
+        op.execute(f'CREATE INDEX {name} ON {table} ({columns})')
+    for name, column, target, action in spec['foreign_keys']:
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {target}{action}')
+
+
+def upgrade() -> None:
+    # Append-only tables: monthly RANGE partitions on created_at, so old months
+    # are detached (and archived) instead of deleted row by row, and cursor
+    # pages only scan the months they reach.
+    # Rows are copied under an exclusive lock: run during a maintenance window on large tables.
+    for table in TABLES:
+        _replace_table(table, partitioned=True)
+
+
+def downgrade() -> None:
+    # Back to plain tables; partitions detached since the upgrade are not brought back
+    for table in TABLES:
+        _replace_table(table, partitioned=False)
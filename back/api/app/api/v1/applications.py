@@ -1,17 +1,18 @@
 """Application endpoints"""
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_ # and_ を追加
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import select, or_, and_ # and_ を追加
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db
 from app.core.deps import get_current_user
 from app.models.user import User
 from app.models.project import Project
 from app.models.application import Application
 from app.models.match import Match
-from app.models.audit import AuditLog
+from app.services.audit import audit_sink
 from app.schemas.application import (
     ApplicationResponse,
     ApplicationListResponse
@@ -26,7 +27,7 @@ logger = logging.getLogger(__name__)
 async def get_my_applications(
         type: str = Query(..., description="Filter type: 'received' or 'submitted'"),
         current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get applications related to the current user (received by their projects or submitted by them).
@@ -39,7 +40,7 @@ async def get_my_applications(
     """
 
     # 応募者とプロジェクトオーナーの情報を eager load するための基本クエリ
-    q = db.query(Application).options(
+    q = select(Application).options(
         joinedload(Application.applicant),
         joinedload(Application.project).joinedload(Project.owner) # プロジェクトオーナー情報も取得
     )
@@ -56,7 +57,8 @@ async def get_my_applications(
             detail="Invalid type parameter. Must be 'received' or 'submitted'."
         )
 
-    applications = q.order_by(Application.created_at.desc()).all()
+    result = await db.execute(q.order_by(Application.created_at.desc()))
+    applications = result.scalars().all()
 
     # スキーマに変換して返す
     return ApplicationListResponse(
@@ -67,7 +69,7 @@ async def get_my_applications(
 async def accept_application(
     application_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Accept an application (project owner only)
@@ -80,9 +82,12 @@ async def accept_application(
     Returns:
         Success message
     """
-    application = db.query(Application).filter(
-        Application.id == application_id
-    ).first()
+    result = await db.execute(
+        select(Application).filter(
+            Application.id == application_id
+        )
+    )
+    application = result.scalars().first()
     
     if not application:
         raise HTTPException(
@@ -91,9 +96,12 @@ async def accept_application(
         )
     
     # Get project
-    project = db.query(Project).filter(
-        Project.id == application.project_id
-    ).first()
+    result = await db.execute(
+        select(Project).filter(
+            Project.id == application.project_id
+        )
+    )
+    project = result.scalars().first()
     
     # Check if user is project owner
     if project.owner_id != current_user.id:
@@ -115,15 +123,15 @@ async def accept_application(
     db.add(match)
     
     # Create audit log
-    audit_log = AuditLog(
+    await audit_sink.record(
+        db,
         user_id=current_user.id,
         action="ACCEPT_APPLICATION",
         resource="applications",
         payload={"application_id": str(application_id)}
     )
-    db.add(audit_log)
     
-    db.commit()
+    await db.commit()
     
     return SuccessResponse(message="Application accepted")
 
@@ -132,7 +140,7 @@ async def accept_application(
 async def reject_application(
     application_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Reject an application (project owner only)
@@ -145,9 +153,12 @@ async def reject_application(
     Returns:
         Success message
     """
-    application = db.query(Application).filter(
-        Application.id == application_id
-    ).first()
+    result = await db.execute(
+        select(Application).filter(
+            Application.id == application_id
+        )
+    )
+    application = result.scalars().first()
     
     if not application:
         raise HTTPException(
@@ -156,9 +167,12 @@ async def reject_application(
         )
     
     # Get project
-    project = db.query(Project).filter(
-        Project.id == application.project_id
-    ).first()
+    result = await db.execute(
+        select(Project).filter(
+            Project.id == application.project_id
+        )
+    )
+    project = result.scalars().first()
     
     # Check if user is project owner
     if project.owner_id != current_user.id:
@@ -172,15 +186,15 @@ async def reject_application(
     application.updated_at = datetime.utcnow()
     
     # Create audit log
-    audit_log = AuditLog(
+    await audit_sink.record(
+        db,
         user_id=current_user.id,
         action="REJECT_APPLICATION",
         resource="applications",
         payload={"application_id": str(application_id)}
     )
-    db.add(audit_log)
     
-    db.commit()
+    await db.commit()
     
     return SuccessResponse(message="Application rejected")
 
@@ -1,4 +1,5 @@
 """Authentication endpoints"""
+import asyncio
 import logging
 from typing import Optional
 import urllib.parse
@@ -6,16 +7,21 @@ from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
-from app.database import get_db
+from app.database import get_async_db
 from app.core.security import create_access_token
 from app.core.deps import get_current_user
+from app.core.identity_cache import identity_cache
 from app.config import settings
 from app.services.github_service import GitHubService
+from app.services.job_runner import job_runner
+from app.services.repo_sync import enqueue_repo_sync
 from app.models.user import User, OAuthAccount
-from app.models.audit import AuditLog
+from app.services.audit import audit_sink
 from app.schemas.auth import TokenResponse
 from app.schemas.user import UserResponse
 
@@ -24,7 +30,7 @@ logger = logging.getLogger(__name__)
 FRONTEND_PROFILE_URL = settings.frontend_profile_url
 
 
-def _generate_unique_handle(db: Session, base_handle: str) -> str:
+async def _generate_unique_handle(db: AsyncSession, base_handle: str) -> str:
     """
     Generate a unique user handle by appending an incrementing suffix when necessary.
 
@@ -38,15 +44,15 @@ def _generate_unique_handle(db: Session, base_handle: str) -> str:
     candidate = base_handle
     suffix = 1
 
-    while db.query(User.id).filter(User.handle == candidate).first():
+    while await db.scalar(select(User.id).filter(User.handle == candidate)):
         candidate = f"{base_handle}-{suffix}"
         suffix += 1
 
     return candidate
 
 
-def _locate_existing_user(
-    db: Session,
+async def _locate_existing_user(
+    db: AsyncSession,
     github_login: str,
     primary_email: Optional[str]
 ) -> Optional[User]:
@@ -62,11 +68,17 @@ def _locate_existing_user(
         Existing user instance or None
     """
     if primary_email:
-        user = db.query(User).filter(User.email == primary_email).first()
+        result = await db.execute(
+            select(User).filter(User.email == primary_email)
+        )
+        user = result.scalars().first()
         if user:
             return user
 
-    return db.query(User).filter(User.github_login == github_login).first()
+    result = await db.execute(
+        select(User).filter(User.github_login == github_login)
+    )
+    return result.scalars().first()
 
 
 @router.get("/github/login")
@@ -88,7 +100,7 @@ async def github_login(state: Optional[str] = Query(None)):
 async def github_callback(
     code: str = Query(...),
     state: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Handle GitHub OAuth callback
@@ -112,23 +124,29 @@ async def github_callback(
                 detail="Failed to get access token from GitHub"
             )
         
-        # Get user info from GitHub
-        github_user = await GitHubService.get_user_info(access_token)
+        # Get user info and emails from GitHub (concurrently, over the pooled client)
+        github_user, emails = await asyncio.gather(
+            GitHubService.get_user_info(access_token),
+            GitHubService.get_user_emails(access_token)
+        )
         github_id = str(github_user["id"])
         github_login = github_user["login"]
         
-        # Get user emails
-        emails = await GitHubService.get_user_emails(access_token)
         primary_email = next(
             (email["email"] for email in emails if email.get("primary")),
             None
         )
         
         # Check if OAuth account exists
-        oauth_account = db.query(OAuthAccount).filter(
-            OAuthAccount.provider == "github",
-            OAuthAccount.provider_account_id == github_id
-        ).first()
+        result = await db.execute(
+            select(OAuthAccount).options(
+                selectinload(OAuthAccount.user)
+            ).filter(
+                OAuthAccount.provider == "github",
+                OAuthAccount.provider_account_id == github_id
+            )
+        )
+        oauth_account = result.scalars().first()
 
         if oauth_account:
             # Existing OAuth link: refresh token & user metadata
@@ -136,7 +154,7 @@ async def github_callback(
             oauth_account.access_token = access_token
         else:
             # Either reuse an existing user (matched by email/github_login) or create a new one
-            user = _locate_existing_user(db, github_login=github_login, primary_email=primary_email)
+            user = await _locate_existing_user(db, github_login=github_login, primary_email=primary_email)
 
             if user:
                 oauth_account = OAuthAccount(
@@ -147,7 +165,7 @@ async def github_callback(
                 )
                 db.add(oauth_account)
             else:
-                handle = _generate_unique_handle(db, github_login)
+                handle = await _generate_unique_handle(db, github_login)
                 user = User(
                     handle=handle,
                     email=primary_email,
@@ -156,7 +174,7 @@ async def github_callback(
                     github_login=github_login
                 )
                 db.add(user)
-                db.flush()
+                await db.flush()
 
                 oauth_account = OAuthAccount(
                     user_id=user.id,
@@ -176,17 +194,19 @@ async def github_callback(
         user.updated_at = datetime.utcnow()
 
         # Create audit log
-        audit_log = AuditLog(
+        await audit_sink.record(
+            db,
             user_id=user.id,
             action="LOGIN",
             resource="auth",
             payload={"provider": "github", "github_login": github_login}
         )
-        db.add(audit_log)
         try:
-            db.commit()
+            # Refresh the repositories in the background (a no-op if one is already queued)
+            await enqueue_repo_sync(db, user.id)
+            await db.commit()
         except IntegrityError as commit_error:
-            db.rollback()
+            await db.rollback()
             logger.exception(
                 "GitHub OAuth commit failed",
                 extra={
@@ -200,7 +220,10 @@ async def github_callback(
                 detail="Failed to reconcile GitHub account with existing user data"
             ) from commit_error
 
-        db.refresh(user)
+        job_runner.notify()
+        await db.refresh(user)
+        # Older tokens of this user must not serve the pre-login profile
+        identity_cache.invalidate_user(user.id)
 
         # Create JWT token
         jwt_token = create_access_token(data={"sub": str(user.id)})
@@ -226,7 +249,7 @@ async def github_callback(
                 "github_login": github_user.get("login") if 'github_user' in locals() else None
             }
         )
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Authentication failed"
@@ -1,12 +1,14 @@
 """Group chat endpoints"""
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import select, and_
 
-from app.database import get_db
+from app.database import get_async_db
 from app.core.deps import get_current_user
+from app.core.pagination import decode_cursor, encode_cursor, fetch_message_page, message_position
 from app.models.user import User
 from app.models.project import Project
 from app.models.group_chat import GroupConversation, GroupMember, GroupMessage, MemberRole
@@ -21,6 +23,8 @@ from app.schemas.group_chat import (
     GroupMemberUpdateRole,
 )
 from app.schemas.common import SuccessResponse
+from app.services.membership_cache import membership_cache
+from app.services.chat_summary import mark_read
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -30,7 +34,7 @@ logger = logging.getLogger(__name__)
 async def create_general_group(
     data: GeneralGroupCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a general group conversation (not project-based)
@@ -47,10 +51,13 @@ async def create_general_group(
         Created group conversation
     """
     # Validate that all member IDs exist and are not deleted
-    members_to_add = db.query(User).filter(
-        User.id.in_(data.member_ids),
-        User.deleted_at.is_(None)
-    ).all()
+    result = await db.execute(
+        select(User).filter(
+            User.id.in_(data.member_ids),
+            User.deleted_at.is_(None)
+        )
+    )
+    members_to_add = result.scalars().all()
     
     if len(members_to_add) != len(data.member_ids):
         raise HTTPException(
@@ -64,7 +71,7 @@ async def create_general_group(
         name=data.name
     )
     db.add(group_conv)
-    db.flush()
+    await db.flush()
     
     # Add creator as owner
     owner_member = GroupMember(
@@ -87,8 +94,8 @@ async def create_general_group(
         )
         db.add(member)
     
-    db.commit()
-    db.refresh(group_conv)
+    await db.commit()
+    await db.refresh(group_conv, ["members"])
     
     return GroupConversationResponse.from_orm(group_conv)
 
@@ -97,7 +104,7 @@ async def create_general_group(
 async def create_group_conversation(
     data: GroupConversationCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a group conversation for a project
@@ -114,7 +121,10 @@ async def create_group_conversation(
         Created group conversation
     """
     # Check if project exists and user is owner
-    project = db.query(Project).filter(Project.id == data.project_id).first()
+    result = await db.execute(
+        select(Project).filter(Project.id == data.project_id)
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(
@@ -129,9 +139,12 @@ async def create_group_conversation(
         )
     
     # Check if group conversation already exists for this project
-    existing = db.query(GroupConversation).filter(
-        GroupConversation.project_id == data.project_id
-    ).first()
+    result = await db.execute(
+        select(GroupConversation).filter(
+            GroupConversation.project_id == data.project_id
+        )
+    )
+    existing = result.scalars().first()
     
     if existing:
         raise HTTPException(
@@ -145,7 +158,7 @@ async def create_group_conversation(
         name=data.name
     )
     db.add(group_conv)
-    db.flush()
+    await db.flush()
     
     # Add owner as member
     member = GroupMember(
@@ -154,8 +167,8 @@ async def create_group_conversation(
         role=MemberRole.owner
     )
     db.add(member)
-    db.commit()
-    db.refresh(group_conv)
+    await db.commit()
+    await db.refresh(group_conv, ["members"])
     
     return GroupConversationResponse.from_orm(group_conv)
 
@@ -163,11 +176,14 @@ async def create_group_conversation(
 @router.get("", response_model=List[GroupConversationResponse])
 async def get_my_group_conversations(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all group conversations the current user is a member of
     
+    Members are loaded with one extra IN query for all groups, so the
+    cost does not grow with the number of groups or members.
+    
     Args:
         current_user: Current authenticated user
         db: Database session
@@ -176,14 +192,17 @@ async def get_my_group_conversations(
         List of group conversations
     """
     # Get group conversations where user is a member
-    group_convs = db.query(GroupConversation).join(
-        GroupMember,
-        GroupConversation.id == GroupMember.group_conversation_id
-    ).filter(
-        GroupMember.user_id == current_user.id
-    ).options(
-        joinedload(GroupConversation.members)
-    ).order_by(GroupConversation.updated_at.desc()).all()
+    result = await db.execute(
+        select(GroupConversation).join(
+            GroupMember,
+            GroupConversation.id == GroupMember.group_conversation_id
+        ).filter(
+            GroupMember.user_id == current_user.id
+        ).options(
+            selectinload(GroupConversation.members)
+        ).order_by(GroupConversation.updated_at.desc())
+    )
+    group_convs = result.scalars().all()
     
     return [GroupConversationResponse.from_orm(gc) for gc in group_convs]
 
@@ -192,9 +211,11 @@ async def get_my_group_conversations(
 async def get_group_conversation(
     group_conversation_id: str,
     limit: int = Query(50, ge=1, le=100),
-    before_id: int = Query(None, description="Get messages before this ID"),
+    before: Optional[str] = Query(None, description="Cursor: get messages older than this position"),
+    after: Optional[str] = Query(None, description="Cursor: get messages newer than this position"),
+    before_id: int = Query(None, description="Deprecated: get messages before this ID"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get group conversation with messages
@@ -202,7 +223,9 @@ async def get_group_conversation(
     Args:
         group_conversation_id: Group conversation ID
         limit: Maximum number of messages
-        before_id: Get messages before this message ID (for pagination)
+        before: before_cursor of a previous page (scroll back)
+        after: after_cursor of a previous page (catch up on reconnect)
+        before_id: Get messages before this message ID (deprecated, use before)
         current_user: Current authenticated user
         db: Database session
     
@@ -210,11 +233,14 @@ async def get_group_conversation(
         Group conversation with messages
     """
     # Get group conversation
-    group_conv = db.query(GroupConversation).filter(
-        GroupConversation.id == group_conversation_id
-    ).options(
-        joinedload(GroupConversation.members)
-    ).first()
+    result = await db.execute(
+        select(GroupConversation).filter(
+            GroupConversation.id == group_conversation_id
+        ).options(
+            joinedload(GroupConversation.members)
+        )
+    )
+    group_conv = result.unique().scalars().first()
     
     if not group_conv:
         raise HTTPException(
@@ -223,12 +249,15 @@ async def get_group_conversation(
         )
     
     # Check if user is a member
-    is_member = db.query(GroupMember).filter(
-        and_(
-            GroupMember.group_conversation_id == group_conversation_id,
-            GroupMember.user_id == current_user.id
+    result = await db.execute(
+        select(GroupMember).filter(
+            and_(
+                GroupMember.group_conversation_id == group_conversation_id,
+                GroupMember.user_id == current_user.id
+            )
         )
-    ).first()
+    )
+    is_member = result.scalars().first()
     
     if not is_member:
         raise HTTPException(
@@ -237,22 +266,18 @@ async def get_group_conversation(
         )
     
     # Get messages
-    q = db.query(GroupMessage).filter(
+    q = select(GroupMessage).filter(
         GroupMessage.group_conversation_id == group_conversation_id
     )
     
-    if before_id:
-        q = q.filter(GroupMessage.id < before_id)
+    before_position = decode_cursor(before) if before else None
+    after_position = decode_cursor(after) if after else None
+    if before_position is None and before_id:
+        before_position = await message_position(db, q, GroupMessage, before_id)
     
-    messages = q.order_by(GroupMessage.created_at.desc()).limit(limit + 1).all()
-    
-    # Check if there are more messages
-    has_more = len(messages) > limit
-    if has_more:
-        messages = messages[:limit]
-    
-    # Reverse to show oldest first
-    messages.reverse()
+    messages, has_more = await fetch_message_page(
+        db, q, GroupMessage, limit, before=before_position, after=after_position
+    )
     
     return GroupConversationDetailResponse(
         id=group_conv.id,
@@ -262,16 +287,56 @@ async def get_group_conversation(
         updated_at=group_conv.updated_at,
         members=[member for member in group_conv.members],
         messages=[GroupMessageResponse.from_orm(msg) for msg in messages],
-        has_more=has_more
+        has_more=has_more,
+        before_cursor=encode_cursor(messages[0].created_at, messages[0].id) if messages else before,
+        after_cursor=encode_cursor(messages[-1].created_at, messages[-1].id) if messages else after
     )
 
 
+@router.post("/{group_conversation_id}/read", response_model=SuccessResponse)
+async def mark_group_conversation_read(
+    group_conversation_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Mark a group conversation as read up to its latest message
+    
+    Args:
+        group_conversation_id: Group conversation ID
+        current_user: Current authenticated user
+        db: Database session
+    
+    Returns:
+        Success message
+    """
+    result = await db.execute(
+        select(GroupMember.user_id).filter(
+            and_(
+                GroupMember.group_conversation_id == group_conversation_id,
+                GroupMember.user_id == current_user.id
+            )
+        )
+    )
+    
+    if result.first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this group conversation"
+        )
+    
+    await mark_read(db, GroupMessage, group_conversation_id, current_user.id)
+    await db.commit()
+    
+    return SuccessResponse(message="Conversation marked as read")
+
+
 @router.patch("/{group_conversation_id}", response_model=GroupConversationResponse)
 async def update_group_conversation(
     group_conversation_id: str,
     data: GroupConversationUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update group conversation (name)
@@ -288,9 +353,12 @@ async def update_group_conversation(
         Updated group conversation
     """
     # Get group conversation
-    group_conv = db.query(GroupConversation).filter(
-        GroupConversation.id == group_conversation_id
-    ).first()
+    result = await db.execute(
+        select(GroupConversation).filter(
+            GroupConversation.id == group_conversation_id
+        )
+    )
+    group_conv = result.scalars().first()
     
     if not group_conv:
         raise HTTPException(
@@ -299,12 +367,15 @@ async def update_group_conversation(
         )
     
     # Check if user is owner
-    member = db.query(GroupMember).filter(
-        and_(
-            GroupMember.group_conversation_id == group_conversation_id,
-            GroupMember.user_id == current_user.id
+    result = await db.execute(
+        select(GroupMember).filter(
+            and_(
+                GroupMember.group_conversation_id == group_conversation_id,
+                GroupMember.user_id == current_user.id
+            )
         )
-    ).first()
+    )
+    member = result.scalars().first()
     
     if not member or member.role != MemberRole.owner:
         raise HTTPException(
@@ -316,8 +387,8 @@ async def update_group_conversation(
     if data.name is not None:
         group_conv.name = data.name
     
-    db.commit()
-    db.refresh(group_conv)
+    await db.commit()
+    await db.refresh(group_conv, ["members"])
     
     return GroupConversationResponse.from_orm(group_conv)
 
@@ -327,7 +398,7 @@ async def add_member_to_group(
     group_conversation_id: str,
     data: GroupMemberAdd,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add a member to the group conversation
@@ -344,9 +415,12 @@ async def add_member_to_group(
         Success message
     """
     # Get group conversation
-    group_conv = db.query(GroupConversation).filter(
-        GroupConversation.id == group_conversation_id
-    ).first()
+    result = await db.execute(
+        select(GroupConversation).filter(
+            GroupConversation.id == group_conversation_id
+        )
+    )
+    group_conv = result.scalars().first()
     
     if not group_conv:
         raise HTTPException(
@@ -355,12 +429,15 @@ async def add_member_to_group(
         )
     
     # Check if current user is owner
-    current_member = db.query(GroupMember).filter(
-        and_(
-            GroupMember.group_conversation_id == group_conversation_id,
-            GroupMember.user_id == current_user.id
+    result = await db.execute(
+        select(GroupMember).filter(
+            and_(
+                GroupMember.group_conversation_id == group_conversation_id,
+                GroupMember.user_id == current_user.id
+            )
         )
-    ).first()
+    )
+    current_member = result.scalars().first()
     
     if not current_member or current_member.role != MemberRole.owner:
         raise HTTPException(
@@ -369,7 +446,10 @@ async def add_member_to_group(
         )
     
     # Check if user to add exists
-    user_to_add = db.query(User).filter(User.id == data.user_id).first()
+    result = await db.execute(
+        select(User).filter(User.id == data.user_id)
+    )
+    user_to_add = result.scalars().first()
     if not user_to_add:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -377,12 +457,15 @@ async def add_member_to_group(
         )
     
     # Check if user is already a member
-    existing = db.query(GroupMember).filter(
-        and_(
-            GroupMember.group_conversation_id == group_conversation_id,
-            GroupMember.user_id == data.user_id
+    result = await db.execute(
+        select(GroupMember).filter(
+            and_(
+                GroupMember.group_conversation_id == group_conversation_id,
+                GroupMember.user_id == data.user_id
+            )
         )
-    ).first()
+    )
+    existing = result.scalars().first()
     
     if existing:
         raise HTTPException(
@@ -390,14 +473,17 @@ async def add_member_to_group(
             detail="User is already a member"
         )
     
-    # Add member
+    # Add member; earlier history does not count as unread
     member = GroupMember(
         group_conversation_id=group_conversation_id,
         user_id=data.user_id,
-        role=MemberRole.member
+        role=MemberRole.member,
+        read_count=group_conv.message_count,
+        last_read_message_id=group_conv.last_message_id
     )
     db.add(member)
-    db.commit()
+    await db.commit()
+    membership_cache.invalidate(data.user_id, f"group:{group_conversation_id}")
     
     return SuccessResponse(message="Member added successfully")
 
@@ -407,7 +493,7 @@ async def remove_member_from_group(
     group_conversation_id: str,
     user_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Remove a member from the group conversation
@@ -424,9 +510,12 @@ async def remove_member_from_group(
         Success message
     """
     # Get group conversation
-    group_conv = db.query(GroupConversation).filter(
-        GroupConversation.id == group_conversation_id
-    ).first()
+    result = await db.execute(
+        select(GroupConversation).filter(
+            GroupConversation.id == group_conversation_id
+        )
+    )
+    group_conv = result.scalars().first()
     
     if not group_conv:
         raise HTTPException(
@@ -435,12 +524,15 @@ async def remove_member_from_group(
         )
     
     # Check if current user is owner or removing themselves
-    current_member = db.query(GroupMember).filter(
-        and_(
-            GroupMember.group_conversation_id == group_conversation_id,
-            GroupMember.user_id == current_user.id
+    result = await db.execute(
+        select(GroupMember).filter(
+            and_(
+                GroupMember.group_conversation_id == group_conversation_id,
+                GroupMember.user_id == current_user.id
+            )
         )
-    ).first()
+    )
+    current_member = result.scalars().first()
     
     if not current_member:
         raise HTTPException(
@@ -458,12 +550,15 @@ async def remove_member_from_group(
         )
     
     # Get member to remove
-    member_to_remove = db.query(GroupMember).filter(
-        and_(
-            GroupMember.group_conversation_id == group_conversation_id,
-            GroupMember.user_id == user_id
+    result = await db.execute(
+        select(GroupMember).filter(
+            and_(
+                GroupMember.group_conversation_id == group_conversation_id,
+                GroupMember.user_id == user_id
+            )
         )
-    ).first()
+    )
+    member_to_remove = result.scalars().first()
     
     if not member_to_remove:
         raise HTTPException(
@@ -478,8 +573,10 @@ async def remove_member_from_group(
             detail="Cannot remove the owner"
         )
     
-    db.delete(member_to_remove)
-    db.commit()
+    await db.delete(member_to_remove)
+    await db.commit()
+    # Removed members must not reconnect on a cached authorization
+    membership_cache.invalidate(user_id, f"group:{group_conversation_id}")
     
     return SuccessResponse(message="Member removed successfully")
 
@@ -488,7 +585,7 @@ async def remove_member_from_group(
 async def get_project_group_conversation(
     project_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get the group conversation for a project
@@ -502,7 +599,10 @@ async def get_project_group_conversation(
         Group conversation
     """
     # Get project
-    project = db.query(Project).filter(Project.id == project_id).first()
+    result = await db.execute(
+        select(Project).filter(Project.id == project_id)
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(
@@ -511,11 +611,14 @@ async def get_project_group_conversation(
         )
     
     # Get group conversation
-    group_conv = db.query(GroupConversation).filter(
-        GroupConversation.project_id == project_id
-    ).options(
-        joinedload(GroupConversation.members)
-    ).first()
+    result = await db.execute(
+        select(GroupConversation).filter(
+            GroupConversation.project_id == project_id
+        ).options(
+            joinedload(GroupConversation.members)
+        )
+    )
+    group_conv = result.unique().scalars().first()
     
     if not group_conv:
         raise HTTPException(
@@ -524,12 +627,15 @@ async def get_project_group_conversation(
         )
     
     # Check if user is a member
-    is_member = db.query(GroupMember).filter(
-        and_(
-            GroupMember.group_conversation_id == group_conv.id,
-            GroupMember.user_id == current_user.id
+    result = await db.execute(
+        select(GroupMember).filter(
+            and_(
+                GroupMember.group_conversation_id == group_conv.id,
+                GroupMember.user_id == current_user.id
+            )
         )
-    ).first()
+    )
+    is_member = result.scalars().first()
     
     if not is_member:
         raise HTTPException(
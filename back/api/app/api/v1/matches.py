@@ -1,11 +1,13 @@
 """Match endpoints"""
 import logging
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_
 
-from app.database import get_db
+from app.database import get_async_db
 from app.core.deps import get_current_user
+from app.core.pagination import decode_cursor, encode_cursor, fetch_message_page, message_position
 from app.models.user import User
 from app.models.match import Match
 from app.models.chat import Conversation, Message
@@ -15,6 +17,8 @@ from app.schemas.match import (
     ConversationResponse,
     MessageResponse
 )
+from app.schemas.common import SuccessResponse
+from app.services.chat_summary import mark_read
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -23,7 +27,7 @@ logger = logging.getLogger(__name__)
 @router.get("/me/matches", response_model=MatchListResponse)
 async def get_my_matches(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user's matches
@@ -35,12 +39,15 @@ async def get_my_matches(
     Returns:
         List of matches
     """
-    matches = db.query(Match).filter(
-        or_(
-            Match.user_a == current_user.id,
-            Match.user_b == current_user.id
-        )
-    ).order_by(Match.created_at.desc()).all()
+    result = await db.execute(
+        select(Match).filter(
+            or_(
+                Match.user_a == current_user.id,
+                Match.user_b == current_user.id
+            )
+        ).order_by(Match.created_at.desc())
+    )
+    matches = result.scalars().all()
     
     return MatchListResponse(
         matches=[MatchResponse.from_orm(match) for match in matches]
@@ -51,9 +58,11 @@ async def get_my_matches(
 async def get_conversation(
     match_id: str,
     limit: int = Query(50, ge=1, le=100),
-    before_id: int = Query(None, description="Get messages before this ID"),
+    before: Optional[str] = Query(None, description="Cursor: get messages older than this position"),
+    after: Optional[str] = Query(None, description="Cursor: get messages newer than this position"),
+    before_id: int = Query(None, description="Deprecated: get messages before this ID"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get conversation for a match
@@ -61,7 +70,9 @@ async def get_conversation(
     Args:
         match_id: Match ID
         limit: Maximum number of messages
-        before_id: Get messages before this message ID (for pagination)
+        before: before_cursor of a previous page (scroll back)
+        after: after_cursor of a previous page (catch up on reconnect)
+        before_id: Get messages before this message ID (deprecated, use before)
         current_user: Current authenticated user
         db: Database session
     
@@ -69,9 +80,12 @@ async def get_conversation(
         Conversation with messages
     """
     # Get match
-    match = db.query(Match).filter(
-        Match.id == match_id
-    ).first()
+    result = await db.execute(
+        select(Match).filter(
+            Match.id == match_id
+        )
+    )
+    match = result.scalars().first()
     
     if not match:
         raise HTTPException(
@@ -87,38 +101,83 @@ async def get_conversation(
         )
     
     # Get or create conversation
-    conversation = db.query(Conversation).filter(
-        Conversation.match_id == match_id
-    ).first()
+    result = await db.execute(
+        select(Conversation).filter(
+            Conversation.match_id == match_id
+        )
+    )
+    conversation = result.scalars().first()
     
     if not conversation:
         conversation = Conversation(match_id=match_id)
         db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
+        await db.commit()
+        await db.refresh(conversation)
     
     # Get messages
-    q = db.query(Message).filter(
+    q = select(Message).filter(
         Message.conversation_id == conversation.id
     )
     
-    if before_id:
-        q = q.filter(Message.id < before_id)
-    
-    messages = q.order_by(Message.created_at.desc()).limit(limit + 1).all()
+    before_position = decode_cursor(before) if before else None
+    after_position = decode_cursor(after) if after else None
+    if before_position is None and before_id:
+        before_position = await message_position(db, q, Message, before_id)
     
-    # Check if there are more messages
-    has_more = len(messages) > limit
-    if has_more:
-        messages = messages[:limit]
-    
-    # Reverse to show oldest first
-    messages.reverse()
+    messages, has_more = await fetch_message_page(
+        db, q, Message, limit, before=before_position, after=after_position
+    )
     
     return ConversationResponse(
         id=conversation.id,
         match_id=match_id,
         messages=[MessageResponse.from_orm(msg) for msg in messages],
-        has_more=has_more
+        has_more=has_more,
+        before_cursor=encode_cursor(messages[0].created_at, messages[0].id) if messages else before,
+        after_cursor=encode_cursor(messages[-1].created_at, messages[-1].id) if messages else after
+    )
+
+
+@router.post("/{match_id}/conversation/read", response_model=SuccessResponse)
+async def mark_conversation_read(
+    match_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Mark a match's conversation as read up to its latest message
+    
+    Args:
+        match_id: Match ID
+        current_user: Current authenticated user
+        db: Database session
+    
+    Returns:
+        Success message
+    """
+    result = await db.execute(
+        select(Match.user_a, Match.user_b, Conversation.id)
+        .outerjoin(Conversation, Conversation.match_id == Match.id)
+        .filter(Match.id == match_id)
     )
+    row = result.first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Match not found"
+        )
+    
+    if current_user.id not in (row.user_a, row.user_b):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this conversation"
+        )
+    
+    # A conversation that was never opened has nothing to read
+    if row.id is not None:
+        await mark_read(db, Message, row.id, current_user.id)
+        await db.commit()
+    
+    return SuccessResponse(message="Conversation marked as read")
 
@@ -1,16 +1,36 @@
 """Me (current user) endpoints"""
 import logging
 from typing import TYPE_CHECKING
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import UUID4
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload, selectinload
+from sqlalchemy import select, or_, and_, case, cast, func, literal, null, union_all, Text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
-from app.database import get_db
-from app.core.deps import get_current_user
+from app.database import get_async_db
+from app.core.deps import get_current_user, get_current_user_id
 from app.models.user import User
 from app.models.application import Application
 from app.models.offer import Offer
-from app.models.project import Project
+from app.models.project import Project, ProjectSkill, Favorite
+from app.models.skill import UserSkill
+from app.models.match import Match
+from app.models.chat import Conversation, ConversationRead
+from app.models.group_chat import GroupConversation, GroupMember
+from app.models.job import Job
+from app.schemas.project import (
+    ProjectSkillResponse,
+    RecommendedProjectResponse,
+    RecommendedProjectListResponse
+)
+from app.schemas.conversation import (
+    LastMessageResponse,
+    ConversationSummaryResponse,
+    ConversationSummaryListResponse
+)
+from app.schemas.job import JobResponse
+from app.services.project_index import project_index
 
 if TYPE_CHECKING:
     from app.schemas.application import ApplicationListResponse
@@ -23,7 +43,7 @@ logger = logging.getLogger(__name__)
 @router.get("/applications")
 async def get_my_applications(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user's applications
@@ -35,11 +55,15 @@ async def get_my_applications(
     Returns:
         List of applications
     """
-    applications = db.query(Application).filter(
-        Application.applicant_id == current_user.id
-    ).options(
-        joinedload(Application.project)
-    ).order_by(Application.created_at.desc()).all()
+    result = await db.execute(
+        select(Application).filter(
+            Application.applicant_id == current_user.id
+        ).options(
+            joinedload(Application.applicant),
+            joinedload(Application.project).joinedload(Project.owner)
+        ).order_by(Application.created_at.desc())
+    )
+    applications = result.scalars().all()
     
     from app.schemas.application import ApplicationResponse, ApplicationListResponse
     
@@ -51,7 +75,7 @@ async def get_my_applications(
 @router.get("/offers/sent")
 async def get_sent_offers(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get offers sent by current user
@@ -64,17 +88,20 @@ async def get_sent_offers(
         List of sent offers
     """
     # Get projects owned by current user
-    owned_project_ids = db.query(Project.id).filter(
+    owned_project_ids = select(Project.id).filter(
         Project.owner_id == current_user.id
-    ).subquery()
+    )
     
     # Get offers for those projects
-    offers = db.query(Offer).filter(
-        Offer.project_id.in_(owned_project_ids)
-    ).options(
-        joinedload(Offer.project),
-        joinedload(Offer.receiver)
-    ).order_by(Offer.created_at.desc()).all()
+    result = await db.execute(
+        select(Offer).filter(
+            Offer.project_id.in_(owned_project_ids)
+        ).options(
+            joinedload(Offer.project),
+            joinedload(Offer.receiver)
+        ).order_by(Offer.created_at.desc())
+    )
+    offers = result.scalars().all()
     
     from app.schemas.offer import OfferResponse, OfferListResponse
     
@@ -86,7 +113,7 @@ async def get_sent_offers(
 @router.get("/offers/received")
 async def get_received_offers(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get offers received by current user
@@ -98,12 +125,15 @@ async def get_received_offers(
     Returns:
         List of received offers
     """
-    offers = db.query(Offer).filter(
-        Offer.receiver_id == current_user.id
-    ).options(
-        joinedload(Offer.project),
-        joinedload(Offer.receiver)
-    ).order_by(Offer.created_at.desc()).all()
+    result = await db.execute(
+        select(Offer).filter(
+            Offer.receiver_id == current_user.id
+        ).options(
+            joinedload(Offer.project),
+            joinedload(Offer.receiver)
+        ).order_by(Offer.created_at.desc())
+    )
+    offers = result.scalars().all()
     
     from app.schemas.offer import OfferResponse, OfferListResponse
     
@@ -111,3 +141,236 @@ async def get_received_offers(
         offers=[OfferResponse.from_orm(offer) for offer in offers]
     )
 
+
+
+@router.get("/recommended-projects", response_model=RecommendedProjectListResponse)
+async def get_recommended_projects(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Recommend open projects to the current user
+    
+    Projects are ranked by how well the user's skill levels cover the
+    required levels, boosted by skills of projects the user favorited or
+    applied to. Projects already applied to and the user's own projects
+    are left out. The ranking is served from the in-memory project index
+    and cached per user.
+    
+    Args:
+        limit: Maximum number of projects
+        current_user: Current authenticated user
+        db: Database session
+    
+    Returns:
+        Recommended projects, best first
+    """
+    feed = project_index.cached_feed(current_user.id)
+    if feed is None:
+        await project_index.ensure_loaded()
+        
+        result = await db.execute(
+            select(UserSkill.skill_id, UserSkill.level).filter(
+                UserSkill.user_id == current_user.id
+            )
+        )
+        skills = dict(result.all())
+        
+        result = await db.execute(
+            select(Favorite.project_id).filter(Favorite.user_id == current_user.id)
+        )
+        favorited = set(result.scalars().all())
+        
+        result = await db.execute(
+            select(Application.project_id).filter(Application.applicant_id == current_user.id)
+        )
+        applied = set(result.scalars().all())
+        
+        feed = project_index.rank(current_user.id, skills, favorited | applied, applied)
+        project_index.store_feed(current_user.id, feed)
+    
+    feed = feed[:limit]
+    if not feed:
+        return RecommendedProjectListResponse(projects=[])
+    
+    result = await db.execute(
+        select(Project).options(
+            selectinload(Project.owner),
+            selectinload(Project.project_skills).joinedload(ProjectSkill.skill)
+        ).filter(
+            Project.id.in_([project_id for project_id, _ in feed]),
+            Project.deleted_at.is_(None),
+            Project.status == "open"
+        )
+    )
+    projects = {project.id: project for project in result.scalars().all()}
+    
+    result = await db.execute(
+        select(Favorite.project_id).filter(
+            Favorite.user_id == current_user.id,
+            Favorite.project_id.in_(list(projects))
+        )
+    )
+    favorited_ids = set(result.scalars().all())
+    
+    # Format response
+    project_responses = []
+    for project_id, score in feed:
+        project = projects.get(project_id)
+        if project is None:
+            continue
+        
+        project_detail = RecommendedProjectResponse.from_orm(project)
+        project_detail.required_skills = [
+            ProjectSkillResponse(
+                skill_id=ps.skill_id,
+                skill_name=ps.skill.name,
+                required_level=ps.required_level
+            )
+            for ps in project.project_skills
+        ]
+        project_detail.is_favorited = project.id in favorited_ids
+        project_detail.score = score
+        
+        project_responses.append(project_detail)
+    
+    return RecommendedProjectListResponse(projects=project_responses)
+
+
+@router.get("/conversations", response_model=ConversationSummaryListResponse)
+async def get_my_conversations(
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    List the current user's 1-on-1 and group conversations
+    
+    Every conversation comes with its last message, unread count and last
+    activity from one query. The summaries are kept on the conversation
+    rows and read cursors as messages are stored, so the cost grows with
+    the number of conversations, not messages.
+    
+    Args:
+        limit: Maximum number of conversations
+        current_user: Current authenticated user
+        db: Database session
+    
+    Returns:
+        Conversations, most recent activity first
+    """
+    user_id = current_user.id
+    peer = aliased(User)
+    no_uuid = cast(null(), PG_UUID(as_uuid=True))
+    
+    direct = (
+        select(
+            literal("direct").label("type"),
+            Conversation.id.label("id"),
+            Match.id.label("match_id"),
+            Match.project_id.label("project_id"),
+            peer.handle.label("name"),
+            peer.id.label("peer_id"),
+            peer.avatar_url.label("avatar_url"),
+            Conversation.last_message_id.label("last_message_id"),
+            Conversation.last_sender_id.label("last_sender_id"),
+            Conversation.last_message_preview.label("last_message_preview"),
+            Conversation.last_message_at.label("last_message_at"),
+            (
+                func.coalesce(Conversation.message_count, 0) - func.coalesce(ConversationRead.read_count, 0)
+            ).label("unread_count"),
+            func.coalesce(
+                Conversation.last_message_at, Conversation.created_at, Match.created_at
+            ).label("last_activity_at")
+        )
+        .select_from(Match)
+        .join(peer, peer.id == case((Match.user_a == user_id, Match.user_b), else_=Match.user_a))
+        .outerjoin(Conversation, Conversation.match_id == Match.id)
+        .outerjoin(
+            ConversationRead,
+            and_(ConversationRead.conversation_id == Conversation.id, ConversationRead.user_id == user_id)
+        )
+        .filter(or_(Match.user_a == user_id, Match.user_b == user_id))
+    )
+    group = (
+        select(
+            literal("group").label("type"),
+            GroupConversation.id,
+            no_uuid,
+            GroupConversation.project_id,
+            GroupConversation.name,
+            no_uuid,
+            cast(null(), Text),
+            GroupConversation.last_message_id,
+            GroupConversation.last_sender_id,
+            GroupConversation.last_message_preview,
+            GroupConversation.last_message_at,
+            GroupConversation.message_count - GroupMember.read_count,
+            func.coalesce(GroupConversation.last_message_at, GroupConversation.created_at)
+        )
+        .join(GroupMember, GroupMember.group_conversation_id == GroupConversation.id)
+        .filter(GroupMember.user_id == user_id)
+    )
+    conversations = union_all(direct, group).subquery()
+    result = await db.execute(
+        select(conversations)
+        .order_by(conversations.c.last_activity_at.desc())
+        .limit(limit)
+    )
+    
+    return ConversationSummaryListResponse(
+        conversations=[
+            ConversationSummaryResponse(
+                type=row.type,
+                id=row.id,
+                match_id=row.match_id,
+                project_id=row.project_id,
+                name=row.name,
+                peer_id=row.peer_id,
+                avatar_url=row.avatar_url,
+                last_message=LastMessageResponse(
+                    id=row.last_message_id,
+                    sender_id=row.last_sender_id,
+                    preview=row.last_message_preview,
+                    created_at=row.last_message_at
+                ) if row.last_message_id is not None else None,
+                unread_count=max(row.unread_count, 0),
+                last_activity_at=row.last_activity_at
+            )
+            for row in result.all()
+        ]
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_my_job(
+    job_id: UUID4,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the status of one of current user's background jobs
+    
+    Polled after an endpoint answered 202 with a job (e.g. repository
+    sync); one primary-key lookup, the user is not loaded.
+    
+    Args:
+        job_id: Job ID
+        current_user_id: Authenticated user's ID
+        db: Database session
+    
+    Returns:
+        Job status, with its result once succeeded
+    
+    Raises:
+        HTTPException: If the job does not exist or belongs to another user
+    """
+    job = await db.get(Job, job_id)
+    if job is None or str(job.user_id) != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    return JobResponse.model_validate(job)
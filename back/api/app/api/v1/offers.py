@@ -1,16 +1,17 @@
 """Offer endpoints"""
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db
 from app.core.deps import get_current_user
 from app.models.user import User
 from app.models.project import Project
 from app.models.offer import Offer
 from app.models.match import Match
-from app.models.audit import AuditLog
+from app.services.audit import audit_sink
 from app.schemas.offer import (
     OfferResponse,
     OfferListResponse
@@ -25,7 +26,7 @@ logger = logging.getLogger(__name__)
 async def accept_offer(
     offer_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Accept an offer (receiver only)
@@ -38,9 +39,12 @@ async def accept_offer(
     Returns:
         Success message
     """
-    offer = db.query(Offer).filter(
-        Offer.id == offer_id
-    ).first()
+    result = await db.execute(
+        select(Offer).filter(
+            Offer.id == offer_id
+        )
+    )
+    offer = result.scalars().first()
     
     if not offer:
         raise HTTPException(
@@ -68,15 +72,15 @@ async def accept_offer(
     db.add(match)
     
     # Create audit log
-    audit_log = AuditLog(
+    await audit_sink.record(
+        db,
         user_id=current_user.id,
         action="ACCEPT_OFFER",
         resource="offers",
         payload={"offer_id": str(offer_id)}
     )
-    db.add(audit_log)
     
-    db.commit()
+    await db.commit()
     
     return SuccessResponse(message="Offer accepted")
 
@@ -85,7 +89,7 @@ async def accept_offer(
 async def reject_offer(
     offer_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Reject an offer (receiver only)
@@ -98,9 +102,12 @@ async def reject_offer(
     Returns:
         Success message
     """
-    offer = db.query(Offer).filter(
-        Offer.id == offer_id
-    ).first()
+    result = await db.execute(
+        select(Offer).filter(
+            Offer.id == offer_id
+        )
+    )
+    offer = result.scalars().first()
     
     if not offer:
         raise HTTPException(
@@ -120,15 +127,15 @@ async def reject_offer(
     offer.updated_at = datetime.utcnow()
     
     # Create audit log
-    audit_log = AuditLog(
+    await audit_sink.record(
+        db,
         user_id=current_user.id,
         action="REJECT_OFFER",
         resource="offers",
         payload={"offer_id": str(offer_id)}
     )
-    db.add(audit_log)
     
-    db.commit()
+    await db.commit()
     
     return SuccessResponse(message="Offer rejected")
 
@@ -1,40 +1,54 @@
 """Project endpoints"""
+import html
+import json
 import logging
-from typing import Optional, TYPE_CHECKING
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_, func
-from datetime import datetime
+from typing import Dict, List, Optional, TYPE_CHECKING
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query, Body
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import select, or_, and_, func
+from datetime import datetime, timedelta
 
 if TYPE_CHECKING:
     from app.schemas.application import ApplicationCreate, ApplicationResponse
     from app.schemas.offer import OfferCreate, OfferResponse
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_async_db
 from app.core.deps import get_current_user, get_current_user_optional
 from app.models.user import User
 from app.models.project import Project, ProjectSkill, Favorite
-from app.models.skill import Skill
-from app.models.audit import AuditLog
+from app.services.audit import audit_sink
+from app.services.skill_set import write_skill_set
+from app.services.candidate_index import candidate_index
+from app.services.project_index import project_index
+from app.services.response_cache import project_cache, json_response, dump_json
 from app.schemas.project import (
     ProjectCreate,
     ProjectUpdate,
     ProjectResponse,
     ProjectDetailResponse,
     ProjectListResponse,
-    ProjectSkillResponse
+    ProjectSkillResponse,
+    CandidateResponse,
+    CandidateListResponse
 )
+from app.schemas.user import UserResponse
 from app.schemas.common import SuccessResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Match markers for ts_headline; control characters never occur in user text
+_HIGHLIGHT_START = "\x02"
+_HIGHLIGHT_STOP = "\x03"
+
 
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project_data: ProjectCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new project
@@ -55,85 +69,172 @@ async def create_project(
         status="open"
     )
     db.add(project)
-    db.flush()
+    await db.flush()
     
     # Add required skills
-    for skill_data in project_data.required_skills:
-        # Verify skill exists
-        skill = db.query(Skill).filter(Skill.id == skill_data.skill_id).first()
-        if not skill:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Skill with id {skill_data.skill_id} not found"
-            )
-        
-        # Validate level
-        if skill_data.required_level < 1 or skill_data.required_level > 5:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Required level must be between 1 and 5"
-            )
-        
-        project_skill = ProjectSkill(
-            project_id=project.id,
-            skill_id=skill_data.skill_id,
-            required_level=skill_data.required_level
-        )
-        db.add(project_skill)
+    await write_skill_set(
+        db, ProjectSkill, "project_id", project.id, "required_level",
+        [(s.skill_id, s.required_level) for s in project_data.required_skills],
+        level_label="Required level",
+        is_new=True
+    )
     
     # Create audit log
-    audit_log = AuditLog(
+    await audit_sink.record(
+        db,
         user_id=current_user.id,
         action="CREATE_PROJECT",
         resource="projects",
         payload={"project_id": str(project.id), "title": project.title}
     )
-    db.add(audit_log)
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project, ["owner"])
+    project_cache.clear()
+    project_index.set_project(
+        project.id,
+        current_user.id,
+        {s.skill_id: s.required_level for s in project_data.required_skills},
+        is_open=True
+    )
     
     return ProjectResponse.from_orm(project)
 
 
 @router.get("", response_model=ProjectListResponse)
 async def list_projects(
+    request: Request,
     query: Optional[str] = Query(None, description="Search query for title/description"),
     skill_id: Optional[int] = Query(None, description="Filter by skill ID"),
     owner_id: Optional[str] = Query(None, description="Filter by owner ID"),
     status: Optional[str] = Query(None, description="Filter by status"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    total_mode: Optional[str] = Query(
+        None,
+        pattern="^(exact|estimated|none)$",
+        description="How to compute total: exact, estimated or none (default depends on filters)"
+    ),
+    sort: str = Query(
+        "newest",
+        pattern="^(newest|relevance)$",
+        description="Order: newest first, or by search relevance (requires query)"
+    ),
+    highlight: bool = Query(False, description="Return a highlighted description snippet (requires query)"),
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List projects with filters
     
+    total_mode controls the total count:
+        exact: count(*) OVER () computed by the page query itself
+        estimated: the planner's row estimate (counted exactly when small)
+        none: no total, only has_more
+    
+    Pages are served from the response cache and carry an ETag, so
+    If-None-Match revalidation returns 304. is_favorited is overlaid per
+    caller after the cache lookup.
+    
     Args:
+        request: Incoming request (for If-None-Match)
         query: Search query for title/description
         skill_id: Filter by skill
         owner_id: Filter by owner
         status: Filter by status
         limit: Maximum number of results
         offset: Offset for pagination
+        total_mode: Total count strategy
+        sort: newest or relevance
+        highlight: Whether to return highlighted snippets
         current_user: Optional current user
         db: Database session
     
     Returns:
         List of projects
     """
-    q = db.query(Project).options(
-        joinedload(Project.project_skills).joinedload(ProjectSkill.skill)
-    ).filter(Project.deleted_at.is_(None))
+    # Blank queries search nothing: same default total_mode and cache entry as no query
+    query = " ".join(query.split()) if query else None
+    query = query or None
+    
+    # A full-text search has to collect every match before sorting, so the
+    # window count is nearly free, while planner estimates for tsquery
+    # predicates are poor. Without one, the listing can stop early on the
+    # created_at index and the column statistics estimate well (small
+    # estimates are still counted exactly).
+    if total_mode is None:
+        total_mode = "exact" if query else "estimated"
+    
+    # Anonymous and signed-in callers share one cached page per normalized query
+    key = ("list", query, skill_id, owner_id and owner_id.lower(), status, limit, offset, total_mode, sort, highlight)
+    cached = project_cache.get(key)
+    if cached is None:
+        generation = project_cache.generation
+        listing = await _query_project_list(
+            db, query, skill_id, owner_id, status, limit, offset, total_mode, sort, highlight
+        )
+        cached = project_cache.set(key, listing.model_dump(mode="json"), generation)
+    
+    # Overlay the caller's favorites
+    favorited_ids = set()
+    if current_user and cached.data["projects"]:
+        result = await db.execute(
+            select(Favorite.project_id).filter(
+                Favorite.user_id == current_user.id,
+                Favorite.project_id.in_([p["id"] for p in cached.data["projects"]])
+            )
+        )
+        favorited_ids = {str(project_id) for project_id in result.scalars().all()}
+    
+    if not favorited_ids:
+        return json_response(request, cached.body, private=current_user is not None, etag=cached.etag)
+    
+    data = dict(cached.data)
+    data["projects"] = [
+        dict(p, is_favorited=True) if p["id"] in favorited_ids else p
+        for p in cached.data["projects"]
+    ]
+    return json_response(request, dump_json(data), private=True)
+
+
+async def _query_project_list(
+    db: AsyncSession,
+    query: Optional[str],
+    skill_id: Optional[int],
+    owner_id: Optional[str],
+    status: Optional[str],
+    limit: int,
+    offset: int,
+    total_mode: str,
+    sort: str,
+    highlight: bool
+) -> ProjectListResponse:
+    """
+    Run the project listing queries (without per-user fields)
+    
+    Args:
+        db: Database session
+        query: Normalized search query
+        skill_id: Filter by skill
+        owner_id: Filter by owner
+        status: Filter by status
+        limit: Maximum number of results
+        offset: Offset for pagination
+        total_mode: exact, estimated or none
+        sort: newest or relevance
+        highlight: Whether to return highlighted snippets
+    
+    Returns:
+        Project page with is_favorited unset
+    """
+    q = select(Project).filter(Project.deleted_at.is_(None))
     
     # Apply filters
+    tsquery = None
     if query:
-        # Use PostgreSQL full-text search with unaccent_immutable function
-        from sqlalchemy import text
-        q = q.filter(
-            text("to_tsvector('simple', unaccent_immutable(coalesce(projects.title, '') || ' ' || coalesce(projects.description, ''))) @@ plainto_tsquery('simple', :query)")
-        ).params(query=query)
+        # Full-text search on the stored, GIN-indexed search_vector
+        tsquery = func.plainto_tsquery("simple", func.unaccent_immutable(query))
+        q = q.filter(Project.search_vector.op("@@")(tsquery))
     
     if skill_id:
         q = q.join(ProjectSkill).filter(ProjectSkill.skill_id == skill_id)
@@ -144,21 +245,57 @@ async def list_projects(
     if status:
         q = q.filter(Project.status == status)
     
-    # Get total count
-    total = q.count()
-    
-    # Get projects
-    projects = q.order_by(Project.created_at.desc()).offset(offset).limit(limit).all()
-    
-    # Check if favorited by current user
-    favorited_ids = set()
-    if current_user:
-        favorited_ids = set(
-            fav.project_id for fav in db.query(Favorite).filter(
-                Favorite.user_id == current_user.id,
-                Favorite.project_id.in_([p.id for p in projects])
-            ).all()
+    # Get projects (one extra row tells whether there is a next page)
+    page_q = q.options(
+        selectinload(Project.owner),
+        selectinload(Project.project_skills).joinedload(ProjectSkill.skill)
+    )
+    if sort == "relevance" and tsquery is not None:
+        page_q = page_q.order_by(
+            func.ts_rank_cd(Project.search_vector, tsquery).desc(),
+            Project.created_at.desc()
         )
+    elif tsquery is not None:
+        # tsquery selectivity is poorly estimated; sorting on an expression
+        # keeps the planner from walking the created_at index and filtering
+        # every row when few (or no) projects match, so the GIN index is used
+        page_q = page_q.order_by((Project.created_at + timedelta(0)).desc())
+    else:
+        page_q = page_q.order_by(Project.created_at.desc())
+    page_q = page_q.offset(offset).limit(limit + 1)
+    
+    total = None
+    if total_mode == "exact":
+        result = await db.execute(page_q.add_columns(func.count().over().label("total")))
+        rows = result.all()
+        projects = [row[0] for row in rows]
+        if rows:
+            total = rows[0].total
+    else:
+        result = await db.execute(page_q)
+        projects = list(result.scalars().all())
+    
+    has_more = len(projects) > limit
+    projects = projects[:limit]
+    
+    # Get total count
+    if total_mode == "exact" and total is None:
+        # Empty page: past the end, so count separately (or nothing matched)
+        total = await _count_projects(db, q) if offset else 0
+    elif total_mode == "estimated":
+        if not has_more and (projects or not offset):
+            # Last page: the total is known exactly
+            total = offset + len(projects)
+        else:
+            total = await _estimate_projects(db, q)
+            if total < settings.project_count_exact_threshold:
+                total = await _count_projects(db, q)
+            total = max(total, offset + len(projects) + int(has_more))
+    
+    # Highlight matches for the page only
+    snippets = {}
+    if highlight and tsquery is not None and projects:
+        snippets = await _highlight_projects(db, [p.id for p in projects], tsquery)
     
     # Format response
     project_responses = []
@@ -174,23 +311,101 @@ async def list_projects(
         
         project_detail = ProjectDetailResponse.from_orm(project)
         project_detail.required_skills = skills
-        project_detail.is_favorited = project.id in favorited_ids
+        project_detail.snippet = snippets.get(project.id)
         
         project_responses.append(project_detail)
     
-    return ProjectListResponse(projects=project_responses, total=total)
+    return ProjectListResponse(
+        projects=project_responses,
+        total=total,
+        total_mode=total_mode,
+        has_more=has_more
+    )
+
+
+async def _count_projects(db: AsyncSession, q) -> int:
+    """
+    Count the rows matched by a project query
+    
+    Args:
+        db: Database session
+        q: Filtered project select
+    
+    Returns:
+        Exact number of rows
+    """
+    return await db.scalar(select(func.count()).select_from(q.subquery()))
+
+
+async def _highlight_projects(db: AsyncSession, project_ids: List, tsquery) -> Dict:
+    """
+    Build highlighted description snippets for a page of search results
+    
+    ts_headline marks matches with control characters, which are turned into
+    <mark> tags after HTML-escaping the text so descriptions cannot inject markup.
+    
+    Args:
+        db: Database session
+        project_ids: Project IDs on the page
+        tsquery: Search query expression
+    
+    Returns:
+        Snippet HTML by project ID
+    """
+    result = await db.execute(
+        select(
+            Project.id,
+            func.ts_headline(
+                "simple",
+                Project.description,
+                tsquery,
+                f"StartSel={_HIGHLIGHT_START}, StopSel={_HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=20, MinWords=5"
+            )
+        ).filter(Project.id.in_(project_ids))
+    )
+    return {
+        project_id: html.escape(snippet)
+        .replace(_HIGHLIGHT_START, "<mark>")
+        .replace(_HIGHLIGHT_STOP, "</mark>")
+        for project_id, snippet in result.all()
+    }
+
+
+async def _estimate_projects(db: AsyncSession, q) -> int:
+    """
+    Estimate the rows matched by a project query from the planner
+    
+    Args:
+        db: Database session
+        q: Filtered project select
+    
+    Returns:
+        Planner row estimate
+    """
+    conn = await db.connection()
+    compiled = q.compile(dialect=conn.dialect)
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
 
 
 @router.get("/{project_id}", response_model=ProjectDetailResponse)
 async def get_project(
+    request: Request,
     project_id: str,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get project by ID
     
+    Served from the response cache with an ETag; is_favorited is
+    overlaid per caller.
+    
     Args:
+        request: Incoming request (for If-None-Match)
         project_id: Project ID
         current_user: Optional current user
         db: Database session
@@ -198,12 +413,53 @@ async def get_project(
     Returns:
         Project detail
     """
-    project = db.query(Project).options(
-        joinedload(Project.project_skills).joinedload(ProjectSkill.skill)
-    ).filter(
-        Project.id == project_id,
-        Project.deleted_at.is_(None)
-    ).first()
+    key = ("detail", project_id.lower())
+    cached = project_cache.get(key)
+    if cached is None:
+        generation = project_cache.generation
+        project_detail = await _query_project_detail(db, project_id)
+        cached = project_cache.set(key, project_detail.model_dump(mode="json"), generation)
+    
+    # Check if favorited
+    is_favorited = False
+    if current_user:
+        result = await db.execute(
+            select(Favorite.project_id).filter(
+                Favorite.user_id == current_user.id,
+                Favorite.project_id == project_id
+            )
+        )
+        is_favorited = result.first() is not None
+    
+    if not is_favorited:
+        return json_response(request, cached.body, private=current_user is not None, etag=cached.etag)
+    return json_response(request, dump_json(dict(cached.data, is_favorited=True)), private=True)
+
+
+async def _query_project_detail(db: AsyncSession, project_id: str) -> ProjectDetailResponse:
+    """
+    Load a project with its owner and skills (without per-user fields)
+    
+    Args:
+        db: Database session
+        project_id: Project ID
+    
+    Returns:
+        Project detail with is_favorited unset
+    
+    Raises:
+        HTTPException: If the project does not exist
+    """
+    result = await db.execute(
+        select(Project).options(
+            selectinload(Project.owner),
+            selectinload(Project.project_skills).joinedload(ProjectSkill.skill)
+        ).filter(
+            Project.id == project_id,
+            Project.deleted_at.is_(None)
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(
@@ -211,14 +467,6 @@ async def get_project(
             detail="Project not found"
         )
     
-    # Check if favorited
-    is_favorited = False
-    if current_user:
-        is_favorited = db.query(Favorite).filter(
-            Favorite.user_id == current_user.id,
-            Favorite.project_id == project.id
-        ).first() is not None
-    
     # Format response
     skills = [
         ProjectSkillResponse(
@@ -231,7 +479,6 @@ async def get_project(
     
     project_detail = ProjectDetailResponse.from_orm(project)
     project_detail.required_skills = skills
-    project_detail.is_favorited = is_favorited
     
     return project_detail
 
@@ -241,7 +488,7 @@ async def update_project(
     project_id: str,
     project_update: ProjectUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update project
@@ -255,10 +502,13 @@ async def update_project(
     Returns:
         Updated project
     """
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.deleted_at.is_(None)
-    ).first()
+    result = await db.execute(
+        select(Project).filter(
+            Project.id == project_id,
+            Project.deleted_at.is_(None)
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(
@@ -283,49 +533,122 @@ async def update_project(
     
     # Update skills if provided
     if project_update.required_skills is not None:
-        # Delete existing skills
-        db.query(ProjectSkill).filter(
-            ProjectSkill.project_id == project.id
-        ).delete()
-        
-        # Add new skills
-        for skill_data in project_update.required_skills:
-            skill = db.query(Skill).filter(Skill.id == skill_data.skill_id).first()
-            if not skill:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Skill with id {skill_data.skill_id} not found"
-                )
-            
-            project_skill = ProjectSkill(
-                project_id=project.id,
-                skill_id=skill_data.skill_id,
-                required_level=skill_data.required_level
-            )
-            db.add(project_skill)
+        await write_skill_set(
+            db, ProjectSkill, "project_id", project.id, "required_level",
+            [(s.skill_id, s.required_level) for s in project_update.required_skills],
+            level_label="Required level"
+        )
     
     project.updated_at = datetime.utcnow()
     
     # Create audit log
-    audit_log = AuditLog(
+    await audit_sink.record(
+        db,
         user_id=current_user.id,
         action="UPDATE_PROJECT",
         resource="projects",
         payload={"project_id": str(project.id)}
     )
-    db.add(audit_log)
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project, ["owner"])
+    project_cache.clear()
+    
+    # Keep the recommendation index in step
+    skills = None
+    if project_update.required_skills is not None:
+        skills = {s.skill_id: s.required_level for s in project_update.required_skills}
+    elif project_update.status == "open":
+        # Possibly reopened: the index may hold no skills for it
+        result = await db.execute(
+            select(ProjectSkill.skill_id, ProjectSkill.required_level).filter(
+                ProjectSkill.project_id == project.id
+            )
+        )
+        skills = dict(result.all())
+    project_index.set_project(project.id, project.owner_id, skills, is_open=project.status == "open")
     
     return ProjectResponse.from_orm(project)
 
 
+@router.get("/{project_id}/candidates", response_model=CandidateListResponse)
+async def get_project_candidates(
+    project_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Recommend users for a project (owner only)
+    
+    Users are ranked by how well their skill levels cover the required
+    levels, boosted by GitHub repos written in a required skill and by
+    stars. Scoring runs on the in-memory candidate index, not in SQL.
+    
+    Args:
+        project_id: Project ID
+        limit: Maximum number of candidates
+        current_user: Current authenticated user
+        db: Database session
+    
+    Returns:
+        Candidates, best first
+    """
+    result = await db.execute(
+        select(Project).options(
+            selectinload(Project.project_skills).joinedload(ProjectSkill.skill)
+        ).filter(
+            Project.id == project_id,
+            Project.deleted_at.is_(None)
+        )
+    )
+    project = result.scalars().first()
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    if project.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only project owner can view candidates"
+        )
+    
+    await candidate_index.ensure_loaded()
+    ranked = candidate_index.rank(
+        [(ps.skill_id, ps.required_level, ps.skill.name) for ps in project.project_skills],
+        limit,
+        exclude={project.owner_id}
+    )
+    if not ranked:
+        return CandidateListResponse(candidates=[])
+    
+    result = await db.execute(
+        select(User).filter(
+            User.id.in_([user_id for user_id, _, _ in ranked]),
+            User.deleted_at.is_(None)
+        )
+    )
+    users = {user.id: user for user in result.scalars().all()}
+    
+    return CandidateListResponse(candidates=[
+        CandidateResponse(
+            user=UserResponse.from_orm(users[user_id]),
+            score=score,
+            matched_skill_ids=matched
+        )
+        for user_id, score, matched in ranked
+        if user_id in users
+    ])
+
+
 @router.post("/{project_id}/favorite", response_model=SuccessResponse)
 async def favorite_project(
     project_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add project to favorites
@@ -339,10 +662,13 @@ async def favorite_project(
         Success message
     """
     # Check if project exists
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.deleted_at.is_(None)
-    ).first()
+    result = await db.execute(
+        select(Project).filter(
+            Project.id == project_id,
+            Project.deleted_at.is_(None)
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(
@@ -351,10 +677,13 @@ async def favorite_project(
         )
     
     # Check if already favorited
-    existing = db.query(Favorite).filter(
-        Favorite.user_id == current_user.id,
-        Favorite.project_id == project_id
-    ).first()
+    result = await db.execute(
+        select(Favorite).filter(
+            Favorite.user_id == current_user.id,
+            Favorite.project_id == project_id
+        )
+    )
+    existing = result.scalars().first()
     
     if existing:
         return SuccessResponse(message="Project already in favorites")
@@ -365,7 +694,8 @@ async def favorite_project(
         project_id=project_id
     )
     db.add(favorite)
-    db.commit()
+    await db.commit()
+    project_index.invalidate_feed(current_user.id)
     
     return SuccessResponse(message="Project added to favorites")
 
@@ -374,7 +704,7 @@ async def favorite_project(
 async def unfavorite_project(
     project_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Remove project from favorites
@@ -387,16 +717,20 @@ async def unfavorite_project(
     Returns:
         Success message
     """
-    favorite = db.query(Favorite).filter(
-        Favorite.user_id == current_user.id,
-        Favorite.project_id == project_id
-    ).first()
+    result = await db.execute(
+        select(Favorite).filter(
+            Favorite.user_id == current_user.id,
+            Favorite.project_id == project_id
+        )
+    )
+    favorite = result.scalars().first()
     
     if not favorite:
         return SuccessResponse(message="Project not in favorites")
     
-    db.delete(favorite)
-    db.commit()
+    await db.delete(favorite)
+    await db.commit()
+    project_index.invalidate_feed(current_user.id)
     
     return SuccessResponse(message="Project removed from favorites")
 
@@ -406,7 +740,7 @@ async def apply_to_project(
     project_id: str,
     application_data: dict = Body(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Apply to a project"""
     from app.models.application import Application
@@ -416,11 +750,14 @@ async def apply_to_project(
     application_data = ApplicationCreate(**application_data)
     
     # Check if project exists
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.deleted_at.is_(None),
-        Project.status == "open"
-    ).first()
+    result = await db.execute(
+        select(Project).filter(
+            Project.id == project_id,
+            Project.deleted_at.is_(None),
+            Project.status == "open"
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(
@@ -436,10 +773,13 @@ async def apply_to_project(
         )
     
     # Check if already applied
-    existing = db.query(Application).filter(
-        Application.project_id == project_id,
-        Application.applicant_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Application).filter(
+            Application.project_id == project_id,
+            Application.applicant_id == current_user.id
+        )
+    )
+    existing = result.scalars().first()
     
     if existing:
         raise HTTPException(
@@ -457,16 +797,24 @@ async def apply_to_project(
     db.add(application)
     
     # Create audit log
-    audit_log = AuditLog(
+    await audit_sink.record(
+        db,
         user_id=current_user.id,
         action="CREATE_APPLICATION",
         resource="applications",
         payload={"project_id": str(project_id)}
     )
-    db.add(audit_log)
     
-    db.commit()
-    db.refresh(application)
+    await db.commit()
+    project_index.invalidate_feed(current_user.id)
+    
+    result = await db.execute(
+        select(Application).options(
+            selectinload(Application.applicant),
+            selectinload(Application.project).selectinload(Project.owner)
+        ).filter(Application.id == application.id)
+    )
+    application = result.scalars().one()
     
     return ApplicationResponse.from_orm(application)
 
@@ -476,7 +824,7 @@ async def create_offer(
     project_id: str,
     offer_data: dict = Body(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create an offer to a user for a project"""
     from app.models.offer import Offer
@@ -486,11 +834,14 @@ async def create_offer(
     offer_data = OfferCreate(**offer_data)
     
     # Check if project exists and user is owner
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.deleted_at.is_(None),
-        Project.status == "open"
-    ).first()
+    result = await db.execute(
+        select(Project).filter(
+            Project.id == project_id,
+            Project.deleted_at.is_(None),
+            Project.status == "open"
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(
@@ -505,10 +856,13 @@ async def create_offer(
         )
     
     # Check if receiver exists
-    receiver = db.query(User).filter(
-        User.id == offer_data.receiver_id,
-        User.deleted_at.is_(None)
-    ).first()
+    result = await db.execute(
+        select(User).filter(
+            User.id == offer_data.receiver_id,
+            User.deleted_at.is_(None)
+        )
+    )
+    receiver = result.scalars().first()
     
     if not receiver:
         raise HTTPException(
@@ -524,11 +878,14 @@ async def create_offer(
         )
     
     # Check if already offered
-    existing = db.query(Offer).filter(
-        Offer.project_id == project_id,
-        Offer.sender_id == current_user.id,
-        Offer.receiver_id == offer_data.receiver_id
-    ).first()
+    result = await db.execute(
+        select(Offer).filter(
+            Offer.project_id == project_id,
+            Offer.sender_id == current_user.id,
+            Offer.receiver_id == offer_data.receiver_id
+        )
+    )
+    existing = result.scalars().first()
     
     if existing:
         raise HTTPException(
@@ -547,16 +904,16 @@ async def create_offer(
     db.add(offer)
     
     # Create audit log
-    audit_log = AuditLog(
+    await audit_sink.record(
+        db,
         user_id=current_user.id,
         action="CREATE_OFFER",
         resource="offers",
         payload={"project_id": str(project_id), "receiver_id": str(offer_data.receiver_id)}
     )
-    db.add(audit_log)
     
-    db.commit()
-    db.refresh(offer)
+    await db.commit()
+    await db.refresh(offer)
     
     return OfferResponse.from_orm(offer)
 
@@ -1,14 +1,16 @@
 """Skill endpoints"""
 from typing import Optional
 from fastapi import APIRouter, Depends, Query, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, case, func
 from sqlalchemy.exc import IntegrityError
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.skill import Skill
 from app.models.user import User
 from app.schemas.skill import SkillResponse, SkillListResponse, SkillCreate
 from app.core.deps import get_current_user
+from app.services.skill_index import skill_index
 
 router = APIRouter()
 
@@ -17,11 +19,15 @@ router = APIRouter()
 async def search_skills(
     query: Optional[str] = Query(None, description="Search query for skill names"),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Search skills by name (for autocomplete/suggestion)
     
+    Names starting with the query come first, then names containing it.
+    Served from the in-memory skill index; very large skill tables are
+    searched through the pg_trgm index instead.
+    
     Args:
         query: Optional search query
         limit: Maximum number of results
@@ -30,13 +36,22 @@ async def search_skills(
     Returns:
         List of matching skills
     """
-    q = db.query(Skill)
+    if await skill_index.ensure_loaded(db):
+        return SkillListResponse(
+            skills=[SkillResponse(id=skill_id, name=name) for skill_id, name in skill_index.search(query, limit)]
+        )
+    
+    q = select(Skill)
     
     if query:
-        # Case-insensitive partial match
-        q = q.filter(Skill.name.ilike(f"%{query}%"))
+        # Case-insensitive partial match (served by the trigram index)
+        pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        q = q.filter(Skill.name.ilike(f"%{pattern}%")).order_by(
+            case((Skill.name.ilike(f"{pattern}%"), 0), else_=1)
+        )
     
-    skills = q.order_by(Skill.name).limit(limit).all()
+    result = await db.execute(q.order_by(func.lower(Skill.name)).limit(limit))
+    skills = result.scalars().all()
     
     return SkillListResponse(
         skills=[SkillResponse.from_orm(skill) for skill in skills]
@@ -47,7 +62,7 @@ async def search_skills(
 async def create_skill(
     skill_data: SkillCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new skill (authenticated users only)
@@ -81,9 +96,12 @@ async def create_skill(
         )
     
     # 既存のスキルをチェック（大文字小文字を区別しない）
-    existing_skill = db.query(Skill).filter(
-        Skill.name.ilike(skill_name)
-    ).first()
+    result = await db.execute(
+        select(Skill).filter(
+            Skill.name.ilike(skill_name)
+        )
+    )
+    existing_skill = result.scalars().first()
     
     if existing_skill:
         # 既に存在する場合は既存のスキルを返す
@@ -94,15 +112,19 @@ async def create_skill(
     
     try:
         db.add(new_skill)
-        db.commit()
-        db.refresh(new_skill)
+        await db.commit()
+        await db.refresh(new_skill)
+        skill_index.add(new_skill.id, new_skill.name)
         return SkillResponse.from_orm(new_skill)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         # 競合状態で別のユーザーが同時に作成した場合
-        existing_skill = db.query(Skill).filter(
-            Skill.name.ilike(skill_name)
-        ).first()
+        result = await db.execute(
+            select(Skill).filter(
+                Skill.name.ilike(skill_name)
+            )
+        )
+        existing_skill = result.scalars().first()
         if existing_skill:
             return SkillResponse.from_orm(existing_skill)
         raise HTTPException(
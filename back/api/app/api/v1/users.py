@@ -1,83 +1,188 @@
 """User endpoints"""
 import logging
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import UUID4
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select, distinct, func, tuple_
 from datetime import datetime
 
-from app.database import get_db
-from app.core.deps import get_current_user
+from app.database import get_async_db
+from app.core.deps import get_current_user, get_current_user_id
+from app.core.identity_cache import identity_cache
+from app.core.pagination import encode_keyset, decode_keyset
 from app.models.user import User
-from app.models.skill import Skill, UserSkill
+from app.models.skill import UserSkill
 from app.models.github_repo import GitHubRepo
-from app.models.audit import AuditLog
-from app.services.github_service import GitHubService
+from app.services.audit import audit_sink
+from app.services.repo_sync import enqueue_repo_sync
+from app.services.job_runner import job_runner
+from app.services.skill_set import write_skill_set
+from app.services.candidate_index import candidate_index
+from app.services.project_index import project_index
+from app.services.response_cache import project_cache
+from app.services.chat_service import manager
 from app.schemas.user import (
     UserResponse,
     UserDetailResponse,
+    UserSearchResponse,
+    UserPresence,
+    UserPresenceResponse,
     UserUpdate,
     UserSkillUpdate,
     UserSkillSchema,
     GitHubRepoSchema
 )
 from app.schemas.common import SuccessResponse
+from app.schemas.job import JobResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-@router.get("/search", response_model=List[UserResponse])
+@router.get("/search", response_model=UserSearchResponse)
 async def search_users(
         q: str,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user),  # 認証済みユーザーのみアクセス可能とする
-        limit: int = 10
+        limit: int = Query(10, ge=1, le=50),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        skill_ids: Optional[List[int]] = Query(None, description="Only users having all of these skills")
 ):
     """
-    Search users by handle or name.
+    Search users by handle.
+
+    Matches are case-insensitive substrings ranked by closeness: handles
+    starting with the query come first in alphabetical order (so an exact
+    match leads), then handles containing it, most similar first (pg_trgm
+    similarity). Prefix matches are read in order from the lower(handle)
+    index and the rest through the trigram index, which is skipped when
+    prefix matches fill the page.
 
     Args:
-        q: Search query string (handle or name)
+        q: Search query string (handle)
         db: Database session
         current_user: Current authenticated user
         limit: Maximum number of results
+        cursor: Keyset cursor for the next page
+        skill_ids: Required skill IDs
 
     Returns:
-        List of matching users (UserResponse schema)
+        Matching users and the cursor of the next page
     """
     if len(q) < 2:
-        return [] # 短すぎるクエリは拒否
+        return UserSearchResponse(users=[]) # 短すぎるクエリは拒否
+
+    needle = q.lower()
+    # LIKE のワイルドカードはそのまま文字として扱う
+    escaped = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    handle = func.lower(User.handle).collate("C")
+
+    query = select(User).filter(User.deleted_at.is_(None))
+    if skill_ids:
+        query = query.filter(User.id.in_(
+            select(UserSkill.user_id)
+            .filter(UserSkill.skill_id.in_(skill_ids))
+            .group_by(UserSkill.user_id)
+            .having(func.count(distinct(UserSkill.skill_id)) == len(set(skill_ids)))
+        ))
+
+    # The cursor is (group, similarity, handle) of the last user:
+    # group 1 = prefix (similarity None), 2 = substring
+    after = None
+    if cursor:
+        after = decode_keyset(cursor, 3)
+        valid = isinstance(after[2], str) and (
+            (after[0] == 1 and after[1] is None)
+            or (after[0] == 2 and isinstance(after[1], (int, float)) and not isinstance(after[1], bool))
+        )
+        if not valid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
 
-    # 大文字・小文字を区別しない部分一致検索
-    search_pattern = f"%{q}%"
+    rows = []
+    # 1. 前方一致（prefix index を順に読むのでソート不要）
+    if after is None or after[0] == 1:
+        prefix_key = tuple_(handle, User.handle)
+        prefix_query = query.filter(handle.like(f"{escaped}%", escape="\\"))
+        if after is not None:
+            prefix_query = prefix_query.filter(prefix_key > tuple_(after[2].lower(), after[2]))
+        result = await db.execute(prefix_query.order_by(*prefix_key).limit(limit + 1))
+        rows = [(1, None, user) for user in result.scalars().all()]
+
+    # 2. 部分一致（trigram index で絞り込み、similarity の高い順）
+    if len(rows) <= limit:
+        # Plain lower(handle), the expression of the trigram index
+        lowered = func.lower(User.handle)
+        similarity = func.similarity(lowered, needle)
+        contains_query = query.add_columns(similarity).filter(
+            lowered.like(f"%{escaped}%", escape="\\"),
+            handle.notlike(f"{escaped}%", escape="\\")
+        )
+        if after is not None and after[0] == 2:
+            contains_query = contains_query.filter(
+                tuple_(-similarity, User.handle) > tuple_(-after[1], after[2])
+            )
+        result = await db.execute(
+            contains_query.order_by(similarity.desc(), User.handle).limit(limit + 1 - len(rows))
+        )
+        rows.extend((2, score, user) for user, score in result.all())
 
-    # 1. 認証ユーザーIDと検索クエリをログに出力
-    logger.info(f"Searching for: {q}. Current User ID: {current_user.id}")
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        group, score, last = rows[-1]
+        next_cursor = encode_keyset(group, score, last.handle)
 
-    # 2. 実際に実行されるSQLクエリをログに出力 (DEBUGレベル)
-    # NOTE: db.query(User).filter(...) の後の .statement.compile(...) を利用します
-    # ただし、完全なクエリをログに出すには、SQLAlchemyの機能を正しく使う必要があります。
-    # ここでは簡易的なログ出力にとどめます。
+    return UserSearchResponse(
+        users=[UserResponse.from_orm(user) for _, _, user in rows],
+        next_cursor=next_cursor
+    )
 
-    # handleで検索
-    query_filter = User.deleted_at.is_(None) & (User.handle.ilike(search_pattern))
+# Users per presence request
+MAX_PRESENCE_IDS = 100
 
-    # 検索ロジックの実行
-    users = db.query(User).filter(
-        query_filter
-    ).limit(limit).all()
 
-    # 3. データベースから返されたユーザー数を出力
-    logger.info(f"Found {len(users)} users.")
+@router.get("/presence", response_model=UserPresenceResponse)
+async def get_presence(
+    ids: List[UUID4] = Query(..., description="User IDs (repeat the parameter, up to 100)"),
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """
+    Get online / away / offline presence of several users
 
-    # --- 👆 ここまでデバッグロギングを追加 ---
+    Served from the chat connection manager's memory (this worker's sockets
+    plus presence announced by the other workers); the database is not
+    queried, not even for the caller.
+
+    Args:
+        ids: User IDs
+        current_user_id: Authenticated user's ID
+
+    Returns:
+        Presence of each requested user
+
+    Raises:
+        HTTPException: If more than 100 IDs are requested
+    """
+    if len(ids) > MAX_PRESENCE_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_PRESENCE_IDS} user IDs can be requested at once"
+        )
+
+    statuses = manager.get_presence(str(user_id) for user_id in ids)
+    return UserPresenceResponse(presence=[
+        UserPresence(user_id=user_id, status=statuses[str(user_id)]) for user_id in ids
+    ])
 
-    # UserResponse スキーマのリストに変換して返す
-    return [UserResponse.from_orm(user) for user in users]
 
 @router.get("/{user_id}", response_model=UserDetailResponse)
 async def get_user(
     user_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user by ID with skills and repositories
@@ -89,13 +194,16 @@ async def get_user(
     Returns:
         User detail information
     """
-    user = db.query(User).options(
-        joinedload(User.user_skills).joinedload(UserSkill.skill),
-        joinedload(User.github_repos)
-    ).filter(
-        User.id == user_id,
-        User.deleted_at.is_(None)
-    ).first()
+    result = await db.execute(
+        select(User).options(
+            selectinload(User.user_skills).selectinload(UserSkill.skill),
+            selectinload(User.github_repos)
+        ).filter(
+            User.id == user_id,
+            User.deleted_at.is_(None)
+        )
+    )
+    user = result.scalars().first()
 
     if not user:
         raise HTTPException(
@@ -129,7 +237,7 @@ async def get_user(
 async def update_current_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update current user profile
@@ -151,16 +259,19 @@ async def update_current_user(
     current_user.updated_at = datetime.utcnow()
 
     # Create audit log
-    audit_log = AuditLog(
+    await audit_sink.record(
+        db,
         user_id=current_user.id,
         action="UPDATE_PROFILE",
         resource="users",
         payload=user_update.dict(exclude_unset=True)
     )
-    db.add(audit_log)
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    identity_cache.invalidate_user(current_user.id)
+    # Project responses embed the owner's profile
+    project_cache.clear()
 
     return UserResponse.from_orm(current_user)
 
@@ -169,7 +280,7 @@ async def update_current_user(
 async def update_user_skills(
     skills: List[UserSkillUpdate],
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update current user's skills
@@ -182,121 +293,65 @@ async def update_user_skills(
     Returns:
         Success message
     """
-    # Delete existing skills
-    db.query(UserSkill).filter(
-        UserSkill.user_id == current_user.id
-    ).delete()
-
-    # Add new skills
-    for skill_data in skills:
-        # Verify skill exists
-        skill = db.query(Skill).filter(Skill.id == skill_data.skill_id).first()
-        if not skill:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Skill with id {skill_data.skill_id} not found"
-            )
-
-        # Validate level
-        if skill_data.level < 1 or skill_data.level > 5:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Skill level must be between 1 and 5"
-            )
-
-        user_skill = UserSkill(
-            user_id=current_user.id,
-            skill_id=skill_data.skill_id,
-            level=skill_data.level
-        )
-        db.add(user_skill)
+    # Validate and write only the changed skills
+    await write_skill_set(
+        db, UserSkill, "user_id", current_user.id, "level",
+        [(s.skill_id, s.level) for s in skills]
+    )
 
     # Create audit log
-    audit_log = AuditLog(
+    await audit_sink.record(
+        db,
         user_id=current_user.id,
         action="UPDATE_SKILLS",
         resource="users",
         payload={"skills": [s.dict() for s in skills]}
     )
-    db.add(audit_log)
 
-    db.commit()
+    await db.commit()
+    candidate_index.set_user_skills(current_user.id, {s.skill_id: s.level for s in skills})
+    project_index.invalidate_feed(current_user.id)
 
     return SuccessResponse(message="Skills updated successfully")
 
 
-@router.post("/me/repos/sync", response_model=SuccessResponse)
+@router.post("/me/repos/sync", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def sync_github_repos(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Sync GitHub repositories for current user
+    Queue a sync of GitHub repositories for current user
+
+    The sync runs as a background job (see app.services.repo_sync); poll
+    GET /me/jobs/{job_id} for its outcome. A sync already queued or
+    running is returned instead of queueing another.
 
     Args:
         current_user: Current authenticated user
         db: Database session
 
     Returns:
-        Success message
+        The sync job
     """
     # Get OAuth account
     from app.models.user import OAuthAccount
-    oauth_account = db.query(OAuthAccount).filter(
-        OAuthAccount.user_id == current_user.id,
-        OAuthAccount.provider == "github"
-    ).first()
+    result = await db.execute(
+        select(OAuthAccount.id).filter(
+            OAuthAccount.user_id == current_user.id,
+            OAuthAccount.provider == "github"
+        )
+    )
 
-    if not oauth_account:
+    if result.scalar() is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="GitHub account not linked"
         )
 
-    try:
-        # Fetch repos from GitHub
-        repos = await GitHubService.get_user_repos(
-            oauth_account.access_token,
-            current_user.github_login
-        )
-
-        # Delete existing repos
-        db.query(GitHubRepo).filter(
-            GitHubRepo.user_id == current_user.id
-        ).delete()
-
-        # Add new repos
-        for repo_data in repos:
-            repo = GitHubRepo(
-                user_id=current_user.id,
-                repo_full_name=repo_data["full_name"],
-                stars=repo_data.get("stargazers_count", 0),
-                language=repo_data.get("language"),
-                url=repo_data["html_url"],
-                last_pushed_at=repo_data.get("pushed_at")
-            )
-            db.add(repo)
-
-        # Create audit log
-        audit_log = AuditLog(
-            user_id=current_user.id,
-            action="SYNC_REPOS",
-            resource="github_repos",
-            payload={"repo_count": len(repos)}
-        )
-        db.add(audit_log)
+    job = await enqueue_repo_sync(db, current_user.id)
+    await db.commit()
+    job_runner.notify()
 
-        db.commit()
-
-        return SuccessResponse(
-            message=f"Successfully synced {len(repos)} repositories"
-        )
-
-    except Exception as e:
-        logger.error(f"Failed to sync repos: {str(e)}")
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to sync repositories"
-        )
+    return JobResponse.model_validate(job)
 
@@ -1,68 +1,259 @@
 """WebSocket endpoints for chat"""
+import uuid
+import asyncio
 import logging
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Depends, status
 from fastapi.exceptions import HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_
+from app.config import settings
+from app.database import get_async_db
+from app.core.metrics import background_context
 from app.core.security import verify_token
 from app.models.user import User
 from app.models.match import Match
 from app.models.chat import Conversation, Message
-from app.models.group_chat import GroupConversation, GroupMember, GroupMessage
+from app.models.group_chat import GroupMember, GroupMessage
 from app.services.chat_service import manager
+from app.services.membership_cache import ChatIdentity, membership_cache
+from app.services.message_writer import message_writer
+from app.services.chat_summary import record_messages
+from app.services.presence import parse_status
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Ack tasks of batched messages (kept referenced until they finish)
+_pending_acks = set()
 
-async def get_current_user_ws(
-    token: str = Query(..., description="JWT token"),
-    db: Session = Depends(get_db)
-) -> User:
+
+def _token_user_id(token: str) -> str:
     """
-    Get current user from WebSocket query parameter
+    Get the user ID from a WebSocket token
     
     Args:
         token: JWT token from query
-        db: Database session
     
     Returns:
-        Current user
+        User ID (token subject)
     
     Raises:
-        HTTPException: If token is invalid or user not found
+        HTTPException: If token is invalid
     """
-    # Verify token
     payload = verify_token(token)
-    if payload is None:
+    user_id = payload.get("sub") if payload is not None else None
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
+    return user_id
+
+
+async def authorize_chat(token: str, conversation_id: str, db: AsyncSession) -> Optional[ChatIdentity]:
+    """
+    Authorize a user for a 1-on-1 conversation socket
     
-    # Get user ID from token
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
+    The user, conversation and match are checked in a single joined query;
+    granted access is cached for a short time so reconnects skip the database.
+    
+    Args:
+        token: JWT token from query
+        conversation_id: Conversation ID
+        db: Database session
+    
+    Returns:
+        Identity of the user, or None if the user may not join
+    
+    Raises:
+        HTTPException: If token is invalid
+    """
+    user_id = _token_user_id(token)
+    identity = membership_cache.get(user_id, conversation_id)
+    if identity is not None:
+        return identity
+    
+    result = await db.execute(
+        select(User.id, User.handle)
+        .join(Match, or_(Match.user_a == User.id, Match.user_b == User.id))
+        .join(Conversation, Conversation.match_id == Match.id)
+        .filter(
+            User.id == user_id,
+            User.deleted_at.is_(None),
+            Conversation.id == conversation_id
         )
+    )
+    row = result.first()
+    if row is None:
+        return None
+    
+    identity = ChatIdentity(user_id=row.id, handle=row.handle)
+    membership_cache.set(user_id, conversation_id, identity)
+    return identity
+
+
+async def authorize_group_chat(token: str, group_conversation_id: str, db: AsyncSession) -> Optional[ChatIdentity]:
+    """
+    Authorize a user for a group conversation socket
     
-    # Get user from database
-    user = db.query(User).filter(
-        User.id == user_id,
-        User.deleted_at.is_(None)
-    ).first()
+    Args:
+        token: JWT token from query
+        group_conversation_id: Group conversation ID
+        db: Database session
     
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
+    Returns:
+        Identity of the user, or None if the user is not a member
+    
+    Raises:
+        HTTPException: If token is invalid
+    """
+    user_id = _token_user_id(token)
+    room = f"group:{group_conversation_id}"
+    identity = membership_cache.get(user_id, room)
+    if identity is not None:
+        return identity
+    
+    result = await db.execute(
+        select(User.id, User.handle)
+        .join(GroupMember, GroupMember.user_id == User.id)
+        .filter(
+            User.id == user_id,
+            User.deleted_at.is_(None),
+            GroupMember.group_conversation_id == group_conversation_id
         )
+    )
+    row = result.first()
+    if row is None:
+        return None
     
-    return user
+    identity = ChatIdentity(user_id=row.id, handle=row.handle)
+    membership_cache.set(user_id, room, identity)
+    return identity
+
+
+async def reject_oversized(websocket: WebSocket, target: str, key: str, message: Dict[str, Any]) -> bool:
+    """
+    Refuse a message too large to reach sockets on every worker
+    
+    Args:
+        websocket: Sender's WebSocket connection
+        target: "conversation" or "user"
+        key: Conversation key or target user ID
+        message: Message as it would be sent
+    
+    Returns:
+        Whether the message was refused (the sender got an error frame)
+    """
+    if manager.fits(target, key, message):
+        return False
+    await manager.send_personal(websocket, {
+        "type": "error",
+        "message": "Message is too large"
+    })
+    return True
+
+
+async def store_and_broadcast(
+    websocket: WebSocket,
+    db: AsyncSession,
+    model: Any,
+    room: str,
+    values: Dict[str, Any]
+):
+    """
+    Persist a chat message and broadcast it to the room
+    
+    In batched mode the message is broadcast immediately with a provisional
+    ID and written by the message writer; the sender gets an "ack" carrying
+    the real ID once the row is committed. Either way the conversation
+    summary is updated in the same transaction as the message. A message
+    too large for the backplane is refused before it is stored.
+    
+    Args:
+        websocket: Sender's WebSocket connection
+        db: Database session
+        model: Message or GroupMessage
+        room: Connection key of the conversation
+        values: sender_id, body and the conversation foreign key
+    """
+    values["created_at"] = datetime.utcnow()
+    provisional_id = f"pending-{uuid.uuid4().hex}"
+    # Larger than the stored message's frame (provisional ID and flag)
+    provisional = {
+        "type": "message",
+        "id": provisional_id,
+        "provisional": True,
+        "sender_id": str(values["sender_id"]),
+        "body": values["body"],
+        "created_at": values["created_at"].isoformat()
+    }
+    if await reject_oversized(websocket, "conversation", room, provisional):
+        return
+    
+    # Sending a message ends the sender's typing indicator
+    manager.typing.update(room, str(values["sender_id"]), False)
+    
+    if settings.chat_persist_mode == "batched":
+        saved = message_writer.submit(model, values)
+        
+        await manager.send_to_conversation(room, provisional)
+        
+        task = asyncio.create_task(
+            _ack_when_saved(websocket, provisional_id, saved),
+            context=background_context()
+        )
+        _pending_acks.add(task)
+        task.add_done_callback(_pending_acks.discard)
+        return
+    
+    message = model(**values)
+    db.add(message)
+    await db.flush()
+    await record_messages(db, model, [{
+        **values,
+        "id": message.id,
+        "created_at": message.created_at
+    }])
+    await db.commit()
+    
+    await manager.send_to_conversation(
+        room,
+        {
+            "type": "message",
+            "id": message.id,
+            "sender_id": str(message.sender_id),
+            "body": message.body,
+            "created_at": message.created_at.isoformat()
+        }
+    )
+
+
+async def _ack_when_saved(websocket: WebSocket, provisional_id: str, saved: asyncio.Future):
+    """
+    Tell the sender a batched message is durable (or that it was lost)
+    
+    Args:
+        websocket: Sender's WebSocket connection
+        provisional_id: ID the message was broadcast with
+        saved: Future resolving to the inserted row ID
+    """
+    try:
+        message_id = await saved
+    except Exception:
+        await manager.send_personal(websocket, {
+            "type": "error",
+            "message": "Message could not be saved",
+            "provisional_id": provisional_id
+        })
+        return
+    
+    await manager.send_personal(websocket, {
+        "type": "ack",
+        "provisional_id": provisional_id,
+        "id": message_id
+    })
 
 
 @router.websocket("/chat")
@@ -70,7 +261,7 @@ async def websocket_chat(
     websocket: WebSocket,
     conversation_id: str = Query(...),
     token: str = Query(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     WebSocket endpoint for real-time chat
@@ -82,34 +273,19 @@ async def websocket_chat(
         db: Database session
     """
     try:
-        # Authenticate user
-        current_user = await get_current_user_ws(token=token, db=db)
-        
-        # Get conversation
-        conversation = db.query(Conversation).filter(
-            Conversation.id == conversation_id
-        ).first()
-        
-        if not conversation:
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Conversation not found")
-            return
-        
-        # Get match to verify user access
-        match = db.query(Match).filter(
-            Match.id == conversation.match_id
-        ).first()
+        # Authenticate user and verify they are part of the conversation's match
+        current_user = await authorize_chat(token, conversation_id, db)
         
-        if not match:
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Match not found")
-            return
-        
-        # Verify user is part of match
-        if match.user_a != current_user.id and match.user_b != current_user.id:
+        if current_user is None:
             await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason="Not authorized")
             return
         
+        # End the authorization transaction so the pooled connection is not
+        # held for the lifetime of an idle socket
+        await db.commit()
+        
         # Connect WebSocket
-        await manager.connect(websocket, str(current_user.id), str(conversation_id))
+        await manager.connect(websocket, str(current_user.user_id), str(conversation_id))
         
         try:
             while True:
@@ -123,43 +299,49 @@ async def websocket_chat(
                     message_body = data.get("body", "").strip()
                     
                     if not message_body:
-                        await websocket.send_json({
+                        await manager.send_personal(websocket, {
                             "type": "error",
                             "message": "Message body cannot be empty"
                         })
                         continue
                     
-                    message = Message(
-                        conversation_id=conversation_id,
-                        sender_id=current_user.id,
-                        body=message_body
-                    )
-                    db.add(message)
-                    db.commit()
-                    db.refresh(message)
-                    
-                    # Broadcast message to all connections in conversation
-                    await manager.send_to_conversation(
+                    # Store and broadcast message to all connections in conversation
+                    await store_and_broadcast(
+                        websocket,
+                        db,
+                        Message,
                         str(conversation_id),
                         {
-                            "type": "message",
-                            "id": message.id,
-                            "sender_id": str(message.sender_id),
-                            "body": message.body,
-                            "created_at": message.created_at.isoformat()
+                            "conversation_id": conversation_id,
+                            "sender_id": current_user.user_id,
+                            "body": message_body
                         }
                     )
                     
                 elif message_type == "ping":
                     # Respond to ping
-                    await websocket.send_json({"type": "pong"})
+                    await manager.send_personal(websocket, {"type": "pong"})
+                
+                elif message_type == "typing":
+                    # Coalesced and rate-limited per room by the manager
+                    manager.typing.update(str(conversation_id), str(current_user.user_id), bool(data.get("typing", True)))
+                
+                elif message_type == "presence":
+                    presence_status = parse_status(data.get("status"))
+                    if presence_status is None:
+                        await manager.send_personal(websocket, {
+                            "type": "error",
+                            "message": "status must be 'online' or 'away'"
+                        })
+                        continue
+                    manager.set_status(websocket, presence_status)
                 
                 # WebRTCシグナリングメッセージの処理
                 elif message_type in ["offer", "answer", "ice-candidate", "reject", "end"]:
                     # WebRTCシグナリングメッセージを相手に転送
                     target_user_id = data.get("target_user_id")
                     if not target_user_id:
-                        await websocket.send_json({
+                        await manager.send_personal(websocket, {
                             "type": "error",
                             "message": "target_user_id is required for signaling messages"
                         })
@@ -168,7 +350,7 @@ async def websocket_chat(
                     # 送信者情報を追加
                     signaling_data = {
                         "type": message_type,
-                        "sender_id": str(current_user.id),
+                        "sender_id": str(current_user.user_id),
                         "sender_name": current_user.handle or "Unknown",
                         "conversation_id": conversation_id
                     }
@@ -183,19 +365,21 @@ async def websocket_chat(
                         signaling_data["candidate"] = data.get("candidate")
                     
                     # 相手にシグナリングメッセージを送信
+                    if await reject_oversized(websocket, "user", target_user_id, signaling_data):
+                        continue
                     await manager.send_to_user(target_user_id, signaling_data)
                     
-                    logger.info(f"Signaling message {message_type} sent from {current_user.id} to {target_user_id}")
+                    logger.info(f"Signaling message {message_type} sent from {current_user.user_id} to {target_user_id}")
                 
                 else:
-                    await websocket.send_json({
+                    await manager.send_personal(websocket, {
                         "type": "error",
                         "message": f"Unknown message type: {message_type}"
                     })
         
         except WebSocketDisconnect:
             manager.disconnect(websocket)
-            logger.info(f"User {current_user.id} disconnected from conversation {conversation_id}")
+            logger.info(f"User {current_user.user_id} disconnected from conversation {conversation_id}")
         
         except Exception as e:
             logger.error(f"WebSocket error: {str(e)}")
@@ -221,7 +405,7 @@ async def websocket_group_chat(
     websocket: WebSocket,
     group_conversation_id: str = Query(...),
     token: str = Query(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     WebSocket endpoint for group chat
@@ -233,32 +417,19 @@ async def websocket_group_chat(
         db: Database session
     """
     try:
-        # Authenticate user
-        current_user = await get_current_user_ws(token=token, db=db)
-        
-        # Get group conversation
-        group_conv = db.query(GroupConversation).filter(
-            GroupConversation.id == group_conversation_id
-        ).first()
+        # Authenticate user and verify they are a member
+        current_user = await authorize_group_chat(token, group_conversation_id, db)
         
-        if not group_conv:
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Group conversation not found")
-            return
-        
-        # Verify user is a member
-        is_member = db.query(GroupMember).filter(
-            and_(
-                GroupMember.group_conversation_id == group_conversation_id,
-                GroupMember.user_id == current_user.id
-            )
-        ).first()
-        
-        if not is_member:
+        if current_user is None:
             await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason="Not authorized")
             return
         
+        # End the authorization transaction so the pooled connection is not
+        # held for the lifetime of an idle socket
+        await db.commit()
+        
         # Connect WebSocket (use "group:" prefix to distinguish from 1-on-1 conversations)
-        await manager.connect(websocket, str(current_user.id), f"group:{group_conversation_id}")
+        await manager.connect(websocket, str(current_user.user_id), f"group:{group_conversation_id}")
         
         try:
             while True:
@@ -272,43 +443,49 @@ async def websocket_group_chat(
                     message_body = data.get("body", "").strip()
                     
                     if not message_body:
-                        await websocket.send_json({
+                        await manager.send_personal(websocket, {
                             "type": "error",
                             "message": "Message body cannot be empty"
                         })
                         continue
                     
-                    message = GroupMessage(
-                        group_conversation_id=group_conversation_id,
-                        sender_id=current_user.id,
-                        body=message_body
-                    )
-                    db.add(message)
-                    db.commit()
-                    db.refresh(message)
-                    
-                    # Broadcast message to all connections in group conversation
-                    await manager.send_to_conversation(
+                    # Store and broadcast message to all connections in group conversation
+                    await store_and_broadcast(
+                        websocket,
+                        db,
+                        GroupMessage,
                         f"group:{group_conversation_id}",
                         {
-                            "type": "message",
-                            "id": message.id,
-                            "sender_id": str(message.sender_id),
-                            "body": message.body,
-                            "created_at": message.created_at.isoformat()
+                            "group_conversation_id": group_conversation_id,
+                            "sender_id": current_user.user_id,
+                            "body": message_body
                         }
                     )
                     
                 elif message_type == "ping":
                     # Respond to ping
-                    await websocket.send_json({"type": "pong"})
+                    await manager.send_personal(websocket, {"type": "pong"})
+                
+                elif message_type == "typing":
+                    # Coalesced and rate-limited per room by the manager
+                    manager.typing.update(f"group:{group_conversation_id}", str(current_user.user_id), bool(data.get("typing", True)))
+                
+                elif message_type == "presence":
+                    presence_status = parse_status(data.get("status"))
+                    if presence_status is None:
+                        await manager.send_personal(websocket, {
+                            "type": "error",
+                            "message": "status must be 'online' or 'away'"
+                        })
+                        continue
+                    manager.set_status(websocket, presence_status)
                 
                 # WebRTCシグナリングメッセージの処理（グループチャット用）
                 elif message_type in ["offer", "answer", "ice-candidate", "reject", "end"]:
                     # WebRTCシグナリングメッセージを相手に転送
                     target_user_id = data.get("target_user_id")
                     if not target_user_id:
-                        await websocket.send_json({
+                        await manager.send_personal(websocket, {
                             "type": "error",
                             "message": "target_user_id is required for signaling messages"
                         })
@@ -317,7 +494,7 @@ async def websocket_group_chat(
                     # 送信者情報を追加
                     signaling_data = {
                         "type": message_type,
-                        "sender_id": str(current_user.id),
+                        "sender_id": str(current_user.user_id),
                         "sender_name": current_user.handle or "Unknown",
                         "conversation_id": group_conversation_id
                     }
@@ -332,19 +509,21 @@ async def websocket_group_chat(
                         signaling_data["candidate"] = data.get("candidate")
                     
                     # 相手にシグナリングメッセージを送信
+                    if await reject_oversized(websocket, "user", target_user_id, signaling_data):
+                        continue
                     await manager.send_to_user(target_user_id, signaling_data)
                     
-                    logger.info(f"Group signaling message {message_type} sent from {current_user.id} to {target_user_id}")
+                    logger.info(f"Group signaling message {message_type} sent from {current_user.user_id} to {target_user_id}")
                 
                 else:
-                    await websocket.send_json({
+                    await manager.send_personal(websocket, {
                         "type": "error",
                         "message": f"Unknown message type: {message_type}"
                     })
         
         except WebSocketDisconnect:
             manager.disconnect(websocket)
-            logger.info(f"User {current_user.id} disconnected from group conversation {group_conversation_id}")
+            logger.info(f"User {current_user.user_id} disconnected from group conversation {group_conversation_id}")
         
         except Exception as e:
             logger.error(f"WebSocket error: {str(e)}")
@@ -24,6 +24,14 @@ class Settings(BaseSettings):
     github_client_id: str
     github_client_secret: str
     github_redirect_uri: str
+    github_oauth_url: str = "https://github.com/login/oauth"  # authorize redirect and token exchange (override for a mock server)
+    github_api_url: str = "https://api.github.com"
+    github_http2: bool = True
+    github_max_connections: int = 20  # pooled keep-alive connections shared by all requests
+    github_connect_timeout_seconds: float = 5.0
+    github_timeout_seconds: float = 10.0  # read / write / pool wait
+    github_max_retries: int = 2  # retries of connection failures, and of 429/5xx for GET requests
+    github_retry_backoff_seconds: float = 0.25  # doubled on every retry
     
     # JWT
     jwt_secret: str
@@ -39,6 +47,71 @@ class Settings(BaseSettings):
     # Server
     api_host: str = "127.0.0.1"
     api_port: int = 8080
+    
+    # Chat fan-out across workers
+    chat_backplane: str = "memory"  # memory (single worker) or postgres (LISTEN/NOTIFY)
+    chat_backplane_channel: str = "buildup_chat"
+    chat_send_queue_size: int = 256  # frames buffered per socket before a slow client is dropped
+    ws_auth_cache_ttl_seconds: float = 30.0  # 0 disables the WebSocket membership cache
+    chat_persist_mode: str = "sync"  # sync (commit per message) or batched (write-behind)
+    chat_persist_batch_size: int = 100
+    chat_persist_flush_ms: float = 20.0
+    chat_persist_max_retries: int = 2  # retries of a batch failing on a connection error
+    chat_persist_retry_backoff_seconds: float = 0.1  # doubled on every retry
+    
+    # Presence and typing indicators
+    presence_ttl_seconds: float = 60.0  # presence announced by another worker expires unless refreshed
+    presence_offline_grace_seconds: float = 5.0  # a reconnect within this time is not announced
+    presence_min_interval_seconds: float = 1.0  # per user, between announced changes
+    chat_typing_ttl_seconds: float = 5.0  # typing state lifetime without a refresh
+    chat_typing_refresh_seconds: float = 2.0  # per user and room, typing events closer than this are dropped
+    chat_typing_flush_ms: float = 250.0  # typing changes of a room are sent together at most this often
+    
+    # Project listing
+    project_count_exact_threshold: int = 1000  # estimated totals below this are counted exactly
+    
+    # Skill autocomplete
+    skill_index_max_size: int = 50000  # larger skill tables are searched with pg_trgm instead
+    skill_index_ttl_seconds: float = 300.0
+    
+    # Candidate recommendation (in-memory user x skill matrix)
+    candidate_index_ttl_seconds: float = 600.0  # full reload interval, picks up other workers' writes
+    project_index_ttl_seconds: float = 600.0
+    recommendation_feed_ttl_seconds: float = 60.0  # per-user cache of /me/recommended-projects
+    
+    # Response cache for project listings and details (0 disables)
+    project_cache_max_entries: int = 1000
+    project_cache_ttl_seconds: float = 30.0  # bounds staleness from writes on other workers
+    
+    # Authentication: verified tokens and token -> user snapshots (0 disables)
+    identity_cache_max_entries: int = 10000
+    identity_cache_ttl_seconds: float = 30.0  # bounds how long other workers serve a stale or deleted user
+    
+    # Audit log: "transaction" (row added to the request's transaction) or "buffered" (batched by a background writer)
+    audit_mode: str = "transaction"
+    audit_batch_size: int = 500
+    audit_flush_ms: float = 100.0
+    audit_max_pending: int = 10000  # buffered events; requests wait for the writer beyond this
+    
+    # Background jobs (GitHub sync, ...): Postgres-backed queue run in every worker
+    job_workers: int = 2  # concurrent jobs per process; 0 only enqueues
+    job_poll_seconds: float = 5.0  # picks up jobs queued by other workers
+    job_maintenance_seconds: float = 30.0  # re-queues expired leases and deletes old jobs, busy or idle
+    job_max_attempts: int = 5
+    job_retry_backoff_seconds: float = 2.0  # doubled on every retry
+    job_timeout_seconds: float = 300.0  # lease of a running job; a job running longer is cancelled
+    job_retention_hours: float = 24.0  # finished jobs are deleted after this
+    
+    # Monthly partitions of audit_logs, messages and group_messages (scripts/maintain_partitions.py)
+    partition_months_ahead: int = 3  # future months created in advance
+    audit_log_retention_months: int = 0  # months kept besides the current one; 0 keeps everything
+    message_retention_months: int = 0  # messages and group_messages; 0 keeps everything
+    partition_archive_dir: str = ""  # detached partitions are written here as .csv.gz and dropped; empty keeps them as tables
+    
+    # Instrumentation: per-request SQL stats (X-DB-* headers outside production) and /metrics
+    metrics_enabled: bool = True
+    slow_query_ms: float = 200.0  # 0 disables slow-query logging
+    log_format: str = ""  # "text" or "json" (request fields as JSON keys); empty: json in production, text elsewhere
 
     @property
     def database_url_resolved(self) -> str:
@@ -69,6 +142,19 @@ class Settings(BaseSettings):
             return self.database_url_dev_local
 
         raise ValueError(f"Unsupported DATABASE_TARGET '{self.database_target}'")
+
+    @property
+    def database_url_async(self) -> str:
+        """
+        Async driver variant of the resolved database URL.
+        The psycopg (v3) dialect accepts the same libpq URL options as psycopg2,
+        so only the driver part of the scheme needs to change.
+        """
+        url = self.database_url_resolved
+        scheme, sep, rest = url.partition("://")
+        if scheme in ("postgres", "postgresql", "postgresql+psycopg2"):
+            return f"postgresql+psycopg{sep}{rest}"
+        return url
     
     @property
     def cors_origins_list(self) -> List[str]:
@@ -2,10 +2,13 @@
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
-from app.database import get_db
+from app.database import get_async_db
 from app.core.security import verify_token
+from app.core.identity_cache import identity_cache
 from app.models.user import User
 
 # HTTP Bearer token security
@@ -14,11 +17,15 @@ security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Get current authenticated user from JWT token
     
+    The user is looked up once per token and identity cache TTL; later
+    requests attach the cached snapshot to the session without a query,
+    so endpoints can still modify and commit it.
+    
     Args:
         credentials: HTTP Bearer token credentials
         db: Database session
@@ -49,11 +56,22 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Attach a cached snapshot of the user if this token was seen recently
+    key = (str(user_id), payload.get("iat"))
+    values = identity_cache.get_user(key)
+    if values is not None:
+        user = User(**values)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+    
     # Get user from database
-    user = db.query(User).filter(
-        User.id == user_id,
-        User.deleted_at.is_(None)
-    ).first()
+    result = await db.execute(
+        select(User).filter(
+            User.id == user_id,
+            User.deleted_at.is_(None)
+        )
+    )
+    user = result.scalars().first()
     
     if user is None:
         raise HTTPException(
@@ -62,12 +80,42 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    identity_cache.set_user(key, {column.key: getattr(user, column.key) for column in User.__table__.columns})
     return user
 
 
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> str:
+    """
+    Get the authenticated user's ID from the JWT alone, without loading the user
+    
+    For endpoints served from memory; the user may have been deleted since
+    the token was issued.
+    
+    Args:
+        credentials: HTTP Bearer token credentials
+    
+    Returns:
+        User ID (token subject)
+    
+    Raises:
+        HTTPException: If token is invalid
+    """
+    payload = verify_token(credentials.credentials)
+    user_id = payload.get("sub") if payload is not None else None
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_id
+
+
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[User]:
     """
     Get current user if authenticated, otherwise return None
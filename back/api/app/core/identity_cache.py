@@ -0,0 +1,153 @@
+"""Per-worker caches of verified JWT payloads and the users they identify"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from app.config import settings
+
+# (sub, iat) of an access token
+IdentityKey = Tuple[str, Any]
+
+
+class IdentityCache:
+    """
+    Bounded LRU caches for request authentication
+
+    Verified token payloads are kept until the token expires, so a token
+    seen before skips the signature check. Users are kept as column
+    snapshots keyed by the token's (sub, iat) for ttl_seconds, so a repeat
+    request skips the users lookup. Profile writes on this worker
+    invalidate a user's snapshots right away; the TTL bounds how long
+    another worker may serve a stale profile or a soft-deleted user.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clear()
+
+    def clear(self):
+        """Forget every token, user and counter"""
+        self._tokens: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._users: "OrderedDict[IdentityKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[IdentityKey]] = {}
+        self.token_hits = 0
+        self.token_misses = 0
+        self.user_hits = 0
+        self.user_misses = 0
+
+    def get_payload(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a verified token
+
+        Args:
+            token: Encoded JWT
+
+        Returns:
+            Copy of the decoded payload, or None if unseen or expired
+        """
+        entry = self._tokens.get(token)
+        if entry is None or entry[0] <= time.time():
+            self._tokens.pop(token, None)
+            self.token_misses += 1
+            return None
+        self._tokens.move_to_end(token)
+        self.token_hits += 1
+        return dict(entry[1])
+
+    def set_payload(self, token: str, payload: Dict[str, Any]):
+        """
+        Remember a token whose signature was verified
+
+        Args:
+            token: Encoded JWT
+            payload: Decoded payload (tokens without an exp claim are not cached)
+        """
+        expires_at = payload.get("exp")
+        if self.max_entries <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        self._tokens[token] = (float(expires_at), dict(payload))
+        self._tokens.move_to_end(token)
+        while len(self._tokens) > self.max_entries:
+            self._tokens.popitem(last=False)
+
+    def get_user(self, key: IdentityKey) -> Optional[Dict[str, Any]]:
+        """
+        Look up a user snapshot
+
+        Args:
+            key: (sub, iat) of the token
+
+        Returns:
+            Column values of the user, or None if missing or expired
+        """
+        entry = self._users.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._drop_user_key(key)
+            self.user_misses += 1
+            return None
+        self._users.move_to_end(key)
+        self.user_hits += 1
+        return entry[1]
+
+    def set_user(self, key: IdentityKey, values: Dict[str, Any]):
+        """
+        Remember the user a token identifies
+
+        Args:
+            key: (sub, iat) of the token
+            values: Column values of the user (must include "id")
+        """
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        self._users[key] = (time.monotonic() + self.ttl_seconds, dict(values))
+        self._users.move_to_end(key)
+        self._keys_by_user.setdefault(str(values["id"]), set()).add(key)
+        while len(self._users) > self.max_entries:
+            self._drop_user_key(next(iter(self._users)))
+
+    def invalidate_user(self, user_id: Any):
+        """
+        Forget every snapshot of a user (call after a profile update or soft delete)
+
+        Args:
+            user_id: User ID
+        """
+        for key in self._keys_by_user.pop(str(user_id), ()):
+            self._users.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters for instrumentation
+
+        Returns:
+            Token and user hits and misses, the user hit ratio, and the
+            number of users lookups saved
+        """
+        lookups = self.user_hits + self.user_misses
+        return {
+            "token_hits": self.token_hits,
+            "token_misses": self.token_misses,
+            "user_hits": self.user_hits,
+            "user_misses": self.user_misses,
+            "user_hit_ratio": round(self.user_hits / lookups, 4) if lookups else 0.0,
+            "saved_queries": self.user_hits,
+            "tokens": len(self._tokens),
+            "users": len(self._users),
+        }
+
+    def _drop_user_key(self, key: IdentityKey):
+        """Remove one snapshot and its per-user index entry"""
+        entry = self._users.pop(key, None)
+        if entry is None:
+            return
+        user_id = str(entry[1]["id"])
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+
+identity_cache = IdentityCache(settings.identity_cache_max_entries, settings.identity_cache_ttl_seconds)
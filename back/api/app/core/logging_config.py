@@ -0,0 +1,102 @@
+"""Process-wide logging: request IDs on every record, output written off the event loop"""
+import atexit
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.config import settings
+from app.core.metrics import current_request
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+# Attributes of every record; any other attribute came from extra= and becomes a JSON field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class RequestIDFilter(logging.Filter):
+    """Set record.request_id from the request being served ("-" outside requests)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            stats = current_request.get()
+            record.request_id = stats.request_id if stats is not None else "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and the record's extra= fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def log_formatter() -> logging.Formatter:
+    """
+    Formatter selected by LOG_FORMAT
+
+    Returns:
+        JsonFormatter for "json", the plain-text LOG_FORMAT otherwise;
+        unset means json in production and text elsewhere
+    """
+    log_format = settings.log_format.lower() or ("json" if settings.is_production else "text")
+    if log_format == "json":
+        return JsonFormatter()
+    if log_format == "text":
+        return logging.Formatter(LOG_FORMAT)
+    raise ValueError(f"Unsupported LOG_FORMAT '{settings.log_format}'")
+
+
+def configure_logging(level: int = logging.INFO):
+    """
+    Route root logging through a queue
+
+    Records are stamped with the request ID and queued by the calling
+    thread; a listener thread formats and writes them, so a slow stderr
+    never blocks the event loop. Calling it again is a no-op.
+
+    Args:
+        level: Root logger level
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(log_formatter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    # The filter must run on the calling thread, where the request context lives
+    queue_handler.addFilter(RequestIDFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,235 @@
+"""Per-request SQL instrumentation and Prometheus metrics"""
+import time
+import logging
+from contextvars import Context, ContextVar, copy_context
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.core.identity_cache import identity_cache
+
+logger = logging.getLogger(__name__)
+
+# Route label of requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@dataclass
+class RequestStats:
+    """SQL cost of one request, filled in by the engine hooks"""
+    request_id: str
+    method: str
+    scope: Dict[str, Any] = field(repr=False, default_factory=dict)
+    queries: int = 0
+    db_time: float = 0.0  # seconds
+    rows: int = 0  # rows returned by SELECT / RETURNING statements
+
+    @property
+    def route(self) -> str:
+        """Path template of the matched route (known once routing has run)"""
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+# Stats of the request being served; copied into the tasks it spawns
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def background_context() -> Context:
+    """
+    Context for a task that may outlive the request starting it
+
+    Pass it to asyncio.create_task(..., context=...): the task's statements
+    and logs are not attributed to the request.
+
+    Returns:
+        Copy of the current context without the request being served
+    """
+    context = copy_context()
+    context.run(current_request.set, None)
+    return context
+
+
+class Histogram:
+    """Prometheus histogram with a fixed label set"""
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float], labels: Sequence[str]):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, label_values: Tuple[str, ...], value: float):
+        """
+        Record one observation
+
+        Args:
+            label_values: One value per label
+            value: Observed value
+        """
+        series = self._series.get(label_values)
+        if series is None:
+            series = ([0] * (len(self.buckets) + 1), [0.0])
+            self._series[label_values] = series
+        counts, total = series
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += value
+
+    def render(self) -> List[str]:
+        """Exposition lines (cumulative buckets)"""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(self._series.items()):
+            labels = ",".join(
+                f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values)
+            )
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total[0]}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+    def clear(self):
+        """Forget every series"""
+        self._series.clear()
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """Request and SQL histograms plus collectors rendered at scrape time"""
+
+    def __init__(self):
+        labels = ("method", "route")
+        self.request_duration = Histogram(
+            "buildup_http_request_duration_seconds", "Request latency",
+            (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10), labels
+        )
+        self.db_queries = Histogram(
+            "buildup_db_queries_per_request", "SQL statements per request",
+            (0, 1, 2, 3, 5, 10, 20, 50, 100), labels
+        )
+        self.db_time = Histogram(
+            "buildup_db_time_seconds", "Time spent in SQL statements per request",
+            (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5), labels
+        )
+        self.db_rows = Histogram(
+            "buildup_db_rows_per_request", "Rows returned by SQL statements per request",
+            (0, 1, 10, 100, 1000, 10000), labels
+        )
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def observe_request(self, stats: RequestStats, duration: float):
+        """
+        Record a finished request
+
+        Args:
+            stats: SQL cost of the request
+            duration: Wall time in seconds
+        """
+        label_values = (stats.method, stats.route)
+        self.request_duration.observe(label_values, duration)
+        self.db_queries.observe(label_values, stats.queries)
+        self.db_time.observe(label_values, stats.db_time)
+        self.db_rows.observe(label_values, stats.rows)
+
+    def add_collector(self, collector: Callable[[], List[str]]):
+        """
+        Add exposition lines computed at scrape time
+
+        Args:
+            collector: Returns complete metric families (HELP, TYPE and samples)
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for histogram in (self.request_duration, self.db_queries, self.db_time, self.db_rows):
+            lines.extend(histogram.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        """Forget every observation"""
+        for histogram in (self.request_duration, self.db_queries, self.db_time, self.db_rows):
+            histogram.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def _identity_cache_metrics() -> List[str]:
+    """Identity cache counters"""
+    stats = identity_cache.stats()
+    lines = []
+    for name, key, description in (
+        ("buildup_identity_cache_token_hits_total", "token_hits", "Tokens served without a signature check"),
+        ("buildup_identity_cache_token_misses_total", "token_misses", "Tokens verified"),
+        ("buildup_identity_cache_user_hits_total", "user_hits", "Users served without a query"),
+        ("buildup_identity_cache_user_misses_total", "user_misses", "Users loaded from the database"),
+    ):
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} counter", f"{name} {stats[key]}"]
+    return lines
+
+
+metrics.add_collector(_identity_cache_metrics)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Remember when a statement started"""
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Attribute a finished statement to the current request and log it if slow"""
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+        if cursor.description is not None and cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+
+    if settings.slow_query_ms > 0 and elapsed * 1000 >= settings.slow_query_ms:
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms) in "
+            f"{stats.method + ' ' + stats.route if stats else 'background task'}: {statement[:500]}",
+            extra={
+                "request_id": stats.request_id if stats else None,
+                "route": stats.route if stats else None,
+                "db_time_ms": round(elapsed * 1000, 1),
+            }
+        )
+
+
+def _handle_error(context):
+    """Drop the start time of a statement that failed"""
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def install_sql_hooks():
+    """Time every SQL statement of every engine (sync and async) in this process"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
@@ -2,43 +2,74 @@
 import uuid
 import time
 import logging
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.core.metrics import RequestStats, current_request, metrics
 
 logger = logging.getLogger(__name__)
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Middleware to add request ID to all requests"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request and add request ID"""
-        # Generate or get request ID
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-        
-        # Add request ID to request state
-        request.state.request_id = request_id
-        
-        # Log request
-        start_time = time.time()
-        logger.info(
-            f"Request started: {request.method} {request.url.path} "
-            f"[{request_id}]"
-        )
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
-        
-        # Log response
-        duration = time.time() - start_time
-        logger.info(
-            f"Request completed: {request.method} {request.url.path} "
-            f"[{request_id}] - {response.status_code} - {duration:.3f}s"
-        )
-        
-        return response
+class RequestIDMiddleware:
+    """
+    Pure ASGI middleware adding a request ID and SQL cost accounting to all requests
+
+    Runs the app in the same task (no task hop or response buffering, unlike
+    BaseHTTPMiddleware), so the request context set here is visible to the
+    endpoint and to every log record it emits.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Process request, add request ID, and record its SQL statements, DB time and rows"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Generate or get request ID, and expose it as request.state.request_id
+        request_id = Headers(scope=scope).get("x-request-id") or str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        # Engine hooks attribute statements to this object (routing fills in scope["route"])
+        stats = RequestStats(request_id=request_id, method=scope["method"], scope=scope)
+        token = current_request.set(stats)
+        status_code = 500
+        start_time = time.perf_counter()
+
+        async def send_with_headers(message: Message):
+            """Add the request ID and the SQL cost so far to the response headers"""
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                if not settings.is_production:
+                    headers["X-DB-Queries"] = str(stats.queries)
+                    headers["X-DB-Time-Ms"] = f"{stats.db_time * 1000:.1f}"
+                    headers["X-DB-Rows"] = str(stats.rows)
+            await send(message)
 
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            duration = time.perf_counter() - start_time
+            current_request.reset(token)
+            metrics.observe_request(stats, duration)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Request completed: %s %s - %d - %.3fs - %d queries, %.1f ms DB",
+                    scope["method"], scope["path"], status_code, duration,
+                    stats.queries, stats.db_time * 1000,
+                    extra={
+                        "request_id": request_id,
+                        "route": stats.route,
+                        "status_code": status_code,
+                        "duration_ms": round(duration * 1000, 1),
+                        "db_queries": stats.queries,
+                        "db_time_ms": round(stats.db_time * 1000, 1),
+                        "db_rows": stats.rows,
+                    }
+                )
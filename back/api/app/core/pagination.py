@@ -0,0 +1,212 @@
+"""Keyset pagination helpers"""
+import json
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+# Position of a message in (created_at, id) order
+Cursor = Tuple[datetime, int]
+
+
+def encode_keyset(*values: Any) -> str:
+    """
+    Encode a sort key as an opaque cursor
+
+    Args:
+        values: JSON-serializable sort key values
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps(list(values), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_keyset(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_keyset
+
+    Args:
+        cursor: Cursor string
+        size: Expected number of key values
+
+    Returns:
+        Sort key values
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return values
+
+
+def encode_cursor(created_at: datetime, message_id: int) -> str:
+    """
+    Encode a message position as an opaque cursor
+
+    Args:
+        created_at: Message creation time
+        message_id: Message ID (tie-breaker for equal timestamps)
+
+    Returns:
+        URL-safe cursor string
+    """
+    return encode_keyset(created_at.isoformat(), message_id)
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        (created_at, id) tuple
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    created_at, message_id = decode_keyset(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_at), int(message_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def message_page_query(
+    query: Select,
+    model: Any,
+    limit: int,
+    before: Optional[Cursor] = None,
+    after: Optional[Cursor] = None
+) -> Select:
+    """
+    Build the query of one page of messages (limit + 1 rows, in scan order)
+
+    Message tables are partitioned by month of created_at. The planner
+    prunes partitions on plain created_at comparisons but not on the
+    (created_at, id) row comparison, so a cursor adds both: a page older
+    than a cursor skips the newer months, a page newer than it skips the
+    older ones.
+
+    Args:
+        query: Select of the model already filtered to one conversation
+        model: Message or GroupMessage
+        limit: Page size
+        before: Newest messages older than this position
+        after: Oldest messages newer than this position
+
+    Returns:
+        Select ordered newest first, or oldest first with after
+
+    Raises:
+        HTTPException: If both before and after are given
+    """
+    if before is not None and after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either before or after, not both"
+        )
+
+    key = tuple_(model.created_at, model.id)
+
+    if after is not None:
+        query = query.filter(model.created_at >= after[0], key > tuple_(*after))
+        query = query.order_by(model.created_at.asc(), model.id.asc())
+    else:
+        if before is not None:
+            query = query.filter(model.created_at <= before[0], key < tuple_(*before))
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+
+    return query.limit(limit + 1)
+
+
+async def fetch_message_page(
+    db: AsyncSession,
+    query: Select,
+    model: Any,
+    limit: int,
+    before: Optional[Cursor] = None,
+    after: Optional[Cursor] = None
+) -> Tuple[List[Any], bool]:
+    """
+    Fetch one page of messages in (created_at, id) order
+
+    Both directions are a range scan on the (conversation, created_at, id)
+    index of the partitions the cursor leaves, so a deep page costs the
+    same as the first one.
+
+    Args:
+        db: Database session
+        query: Select of the model already filtered to one conversation
+        model: Message or GroupMessage
+        limit: Page size
+        before: Return the newest messages older than this position
+        after: Return the oldest messages newer than this position
+
+    Returns:
+        (messages oldest first, whether more messages exist in that direction)
+
+    Raises:
+        HTTPException: If both before and after are given
+    """
+    result = await db.execute(message_page_query(query, model, limit, before, after))
+    messages = list(result.scalars().all())
+
+    has_more = len(messages) > limit
+    if has_more:
+        messages = messages[:limit]
+
+    # Newest-first pages are reversed to show oldest first
+    if after is None:
+        messages.reverse()
+
+    return messages, has_more
+
+
+async def message_position(db: AsyncSession, query: Select, model: Any, message_id: int) -> Cursor:
+    """
+    Look up the position of a message (for the legacy before_id parameter)
+
+    The ID alone does not tell the month, so this probes every partition;
+    cursors do not need the lookup.
+
+    Args:
+        db: Database session
+        query: Select of the model already filtered to one conversation
+        model: Message or GroupMessage
+        message_id: Message ID
+
+    Returns:
+        (created_at, id) tuple
+
+    Raises:
+        HTTPException: If the message is not in the conversation
+    """
+    result = await db.execute(
+        query.with_only_columns(model.created_at, model.id).filter(model.id == message_id)
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid before_id"
+        )
+    return row.created_at, row.id
@@ -0,0 +1,269 @@
+"""Monthly range partitions of the append-only tables (audit_logs, messages, group_messages)"""
+import re
+import gzip
+import logging
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import DDL, Table, event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Tables partitioned by RANGE (created_at), one partition per calendar month (UTC)
+PARTITIONED_TABLES = ("audit_logs", "messages", "group_messages")
+
+
+def add_default_partition(table: Table):
+    """
+    Give a partitioned model a DEFAULT partition when created with create_all
+
+    Databases built from the models (tests, scratch databases) then accept
+    rows of any date; migrated databases get monthly partitions from the
+    migration and from scripts/maintain_partitions.py.
+
+    Args:
+        table: Table declared with postgresql_partition_by
+    """
+    event.listen(
+        table,
+        "after_create",
+        DDL(f"CREATE TABLE {table.name}_default PARTITION OF {table.name} DEFAULT")
+    )
+
+
+def month_start(value: date) -> date:
+    """First day of the month of a date"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after (or before, if negative) a month"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of a table's partition for a month, e.g. messages_p2026_10"""
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+async def monthly_partitions(conn: AsyncConnection, table: str) -> Dict[date, str]:
+    """
+    Monthly partitions currently attached to a table
+
+    Args:
+        conn: Database connection
+        table: Partitioned table
+
+    Returns:
+        First day of the month -> partition name, oldest first
+    """
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:table AS regclass)"
+    ), {"table": table})
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$")
+    partitions = {}
+    for (name,) in result.all():
+        match = pattern.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return dict(sorted(partitions.items()))
+
+
+async def create_partition(conn: AsyncConnection, table: str, month: date) -> bool:
+    """
+    Create a table's partition for one month, unless it exists
+
+    Rows of that month already stored in the DEFAULT partition (written
+    while the partition was missing) are moved into the new partition.
+
+    Args:
+        conn: Database connection (the caller commits)
+        table: Partitioned table
+        month: First day of the month
+
+    Returns:
+        Whether the partition was created
+    """
+    name = partition_name(table, month)
+    exists = (await conn.execute(text("SELECT to_regclass(:name)"), {"name": name})).scalar()
+    if exists is not None:
+        return False
+
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    end_month = add_months(month, 1)
+    end = datetime(end_month.year, end_month.month, 1, tzinfo=timezone.utc)
+    bounds = {"start": start, "end": end}
+    default = f"{table}_default"
+    has_default = (await conn.execute(text("SELECT to_regclass(:name)"), {"name": default})).scalar() is not None
+
+    moved = 0
+    if has_default:
+        await conn.execute(text(f"CREATE TEMP TABLE moved_rows (LIKE {table}) ON COMMIT DROP"))
+        result = await conn.execute(text(
+            f"WITH moved AS (DELETE FROM {default} WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO moved_rows SELECT * FROM moved"
+        ), bounds)
+        moved = result.rowcount
+
+    await conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+
+    if has_default:
+        if moved:
+            await conn.execute(text(f"INSERT INTO {table} SELECT * FROM moved_rows"))
+        await conn.execute(text("DROP TABLE moved_rows"))
+    logger.info(f"Created partition {name}" + (f" ({moved} rows moved from {default})" if moved else ""))
+    return True
+
+
+async def ensure_partitions(
+    conn: AsyncConnection,
+    table: str,
+    months_ahead: int,
+    today: Optional[date] = None
+) -> List[str]:
+    """
+    Create the partitions of the current month and the next months_ahead months
+
+    Args:
+        conn: Database connection (the caller commits)
+        table: Partitioned table
+        months_ahead: Future months to pre-create
+        today: Reference date (default: today, UTC)
+
+    Returns:
+        Names of the partitions created
+    """
+    current = month_start(today or datetime.now(timezone.utc).date())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if await create_partition(conn, table, month):
+            created.append(partition_name(table, month))
+    return created
+
+
+async def archive_partition(conn: AsyncConnection, name: str, archive_dir: Path) -> Path:
+    """
+    Write a partition's rows to a gzip-compressed CSV file (with a header line)
+
+    Args:
+        conn: Database connection on the psycopg (v3) driver
+        name: Partition (or detached table) name
+        archive_dir: Directory of the archive files
+
+    Returns:
+        Path of the file written
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{name}.csv.gz"
+    partial = path.with_suffix(".gz.partial")
+    driver = (await conn.get_raw_connection()).driver_connection
+    async with driver.cursor() as cursor:
+        async with cursor.copy(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)") as copy:
+            with gzip.open(partial, "wb") as archive:
+                async for block in copy:
+                    archive.write(block)
+    partial.rename(path)
+    return path
+
+
+async def expired_partitions(
+    conn: AsyncConnection,
+    table: str,
+    retention_months: int,
+    today: Optional[date] = None
+) -> List[str]:
+    """
+    Attached partitions older than the retention period
+
+    A partition expires once its whole month is more than retention_months
+    months before the current month.
+
+    Args:
+        conn: Database connection
+        table: Partitioned table
+        retention_months: Months to keep besides the current one; 0 keeps everything
+        today: Reference date (default: today, UTC)
+
+    Returns:
+        Partition names, oldest first
+    """
+    if retention_months <= 0:
+        return []
+    cutoff = add_months(month_start(today or datetime.now(timezone.utc).date()), -retention_months)
+    return [name for month, name in (await monthly_partitions(conn, table)).items() if month < cutoff]
+
+
+async def detach_partition(conn: AsyncConnection, table: str, name: str):
+    """
+    Detach a partition from its table, keeping it as a plain table
+
+    DETACH locks the parent table (ACCESS EXCLUSIVE) until the transaction
+    ends: commit right after it.
+
+    Args:
+        conn: Database connection (the caller commits)
+        table: Partitioned table
+        name: Partition name
+    """
+    await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    # The detached table is an archive: unlink it from the parent's ID sequence
+    await conn.execute(text(f"ALTER TABLE {name} ALTER COLUMN id DROP DEFAULT"))
+
+
+async def detach_old_partitions(
+    engine: AsyncEngine,
+    table: str,
+    retention_months: int,
+    archive_dir: Optional[Path] = None,
+    today: Optional[date] = None,
+    lock_timeout: Optional[str] = None
+) -> List[str]:
+    """
+    Detach the partitions older than the retention period
+
+    Each partition is detached in its own short transaction, so the
+    parent table is only locked for the DETACH itself. Without an archive
+    directory the detached table is kept (outside of the parent, no longer
+    queried or indexed with it); with one, it is then written to
+    <archive_dir>/<partition>.csv.gz and dropped in a second transaction,
+    which only locks the detached table. If archiving fails, the detached
+    table stays in the database with its rows.
+
+    Args:
+        engine: Database engine (transactions are committed here)
+        table: Partitioned table
+        retention_months: Months to keep besides the current one; 0 keeps everything
+        archive_dir: Directory to archive detached partitions to
+        today: Reference date (default: today, UTC)
+        lock_timeout: Longest wait for the parent table's lock, e.g. "5s"
+
+    Returns:
+        Names of the partitions detached
+    """
+    async with engine.connect() as conn:
+        names = await expired_partitions(conn, table, retention_months, today)
+
+    detached = []
+    for name in names:
+        async with engine.begin() as conn:
+            if lock_timeout:
+                await conn.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+            await detach_partition(conn, table, name)
+        detached.append(name)
+
+        if archive_dir is None:
+            logger.info(f"Detached partition {name}")
+            continue
+        async with engine.begin() as conn:
+            path = await archive_partition(conn, name, archive_dir)
+            await conn.execute(text(f"DROP TABLE {name}"))
+        logger.info(f"Archived partition {name} to {path}")
+    return detached
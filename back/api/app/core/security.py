@@ -5,6 +5,7 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import settings
+from app.core.identity_cache import identity_cache
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -43,21 +44,30 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Verify and decode JWT token
     
+    Tokens verified before are served from the identity cache until they
+    expire, so repeat requests skip the signature check.
+    
     Args:
         token: JWT token string
     
     Returns:
         Decoded token payload or None if invalid
     """
+    payload = identity_cache.get_payload(token)
+    if payload is not None:
+        return payload
+    
     try:
         payload = jwt.decode(
             token,
             settings.jwt_secret,
             algorithms=[settings.jwt_algorithm]
         )
-        return payload
     except JWTError:
         return None
+    
+    identity_cache.set_payload(token, payload)
+    return payload
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -1,12 +1,13 @@
 """Database connection and session management"""
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.config import settings
 
-# Create database engine
+# Create database engine (sync; used by scripts and Alembic)
 engine = create_engine(
     settings.database_url_resolved,
     pool_pre_ping=True,
@@ -17,6 +18,23 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async database engine (used by the API and WebSocket endpoints)
+async_engine = create_async_engine(
+    settings.database_url_async,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20
+)
+
+# Create async session factory.
+# expire_on_commit=False keeps loaded attributes readable after commit,
+# since lazy refreshes are not possible outside of an awaited call.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -32,3 +50,11 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an async database session.
+    Yields an async database session and closes it after use.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,14 +1,15 @@
 """Database models"""
 from app.models.user import User, OAuthAccount
 from app.models.skill import Skill, UserSkill
-from app.models.github_repo import GitHubRepo
+from app.models.github_repo import GitHubRepo, GitHubSyncState
 from app.models.project import Project, ProjectSkill, Favorite
 from app.models.application import Application
 from app.models.offer import Offer
 from app.models.match import Match
-from app.models.chat import Conversation, Message
+from app.models.chat import Conversation, Message, ConversationRead
 from app.models.group_chat import GroupConversation, GroupMember, GroupMessage, MemberRole
 from app.models.audit import AuditLog
+from app.models.job import Job
 
 __all__ = [
     "User",
@@ -16,6 +17,7 @@ __all__ = [
     "Skill",
     "UserSkill",
     "GitHubRepo",
+    "GitHubSyncState",
     "Project",
     "ProjectSkill",
     "Favorite",
@@ -24,9 +26,11 @@ __all__ = [
     "Match",
     "Conversation",
     "Message",
+    "ConversationRead",
     "GroupConversation",
     "GroupMember",
     "GroupMessage",
     "MemberRole",
     "AuditLog",
+    "Job",
 ]
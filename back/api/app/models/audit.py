@@ -4,10 +4,11 @@ from sqlalchemy import Column, Text, BigInteger, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from app.database import Base
+from app.core.partitions import add_default_partition
 
 
 class AuditLog(Base):
-    """Audit log for important actions"""
+    """Audit log for important actions (partitioned by month of created_at)"""
     __tablename__ = "audit_logs"
     
     id = Column(BigInteger, primary_key=True, autoincrement=True)
@@ -15,5 +16,12 @@ class AuditLog(Base):
     action = Column(Text, nullable=False)  # e.g. 'LOGIN', 'CREATE_PROJECT'
     resource = Column(Text)
     payload = Column(JSONB)
-    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=datetime.utcnow)
+    
+    __table_args__ = (
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+add_default_partition(AuditLog.__table__)
 
@@ -6,6 +6,7 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.core.partitions import add_default_partition
 
 
 class Conversation(Base):
@@ -16,26 +17,52 @@ class Conversation(Base):
     match_id = Column(UUID(as_uuid=True), ForeignKey("matches.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     
+    # Summary maintained on message insert (see services/chat_summary.py)
+    message_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    last_message_id = Column(BigInteger)
+    last_sender_id = Column(UUID(as_uuid=True))
+    last_message_preview = Column(Text)
+    last_message_at = Column(DateTime(timezone=True))
+    
     # Relationships
     match = relationship("Match", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
+    reads = relationship("ConversationRead", back_populates="conversation", cascade="all, delete-orphan")
 
 
 class Message(Base):
-    """Chat message"""
+    """Chat message (partitioned by month of created_at)"""
     __tablename__ = "messages"
     
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
     sender_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     body = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=datetime.utcnow)
     
     __table_args__ = (
-        Index("idx_messages_conv_time", "conversation_id", "created_at"),
+        Index("idx_messages_conv_time_id", "conversation_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
     
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
     sender = relationship("User", foreign_keys=[sender_id], back_populates="sent_messages")
 
+
+add_default_partition(Message.__table__)
+
+
+class ConversationRead(Base):
+    """Read cursor of a match member in a 1-on-1 conversation"""
+    __tablename__ = "conversation_reads"
+    
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    read_count = Column(BigInteger, nullable=False, default=0)  # conversation message_count when last read
+    last_read_message_id = Column(BigInteger)
+    read_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    
+    # Relationships
+    conversation = relationship("Conversation", back_populates="reads")
+
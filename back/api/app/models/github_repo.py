@@ -1,6 +1,6 @@
 """GitHub repository model"""
 from sqlalchemy import Column, BigInteger, Integer, Text, DateTime, ForeignKey, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -25,3 +25,14 @@ class GitHubRepo(Base):
     # Relationships
     user = relationship("User", back_populates="github_repos")
 
+
+class GitHubSyncState(Base):
+    """Conditional-request state of a user's last repository sync"""
+    __tablename__ = "github_sync_states"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # One entry per listing page: {"etag": ..., "repos": [repo_full_name, ...]}
+    pages = Column(JSONB, nullable=False, default=list)
+    repo_count = Column(Integer, nullable=False, default=0)
+    last_synced_at = Column(DateTime(timezone=True), nullable=False)
+
@@ -7,6 +7,7 @@ from sqlalchemy.orm import relationship
 import enum
 
 from app.database import Base
+from app.core.partitions import add_default_partition
 
 
 class MemberRole(str, enum.Enum):
@@ -25,6 +26,13 @@ class GroupConversation(Base):
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Summary maintained on message insert (see services/chat_summary.py)
+    message_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    last_message_id = Column(BigInteger)
+    last_sender_id = Column(UUID(as_uuid=True))
+    last_message_preview = Column(Text)
+    last_message_at = Column(DateTime(timezone=True))
+    
     # Relationships
     project = relationship("Project", back_populates="group_conversation")
     members = relationship("GroupMember", back_populates="group_conversation", cascade="all, delete-orphan")
@@ -40,26 +48,38 @@ class GroupMember(Base):
     role = Column(SQLEnum(MemberRole), nullable=False, default=MemberRole.member)
     joined_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     
+    # Read cursor: group message_count when last read
+    read_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    last_read_message_id = Column(BigInteger)
+    
+    __table_args__ = (
+        # A user's groups, index-only (conversation lists); the primary key leads with the group
+        Index("idx_group_members_user_group", "user_id", "group_conversation_id"),
+    )
+    
     # Relationships
     group_conversation = relationship("GroupConversation", back_populates="members")
     user = relationship("User", back_populates="group_memberships")
 
 
 class GroupMessage(Base):
-    """Message in a group conversation"""
+    """Message in a group conversation (partitioned by month of created_at)"""
     __tablename__ = "group_messages"
     
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     group_conversation_id = Column(UUID(as_uuid=True), ForeignKey("group_conversations.id", ondelete="CASCADE"), nullable=False)
     sender_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     body = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=datetime.utcnow)
     
     __table_args__ = (
-        Index("idx_group_messages_conv_time", "group_conversation_id", "created_at"),
+        Index("idx_group_messages_conv_time_id", "group_conversation_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
     
     # Relationships
     group_conversation = relationship("GroupConversation", back_populates="messages")
     sender = relationship("User", foreign_keys=[sender_id], back_populates="group_messages")
 
+
+add_default_partition(GroupMessage.__table__)
@@ -0,0 +1,38 @@
+"""Background job model"""
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, Text, Integer, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from app.database import Base
+
+
+class Job(Base):
+    """Queued side effect run by the in-process job runner"""
+    __tablename__ = "jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(Text, nullable=False)  # handler name, e.g. 'github_repo_sync'
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    dedupe_key = Column(Text)  # at most one queued/running job per key
+    status = Column(Text, nullable=False, default="queued")  # queued/running/succeeded/failed
+    payload = Column(JSONB, nullable=False, default=dict)
+    result = Column(JSONB)
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+    locked_until = Column(DateTime(timezone=True))  # lease of a running job; expired leases are re-queued
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        Index(
+            "uq_jobs_active_dedupe_key",
+            "dedupe_key",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')")
+        ),
+        Index("idx_jobs_queued_run_at", "run_at", postgresql_where=text("status = 'queued'")),
+        Index("idx_jobs_running_lease", "locked_until", postgresql_where=text("status = 'running'")),
+    )
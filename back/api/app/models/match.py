@@ -1,7 +1,7 @@
 """Match and conversation models"""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -20,6 +20,9 @@ class Match(Base):
     
     __table_args__ = (
         UniqueConstraint("project_id", "user_a", "user_b", name="uq_project_users"),
+        # A user's matches (conversation list)
+        Index("idx_matches_user_a", "user_a"),
+        Index("idx_matches_user_b", "user_b"),
     )
     
     # Relationships
@@ -1,9 +1,9 @@
 """Project and related models"""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Text, DateTime, ForeignKey, Integer, SmallInteger, CheckConstraint, PrimaryKeyConstraint
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Text, DateTime, ForeignKey, Integer, SmallInteger, CheckConstraint, PrimaryKeyConstraint, Index, Computed, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 
 from app.database import Base
 
@@ -21,6 +21,21 @@ class Project(Base):
     updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = Column(DateTime(timezone=True))
     
+    # Weighted full-text document (title A, description B), maintained by PostgreSQL
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', unaccent_immutable(coalesce(title, ''))), 'A') || "
+            "setweight(to_tsvector('simple', unaccent_immutable(coalesce(description, ''))), 'B')",
+            persisted=True
+        )
+    ))
+    
+    __table_args__ = (
+        Index("idx_projects_live_created", "created_at", postgresql_where=text("deleted_at IS NULL")),
+        Index("idx_projects_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    
     # Relationships
     owner = relationship("User", foreign_keys=[owner_id], back_populates="owned_projects")
     project_skills = relationship("ProjectSkill", back_populates="project", cascade="all, delete-orphan")
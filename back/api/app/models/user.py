@@ -1,7 +1,7 @@
 """User and authentication models"""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, UniqueConstraint, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -22,6 +22,15 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = Column(DateTime(timezone=True))
     
+    __table_args__ = (
+        # Prefix matches in user search; substring matches use the trigram index (migration 008)
+        Index(
+            "idx_users_handle_prefix",
+            func.lower(handle).collate("C"),
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+    )
+    
     # Relationships
     oauth_accounts = relationship("OAuthAccount", back_populates="user", cascade="all, delete-orphan")
     user_skills = relationship("UserSkill", back_populates="user", cascade="all, delete-orphan")
@@ -0,0 +1,31 @@
+"""Conversation list schemas (1-on-1 and group chats)"""
+from typing import List, Literal, Optional
+from datetime import datetime
+from pydantic import BaseModel, UUID4
+
+
+class LastMessageResponse(BaseModel):
+    """Latest message of a conversation"""
+    id: int
+    sender_id: UUID4
+    preview: str  # first 200 characters of the body
+    created_at: datetime
+
+
+class ConversationSummaryResponse(BaseModel):
+    """Conversation list entry"""
+    type: Literal["direct", "group"]
+    id: Optional[UUID4] = None  # None for a match whose conversation has not been opened yet
+    match_id: Optional[UUID4] = None  # direct only; open with GET /matches/{match_id}/conversation
+    project_id: Optional[UUID4] = None
+    name: str  # the other user's handle, or the group name
+    peer_id: Optional[UUID4] = None  # direct only
+    avatar_url: Optional[str] = None  # direct only
+    last_message: Optional[LastMessageResponse] = None
+    unread_count: int
+    last_activity_at: datetime
+
+
+class ConversationSummaryListResponse(BaseModel):
+    """Conversation list, most recent activity first"""
+    conversations: List[ConversationSummaryResponse]
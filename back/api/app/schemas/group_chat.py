@@ -62,6 +62,8 @@ class GroupConversationDetailResponse(BaseModel):
     members: List[GroupMemberResponse]
     messages: List[GroupMessageResponse]
     has_more: bool = False
+    before_cursor: Optional[str] = None  # pass as ?before= to load older messages
+    after_cursor: Optional[str] = None  # pass as ?after= to catch up on newer messages
 
 
 class GroupMessageCreate(BaseModel):
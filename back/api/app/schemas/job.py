@@ -0,0 +1,19 @@
+"""Background job schemas"""
+from typing import Any, Dict, Optional
+from datetime import datetime
+from pydantic import BaseModel, UUID4
+
+
+class JobResponse(BaseModel):
+    """Background job status"""
+    id: UUID4
+    kind: str
+    status: str  # queued/running/succeeded/failed
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 """Match and conversation schemas"""
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, UUID4
 
@@ -39,4 +39,6 @@ class ConversationResponse(BaseModel):
     match_id: UUID4
     messages: List[MessageResponse]
     has_more: bool = False
+    before_cursor: Optional[str] = None  # pass as ?before= to load older messages
+    after_cursor: Optional[str] = None  # pass as ?after= to catch up on newer messages
 
@@ -62,13 +62,38 @@ class ProjectDetailResponse(ProjectResponse):
     """Detailed project response with skills"""
     required_skills: List[ProjectSkillResponse] = []
     is_favorited: bool = False
+    snippet: Optional[str] = None  # Escaped description excerpt with <mark> around matches (highlight=true)
     
     class Config:
         from_attributes = True
 
 
+class RecommendedProjectResponse(ProjectDetailResponse):
+    """Project recommended to the current user"""
+    score: float = 0.0
+
+
+class RecommendedProjectListResponse(BaseModel):
+    """Recommended project list response"""
+    projects: List[RecommendedProjectResponse]
+
+
+class CandidateResponse(BaseModel):
+    """Recommended user for a project"""
+    user: UserResponse
+    score: float
+    matched_skill_ids: List[int]
+
+
+class CandidateListResponse(BaseModel):
+    """Candidate list response"""
+    candidates: List[CandidateResponse]
+
+
 class ProjectListResponse(BaseModel):
     """Project list response"""
     projects: List[ProjectDetailResponse]
-    total: int
+    total: Optional[int] = None  # None when total_mode is "none"
+    total_mode: str = "exact"  # exact, estimated or none
+    has_more: bool = False
 
@@ -1,5 +1,5 @@
 """User schemas"""
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, UUID4
 
@@ -98,6 +98,23 @@ class UserDetailResponse(UserResponse):
         # orm_mode = True
 
 
+class UserSearchResponse(BaseModel):
+    """User search response"""
+    users: List[UserResponse]
+    next_cursor: Optional[str] = None
+
+
+class UserPresence(BaseModel):
+    """Presence of one user"""
+    user_id: UUID4
+    status: Literal["online", "away", "offline"]
+
+
+class UserPresenceResponse(BaseModel):
+    """Presence of the requested users, in request order"""
+    presence: List[UserPresence]
+
+
 class UserListResponse(BaseModel):
     """User list response"""
     users: List[UserResponse]
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""Audit log sink: in the caller's transaction, or buffered and written in batches"""
+import json
+import uuid
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import psycopg
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION = "transaction"
+BUFFERED = "buffered"
+
+# Session.info key of the audit rows recorded in the session's open transaction, per sink
+PENDING_KEY = "audit_events"
+# Failed flushes tried at shutdown before the remaining rows are logged instead
+STOP_FLUSH_ATTEMPTS = 3
+# Longest wait between retries of a failed flush
+MAX_RETRY_SECONDS = 5.0
+# Columns written by the buffered writer, in COPY order
+COPY_COLUMNS = ("user_id", "action", "resource", "payload", "created_at")
+
+
+class AuditSink:
+    """
+    Record audit events
+
+    In "transaction" mode (AUDIT_MODE, the default) an AuditLog row is added
+    to the caller's session and committed with it. In "buffered" mode the
+    row is handed to a background writer when the caller's transaction
+    commits (and discarded if it rolls back), and written with other rows
+    in one COPY every flush interval or batch size, whichever comes first;
+    the request's transaction no longer carries the audit insert.
+
+    The buffer is bounded: record() waits while it holds max_pending rows
+    (the writer is behind or the database down), so a slow audit table
+    slows writers down instead of growing memory or dropping events.
+    Failed flushes are retried with backoff, and stop() writes every
+    buffered row before returning.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[float] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.batch_size = batch_size or settings.audit_batch_size
+        self.flush_interval_ms = flush_interval_ms or settings.audit_flush_ms
+        self.max_pending = max_pending or settings.audit_max_pending
+        self.pending: List[Dict[str, Any]] = []
+        self.written = 0
+        self.failed_flushes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    @property
+    def buffered(self) -> bool:
+        """Whether events go through the background writer"""
+        return settings.audit_mode == BUFFERED and self._task is not None
+
+    async def start(self):
+        """Start the background writer (buffered mode only)"""
+        if settings.audit_mode != BUFFERED:
+            return
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Write every buffered event, then stop the writer"""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    async def record(
+        self,
+        db: AsyncSession,
+        action: str,
+        resource: Optional[str] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        user_id: Optional[uuid.UUID] = None
+    ):
+        """
+        Record an audit event as part of the session's transaction
+
+        Args:
+            db: Database session of the change being audited
+            action: Action name, e.g. 'CREATE_PROJECT'
+            resource: Resource type, e.g. 'projects'
+            payload: JSON details
+            user_id: Acting user
+        """
+        values = {
+            "user_id": user_id,
+            "action": action,
+            "resource": resource,
+            "payload": payload,
+            "created_at": datetime.utcnow()
+        }
+        if not self.buffered:
+            db.add(AuditLog(**values))
+            return
+
+        while len(self.pending) >= self.max_pending and self.buffered:
+            self._space.clear()
+            await self._space.wait()
+        db.info.setdefault(PENDING_KEY, {}).setdefault(self, []).append(values)
+
+    def submit(self, events: List[Dict[str, Any]]):
+        """
+        Buffer committed events for the writer
+
+        Args:
+            events: AuditLog column values
+        """
+        if self._task is None:
+            # Writer stopped since the events were recorded: log rather than lose them
+            _log_unwritten(events)
+            return
+        self.pending.extend(events)
+        if len(self.pending) >= self.batch_size:
+            self._wakeup.set()
+        elif len(self.pending) == len(events):
+            # First events since the last flush: start the flush interval
+            self._wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Buffered rows, written rows and failed flushes"""
+        return {
+            "mode": settings.audit_mode,
+            "pending": len(self.pending),
+            "written": self.written,
+            "failed_flushes": self.failed_flushes
+        }
+
+    async def _run(self):
+        """Flush the buffer every interval or batch size until stopped and drained"""
+        loop = asyncio.get_running_loop()
+        failures = 0
+        while True:
+            if not self.pending:
+                if self._stopping:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Let a batch build up, unless it is already full
+            deadline = loop.time() + self.flush_interval_ms / 1000
+            while len(self.pending) < self.batch_size and not self._stopping:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = self.pending[:self.batch_size]
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                failures += 1
+                self.failed_flushes += 1
+                logger.error(f"Failed to write {len(batch)} audit events (attempt {failures}): {str(e)}")
+                if self._stopping and failures >= STOP_FLUSH_ATTEMPTS:
+                    _log_unwritten(self.pending)
+                    self.pending.clear()
+                    self._space.set()
+                    return
+                await asyncio.sleep(min(MAX_RETRY_SECONDS, 0.1 * (2 ** failures)))
+                continue
+
+            failures = 0
+            del self.pending[:len(batch)]
+            self.written += len(batch)
+            if len(self.pending) < self.max_pending:
+                self._space.set()
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        """
+        Insert a batch in one transaction
+
+        COPY on psycopg connections (an order of magnitude faster than a
+        multi-row INSERT for hundreds of rows), INSERT otherwise.
+
+        Args:
+            batch: AuditLog column values
+        """
+        async with self.session_factory() as db:
+            connection = await db.connection()
+            driver = (await connection.get_raw_connection()).driver_connection
+            if isinstance(driver, psycopg.AsyncConnection):
+                columns = ", ".join(COPY_COLUMNS)
+                async with driver.cursor() as cursor:
+                    async with cursor.copy(f"COPY audit_logs ({columns}) FROM STDIN") as copy:
+                        for values in batch:
+                            await copy.write_row([
+                                json.dumps(values[c]) if c == "payload" and values[c] is not None else values[c]
+                                for c in COPY_COLUMNS
+                            ])
+            else:
+                await db.execute(insert(AuditLog), batch)
+            await db.commit()
+
+
+def _log_unwritten(events: List[Dict[str, Any]]):
+    """Last resort for events that cannot be written: one error log line each"""
+    for values in events:
+        logger.error("Unwritten audit event: " + json.dumps(values, default=str))
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_committed_events(session: Session):
+    """Hand the events of a committed transaction to the writer"""
+    for sink, events in session.info.pop(PENDING_KEY, {}).items():
+        sink.submit(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_events(session: Session):
+    """Drop the events of a rolled back transaction, like the rows they describe"""
+    session.info.pop(PENDING_KEY, None)
+
+
+audit_sink = AuditSink()
@@ -0,0 +1,255 @@
+"""Pub/sub backplane for fanning chat events out across workers"""
+import json
+import uuid
+import zlib
+import base64
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Callback invoked with (target, key, message) for every event that must be
+# delivered to sockets held by this worker.
+DeliveryHandler = Callable[[str, str, Dict[str, Any]], Awaitable[None]]
+
+
+class PayloadTooLarge(ValueError):
+    """Event too large for the backplane to carry to other workers"""
+
+
+class Backplane(ABC):
+    """
+    Base class for chat backplanes
+
+    A backplane receives every event published by any worker and hands it to
+    the local delivery handler, so each worker only writes to its own sockets.
+    """
+
+    def __init__(self):
+        self.handler: Optional[DeliveryHandler] = None
+
+    async def start(self, handler: DeliveryHandler):
+        """
+        Start receiving events
+
+        Args:
+            handler: Coroutine delivering an event to local sockets
+        """
+        self.handler = handler
+
+    async def stop(self):
+        """Stop receiving events"""
+        self.handler = None
+
+    def fits(self, target: str, key: str, message: Dict[str, Any]) -> bool:
+        """
+        Whether an event is small enough to be published
+
+        Args:
+            target: "conversation", "user" or "presence"
+            key: Conversation key, user ID, or announcing user or worker ID
+            message: Message data to send
+
+        Returns:
+            False if publish() would raise PayloadTooLarge
+        """
+        return True
+
+    @abstractmethod
+    async def publish(self, target: str, key: str, message: Dict[str, Any]):
+        """
+        Publish an event to every worker
+
+        Args:
+            target: "conversation", "user" or "presence"
+            key: Conversation key, user ID, or announcing user or worker ID
+            message: Message data to send
+
+        Raises:
+            PayloadTooLarge: If the event cannot reach other workers (nothing is delivered)
+        """
+
+
+class InProcessBackplane(Backplane):
+    """Backplane for a single worker: events are delivered directly"""
+
+    async def publish(self, target: str, key: str, message: Dict[str, Any]):
+        if self.handler is not None:
+            await self.handler(target, key, message)
+
+
+class PostgresBackplane(Backplane):
+    """
+    Backplane built on PostgreSQL LISTEN/NOTIFY
+
+    Events published by this worker are delivered locally right away and
+    broadcast with NOTIFY; notifications coming back from our own node ID are
+    ignored. Payloads above the NOTIFY size limit are zlib-compressed; events
+    that still do not fit are refused (PayloadTooLarge) rather than delivered
+    to this worker's sockets only.
+    """
+
+    # PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+    MAX_PAYLOAD_BYTES = 7999
+    COMPRESSED_PREFIX = "z:"
+    RECONNECT_DELAY_SECONDS = 1.0
+    MAX_RECONNECT_DELAY_SECONDS = 30.0
+    # Longest wait for notifications before the listener checks for stop()
+    LISTEN_POLL_SECONDS = 0.5
+
+    def __init__(self, dsn: Optional[str] = None, channel: Optional[str] = None):
+        super().__init__()
+        self.dsn = dsn or make_url(settings.database_url_resolved).set(
+            drivername="postgresql"
+        ).render_as_string(hide_password=False)
+        self.channel = channel or settings.chat_backplane_channel
+        self.node_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self._listen_conn: Optional[psycopg.AsyncConnection] = None
+        self._publish_conn: Optional[psycopg.AsyncConnection] = None
+        self._publish_lock = asyncio.Lock()
+        self._listening = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+    async def start(self, handler: DeliveryHandler):
+        await super().start(handler)
+        self._stopping.clear()
+        self._listener = asyncio.create_task(self._listen())
+        await self._listening.wait()
+        logger.info(f"Chat backplane listening on channel {self.channel} (node {self.node_id})")
+
+    async def stop(self):
+        # The listener is not cancelled: psycopg answers a cancel during a
+        # LISTEN wait with a server-side query cancel and keeps waiting for a
+        # notification. It sees the stop event within LISTEN_POLL_SECONDS.
+        if self._listener is not None:
+            self._stopping.set()
+            await self._listener
+            self._listener = None
+        if self._publish_conn is not None:
+            await self._publish_conn.close()
+            self._publish_conn = None
+        self._listening.clear()
+        await super().stop()
+
+    def fits(self, target: str, key: str, message: Dict[str, Any]) -> bool:
+        return self._encode(self._event(target, key, message)) is not None
+
+    async def publish(self, target: str, key: str, message: Dict[str, Any]):
+        payload = self._encode(self._event(target, key, message))
+        if payload is None:
+            raise PayloadTooLarge(f"Backplane payload for {target} {key} exceeds the NOTIFY limit")
+
+        # Deliver to our own sockets without waiting for the round trip
+        if self.handler is not None:
+            await self.handler(target, key, message)
+
+        async with self._publish_lock:
+            try:
+                if self._publish_conn is None or self._publish_conn.closed:
+                    self._publish_conn = await psycopg.AsyncConnection.connect(
+                        self.dsn, autocommit=True
+                    )
+                await self._publish_conn.execute(
+                    "SELECT pg_notify(%s, %s)", (self.channel, payload)
+                )
+            except psycopg.Error as e:
+                logger.error(f"Failed to publish backplane event: {str(e)}")
+                if self._publish_conn is not None:
+                    await self._publish_conn.close()
+                self._publish_conn = None
+
+    async def _listen(self):
+        """Keep a LISTEN connection open and dispatch notifications until stop()"""
+        delay = self.RECONNECT_DELAY_SECONDS
+        while not self._stopping.is_set():
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    self.dsn, autocommit=True
+                ) as conn:
+                    self._listen_conn = conn
+                    await conn.execute(f'LISTEN "{self.channel}"')
+                    self._listening.set()
+                    delay = self.RECONNECT_DELAY_SECONDS
+                    while not self._stopping.is_set():
+                        async for notify in conn.notifies(timeout=self.LISTEN_POLL_SECONDS):
+                            await self._dispatch(notify.payload)
+            except Exception as e:
+                logger.error(f"Backplane listener error, reconnecting in {delay:.0f}s: {str(e)}")
+                # Unblock start() even if the database is not reachable yet
+                self._listening.set()
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY_SECONDS)
+            finally:
+                self._listen_conn = None
+
+    async def _dispatch(self, payload: str):
+        """Deliver a notification from another worker to local sockets"""
+        try:
+            event = self._decode(payload)
+        except (ValueError, zlib.error) as e:
+            logger.error(f"Dropping malformed backplane payload: {str(e)}")
+            return
+
+        if event.get("node") == self.node_id or self.handler is None:
+            return
+
+        try:
+            await self.handler(event["target"], event["key"], event["message"])
+        except Exception as e:
+            logger.error(f"Error delivering backplane event: {str(e)}")
+
+    def _event(self, target: str, key: str, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Envelope of a published event"""
+        return {
+            "node": self.node_id,
+            "target": target,
+            "key": key,
+            "message": message
+        }
+
+    def _encode(self, event: Dict[str, Any]) -> Optional[str]:
+        """Serialize an event, compressing it if needed to fit in a NOTIFY"""
+        payload = json.dumps(event, separators=(",", ":"), default=str)
+        if len(payload.encode("utf-8")) <= self.MAX_PAYLOAD_BYTES:
+            return payload
+
+        compressed = self.COMPRESSED_PREFIX + base64.b64encode(
+            zlib.compress(payload.encode("utf-8"))
+        ).decode("ascii")
+        if len(compressed) <= self.MAX_PAYLOAD_BYTES:
+            return compressed
+        return None
+
+    def _decode(self, payload: str) -> Dict[str, Any]:
+        """Inverse of _encode"""
+        if payload.startswith(self.COMPRESSED_PREFIX):
+            payload = zlib.decompress(
+                base64.b64decode(payload[len(self.COMPRESSED_PREFIX):])
+            ).decode("utf-8")
+        return json.loads(payload)
+
+
+def create_backplane() -> Backplane:
+    """
+    Create the backplane selected by settings
+
+    Returns:
+        Backplane instance
+    """
+    kind = settings.chat_backplane.lower()
+    if kind == "memory":
+        return InProcessBackplane()
+    if kind == "postgres":
+        return PostgresBackplane()
+    raise ValueError(f"Unsupported CHAT_BACKPLANE '{settings.chat_backplane}'")
@@ -0,0 +1,217 @@
+"""In-memory user x skill matrix for ranking project candidates"""
+import time
+import uuid
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.models.user import User
+from app.models.skill import UserSkill
+from app.models.github_repo import GitHubRepo
+from app.services.reloading_index import ReloadingIndex
+from app.services.skill_matrix import EMPTY_ROWS, SkillMatrix, top_k
+
+logger = logging.getLogger(__name__)
+
+# Score = skill coverage (0..1) + LANGUAGE_WEIGHT * share of required skills
+# the user writes repos in + STAR_WEIGHT * normalized log(stars)
+LANGUAGE_WEIGHT = 0.2
+STAR_WEIGHT = 0.1
+
+# (user_id, score, matched skill IDs)
+Candidate = Tuple[uuid.UUID, float, List[int]]
+
+
+class CandidateIndex(ReloadingIndex):
+    """
+    Users ranked for a project's required skills with NumPy
+
+    User skills live in a SkillMatrix, and each repo language is an extra
+    array of user rows, so scoring a project only touches the columns of
+    its required skills. The index is loaded from the database on first
+    use and every CANDIDATE_INDEX_TTL_SECONDS (to pick up writes from other
+    workers), in the background (see ReloadingIndex); skill and repo
+    updates on this worker are applied incrementally.
+    """
+
+    def __init__(self, ttl_seconds: float, session_factory: Optional[async_sessionmaker] = None):
+        super().__init__(ttl_seconds, session_factory)
+        self.clear()
+
+    def clear(self):
+        """Drop the index; the next ranking reloads it"""
+        self.matrix = SkillMatrix()
+        self._user_languages: List[Dict[str, int]] = []
+        self._languages: Dict[str, np.ndarray] = {}
+        self._stars = np.zeros(0, dtype=np.float32)
+        self._loaded_at = None
+        self.forget_reload()
+
+    @property
+    def size(self) -> int:
+        """Number of users in the index"""
+        return self.matrix.size
+
+    async def _fetch(self, db: AsyncSession) -> Tuple[list, list]:
+        """Read (user_id, skill_id, level) and (user_id, language, stars) rows"""
+        skills = await db.execute(
+            select(UserSkill.user_id, UserSkill.skill_id, UserSkill.level)
+            .join(User, User.id == UserSkill.user_id)
+            .filter(User.deleted_at.is_(None))
+        )
+        language = func.lower(GitHubRepo.language)
+        repos = await db.execute(
+            select(GitHubRepo.user_id, language, func.sum(GitHubRepo.stars))
+            .join(User, User.id == GitHubRepo.user_id)
+            .filter(User.deleted_at.is_(None), GitHubRepo.language.isnot(None))
+            .group_by(GitHubRepo.user_id, language)
+        )
+        return skills.all(), repos.all()
+
+    def _build(self, rows: Tuple[list, list]) -> "CandidateIndex":
+        """Build a new index from fetched rows (in a worker thread)"""
+        fresh = CandidateIndex(self.ttl_seconds, self.session_factory)
+        fresh.build(*rows)
+        return fresh
+
+    def _adopt(self, fresh: "CandidateIndex"):
+        """Swap in a freshly built index"""
+        self.matrix = fresh.matrix
+        self._user_languages = fresh._user_languages
+        self._languages = fresh._languages
+        self._stars = fresh._stars
+        self._loaded_at = fresh._loaded_at
+        logger.info(f"Loaded candidate index with {self.size} users")
+
+    def build(
+        self,
+        skill_rows: Iterable[Tuple[uuid.UUID, int, int]],
+        repo_rows: Iterable[Tuple[uuid.UUID, str, int]]
+    ):
+        """
+        Replace the index
+
+        Args:
+            skill_rows: (user_id, skill_id, level) rows
+            repo_rows: (user_id, lowercased language, total stars) rows
+        """
+        self.clear()
+        self.matrix.build(skill_rows)
+
+        by_user: Dict[int, Dict[str, int]] = {}
+        for user_id, language, stars in repo_rows:
+            by_user.setdefault(self.matrix.row(user_id), {})[language] = int(stars or 0)
+
+        self._user_languages = [by_user.get(row, {}) for row in range(self.size)]
+        self._stars = np.array(
+            [np.log1p(sum(languages.values())) for languages in self._user_languages],
+            dtype=np.float32
+        )
+
+        by_language: Dict[str, List[int]] = {}
+        for row, languages in by_user.items():
+            for language in languages:
+                by_language.setdefault(language, []).append(row)
+        self._languages = {
+            language: np.array(rows, dtype=np.int32) for language, rows in by_language.items()
+        }
+
+        self._loaded_at = time.monotonic()
+
+    def set_user_skills(self, user_id: uuid.UUID, skills: Dict[int, int]):
+        """
+        Apply a user's new skill set
+
+        Args:
+            user_id: User ID
+            skills: Skill ID -> level
+        """
+        if not self._track(self.set_user_skills, user_id, skills):
+            return
+        self.matrix.set(user_id, skills)
+        self._grow()
+
+    def set_user_languages(self, user_id: uuid.UUID, languages: Dict[str, int]):
+        """
+        Apply a user's repo languages after a sync
+
+        Args:
+            user_id: User ID
+            languages: Lowercased language -> total stars
+        """
+        if not self._track(self.set_user_languages, user_id, languages):
+            return
+        row = self.matrix.row(user_id)
+        self._grow()
+        old = self._user_languages[row]
+        for language in set(old) ^ set(languages):
+            rows = self._languages.get(language, EMPTY_ROWS)
+            if language in languages:
+                rows = np.append(rows, np.int32(row))
+            else:
+                rows = rows[rows != row]
+            self._languages[language] = rows
+        self._user_languages[row] = dict(languages)
+        self._stars[row] = np.log1p(sum(languages.values()))
+
+    def rank(
+        self,
+        required: List[Tuple[int, int, str]],
+        limit: int,
+        exclude: Set[uuid.UUID] = frozenset()
+    ) -> List[Candidate]:
+        """
+        Rank users for a project's required skills
+
+        Args:
+            required: (skill_id, required_level, skill name) per required skill
+            limit: Maximum number of candidates
+            exclude: User IDs never to return (e.g. the owner)
+
+        Returns:
+            Best candidates first; only users with at least one required skill
+        """
+        if not required or not self.size:
+            return []
+
+        coverage = np.zeros(self.size, dtype=np.float32)
+        language_hits = np.zeros(self.size, dtype=np.float32)
+        for skill_id, required_level, name in required:
+            required_level = max(required_level or 1, 1)
+            rows, levels = self.matrix.column(skill_id)
+            # Each user appears once per column, so fancy-index += is safe
+            coverage[rows] += np.minimum(levels, required_level) / required_level
+            language_hits[self._languages.get(name.lower(), EMPTY_ROWS)] += 1
+
+        top_stars = self._stars.max()
+        score = (coverage + LANGUAGE_WEIGHT * language_hits) / len(required)
+        if top_stars > 0:
+            score += STAR_WEIGHT * self._stars / top_stars
+        score[coverage == 0] = 0
+        for user_id in exclude:
+            if user_id in self.matrix.rows:
+                score[self.matrix.rows[user_id]] = 0
+
+        required_ids = [skill_id for skill_id, _, _ in required]
+        return [
+            (
+                self.matrix.keys[row],
+                round(float(score[row]), 4),
+                [skill_id for skill_id in required_ids if skill_id in self.matrix.row_skills[row]]
+            )
+            for row in top_k(score, limit)
+        ]
+
+    def _grow(self):
+        """Extend the per-user language data to rows added to the matrix"""
+        added = self.size - len(self._user_languages)
+        if added > 0:
+            self._user_languages.extend({} for _ in range(added))
+            self._stars = np.append(self._stars, np.zeros(added, dtype=np.float32))
+
+
+candidate_index = CandidateIndex(settings.candidate_index_ttl_seconds)
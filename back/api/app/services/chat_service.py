@@ -1,21 +1,104 @@
 """Chat service for WebSocket connections"""
+import json
+import time
+import uuid
+import asyncio
 import logging
-from typing import Dict, Set
-from fastapi import WebSocket
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from fastapi import WebSocket, status
+
+from app.config import settings
+from app.services.backplane import Backplane, InProcessBackplane
+from app.services.presence import (
+    ONLINE,
+    OFFLINE,
+    PresenceTracker,
+    TypingCoalescer,
+    combine_statuses
+)
 
 logger = logging.getLogger(__name__)
 
+# Users per presence heartbeat event (keeps the payload under the NOTIFY limit)
+PRESENCE_SYNC_CHUNK = 100
+
 
 class ConnectionManager:
     """Manage WebSocket connections for chat"""
     
-    def __init__(self):
+    def __init__(self, backplane: Optional[Backplane] = None):
+        # Backplane used to reach sockets held by other workers
+        self.backplane: Backplane = backplane or InProcessBackplane()
         # Map of conversation_id -> set of WebSocket connections
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         # Map of WebSocket -> (user_id, conversation_id)
         self.connection_info: Dict[WebSocket, tuple] = {}
         # Map of user_id -> set of WebSocket connections
         self.user_connections: Dict[str, Set[WebSocket]] = {}
+        # Map of WebSocket -> bounded queue of encoded frames waiting to be sent
+        self.send_queues: Dict[WebSocket, asyncio.Queue] = {}
+        # Map of WebSocket -> task draining its send queue
+        self.send_tasks: Dict[WebSocket, asyncio.Task] = {}
+        # Closes of slow clients in progress (kept referenced until they finish)
+        self._close_tasks: Set[asyncio.Task] = set()
+        # ID of this worker in presence announcements
+        self.node_id = uuid.uuid4().hex
+        # Map of WebSocket -> "online" or "away", as set by the client
+        self.socket_status: Dict[WebSocket, str] = {}
+        # Presence announced by other workers
+        self.presence = PresenceTracker(settings.presence_ttl_seconds)
+        # Map of user_id -> (status, time) last announced by this worker
+        self.announced: Dict[str, Tuple[str, float]] = {}
+        # Map of user_id -> rooms left since the last announcement
+        self.left_rooms: Dict[str, Set[str]] = {}
+        # Map of user_id -> scheduled announcement
+        self.presence_timers: Dict[str, asyncio.TimerHandle] = {}
+        self._presence_tasks: Set[asyncio.Task] = set()
+        self._heartbeat: Optional[asyncio.Task] = None
+        # Coalesced, rate-limited typing indicators per room
+        self.typing = TypingCoalescer(
+            self.send_to_conversation,
+            ttl_seconds=settings.chat_typing_ttl_seconds,
+            refresh_seconds=settings.chat_typing_refresh_seconds,
+            flush_seconds=settings.chat_typing_flush_ms / 1000
+        )
+    
+    async def start(self, backplane: Optional[Backplane] = None):
+        """
+        Start receiving events from the backplane
+        
+        Args:
+            backplane: Optional backplane replacing the current one
+        """
+        if backplane is not None:
+            self.backplane = backplane
+        await self.backplane.start(self._deliver)
+        # A single worker has nobody to refresh its presence announcements for
+        if not isinstance(self.backplane, InProcessBackplane):
+            self._heartbeat = asyncio.create_task(self._presence_heartbeat())
+    
+    async def stop(self):
+        """Stop receiving events from the backplane and the per-socket senders"""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+        for timer in self.presence_timers.values():
+            timer.cancel()
+        self.presence_timers.clear()
+        await asyncio.gather(*self._presence_tasks, return_exceptions=True)
+        await self.typing.stop()
+        await self.backplane.stop()
+        # Slow clients being closed get no close frame once the server is stopping
+        tasks = list(self.send_tasks.values()) + list(self._close_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.send_tasks.clear()
+        self.send_queues.clear()
+        self.announced.clear()
+        self.left_rooms.clear()
+        self.presence.clear()
     
     async def connect(self, websocket: WebSocket, user_id: str, conversation_id: str):
         """
@@ -39,6 +122,14 @@ class ConnectionManager:
             self.user_connections[user_id] = set()
         self.user_connections[user_id].add(websocket)
         
+        # Start the per-connection sender
+        queue = asyncio.Queue(maxsize=settings.chat_send_queue_size)
+        self.send_queues[websocket] = queue
+        self.send_tasks[websocket] = asyncio.create_task(self._sender(websocket, queue))
+        
+        self.socket_status[websocket] = ONLINE
+        self._presence_changed(user_id)
+        
         logger.info(f"User {user_id} connected to conversation {conversation_id}")
     
     def disconnect(self, websocket: WebSocket):
@@ -68,43 +159,335 @@ class ConnectionManager:
             
             del self.connection_info[websocket]
             
+            # Stop the per-connection sender (unless it is the caller)
+            self.send_queues.pop(websocket, None)
+            task = self.send_tasks.pop(websocket, None)
+            if task is not None and task is not asyncio.current_task():
+                task.cancel()
+            
+            # Stop typing and announce presence to the room just left
+            self.socket_status.pop(websocket, None)
+            if conversation_id not in self._user_rooms(user_id):
+                self.left_rooms.setdefault(user_id, set()).add(conversation_id)
+                self._stop_typing(conversation_id, user_id)
+            self._presence_changed(user_id)
+            
             logger.info(f"User {user_id} disconnected from conversation {conversation_id}")
     
     async def send_to_conversation(self, conversation_id: str, message: dict):
         """
-        Send a message to all connections in a conversation
+        Send a message to all connections in a conversation, on every worker
         
         Args:
             conversation_id: Conversation ID
             message: Message data to send
+        
+        Raises:
+            PayloadTooLarge: If the message cannot reach other workers
         """
-        if conversation_id in self.active_connections:
-            connections = self.active_connections[conversation_id].copy()
-            for connection in connections:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending message: {str(e)}")
-                    # Remove dead connection
-                    self.disconnect(connection)
+        await self.backplane.publish("conversation", conversation_id, message)
+    
+    def fits(self, target: str, key: str, message: dict) -> bool:
+        """
+        Whether a message is small enough to reach every worker
+        
+        Args:
+            target: "conversation" or "user"
+            key: Conversation ID or user ID
+            message: Message data to send
+        
+        Returns:
+            False if sending it would raise PayloadTooLarge
+        """
+        return self.backplane.fits(target, key, message)
     
     async def send_to_user(self, user_id: str, message: dict):
         """
-        Send a message to all connections for a specific user
+        Send a message to all connections for a specific user, on every worker
+        
+        Args:
+            user_id: User ID
+            message: Message data to send
+        
+        Raises:
+            PayloadTooLarge: If the message cannot reach other workers
+        """
+        await self.backplane.publish("user", user_id, message)
+    
+    async def _deliver(self, target: str, key: str, message: Dict[str, Any]):
+        """
+        Backplane handler: deliver an event to the sockets held by this worker
+        
+        Args:
+            target: "conversation", "user" or "presence"
+            key: Conversation ID, user ID, or announcing user or worker ID
+            message: Message data to send
+        """
+        if target == "conversation":
+            await self._send_local_conversation(key, message)
+        elif target == "user":
+            await self._send_local_user(key, message)
+        elif target == "presence":
+            await self._receive_presence(message)
+        else:
+            logger.error(f"Unknown backplane target: {target}")
+    
+    async def _send_local_conversation(self, conversation_id: str, message: dict):
+        """
+        Send a message to this worker's connections in a conversation
+        
+        Args:
+            conversation_id: Conversation ID
+            message: Message data to send
+        """
+        if conversation_id in self.active_connections:
+            self._broadcast(self.active_connections[conversation_id].copy(), message)
+    
+    async def _send_local_user(self, user_id: str, message: dict):
+        """
+        Send a message to this worker's connections for a specific user
         
         Args:
             user_id: User ID
             message: Message data to send
         """
         if user_id in self.user_connections:
-            connections = self.user_connections[user_id].copy()
-            for connection in connections:
+            self._broadcast(self.user_connections[user_id].copy(), message)
+    
+    async def send_personal(self, websocket: WebSocket, message: dict):
+        """
+        Send a message to a single connection, in order with its broadcasts
+        
+        Args:
+            websocket: WebSocket connection
+            message: Message data to send
+        """
+        self._broadcast([websocket], message)
+    
+    def _broadcast(self, connections: Iterable[WebSocket], message: dict):
+        """
+        Encode a message once and queue it on every connection
+        
+        Queuing never waits on a socket, so one slow client cannot delay the
+        others; each connection's sender writes its frames concurrently.
+        
+        Args:
+            connections: Target WebSocket connections
+            message: Message data to send
+        """
+        data = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+        for connection in connections:
+            queue = self.send_queues.get(connection)
+            if queue is None:
+                continue
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                user_id = self.get_user_id(connection)
+                logger.warning(f"Send queue overflow for user {user_id}; disconnecting slow client")
+                self.disconnect(connection)
+                task = asyncio.create_task(self._close_slow_client(connection))
+                self._close_tasks.add(task)
+                task.add_done_callback(self._close_tasks.discard)
+    
+    async def _sender(self, websocket: WebSocket, queue: asyncio.Queue):
+        """
+        Drain a connection's send queue
+        
+        Args:
+            websocket: WebSocket connection
+            queue: Queue of encoded frames
+        """
+        try:
+            while True:
+                data = await queue.get()
+                await websocket.send_text(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message: {str(e)}")
+            # Remove dead connection
+            self.disconnect(websocket)
+    
+    async def _close_slow_client(self, websocket: WebSocket):
+        """
+        Close a connection whose send queue overflowed
+        
+        Args:
+            websocket: WebSocket connection
+        """
+        try:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Send queue overflow")
+        except Exception:
+            pass
+    
+    def set_status(self, websocket: WebSocket, status: str):
+        """
+        Set the presence a connection reports (e.g. "away" while the tab is hidden)
+        
+        Args:
+            websocket: WebSocket connection
+            status: "online" or "away"
+        """
+        if websocket not in self.connection_info:
+            return
+        self.socket_status[websocket] = status
+        self._presence_changed(self.connection_info[websocket][0])
+    
+    def local_status(self, user_id: str) -> str:
+        """
+        Presence of a user from this worker's connections
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            "online", "away" or "offline"
+        """
+        return combine_statuses(
+            self.socket_status.get(websocket, ONLINE)
+            for websocket in self.user_connections.get(user_id, ())
+        )
+    
+    def get_presence(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Presence of users on every worker, from memory
+        
+        Args:
+            user_ids: User IDs
+        
+        Returns:
+            Map of user_id -> "online", "away" or "offline"
+        """
+        return {
+            user_id: combine_statuses((self.local_status(user_id), self.presence.get(user_id)))
+            for user_id in user_ids
+        }
+    
+    def _user_rooms(self, user_id: str) -> Set[str]:
+        """Conversation keys of a user's connections on this worker"""
+        return {
+            self.connection_info[websocket][1]
+            for websocket in self.user_connections.get(user_id, ())
+            if websocket in self.connection_info
+        }
+    
+    def _stop_typing(self, conversation_id: str, user_id: str):
+        """Clear a user's typing state in a room (no-op without a running loop)"""
+        try:
+            self.typing.update(conversation_id, user_id, False)
+        except RuntimeError:
+            pass
+    
+    def _presence_changed(self, user_id: str):
+        """
+        Schedule an announcement of a user's presence if it changed
+        
+        Going offline is announced after a grace period, so a reconnect
+        (page reload, network blip) is never seen by the other side; other
+        changes are announced at most once per minimum interval, so a
+        flapping client is coalesced into its final state.
+        
+        Args:
+            user_id: User ID
+        """
+        timer = self.presence_timers.pop(user_id, None)
+        if timer is not None:
+            timer.cancel()
+        
+        current = self.local_status(user_id)
+        announced = self.announced.get(user_id)
+        if current == (announced[0] if announced else OFFLINE):
+            self.left_rooms.pop(user_id, None)
+            return
+        
+        if current == OFFLINE:
+            delay = settings.presence_offline_grace_seconds
+        elif announced is not None:
+            delay = max(0.0, announced[1] + settings.presence_min_interval_seconds - time.monotonic())
+        else:
+            delay = 0.0
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.presence_timers[user_id] = loop.call_later(delay, self._announce_soon, user_id)
+    
+    def _announce_soon(self, user_id: str):
+        """Timer callback: announce a user's presence"""
+        self.presence_timers.pop(user_id, None)
+        task = asyncio.create_task(self._announce(user_id))
+        self._presence_tasks.add(task)
+        task.add_done_callback(self._presence_tasks.discard)
+    
+    async def _announce(self, user_id: str):
+        """
+        Publish a user's presence to every worker and the rooms they are (or were) in
+        
+        Args:
+            user_id: User ID
+        """
+        current = self.local_status(user_id)
+        rooms = self._user_rooms(user_id) | self.left_rooms.pop(user_id, set())
+        if current == OFFLINE:
+            self.announced.pop(user_id, None)
+        else:
+            self.announced[user_id] = (current, time.monotonic())
+        
+        try:
+            await self.backplane.publish("presence", user_id, {
+                "type": "presence",
+                "node": self.node_id,
+                "user_id": user_id,
+                "status": current,
+                "rooms": sorted(rooms)
+            })
+        except Exception as e:
+            logger.error(f"Failed to announce presence of user {user_id}: {str(e)}")
+    
+    async def _receive_presence(self, message: Dict[str, Any]):
+        """
+        Backplane handler for presence announcements and heartbeats
+        
+        Args:
+            message: Announcement of one user (with the rooms to notify) or
+                heartbeat of a worker (map of its users' statuses)
+        """
+        node = message.get("node")
+        if "users" in message:
+            if node != self.node_id:
+                for user_id, user_status in message["users"].items():
+                    self.presence.update(node, user_id, user_status)
+            return
+        
+        user_id = message["user_id"]
+        if node != self.node_id:
+            self.presence.update(node, user_id, message["status"])
+        event = {
+            "type": "presence",
+            "user_id": user_id,
+            "status": self.get_presence([user_id])[user_id]
+        }
+        for room in message.get("rooms", ()):
+            await self._send_local_conversation(room, event)
+    
+    async def _presence_heartbeat(self):
+        """Re-announce this worker's users so other workers do not expire them"""
+        interval = max(settings.presence_ttl_seconds / 3, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            items: List[Tuple[str, str]] = [
+                (user_id, announced_status) for user_id, (announced_status, _) in self.announced.items()
+            ]
+            for start in range(0, len(items), PRESENCE_SYNC_CHUNK):
                 try:
-                    await connection.send_json(message)
+                    await self.backplane.publish("presence", self.node_id, {
+                        "node": self.node_id,
+                        "users": dict(items[start:start + PRESENCE_SYNC_CHUNK])
+                    })
                 except Exception as e:
-                    logger.error(f"Error sending message to user {user_id}: {str(e)}")
-                    # Remove dead connection
-                    self.disconnect(connection)
+                    logger.error(f"Failed to publish presence heartbeat: {str(e)}")
     
     def get_user_id(self, websocket: WebSocket) -> str:
         """
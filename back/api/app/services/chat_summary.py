@@ -0,0 +1,184 @@
+"""Conversation summaries and read cursors, maintained as messages are inserted"""
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import update, case, or_, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.chat import Conversation, ConversationRead
+from app.models.group_chat import GroupConversation, GroupMember, GroupMessage
+
+# Characters of the last message kept on the conversation row
+PREVIEW_LENGTH = 200
+
+
+def _conversation_of(model: Any) -> Tuple[Any, str]:
+    """
+    Conversation model and foreign key column of a message model
+
+    Args:
+        model: Message or GroupMessage
+
+    Returns:
+        (Conversation or GroupConversation, foreign key column name)
+    """
+    if model is GroupMessage:
+        return GroupConversation, "group_conversation_id"
+    return Conversation, "conversation_id"
+
+
+async def record_messages(db: AsyncSession, model: Any, messages: List[Dict[str, Any]]):
+    """
+    Fold newly inserted messages into their conversations' summaries
+
+    Each conversation gets one UPDATE that bumps message_count and sets the
+    last message (unless a newer one is already recorded), and one statement
+    that moves the senders' read cursors past their own messages, so the
+    cost is per conversation, not per stored message. Nothing is committed.
+
+    Args:
+        db: Database session
+        model: Message or GroupMessage
+        messages: Column values of the inserted rows, including id and
+            created_at, in insertion order
+    """
+    conversation_model, key = _conversation_of(model)
+    by_conversation: Dict[uuid.UUID, List[Dict[str, Any]]] = {}
+    for message in messages:
+        by_conversation.setdefault(uuid.UUID(str(message[key])), []).append(message)
+
+    for conversation_id, rows in by_conversation.items():
+        last = max(rows, key=lambda row: row["id"])
+        newer = or_(
+            conversation_model.last_message_id.is_(None),
+            conversation_model.last_message_id < last["id"]
+        )
+        result = await db.execute(
+            update(conversation_model)
+            .where(conversation_model.id == conversation_id)
+            .values(
+                message_count=conversation_model.message_count + len(rows),
+                last_message_id=case((newer, last["id"]), else_=conversation_model.last_message_id),
+                last_sender_id=case((newer, last["sender_id"]), else_=conversation_model.last_sender_id),
+                last_message_preview=case(
+                    (newer, last["body"][:PREVIEW_LENGTH]),
+                    else_=conversation_model.last_message_preview
+                ),
+                last_message_at=case((newer, last["created_at"]), else_=conversation_model.last_message_at),
+            )
+            .returning(conversation_model.message_count)
+        )
+        total = result.scalar()
+        if total is None:
+            continue
+
+        # A sender has read everything up to their own latest message
+        base = total - len(rows)
+        cursors: Dict[uuid.UUID, Tuple[int, int]] = {}
+        for position, row in enumerate(rows, start=base + 1):
+            cursors[uuid.UUID(str(row["sender_id"]))] = (position, row["id"])
+        await _advance_cursors(db, model, conversation_id, cursors)
+
+
+async def _advance_cursors(
+    db: AsyncSession,
+    model: Any,
+    conversation_id: uuid.UUID,
+    cursors: Dict[uuid.UUID, Tuple[int, int]]
+):
+    """
+    Move read cursors forward (never backward)
+
+    Args:
+        db: Database session
+        model: Message or GroupMessage
+        conversation_id: Conversation ID
+        cursors: User ID -> (read_count, last_read_message_id)
+    """
+    if model is GroupMessage:
+        for user_id, (read_count, message_id) in cursors.items():
+            await db.execute(
+                update(GroupMember)
+                .where(
+                    GroupMember.group_conversation_id == conversation_id,
+                    GroupMember.user_id == user_id
+                )
+                .values(
+                    read_count=func.greatest(GroupMember.read_count, read_count),
+                    last_read_message_id=func.greatest(
+                        func.coalesce(GroupMember.last_read_message_id, 0), message_id
+                    )
+                )
+            )
+        return
+
+    now = datetime.utcnow()
+    stmt = insert(ConversationRead).values([
+        {
+            "conversation_id": conversation_id,
+            "user_id": user_id,
+            "read_count": read_count,
+            "last_read_message_id": message_id,
+            "read_at": now
+        }
+        for user_id, (read_count, message_id) in cursors.items()
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["conversation_id", "user_id"],
+        set_={
+            "read_count": func.greatest(ConversationRead.read_count, stmt.excluded.read_count),
+            "last_read_message_id": func.greatest(
+                func.coalesce(ConversationRead.last_read_message_id, 0), stmt.excluded.last_read_message_id
+            ),
+            "read_at": stmt.excluded.read_at
+        }
+    ))
+
+
+async def mark_read(db: AsyncSession, model: Any, conversation_id: Any, user_id: Any):
+    """
+    Move a member's read cursor to the conversation's latest message
+
+    The cursor is copied from the conversation row inside the statement, so
+    a message stored concurrently is never marked read unseen. Nothing is
+    committed.
+
+    Args:
+        db: Database session
+        model: Message or GroupMessage
+        conversation_id: Conversation ID (membership must already be checked)
+        user_id: Member's user ID
+    """
+    conversation_model, _ = _conversation_of(model)
+    latest = select(conversation_model).where(conversation_model.id == conversation_id)
+    read_count = latest.with_only_columns(conversation_model.message_count).scalar_subquery()
+    message_id = latest.with_only_columns(conversation_model.last_message_id).scalar_subquery()
+
+    if model is GroupMessage:
+        await db.execute(
+            update(GroupMember)
+            .where(
+                GroupMember.group_conversation_id == conversation_id,
+                GroupMember.user_id == user_id
+            )
+            .values(read_count=read_count, last_read_message_id=message_id)
+        )
+        return
+
+    stmt = insert(ConversationRead).values(
+        conversation_id=conversation_id,
+        user_id=user_id,
+        read_count=read_count,
+        last_read_message_id=message_id,
+        read_at=datetime.utcnow()
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["conversation_id", "user_id"],
+        set_={
+            "read_count": stmt.excluded.read_count,
+            "last_read_message_id": stmt.excluded.last_read_message_id,
+            "read_at": stmt.excluded.read_at
+        }
+    ))
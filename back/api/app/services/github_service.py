@@ -1,15 +1,127 @@
 """GitHub OAuth service"""
+import asyncio
+import logging
 import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, NamedTuple, Optional
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limited or a transient server error
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Longest Retry-After honoured before giving up on a retry
+MAX_RETRY_AFTER_SECONDS = 5.0
+# Largest page size of the GitHub REST API
+REPOS_PER_PAGE = 100
+
+
+class RepoPage(NamedTuple):
+    """One page of a repository listing"""
+    page: int
+    not_modified: bool  # 304: same content as the ETag sent
+    etag: Optional[str]
+    repos: List[Dict[str, Any]]
+    last_page: Optional[int]  # from the Link header; None if unknown
+
 
 class GitHubService:
     """Service for GitHub OAuth and API interactions"""
     
-    GITHUB_OAUTH_URL = "https://github.com/login/oauth"
-    GITHUB_API_URL = "https://api.github.com"
+    # Shared client; opened in the application lifespan
+    _client: Optional[httpx.AsyncClient] = None
+    
+    @classmethod
+    async def start(cls, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Open the pooled HTTP client used for every GitHub request
+        
+        Connections are kept alive (and multiplexed over HTTP/2), so an
+        OAuth login pays for one TLS handshake per host instead of one per
+        request.
+        
+        Args:
+            transport: Optional transport replacing the network (e.g. an
+                ASGI stand-in for GitHub in tests and benchmarks)
+        """
+        await cls.stop()
+        cls._client = httpx.AsyncClient(
+            http2=settings.github_http2 and transport is None,
+            transport=transport,
+            timeout=httpx.Timeout(
+                settings.github_timeout_seconds,
+                connect=settings.github_connect_timeout_seconds
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.github_max_connections,
+                max_keepalive_connections=settings.github_max_connections
+            ),
+            headers={"Accept": "application/json"}
+        )
+    
+    @classmethod
+    async def stop(cls):
+        """Close the pooled HTTP client"""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+    
+    @classmethod
+    async def _request(cls, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request with retry and exponential backoff
+        
+        Connection failures are always retried (the request never reached
+        GitHub); timeouts and 429/5xx responses only for GET, since the
+        token exchange consumes a single-use code.
+        
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            **kwargs: Passed to httpx.AsyncClient.request
+        
+        Returns:
+            Successful response, or 304 Not Modified for a conditional request
+        
+        Raises:
+            httpx.HTTPError: If the request fails after all retries
+        """
+        if cls._client is None:
+            # Outside the application lifespan (scripts)
+            await cls.start()
+        
+        idempotent = method == "GET"
+        attempt = 0
+        while True:
+            delay = settings.github_retry_backoff_seconds * (2 ** attempt)
+            try:
+                response = await cls._client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                error: Exception = e
+            except httpx.TimeoutException as e:
+                if not idempotent:
+                    raise
+                error = e
+            else:
+                if response.status_code == 304:
+                    return response  # answer to a conditional request
+                if not (idempotent and response.status_code in RETRY_STATUS_CODES):
+                    response.raise_for_status()
+                    return response
+                error = httpx.HTTPStatusError(
+                    f"GitHub returned {response.status_code}", request=response.request, response=response
+                )
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    if float(retry_after) > MAX_RETRY_AFTER_SECONDS:
+                        response.raise_for_status()
+                    delay = max(delay, float(retry_after))
+            
+            if attempt >= settings.github_max_retries:
+                raise error
+            attempt += 1
+            logger.warning(f"GitHub {method} {url} failed ({error!r}); retry {attempt} in {delay:.2f}s")
+            await asyncio.sleep(delay)
     
     @staticmethod
     def get_authorization_url(state: Optional[str] = None) -> str:
@@ -32,7 +144,7 @@ class GitHubService:
             params["state"] = state
         
         query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        return f"{GitHubService.GITHUB_OAUTH_URL}/authorize?{query_string}"
+        return f"{settings.github_oauth_url}/authorize?{query_string}"
     
     @staticmethod
     async def exchange_code_for_token(code: str) -> Dict[str, Any]:
@@ -48,19 +160,17 @@ class GitHubService:
         Raises:
             httpx.HTTPError: If request fails
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{GitHubService.GITHUB_OAUTH_URL}/access_token",
-                data={
-                    "client_id": settings.github_client_id,
-                    "client_secret": settings.github_client_secret,
-                    "code": code,
-                    "redirect_uri": settings.github_redirect_uri
-                },
-                headers={"Accept": "application/json"}
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await GitHubService._request(
+            "POST",
+            f"{settings.github_oauth_url}/access_token",
+            data={
+                "client_id": settings.github_client_id,
+                "client_secret": settings.github_client_secret,
+                "code": code,
+                "redirect_uri": settings.github_redirect_uri
+            }
+        )
+        return response.json()
     
     @staticmethod
     async def get_user_info(access_token: str) -> Dict[str, Any]:
@@ -76,16 +186,12 @@ class GitHubService:
         Raises:
             httpx.HTTPError: If request fails
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{GitHubService.GITHUB_API_URL}/user",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Accept": "application/json"
-                }
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await GitHubService._request(
+            "GET",
+            f"{settings.github_api_url}/user",
+            headers={"Authorization": f"Bearer {access_token}"}
+        )
+        return response.json()
     
     @staticmethod
     async def get_user_emails(access_token: str) -> list:
@@ -101,44 +207,74 @@ class GitHubService:
         Raises:
             httpx.HTTPError: If request fails
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{GitHubService.GITHUB_API_URL}/user/emails",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Accept": "application/json"
-                }
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await GitHubService._request(
+            "GET",
+            f"{settings.github_api_url}/user/emails",
+            headers={"Authorization": f"Bearer {access_token}"}
+        )
+        return response.json()
     
     @staticmethod
-    async def get_user_repos(access_token: str, username: str) -> list:
+    async def get_user_repos_page(
+        access_token: str,
+        username: str,
+        page: int,
+        etag: Optional[str] = None
+    ) -> RepoPage:
         """
-        Get user's public repositories
+        Get one page of a user's public repositories, conditionally
+        
+        Repositories are listed by name, so a change to one repository
+        only changes the page it is on.
         
         Args:
             access_token: GitHub access token
             username: GitHub username
+            page: Page number (from 1)
+            etag: ETag of the previous response for this page
         
         Returns:
-            List of repositories
+            The page; not_modified (and no repos) if it still matches etag
         
         Raises:
             httpx.HTTPError: If request fails
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{GitHubService.GITHUB_API_URL}/users/{username}/repos",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Accept": "application/json"
-                },
-                params={
-                    "sort": "updated",
-                    "per_page": 100
-                }
-            )
-            response.raise_for_status()
-            return response.json()
+        headers = {"Authorization": f"Bearer {access_token}"}
+        if etag:
+            headers["If-None-Match"] = etag
+        response = await GitHubService._request(
+            "GET",
+            f"{settings.github_api_url}/users/{username}/repos",
+            headers=headers,
+            params={
+                "sort": "full_name",
+                "direction": "asc",
+                "per_page": REPOS_PER_PAGE,
+                "page": page
+            }
+        )
+        if response.status_code == 304:
+            return RepoPage(page=page, not_modified=True, etag=etag, repos=[], last_page=None)
+        
+        links = response.links
+        if "last" in links:
+            last_page = _page_number(links["last"].get("url"))
+        elif "next" in links:
+            last_page = None  # more pages, count unknown
+        else:
+            last_page = page
+        return RepoPage(
+            page=page,
+            not_modified=False,
+            etag=response.headers.get("ETag"),
+            repos=response.json(),
+            last_page=last_page
+        )
+
 
+def _page_number(url: Optional[str]) -> Optional[int]:
+    """Value of the page query parameter of a Link URL"""
+    if not url:
+        return None
+    value = httpx.URL(url).params.get("page")
+    return int(value) if value and value.isdigit() else None
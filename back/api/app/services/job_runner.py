@@ -0,0 +1,338 @@
+"""Background jobs: a Postgres-backed queue run inside every API process"""
+import uuid
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update, delete, case, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# Seconds stop() waits for running jobs before cancelling them
+STOP_GRACE_SECONDS = 10.0
+
+# Coroutine running a job: (job, session factory) -> JSON-serialisable result
+JobHandler = Callable[[Job, async_sessionmaker], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobFailed(Exception):
+    """Raised by a handler to fail its job without retrying"""
+
+
+class JobRunner:
+    """
+    Queue slow side effects in Postgres and run them in the background
+
+    Requests enqueue a job row in their own transaction and return at
+    once; workers of any process claim due jobs with FOR UPDATE SKIP
+    LOCKED, so each runs once. A failed job is re-queued with exponential
+    backoff until max_attempts; a job whose process died is re-queued when
+    its lease (job_timeout_seconds) expires. A dedupe key keeps at most one
+    queued or running job per key (e.g. one repo sync per user).
+
+    Workers sleep until a job is enqueued in this process, a retry falls
+    due, or job_poll_seconds pass (jobs of other processes). Expired
+    leases and old finished jobs are handled every job_maintenance_seconds
+    by a separate task, however busy the workers are.
+    """
+
+    def __init__(self, session_factory: Optional[async_sessionmaker] = None, workers: Optional[int] = None):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.workers = settings.job_workers if workers is None else workers
+        self.handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._maintenance: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._generation = 0
+        self._stopping = False
+
+    def handler(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        """
+        Register the handler of a job kind (decorator)
+
+        Args:
+            kind: Job kind
+
+        Returns:
+            Decorator returning the handler unchanged
+        """
+        def register(func: JobHandler) -> JobHandler:
+            self.handlers[kind] = func
+            return func
+        return register
+
+    async def start(self):
+        """Start the workers"""
+        self._wakeup = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        if self._tasks:
+            self._maintenance = asyncio.create_task(self._maintain_periodically())
+
+    async def stop(self):
+        """Let running jobs finish (cancelling them after a grace period), then stop the workers"""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._stopped.set()
+        self.notify()
+        done, pending = await asyncio.wait(self._tasks, timeout=STOP_GRACE_SECONDS)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*self._tasks, self._maintenance, return_exceptions=True)
+        self._tasks = []
+        self._maintenance = None
+
+    def notify(self):
+        """Wake idle workers; call after committing an enqueue"""
+        self._generation += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        kind: str,
+        payload: Optional[Dict[str, Any]] = None,
+        user_id: Optional[uuid.UUID] = None,
+        dedupe_key: Optional[str] = None,
+        max_attempts: Optional[int] = None
+    ) -> Job:
+        """
+        Queue a job in the caller's transaction
+
+        The job becomes visible to workers when the caller commits; call
+        notify() afterwards to start it without waiting for a poll.
+
+        Args:
+            db: Database session
+            kind: Registered job kind
+            payload: JSON arguments of the handler
+            user_id: Owner of the job (may poll it)
+            dedupe_key: If a queued or running job has this key, it is
+                returned instead of queueing another
+            max_attempts: Runs before the job fails (default job_max_attempts)
+
+        Returns:
+            The queued job, or the active job with the same dedupe key
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        stmt = insert(Job).values(
+            id=uuid.uuid4(),
+            kind=kind,
+            user_id=user_id,
+            dedupe_key=dedupe_key,
+            status=QUEUED,
+            payload=payload or {},
+            attempts=0,
+            max_attempts=max_attempts or settings.job_max_attempts,
+            run_at=func.now(),
+            created_at=func.now()
+        )
+        if dedupe_key is not None:
+            stmt = stmt.on_conflict_do_nothing(
+                index_elements=["dedupe_key"],
+                index_where=text("status IN ('queued', 'running')")
+            )
+        while True:
+            job = (await db.execute(select(Job).from_statement(stmt.returning(Job)))).scalar()
+            if job is not None:
+                return job
+            result = await db.execute(
+                select(Job).where(Job.dedupe_key == dedupe_key, Job.status.in_(ACTIVE_STATUSES))
+            )
+            job = result.scalar()
+            if job is not None:
+                return job
+            # The conflicting job finished after the insert: the key is free again
+
+    async def run_pending(self) -> int:
+        """
+        Run due jobs in the calling task until none is left
+
+        For tests and scripts; retries that are due at once run again.
+
+        Returns:
+            Number of job runs
+        """
+        runs = 0
+        while True:
+            job = await self._claim()
+            if job is None:
+                return runs
+            await self._run(job)
+            runs += 1
+
+    async def _work(self):
+        """Claim and run jobs until stopped"""
+        while not self._stopping:
+            generation = self._generation
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"Failed to claim a job: {str(e)}")
+                job = None
+
+            if job is not None:
+                await self._run(job)
+                continue
+            if self._generation != generation:
+                continue  # notified while claiming
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.job_poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> Optional[Job]:
+        """
+        Take the next due job and lease it to this worker
+
+        Returns:
+            The claimed job, or None if no job is due
+        """
+        next_job = (
+            select(Job.id)
+            .where(Job.status == QUEUED, Job.run_at <= func.now())
+            .order_by(Job.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == next_job)
+                .values(
+                    status=RUNNING,
+                    attempts=Job.attempts + 1,
+                    locked_until=func.now() + timedelta(seconds=settings.job_timeout_seconds)
+                )
+                .returning(Job)
+                .execution_options(synchronize_session=False)
+            )
+            job = result.scalar()
+            await db.commit()
+            return job
+
+    async def _run(self, job: Job):
+        """
+        Run a claimed job and record its outcome
+
+        Args:
+            job: Job leased by _claim
+        """
+        handler = self.handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise JobFailed(f"No handler for job kind {job.kind}")
+            result = await asyncio.wait_for(handler(job, self.session_factory), settings.job_timeout_seconds)
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = TimeoutError(f"Job exceeded {settings.job_timeout_seconds}s")
+            await self._fail(job, e)
+            return
+
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == job.id, Job.status == RUNNING)
+                    .values(status=SUCCEEDED, result=result, error=None, locked_until=None, finished_at=func.now())
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to record success of job {job.id}: {str(e)}")
+
+    async def _fail(self, job: Job, error: Exception):
+        """
+        Re-queue a failed job with backoff, or mark it failed
+
+        Args:
+            job: Job that raised
+            error: The exception
+        """
+        final = isinstance(error, JobFailed) or job.attempts >= job.max_attempts
+        delay = settings.job_retry_backoff_seconds * (2 ** (job.attempts - 1))
+        message = str(error) or error.__class__.__name__
+        if final:
+            logger.error(f"Job {job.kind} {job.id} failed after {job.attempts} attempts: {message}")
+            values = {"status": FAILED, "finished_at": func.now()}
+        else:
+            logger.warning(f"Job {job.kind} {job.id} failed ({message}); retry in {delay:.2f}s")
+            values = {"status": QUEUED, "run_at": func.now() + timedelta(seconds=delay)}
+
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == job.id, Job.status == RUNNING)
+                    .values(error=message, locked_until=None, **values)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to record failure of job {job.id}: {str(e)}")
+            return
+
+        if not final and self._tasks:
+            asyncio.get_running_loop().call_later(delay, self.notify)
+
+    async def _maintain_periodically(self):
+        """Run _maintain every job_maintenance_seconds until stopped"""
+        while not self._stopping:
+            await self._maintain()
+            try:
+                await asyncio.wait_for(self._stopped.wait(), settings.job_maintenance_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _maintain(self):
+        """Re-queue jobs whose lease expired and delete old finished jobs"""
+        try:
+            async with self.session_factory() as db:
+                expired = await db.execute(
+                    update(Job)
+                    .where(Job.status == RUNNING, Job.locked_until < func.now())
+                    .values(
+                        status=case((Job.attempts >= Job.max_attempts, FAILED), else_=QUEUED),
+                        finished_at=case((Job.attempts >= Job.max_attempts, func.now()), else_=None),
+                        error="Lease expired",
+                        locked_until=None
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.execute(
+                    delete(Job).where(
+                        Job.status.in_((SUCCEEDED, FAILED)),
+                        Job.finished_at < func.now() - timedelta(hours=settings.job_retention_hours)
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Job maintenance failed: {str(e)}")
+            return
+
+        if expired.rowcount:
+            self.notify()
+
+
+job_runner = JobRunner()
@@ -0,0 +1,85 @@
+"""Short-lived cache of chat membership checks for WebSocket handshakes"""
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class ChatIdentity:
+    """The parts of an authorized user a chat socket needs"""
+    user_id: uuid.UUID
+    handle: Optional[str]
+
+
+class MembershipCache:
+    """
+    TTL cache of successful chat authorizations keyed by (user_id, room)
+
+    Only granted access is cached, so a denied client is re-checked on every
+    connect. The cache is per worker: removals invalidate the local entry
+    right away, and the TTL bounds how long another worker may still accept
+    a reconnect from a removed member.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[str, str], Tuple[float, ChatIdentity]] = {}
+
+    def get(self, user_id: str, room: str) -> Optional[ChatIdentity]:
+        """
+        Look up a cached authorization
+
+        Args:
+            user_id: User ID from the token
+            room: Connection key ("<conversation_id>" or "group:<id>")
+
+        Returns:
+            Cached identity, or None if missing or expired
+        """
+        if self.ttl_seconds <= 0:
+            return None
+        entry = self._entries.get((user_id, room))
+        if entry is None:
+            return None
+        expires_at, identity = entry
+        if expires_at < time.monotonic():
+            self._entries.pop((user_id, room), None)
+            return None
+        return identity
+
+    def set(self, user_id: str, room: str, identity: ChatIdentity):
+        """
+        Remember that a user may join a room
+
+        Args:
+            user_id: User ID from the token
+            room: Connection key
+            identity: Identity to hand back on a hit
+        """
+        if self.ttl_seconds <= 0:
+            return
+        if len(self._entries) >= self.max_entries:
+            # Drop the oldest entry; dicts keep insertion order
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[(user_id, room)] = (time.monotonic() + self.ttl_seconds, identity)
+
+    def invalidate(self, user_id: str, room: str):
+        """
+        Forget a cached authorization
+
+        Args:
+            user_id: User ID
+            room: Connection key
+        """
+        self._entries.pop((str(user_id).lower(), room), None)
+
+    def clear(self):
+        """Forget every cached authorization"""
+        self._entries.clear()
+
+
+membership_cache = MembershipCache(settings.ws_auth_cache_ttl_seconds)
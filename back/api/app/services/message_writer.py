@@ -0,0 +1,196 @@
+"""Write-behind, batched persistence of chat messages"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.services.chat_summary import record_messages
+
+logger = logging.getLogger(__name__)
+
+# (model, column values, future resolved with the inserted row ID)
+PendingRow = Tuple[Any, Dict[str, Any], asyncio.Future]
+
+
+class MessageWriter:
+    """
+    Queue chat messages and insert them in batches
+
+    Rows are written by a single task in the order they were submitted, as
+    one multi-row INSERT ... RETURNING per model every flush interval or
+    batch size, whichever comes first, followed by one summary update per
+    conversation in the batch. Each submit returns a future that resolves
+    to the row ID once the batch is committed.
+
+    A batch failing on a connection error is retried with backoff; one
+    rejected by a constraint is written again row by row, so only the
+    offending message fails.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[float] = None
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.batch_size = batch_size or settings.chat_persist_batch_size
+        self.flush_interval_ms = flush_interval_ms or settings.chat_persist_flush_ms
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the flush task"""
+        self.queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Write every queued message, then stop the flush task"""
+        if self._task is None:
+            return
+        await self.queue.put(None)
+        await self._task
+        self._task = None
+
+    def submit(self, model: Any, values: Dict[str, Any]) -> asyncio.Future:
+        """
+        Queue a row for insertion
+
+        Args:
+            model: Message model class (Message or GroupMessage)
+            values: Column values; the ID is assigned by the database
+
+        Returns:
+            Future resolving to the inserted row ID
+        """
+        if self._task is None:
+            raise RuntimeError("MessageWriter is not started")
+        saved = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((model, values, saved))
+        return saved
+
+    async def _run(self):
+        """Collect batches from the queue and write them one after another"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch: List[PendingRow] = [item]
+            deadline = loop.time() + self.flush_interval_ms / 1000
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[PendingRow]):
+        """
+        Insert a batch and resolve its futures
+
+        A constraint violation in a batch of several rows writes each row in
+        its own transaction instead, failing only the rows that violate it.
+
+        Args:
+            batch: Rows in submission order
+        """
+        try:
+            inserted = await self._write_with_retry(batch)
+        except IntegrityError as e:
+            if len(batch) == 1:
+                self._fail(batch, e)
+                return
+            logger.warning(f"Batch of {len(batch)} chat messages rejected, writing them one by one: {str(e)}")
+            for row in batch:
+                await self._flush([row])
+            return
+        except Exception as e:
+            self._fail(batch, e)
+            return
+
+        for (_, _, saved), message_id in inserted:
+            if not saved.done():
+                saved.set_result(message_id)
+
+    async def _write_with_retry(self, batch: List[PendingRow]) -> List[Tuple[PendingRow, Any]]:
+        """
+        Write a batch, retrying connection errors with exponential backoff
+
+        Args:
+            batch: Rows in submission order
+
+        Returns:
+            (row, inserted ID) pairs
+
+        Raises:
+            Exception: The last error once retries are exhausted, or any
+                error that is not a connection error
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._write(batch)
+            except DBAPIError as e:
+                transient = isinstance(e, OperationalError) or e.connection_invalidated
+                if not transient or attempt >= settings.chat_persist_max_retries:
+                    raise
+                delay = settings.chat_persist_retry_backoff_seconds * (2 ** attempt)
+                attempt += 1
+                logger.warning(f"Failed to write {len(batch)} chat messages ({str(e)}); retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _write(self, batch: List[PendingRow]) -> List[Tuple[PendingRow, Any]]:
+        """
+        Insert a batch and update the conversation summaries in one transaction
+
+        Args:
+            batch: Rows in submission order
+
+        Returns:
+            (row, inserted ID) pairs
+        """
+        by_model: Dict[Any, List[PendingRow]] = {}
+        for row in batch:
+            by_model.setdefault(row[0], []).append(row)
+
+        async with self.session_factory() as db:
+            inserted = []
+            for model, rows in by_model.items():
+                result = await db.execute(
+                    insert(model).returning(model.id, sort_by_parameter_order=True),
+                    [values for _, values, _ in rows]
+                )
+                ids = result.scalars().all()
+                inserted.extend(zip(rows, ids))
+                await record_messages(db, model, [
+                    {**values, "id": message_id} for (_, values, _), message_id in zip(rows, ids)
+                ])
+            await db.commit()
+        return inserted
+
+    @staticmethod
+    def _fail(batch: List[PendingRow], error: Exception):
+        """Fail the futures of rows that could not be written"""
+        logger.error(f"Failed to write {len(batch)} chat messages: {str(error)}")
+        for _, _, saved in batch:
+            if not saved.done():
+                saved.set_exception(error)
+
+
+message_writer = MessageWriter()
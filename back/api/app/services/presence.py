@@ -0,0 +1,227 @@
+"""Presence and typing state for chat sockets, kept in memory"""
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+ONLINE = "online"
+AWAY = "away"
+OFFLINE = "offline"
+PRESENCE_STATUSES = (ONLINE, AWAY, OFFLINE)
+
+# Coroutine sending an event to every socket of a room: (room, message)
+RoomPublisher = Callable[[str, Dict], Awaitable[None]]
+
+
+def combine_statuses(statuses: Iterable[str]) -> str:
+    """
+    Presence of a user from the statuses of their sockets or workers
+
+    Args:
+        statuses: Individual statuses
+
+    Returns:
+        "online" if any is online, else "away" if any is away, else "offline"
+    """
+    result = OFFLINE
+    for value in statuses:
+        if value == ONLINE:
+            return ONLINE
+        if value == AWAY:
+            result = AWAY
+    return result
+
+
+class PresenceTracker:
+    """
+    Presence of users connected to other workers
+
+    Every worker announces the presence of the users it holds sockets for
+    over the backplane; this keeps the latest announcement per (user,
+    worker) until ttl_seconds pass without a refresh, so the users of a
+    worker that died go offline on their own.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        # user_id -> node -> (status, expires_at)
+        self._remote: Dict[str, Dict[str, Tuple[str, float]]] = {}
+
+    def update(self, node: str, user_id: str, status: str):
+        """
+        Record a worker's announcement
+
+        Args:
+            node: Announcing worker
+            user_id: User ID
+            status: "online", "away" or "offline"
+        """
+        if status == OFFLINE:
+            nodes = self._remote.get(user_id)
+            if nodes is not None:
+                nodes.pop(node, None)
+                if not nodes:
+                    del self._remote[user_id]
+            return
+        self._remote.setdefault(user_id, {})[node] = (status, time.monotonic() + self.ttl_seconds)
+
+    def get(self, user_id: str) -> str:
+        """
+        Presence of a user on other workers
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Combined status of the unexpired announcements
+        """
+        nodes = self._remote.get(user_id)
+        if not nodes:
+            return OFFLINE
+        now = time.monotonic()
+        for node, (_, expires_at) in list(nodes.items()):
+            if expires_at <= now:
+                del nodes[node]
+        if not nodes:
+            del self._remote[user_id]
+            return OFFLINE
+        return combine_statuses(status for status, _ in nodes.values())
+
+    def clear(self):
+        """Forget every announcement"""
+        self._remote.clear()
+
+
+class TypingCoalescer:
+    """
+    Per-room typing state with coalesced, rate-limited broadcasts
+
+    A user's typing events in a room are accepted at most once per
+    refresh_seconds (a stop is always accepted), and the accepted changes
+    of a room are sent as one event at most once per flush_seconds, so a
+    typing storm costs a bounded number of frames per room.
+    """
+
+    def __init__(
+        self,
+        publish: RoomPublisher,
+        ttl_seconds: float,
+        refresh_seconds: float,
+        flush_seconds: float
+    ):
+        self.publish = publish
+        self.ttl_seconds = ttl_seconds
+        self.refresh_seconds = refresh_seconds
+        self.flush_seconds = flush_seconds
+        # room -> user_id -> time the last typing event was accepted
+        self._typing: Dict[str, Dict[str, float]] = {}
+        # room -> (users who started typing, users who stopped) since the last flush
+        self._pending: Dict[str, Tuple[Set[str], Set[str]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def update(self, room: str, user_id: str, typing: bool) -> bool:
+        """
+        Apply a typing event from a user
+
+        Args:
+            room: Connection key of the conversation
+            user_id: User ID
+            typing: True while typing, False when stopped
+
+        Returns:
+            Whether the event changed anything (False if rate-limited or a
+            stop from a user who was not typing)
+        """
+        now = time.monotonic()
+        users = self._typing.get(room, {})
+        last = users.get(user_id)
+        if last is not None and now - last >= self.ttl_seconds:
+            last = None
+
+        if typing:
+            if last is not None and now - last < self.refresh_seconds:
+                return False
+            self._typing.setdefault(room, {})[user_id] = now
+            started, stopped = self._pending.setdefault(room, (set(), set()))
+            started.add(user_id)
+            stopped.discard(user_id)
+        else:
+            if users.pop(user_id, None) is None:
+                return False
+            if not users:
+                self._typing.pop(room, None)
+            if last is None:
+                return False  # already expired on the clients
+            started, stopped = self._pending.setdefault(room, (set(), set()))
+            stopped.add(user_id)
+            started.discard(user_id)
+
+        self._schedule(room)
+        return True
+
+    def _schedule(self, room: str):
+        """Flush a room's pending changes at the end of its window"""
+        if room in self._timers:
+            return
+        loop = asyncio.get_running_loop()
+        self._timers[room] = loop.call_later(self.flush_seconds, self._flush, room)
+
+    def _flush(self, room: str):
+        """Send a room's pending changes as one event"""
+        self._timers.pop(room, None)
+        started, stopped = self._pending.pop(room, (set(), set()))
+
+        # Drop users whose typing state expired without a stop
+        now = time.monotonic()
+        users = self._typing.get(room)
+        if users is not None:
+            for user_id in [u for u, at in users.items() if now - at >= self.ttl_seconds]:
+                del users[user_id]
+            if not users:
+                del self._typing[room]
+
+        if not started and not stopped:
+            return
+        task = asyncio.create_task(self._send(room, {
+            "type": "typing",
+            "typing": sorted(started),
+            "stopped": sorted(stopped),
+            "ttl_ms": int(self.ttl_seconds * 1000)
+        }))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, room: str, message: Dict):
+        """Publish a typing event, logging failures"""
+        try:
+            await self.publish(room, message)
+        except Exception as e:
+            logger.error(f"Failed to publish typing event for {room}: {str(e)}")
+
+    async def stop(self):
+        """Cancel pending flushes and forget every typing state"""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._pending.clear()
+        self._typing.clear()
+        tasks = list(self._tasks)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def parse_status(value: Optional[str]) -> Optional[str]:
+    """
+    Validate a status sent by a client
+
+    Args:
+        value: Requested status
+
+    Returns:
+        "online" or "away", or None if the value is not settable
+    """
+    if value in (ONLINE, AWAY):
+        return value
+    return None
@@ -0,0 +1,229 @@
+"""In-memory project x skill matrix for the recommended-projects feed"""
+import time
+import uuid
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.models.project import Project, ProjectSkill
+from app.services.reloading_index import ReloadingIndex
+from app.services.skill_matrix import SkillMatrix, top_k
+
+logger = logging.getLogger(__name__)
+
+# Score = share of the project's required levels the user covers
+# + INTEREST_WEIGHT * share of its skills seen in favorited or applied projects
+INTEREST_WEIGHT = 0.3
+
+# (project_id, score)
+RankedProject = Tuple[uuid.UUID, float]
+
+
+class ProjectIndex(ReloadingIndex):
+    """
+    Open projects ranked for a developer with NumPy
+
+    Required skills of every open project live in a SkillMatrix, so a feed
+    only touches the columns of the caller's skills and interests. The
+    index is loaded on first use and every PROJECT_INDEX_TTL_SECONDS (to
+    pick up other workers' writes), in the background (see
+    ReloadingIndex); projects created or updated on this worker are
+    applied right away. Ranked feeds are cached per user for
+    RECOMMENDATION_FEED_TTL_SECONDS and dropped when the user's skills,
+    favorites or applications change.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        feed_ttl_seconds: float,
+        feed_size: int = 100,
+        max_feeds: int = 10000,
+        session_factory: Optional[async_sessionmaker] = None
+    ):
+        super().__init__(ttl_seconds, session_factory)
+        self.feed_ttl_seconds = feed_ttl_seconds
+        self.feed_size = feed_size
+        self.max_feeds = max_feeds
+        self.clear()
+
+    def clear(self):
+        """Drop the index and every cached feed"""
+        self.matrix = SkillMatrix()
+        self._owned: Dict[uuid.UUID, Set[int]] = {}
+        self._counts = np.zeros(0, dtype=np.float32)
+        self._feeds: Dict[uuid.UUID, Tuple[float, List[RankedProject]]] = {}
+        self._loaded_at = None
+        self.forget_reload()
+
+    @property
+    def size(self) -> int:
+        """Number of projects in the index (including closed ones emptied since loading)"""
+        return self.matrix.size
+
+    async def _fetch(self, db: AsyncSession) -> list:
+        """Read (project_id, owner_id, skill_id, required_level) rows, newest projects first"""
+        result = await db.execute(
+            select(Project.id, Project.owner_id, ProjectSkill.skill_id, ProjectSkill.required_level)
+            .join(ProjectSkill, ProjectSkill.project_id == Project.id)
+            .filter(Project.deleted_at.is_(None), Project.status == "open")
+            .order_by(Project.created_at.desc())
+        )
+        return result.all()
+
+    def _build(self, rows: list) -> "ProjectIndex":
+        """Build a new index from fetched rows (in a worker thread)"""
+        fresh = ProjectIndex(self.ttl_seconds, self.feed_ttl_seconds, self.feed_size, self.max_feeds, self.session_factory)
+        fresh.build(rows)
+        return fresh
+
+    def _adopt(self, fresh: "ProjectIndex"):
+        """Swap in a freshly built index; feeds ranked on the old one are dropped"""
+        self.matrix = fresh.matrix
+        self._owned = fresh._owned
+        self._counts = fresh._counts
+        self._feeds = {}
+        self._loaded_at = fresh._loaded_at
+        logger.info(f"Loaded project index with {self.size} projects")
+
+    def build(self, rows: Iterable[Tuple[uuid.UUID, uuid.UUID, int, int]]):
+        """
+        Replace the index
+
+        Args:
+            rows: (project_id, owner_id, skill_id, required_level), newest projects first
+        """
+        self.clear()
+        owners: Dict[uuid.UUID, uuid.UUID] = {}
+        entries = []
+        for project_id, owner_id, skill_id, level in rows:
+            owners[project_id] = owner_id
+            entries.append((project_id, skill_id, level))
+        self.matrix.build(entries)
+        for row, project_id in enumerate(self.matrix.keys):
+            self._owned.setdefault(owners[project_id], set()).add(row)
+        self._counts = self.matrix.counts()
+        self._loaded_at = time.monotonic()
+
+    def set_project(self, project_id: uuid.UUID, owner_id: uuid.UUID, skills: Optional[Dict[int, int]], is_open: bool):
+        """
+        Apply a created or updated project
+
+        Args:
+            project_id: Project ID
+            owner_id: Owner user ID
+            skills: Skill ID -> required level, or None if unchanged
+            is_open: Whether the project accepts members
+        """
+        if not self._track(self.set_project, project_id, owner_id, skills, is_open):
+            return
+        if not is_open:
+            skills = {}
+        elif skills is None:
+            row = self.matrix.rows.get(project_id)
+            if row is None:
+                return
+            skills = self.matrix.row_skills[row]
+        row = self.matrix.set(project_id, skills)
+        if row == len(self._counts):
+            self._owned.setdefault(owner_id, set()).add(row)
+            self._counts = np.append(self._counts, np.float32(0))
+        self._counts[row] = len(skills)
+
+    def rank(
+        self,
+        user_id: uuid.UUID,
+        skills: Dict[int, int],
+        interest_project_ids: Iterable[uuid.UUID] = (),
+        exclude_project_ids: Set[uuid.UUID] = frozenset(),
+        limit: Optional[int] = None
+    ) -> List[RankedProject]:
+        """
+        Rank open projects for a developer
+
+        Args:
+            user_id: The developer (their own projects are skipped)
+            skills: The developer's skill ID -> level
+            interest_project_ids: Favorited or applied projects
+            exclude_project_ids: Projects never to return (e.g. already applied)
+            limit: Maximum number of projects (default: the feed size)
+
+        Returns:
+            Best projects first; only projects sharing a skill with the developer
+        """
+        if not self.size:
+            return []
+
+        fit = np.zeros(self.size, dtype=np.float32)
+        for skill_id, level in skills.items():
+            rows, required_levels = self.matrix.column(skill_id)
+            # Each project appears once per column, so fancy-index += is safe
+            fit[rows] += np.minimum(level or 1, required_levels) / np.maximum(required_levels, 1)
+
+        interest_skills: Set[int] = set()
+        for project_id in interest_project_ids:
+            row = self.matrix.rows.get(project_id)
+            if row is not None:
+                interest_skills.update(self.matrix.row_skills[row])
+        interest = np.zeros(self.size, dtype=np.float32)
+        for skill_id in interest_skills:
+            interest[self.matrix.column(skill_id)[0]] += 1
+
+        score = (fit + INTEREST_WEIGHT * interest) / np.maximum(self._counts, 1)
+        for project_id in exclude_project_ids:
+            row = self.matrix.rows.get(project_id)
+            if row is not None:
+                score[row] = 0
+        score[list(self._owned.get(user_id, ()))] = 0
+
+        return [
+            (self.matrix.keys[row], round(float(score[row]), 4))
+            for row in top_k(score, limit or self.feed_size)
+        ]
+
+    def cached_feed(self, user_id: uuid.UUID) -> Optional[List[RankedProject]]:
+        """
+        Look up a user's cached feed
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Ranked projects, or None if missing or expired
+        """
+        entry = self._feeds.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            self._feeds.pop(user_id, None)
+            return None
+        return entry[1]
+
+    def store_feed(self, user_id: uuid.UUID, feed: List[RankedProject]):
+        """
+        Cache a user's feed
+
+        Args:
+            user_id: User ID
+            feed: Ranked projects
+        """
+        if self.feed_ttl_seconds <= 0:
+            return
+        if len(self._feeds) >= self.max_feeds:
+            # Drop the oldest feed; dicts keep insertion order
+            self._feeds.pop(next(iter(self._feeds)))
+        self._feeds[user_id] = (time.monotonic() + self.feed_ttl_seconds, feed)
+
+    def invalidate_feed(self, user_id: uuid.UUID):
+        """
+        Forget a user's cached feed
+
+        Args:
+            user_id: User ID
+        """
+        self._feeds.pop(user_id, None)
+
+
+project_index = ProjectIndex(settings.project_index_ttl_seconds, settings.recommendation_feed_ttl_seconds)
@@ -0,0 +1,117 @@
+"""Base class for in-memory indexes reloaded from the database on a TTL"""
+import time
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.metrics import background_context
+from app.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class ReloadingIndex(ABC):
+    """
+    In-memory index loaded on first use and reloaded every ttl_seconds
+
+    A reload is a single background task: its rows are fetched with its own
+    session and the index is built in a worker thread, so the event loop
+    keeps serving sockets and requests meanwhile. Callers arriving while a
+    reload runs keep using the current index (only the very first load is
+    waited for), and updates applied to it in the meantime are replayed on
+    the new index when it is swapped in.
+
+    Subclasses implement _fetch (rows from the database), _build (a new
+    index from the rows, run off the loop) and _adopt (swap its data in),
+    and call _track at the top of every incremental update.
+    """
+
+    def __init__(self, ttl_seconds: float, session_factory: Optional[async_sessionmaker] = None):
+        self.ttl_seconds = ttl_seconds
+        self.session_factory = session_factory or AsyncSessionLocal
+        self._loaded_at: Optional[float] = None
+        self._reload: Optional[asyncio.Task] = None
+        self._generation = 0
+        self._pending: List[Tuple[Callable[..., Any], Tuple[Any, ...]]] = []
+
+    @property
+    def stale(self) -> bool:
+        """Whether the index is missing or older than the TTL"""
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl_seconds
+
+    def forget_reload(self):
+        """Abandon a reload in progress (its result is discarded); for clear()"""
+        self._generation += 1
+        self._reload = None
+        self._pending = []
+
+    async def ensure_loaded(self):
+        """
+        Start a reload if the index is missing or stale
+
+        Returns immediately while a loaded index exists; waits for the
+        first load otherwise.
+
+        Raises:
+            Exception: If the first load fails
+        """
+        if not self.stale:
+            return
+        if self._reload is None:
+            # Not part of the request that happened to find the index stale
+            self._reload = asyncio.create_task(self._run_reload(self._generation), context=background_context())
+        if self._loaded_at is None:
+            await asyncio.shield(self._reload)
+
+    async def _run_reload(self, generation: int):
+        """Fetch, build off the loop and swap in a new index"""
+        try:
+            async with self.session_factory() as db:
+                rows = await self._fetch(db)
+            fresh = await asyncio.to_thread(self._build, rows)
+        except Exception as e:
+            if generation == self._generation:
+                self._reload = None
+                self._pending = []
+            if self._loaded_at is None:
+                raise
+            logger.error(f"Failed to reload {type(self).__name__}, keeping the current index: {str(e)}")
+            return
+
+        if generation != self._generation:
+            return
+        self._adopt(fresh)
+        self._reload = None
+        pending, self._pending = self._pending, []
+        for update, args in pending:
+            update(*args)
+
+    def _track(self, update: Callable[..., Any], *args: Any) -> bool:
+        """
+        Remember an incremental update for the index being reloaded
+
+        Args:
+            update: Bound update method
+            args: Its arguments
+
+        Returns:
+            Whether there is a loaded index to apply the update to
+        """
+        if self._reload is not None:
+            self._pending.append((update, args))
+        return self._loaded_at is not None
+
+    @abstractmethod
+    async def _fetch(self, db: AsyncSession) -> Any:
+        """Read the rows of a new index"""
+
+    @abstractmethod
+    def _build(self, rows: Any) -> "ReloadingIndex":
+        """Build a new index from fetched rows (runs in a worker thread)"""
+
+    @abstractmethod
+    def _adopt(self, fresh: "ReloadingIndex"):
+        """Replace this index's data with a freshly built index's"""
@@ -0,0 +1,314 @@
+"""Incremental GitHub repository sync with conditional, concurrent page requests"""
+import uuid
+import asyncio
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, delete, func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.user import User, OAuthAccount
+from app.models.github_repo import GitHubRepo, GitHubSyncState
+from app.models.job import Job
+from app.services.audit import audit_sink
+from app.services.candidate_index import candidate_index
+from app.services.github_service import GitHubService, RepoPage, REPOS_PER_PAGE
+from app.services.job_runner import job_runner, JobFailed
+
+REPO_SYNC_JOB = "github_repo_sync"
+
+
+@dataclass
+class RepoListing:
+    """A user's full repository listing, as far as it changed since the last sync"""
+    pages: List[Dict[str, Any]]  # new sync state: {"etag", "repos"} per page
+    changed_repos: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # full_name -> GitHub data
+    pages_changed: int = 0
+    unchanged: bool = False  # every page answered 304 and the page count is the same
+
+    @property
+    def repo_names(self) -> List[str]:
+        """Every repository in the listing"""
+        return [name for page in self.pages for name in page["repos"]]
+
+
+@dataclass
+class RepoSyncResult:
+    """Outcome of a sync"""
+    repo_count: int
+    pages: int
+    pages_changed: int
+    upserted: int
+    deleted: int
+
+
+async def load_sync_state(db: AsyncSession, user_id: uuid.UUID) -> List[Dict[str, Any]]:
+    """
+    Pages recorded by the user's last sync
+
+    Args:
+        db: Database session
+        user_id: User ID
+
+    Returns:
+        {"etag", "repos"} per page, or [] if the user never synced
+    """
+    result = await db.execute(select(GitHubSyncState.pages).where(GitHubSyncState.user_id == user_id))
+    return list(result.scalar() or [])
+
+
+async def fetch_repo_listing(access_token: str, username: str, stored: List[Dict[str, Any]]) -> RepoListing:
+    """
+    Fetch a user's repository listing, reusing what has not changed
+
+    All known pages are requested at once with their ETags, so an unchanged
+    page costs a 304 (free of rate limit) and no parsing. The listing ends
+    at the first page that is not full; further pages are requested
+    concurrently up to the last page announced in the Link header. No
+    database work happens here, so no connection is held while GitHub
+    answers.
+
+    Args:
+        access_token: GitHub access token
+        username: GitHub username
+        stored: Pages recorded by the last sync
+
+    Returns:
+        New page state and the data of repositories on changed pages
+    """
+    async def fetch(numbers: range):
+        pages = await asyncio.gather(*(
+            GitHubService.get_user_repos_page(
+                access_token,
+                username,
+                number,
+                stored[number - 1].get("etag") if number <= len(stored) else None
+            )
+            for number in numbers
+        ))
+        for page in pages:
+            fetched[page.page] = page
+
+    fetched: Dict[int, RepoPage] = {}
+    # A full last page may have been followed by a new one since
+    known = len(stored)
+    if known == 0 or len(stored[-1]["repos"]) >= REPOS_PER_PAGE:
+        known += 1
+    await fetch(range(1, known + 1))
+
+    while True:
+        last = _listing_end(fetched, stored)
+        if last is not None:
+            break
+        next_page = max(fetched) + 1
+        hints = [page.last_page for page in fetched.values() if page.last_page]
+        await fetch(range(next_page, max([next_page, *hints]) + 1))
+
+    listing = RepoListing(pages=[])
+    for number in range(1, last + 1):
+        page = fetched[number]
+        if page.not_modified:
+            listing.pages.append(stored[number - 1])
+            continue
+        listing.pages_changed += 1
+        listing.pages.append({"etag": page.etag, "repos": [repo["full_name"] for repo in page.repos]})
+        for repo in page.repos:
+            listing.changed_repos[repo["full_name"]] = repo
+    listing.unchanged = listing.pages_changed == 0 and last == len(stored)
+    return listing
+
+
+def _listing_end(fetched: Dict[int, RepoPage], stored: List[Dict[str, Any]]) -> Optional[int]:
+    """
+    Number of the last page of the listing, if the pages fetched so far reach it
+
+    Args:
+        fetched: Pages fetched so far
+        stored: Pages recorded by the last sync (content of 304 pages)
+
+    Returns:
+        The first page that is not full, or None if more pages are needed
+    """
+    number = 1
+    while number in fetched:
+        page = fetched[number]
+        count = len(stored[number - 1]["repos"]) if page.not_modified else len(page.repos)
+        if count < REPOS_PER_PAGE:
+            return number
+        number += 1
+    return None
+
+
+async def apply_repo_listing(db: AsyncSession, user_id: uuid.UUID, listing: RepoListing) -> RepoSyncResult:
+    """
+    Write a listing: upsert changed repositories, delete vanished ones, save the state
+
+    Repositories on unchanged pages are not touched, and upserts only
+    rewrite rows whose data differs. Nothing is committed.
+
+    Args:
+        db: Database session
+        user_id: User ID
+        listing: Result of fetch_repo_listing
+
+    Returns:
+        Counts of the sync
+    """
+    names = listing.repo_names
+    upserted = deleted = 0
+
+    if listing.changed_repos:
+        stmt = insert(GitHubRepo).values([
+            {
+                "user_id": user_id,
+                "repo_full_name": name,
+                "stars": repo.get("stargazers_count", 0),
+                "language": repo.get("language"),
+                "url": repo["html_url"],
+                "last_pushed_at": _parse_timestamp(repo.get("pushed_at"))
+            }
+            for name, repo in listing.changed_repos.items()
+        ])
+        columns = ("stars", "language", "url", "last_pushed_at")
+        result = await db.execute(stmt.on_conflict_do_update(
+            constraint="uq_user_repo",
+            set_={column: stmt.excluded[column] for column in columns},
+            where=or_(*(
+                getattr(GitHubRepo, column).is_distinct_from(stmt.excluded[column]) for column in columns
+            ))
+        ))
+        upserted = result.rowcount
+
+    if not listing.unchanged:
+        result = await db.execute(
+            delete(GitHubRepo).where(
+                GitHubRepo.user_id == user_id,
+                GitHubRepo.repo_full_name.not_in(names)
+            )
+        )
+        deleted = result.rowcount
+
+    now = datetime.now(timezone.utc)
+    stmt = insert(GitHubSyncState).values(
+        user_id=user_id,
+        pages=listing.pages,
+        repo_count=len(names),
+        last_synced_at=now
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={
+            "pages": stmt.excluded.pages,
+            "repo_count": stmt.excluded.repo_count,
+            "last_synced_at": stmt.excluded.last_synced_at
+        }
+    ))
+
+    return RepoSyncResult(
+        repo_count=len(names),
+        pages=len(listing.pages),
+        pages_changed=listing.pages_changed,
+        upserted=upserted,
+        deleted=deleted
+    )
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """ISO 8601 timestamp of the GitHub API as a datetime"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+async def language_stars(db: AsyncSession, user_id: uuid.UUID) -> Dict[str, int]:
+    """
+    Stars per language over a user's repositories
+
+    Args:
+        db: Database session
+        user_id: User ID
+
+    Returns:
+        Lowercased language -> total stars
+    """
+    result = await db.execute(
+        select(GitHubRepo.language, func.sum(GitHubRepo.stars))
+        .where(GitHubRepo.user_id == user_id, GitHubRepo.language.isnot(None))
+        .group_by(GitHubRepo.language)
+    )
+    languages: Dict[str, int] = {}
+    for language, stars in result.all():
+        key = language.lower()
+        languages[key] = languages.get(key, 0) + int(stars or 0)
+    return languages
+
+
+async def enqueue_repo_sync(db: AsyncSession, user_id: uuid.UUID) -> Job:
+    """
+    Queue a repository sync for a user, unless one is already queued or running
+
+    Args:
+        db: Database session (the caller commits, then calls job_runner.notify())
+        user_id: User ID
+
+    Returns:
+        The sync job
+    """
+    return await job_runner.enqueue(
+        db,
+        REPO_SYNC_JOB,
+        user_id=user_id,
+        dedupe_key=f"{REPO_SYNC_JOB}:{user_id}"
+    )
+
+
+@job_runner.handler(REPO_SYNC_JOB)
+async def run_repo_sync(job: Job, session_factory: async_sessionmaker) -> Dict[str, Any]:
+    """
+    Sync a user's repositories (background job)
+
+    The session is committed before GitHub is called, so no connection is
+    held while GitHub answers.
+
+    Args:
+        job: The sync job (user_id is the user to sync)
+        session_factory: Session factory of the job runner
+
+    Returns:
+        Counts of the sync
+
+    Raises:
+        JobFailed: If the user has no linked GitHub account
+    """
+    user_id = job.user_id
+    async with session_factory() as db:
+        result = await db.execute(
+            select(OAuthAccount.access_token, User.github_login)
+            .join(User, User.id == OAuthAccount.user_id)
+            .where(OAuthAccount.user_id == user_id, OAuthAccount.provider == "github")
+        )
+        account = result.first()
+        if account is None:
+            raise JobFailed("GitHub account not linked")
+        access_token, github_login = account
+
+        stored_pages = await load_sync_state(db, user_id)
+        await db.commit()
+
+        listing = await fetch_repo_listing(access_token, github_login, stored_pages)
+        sync = await apply_repo_listing(db, user_id, listing)
+        await audit_sink.record(
+            db,
+            user_id=user_id,
+            action="SYNC_REPOS",
+            resource="github_repos",
+            payload=asdict(sync)
+        )
+        await db.commit()
+
+        if sync.upserted or sync.deleted:
+            candidate_index.set_user_languages(user_id, await language_stars(db, user_id))
+
+    return asdict(sync)
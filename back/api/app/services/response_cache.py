@@ -0,0 +1,160 @@
+"""In-process LRU cache of serialized JSON responses with ETag revalidation"""
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A response body serialized once, with its JSON data for per-user overlays"""
+    data: Any
+    body: bytes
+    etag: str
+
+
+def dump_json(data: Any) -> bytes:
+    """
+    Serialize JSON-compatible data the way JSONResponse does
+
+    Args:
+        data: JSON-compatible data
+
+    Returns:
+        UTF-8 JSON body
+    """
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Strong ETag of a response body
+
+    Args:
+        body: Response body
+
+    Returns:
+        Quoted ETag value
+    """
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an ETag (weak comparison)
+
+    Args:
+        if_none_match: Request header value
+        etag: Current ETag
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def json_response(request: Request, body: bytes, private: bool, etag: Optional[str] = None) -> Response:
+    """
+    Build a JSON response with an ETag, or 304 if the client's copy is current
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        body: Serialized body
+        private: Whether the body depends on the caller (shared caches must not store it)
+        etag: ETag of the body (computed if omitted)
+
+    Returns:
+        200 or 304 response
+    """
+    etag = etag or make_etag(body)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache" if private else "public, no-cache",
+        "Vary": "Authorization",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of JSON responses
+
+    Entries are evicted least recently used first and expire after
+    ttl_seconds, which bounds staleness from writes on other workers;
+    writes on this worker clear the cache right away. Every clear starts a
+    new generation: a response computed before the clear (read at the
+    start of the lookup) is not stored, so a listing in flight during a
+    write cannot put its stale rows back.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, CachedResponse]]" = OrderedDict()
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """
+        Look up a response
+
+        Args:
+            key: Normalized request key
+
+        Returns:
+            Cached response, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Hashable, data: Any, generation: Optional[int] = None) -> CachedResponse:
+        """
+        Serialize and remember a response
+
+        Args:
+            key: Normalized request key
+            data: JSON-compatible response data
+            generation: Cache generation read before the data was queried;
+                the response is not stored if the cache was cleared since
+
+        Returns:
+            The cached response (also returned when caching is disabled)
+        """
+        body = dump_json(data)
+        cached = CachedResponse(data=data, body=body, etag=make_etag(body))
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return cached
+        if generation is not None and generation != self.generation:
+            return cached
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, cached)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return cached
+
+    def clear(self):
+        """Forget every response, and any response being computed"""
+        self._entries.clear()
+        self.generation += 1
+
+
+# Project listings and details; cleared on any project or owner profile write
+project_cache = ResponseCache(settings.project_cache_max_entries, settings.project_cache_ttl_seconds)
@@ -0,0 +1,123 @@
+"""In-memory autocomplete index over the skill master table"""
+import time
+import bisect
+import logging
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.skill import Skill
+
+logger = logging.getLogger(__name__)
+
+# (lowercased name, id, name)
+SkillEntry = Tuple[str, int, str]
+
+
+class SkillIndex:
+    """
+    Sorted, case-insensitive index of every skill name
+
+    Prefix matches are found by binary search and substring matches by a
+    scan of the (small) list, so autocomplete never touches the database.
+    The index is reloaded every SKILL_INDEX_TTL_SECONDS so skills created on
+    other workers show up; skills created here are added immediately. When
+    the table has more than SKILL_INDEX_MAX_SIZE rows the index stays empty
+    and callers fall back to the pg_trgm index.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: List[SkillEntry] = []
+        self._keys: List[str] = []
+        self._loaded_at: Optional[float] = None
+        self.too_large = False
+
+    async def ensure_loaded(self, db: AsyncSession) -> bool:
+        """
+        Load the skill table if the index is empty or stale
+
+        Args:
+            db: Database session
+
+        Returns:
+            True if the index can serve searches
+        """
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return not self.too_large
+
+        count = await db.scalar(select(func.count()).select_from(Skill))
+        self.too_large = count > self.max_size
+        if self.too_large:
+            logger.info(f"{count} skills exceed the in-memory index limit; using the database")
+            self._entries, self._keys = [], []
+        else:
+            result = await db.execute(select(Skill.id, Skill.name))
+            self._entries = sorted((name.lower(), skill_id, name) for skill_id, name in result.all())
+            self._keys = [entry[0] for entry in self._entries]
+        self._loaded_at = time.monotonic()
+        return not self.too_large
+
+    def search(self, query: Optional[str], limit: int) -> List[Tuple[int, str]]:
+        """
+        Find skills whose name contains the query, prefix matches first
+
+        Args:
+            query: Search text (case-insensitive); empty lists all skills
+            limit: Maximum number of results
+
+        Returns:
+            (id, name) pairs in ranking order
+        """
+        if not query:
+            return [(skill_id, name) for _, skill_id, name in self._entries[:limit]]
+
+        needle = query.lower()
+        results: List[Tuple[int, str]] = []
+
+        # Prefix matches are contiguous in sorted order
+        index = bisect.bisect_left(self._keys, needle)
+        while index < len(self._keys) and self._keys[index].startswith(needle) and len(results) < limit:
+            results.append((self._entries[index][1], self._entries[index][2]))
+            index += 1
+
+        # Then names containing the query elsewhere
+        if len(results) < limit:
+            for key, skill_id, name in self._entries:
+                if needle in key and not key.startswith(needle):
+                    results.append((skill_id, name))
+                    if len(results) >= limit:
+                        break
+
+        return results
+
+    def add(self, skill_id: int, name: str):
+        """
+        Add a newly created skill
+
+        Args:
+            skill_id: Skill ID
+            name: Skill name
+        """
+        if self._loaded_at is None or self.too_large:
+            return
+        entry = (name.lower(), skill_id, name)
+        index = bisect.bisect_left(self._entries, entry)
+        if index < len(self._entries) and self._entries[index] == entry:
+            return
+        self._entries.insert(index, entry)
+        self._keys.insert(index, entry[0])
+        if len(self._entries) > self.max_size:
+            self.clear()
+
+    def clear(self):
+        """Drop the index; the next search reloads it"""
+        self._entries, self._keys = [], []
+        self._loaded_at = None
+        self.too_large = False
+
+
+skill_index = SkillIndex(settings.skill_index_max_size, settings.skill_index_ttl_seconds)
@@ -0,0 +1,129 @@
+"""Sparse, incrementally updated key x skill matrix backed by NumPy columns"""
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+import numpy as np
+
+EMPTY_ROWS = np.zeros(0, dtype=np.int32)
+EMPTY_LEVELS = np.zeros(0, dtype=np.int8)
+
+
+class SkillMatrix:
+    """
+    Rows are keys (users or projects), columns are skills
+
+    Each skill column stores the row numbers that have the skill and their
+    levels, so an operation over a handful of skills touches only those
+    columns. Rows are never reused: a key whose skills are cleared keeps
+    its row with no entries.
+    """
+
+    def __init__(self):
+        self.keys: List[Any] = []
+        self.rows: Dict[Hashable, int] = {}
+        self.row_skills: List[Dict[int, int]] = []
+        self.columns: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def size(self) -> int:
+        """Number of rows"""
+        return len(self.keys)
+
+    def row(self, key: Hashable) -> int:
+        """
+        Row number of a key, adding an empty row if new
+
+        Args:
+            key: Row key
+
+        Returns:
+            Row number
+        """
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            self.rows[key] = row
+            self.keys.append(key)
+            self.row_skills.append({})
+        return row
+
+    def build(self, entries: Iterable[Tuple[Hashable, int, int]]):
+        """
+        Add many (key, skill_id, level) entries at once to an empty matrix
+
+        Args:
+            entries: Entries; a missing level counts as 1
+        """
+        triples: List[Tuple[int, int, int]] = []
+        for key, skill_id, level in entries:
+            row = self.row(key)
+            self.row_skills[row][skill_id] = level or 1
+            triples.append((row, skill_id, level or 1))
+        if not triples:
+            return
+
+        # Group the triples into one column per skill
+        data = np.array(triples, dtype=np.int64)
+        data = data[np.argsort(data[:, 1], kind="stable")]
+        skill_ids, starts = np.unique(data[:, 1], return_index=True)
+        for skill_id, chunk in zip(skill_ids, np.split(data, starts[1:])):
+            self.columns[int(skill_id)] = (chunk[:, 0].astype(np.int32), chunk[:, 2].astype(np.int8))
+
+    def set(self, key: Hashable, skills: Dict[int, int]) -> int:
+        """
+        Replace the skills of one row, touching only the changed columns
+
+        Args:
+            key: Row key
+            skills: Skill ID -> level
+
+        Returns:
+            Row number
+        """
+        row = self.row(key)
+        old = self.row_skills[row]
+        for skill_id in set(old) | set(skills):
+            if old.get(skill_id) == skills.get(skill_id):
+                continue
+            rows, levels = self.column(skill_id)
+            keep = rows != row
+            rows, levels = rows[keep], levels[keep]
+            if skill_id in skills:
+                rows = np.append(rows, np.int32(row))
+                levels = np.append(levels, np.int8(skills[skill_id] or 1))
+            self.columns[skill_id] = (rows, levels)
+        self.row_skills[row] = dict(skills)
+        return row
+
+    def column(self, skill_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows having a skill and their levels
+
+        Args:
+            skill_id: Skill ID
+
+        Returns:
+            (row numbers, levels); each row appears at most once
+        """
+        return self.columns.get(skill_id, (EMPTY_ROWS, EMPTY_LEVELS))
+
+    def counts(self) -> np.ndarray:
+        """Number of skills per row"""
+        return np.array([len(skills) for skills in self.row_skills], dtype=np.float32)
+
+
+def top_k(score: np.ndarray, limit: int) -> np.ndarray:
+    """
+    Rows of the highest positive scores, best first
+
+    Args:
+        score: Score per row; rows scoring 0 or less are never returned
+        limit: Maximum number of rows
+
+    Returns:
+        Row numbers
+    """
+    count = min(limit, int(np.count_nonzero(score > 0)))
+    if count == 0:
+        return EMPTY_ROWS
+    top = np.argpartition(-score, count - 1)[:count]
+    return top[np.argsort(-score[top], kind="stable")]
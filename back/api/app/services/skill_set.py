@@ -0,0 +1,87 @@
+"""Replace the skill set of a user or project in a constant number of queries"""
+from typing import Any, Dict, List, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.skill import Skill
+
+
+async def write_skill_set(
+    db: AsyncSession,
+    model: Any,
+    owner_column: str,
+    owner_id: Any,
+    level_column: str,
+    skills: List[Tuple[int, int]],
+    level_label: str = "Skill level",
+    is_new: bool = False
+):
+    """
+    Make the owner's skill rows match the submitted skills
+
+    Every skill ID is validated with one IN query, the submitted set is
+    diffed against the existing rows, and only the difference is written:
+    one DELETE for removed skills and one INSERT ... ON CONFLICT DO UPDATE
+    for added or changed ones. Unchanged rows are not touched. Nothing is
+    committed.
+
+    Args:
+        db: Database session
+        model: UserSkill or ProjectSkill
+        owner_column: Owner key column ("user_id" or "project_id")
+        owner_id: Owner ID
+        level_column: Level column ("level" or "required_level")
+        skills: (skill_id, level) pairs; the last level wins for a repeated ID
+        level_label: Name of the level in validation errors
+        is_new: The owner was just created and has no rows yet
+
+    Raises:
+        HTTPException: If a level is out of range or a skill does not exist
+    """
+    levels: Dict[int, int] = {}
+    for skill_id, level in skills:
+        if level < 1 or level > 5:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{level_label} must be between 1 and 5"
+            )
+        levels[skill_id] = level
+
+    if levels:
+        result = await db.execute(select(Skill.id).filter(Skill.id.in_(levels)))
+        found = set(result.scalars().all())
+        for skill_id in levels:
+            if skill_id not in found:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Skill with id {skill_id} not found"
+                )
+
+    owner = getattr(model, owner_column)
+    existing: Dict[int, int] = {}
+    if not is_new:
+        result = await db.execute(
+            select(model.skill_id, getattr(model, level_column)).filter(owner == owner_id)
+        )
+        existing = dict(result.all())
+
+    removed = [skill_id for skill_id in existing if skill_id not in levels]
+    if removed:
+        await db.execute(
+            delete(model).filter(owner == owner_id, model.skill_id.in_(removed))
+        )
+
+    changed = [
+        {owner_column: owner_id, "skill_id": skill_id, level_column: level}
+        for skill_id, level in levels.items()
+        if existing.get(skill_id) != level
+    ]
+    if changed:
+        stmt = insert(model).values(changed)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[owner_column, "skill_id"],
+            set_={level_column: getattr(stmt.excluded, level_column)}
+        ))
@@ -0,0 +1,112 @@
+"""Measure the cost of audit logging inside a request's transaction
+
+Usage:
+    python benchmarks/bench_audit.py --transactions 5000 --concurrency 20
+
+WARNING: this updates "bench_audit_N" users and inserts audit_logs rows in
+the database configured for the API (DATABASE_URL). Run it against a
+scratch database only.
+
+Every simulated request updates its client's user row and records one
+audit event in its transaction, then commits, with --concurrency
+requests in flight:
+
+  transaction  AUDIT_MODE=transaction: the AuditLog row is inserted and
+               committed by the request
+  buffered     AUDIT_MODE=buffered: the event is handed to the background
+               writer on commit and inserted with others in batches
+
+Reported: request latency, throughput, and (buffered) the time stop()
+takes to write what is still buffered.
+"""
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import delete, text
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import settings  # noqa: E402
+from app.database import AsyncSessionLocal  # noqa: E402
+from app.models.audit import AuditLog  # noqa: E402
+from app.services.audit import AuditSink  # noqa: E402
+from bench_projects_idle_websockets import percentile  # noqa: E402
+
+ACTION = "BENCH_AUDIT"
+
+
+async def seed(clients: int) -> List[str]:
+    """Create one bench user per client and return their user IDs"""
+    async with AsyncSessionLocal() as db:
+        user_ids = []
+        for n in range(clients):
+            user_ids.append((await db.execute(text(
+                "INSERT INTO users (id, handle, github_login, created_at, updated_at) "
+                "VALUES (gen_random_uuid(), :handle, :handle, now(), now()) "
+                "ON CONFLICT (handle) DO UPDATE SET handle = EXCLUDED.handle RETURNING id"
+            ), {"handle": f"bench_audit_{n}"})).scalar())
+        await db.execute(delete(AuditLog).where(AuditLog.action == ACTION))
+        await db.commit()
+        return user_ids
+
+
+async def run_mode(mode: str, user_ids: List[str], args: argparse.Namespace):
+    """Run the simulated requests with one audit mode"""
+    settings.audit_mode = mode
+    sink = AuditSink()
+    await sink.start()
+    samples = []
+    remaining = iter(range(args.transactions))
+
+    async def client(user_id: str):
+        for i in remaining:
+            start = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    text("UPDATE users SET updated_at = now() WHERE id = :user_id"), {"user_id": user_id}
+                )
+                await sink.record(db, user_id=user_id, action=ACTION, resource="bench", payload={"i": i})
+                await db.commit()
+            samples.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(user_id) for user_id in user_ids))
+    elapsed = time.perf_counter() - start
+    stop_start = time.perf_counter()
+    await sink.stop()
+    drain_ms = (time.perf_counter() - stop_start) * 1000
+
+    print(
+        f"{mode:12s} p50={statistics.median(samples):6.2f} ms  p95={percentile(samples, 95):6.2f} ms  "
+        f"{args.transactions / elapsed:7.1f} req/s  shutdown drain={drain_ms:6.1f} ms"
+    )
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    user_ids = await seed(args.concurrency)
+    for mode in ("transaction", "buffered"):
+        await run_mode(mode, user_ids, args)
+    async with AsyncSessionLocal() as db:
+        count = (await db.execute(
+            text("SELECT count(*) FROM audit_logs WHERE action = :action"), {"action": ACTION}
+        )).scalar()
+        await db.execute(delete(AuditLog).where(AuditLog.action == ACTION))
+        await db.commit()
+    print(f"{count} audit rows written (expected {2 * args.transactions})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=5000, help="Simulated requests per mode")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
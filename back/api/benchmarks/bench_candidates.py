@@ -0,0 +1,89 @@
+"""Measure candidate ranking latency of CandidateIndex on synthetic users
+
+Usage:
+    python benchmarks/bench_candidates.py --users 10000 100000 --skills 500
+
+Builds the in-memory user x skill matrix from random data (no database),
+then times rank() for projects with 1-8 required skills and the
+incremental update applied by PUT /users/me/skills.
+"""
+import sys
+import time
+import uuid
+import random
+import argparse
+import statistics
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.candidate_index import CandidateIndex  # noqa: E402
+from bench_projects_idle_websockets import percentile  # noqa: E402
+
+LANGUAGES = ["python", "javascript", "typescript", "go", "rust", "java", "swift", "kotlin", "c++", "ruby"]
+
+
+def build(users: int, args: argparse.Namespace, rng: random.Random) -> CandidateIndex:
+    """Build an index with skewed skill popularity, like a real skill table"""
+    skill_ids = list(range(1, args.skills + 1))
+    weights = [1 / rank for rank in skill_ids]
+    skill_rows, repo_rows = [], []
+    for _ in range(users):
+        user_id = uuid.uuid4()
+        for skill_id in set(rng.choices(skill_ids, weights, k=args.skills_per_user)):
+            skill_rows.append((user_id, skill_id, rng.randint(1, 5)))
+        for language in rng.sample(LANGUAGES, rng.randint(0, 3)):
+            repo_rows.append((user_id, language, rng.randint(0, 500)))
+
+    index = CandidateIndex(ttl_seconds=3600)
+    start = time.perf_counter()
+    index.build(skill_rows, repo_rows)
+    print(f"users={users:<7} build={time.perf_counter() - start:6.2f} s")
+    return index
+
+
+def measure(index: CandidateIndex, args: argparse.Namespace, rng: random.Random, required_count: int) -> List[float]:
+    """Rank random projects and return latencies in ms"""
+    samples = []
+    for _ in range(args.requests):
+        required = [
+            (skill_id, rng.randint(1, 5), LANGUAGES[skill_id % len(LANGUAGES)])
+            for skill_id in rng.sample(range(1, 51), required_count)
+        ]
+        start = time.perf_counter()
+        index.rank(required, 20)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--skills", type=int, default=500, help="Skill table size")
+    parser.add_argument("--skills-per-user", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Rankings per cell")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    for users in args.users:
+        index = build(users, args, rng)
+        for required_count in (1, 3, 8):
+            samples = measure(index, args, rng, required_count)
+            print(
+                f"users={users:<7} required={required_count}  "
+                f"p50={statistics.median(samples):7.2f} ms  p95={percentile(samples, 95):7.2f} ms"
+            )
+
+        user_ids = list(index.matrix.keys)
+        samples = []
+        for _ in range(args.requests):
+            skills = {skill_id: rng.randint(1, 5) for skill_id in rng.sample(range(1, 51), 8)}
+            start = time.perf_counter()
+            index.set_user_skills(rng.choice(user_ids), skills)
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"users={users:<7} update     p50={statistics.median(samples):7.2f} ms  p95={percentile(samples, 95):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
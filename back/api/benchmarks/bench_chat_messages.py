@@ -0,0 +1,72 @@
+"""Measure durable chat message throughput over /ws/chat
+
+Usage:
+    python benchmarks/bench_chat_messages.py \
+        --base-url http://127.0.0.1:8080 \
+        --token <JWT> --conversation-id <UUID> \
+        --clients 10 --messages 500
+
+Each client pipelines its messages and counts one as done when it is
+durable: the echoed broadcast in sync mode, or the "ack" in batched mode.
+Start the server once with CHAT_PERSIST_MODE=sync and once with
+CHAT_PERSIST_MODE=batched to compare.
+"""
+import json
+import time
+import asyncio
+import argparse
+
+import websockets
+
+
+async def run_client(url: str, client: int, messages: int) -> int:
+    """Send messages and wait until all of them are durable"""
+    prefix = f"bench {client} "
+    durable = 0
+    async with websockets.connect(url, open_timeout=30, max_queue=None) as ws:
+        for i in range(messages):
+            await ws.send(json.dumps({"type": "message", "body": f"{prefix}{i}"}))
+
+        while durable < messages:
+            frame = json.loads(await ws.recv())
+            if frame["type"] == "ack":
+                durable += 1
+            elif frame["type"] == "message" and not frame.get("provisional"):
+                # Sync mode: the echo of our own message means it is committed
+                if frame["body"].startswith(prefix):
+                    durable += 1
+            elif frame["type"] == "error":
+                raise RuntimeError(frame["message"])
+    return durable
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    ws_base = args.base_url.replace("http://", "ws://").replace("https://", "wss://")
+    url = f"{ws_base}/ws/chat?conversation_id={args.conversation_id}&token={args.token}"
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_client(url, client, args.messages) for client in range(args.clients))
+    )
+    elapsed = time.perf_counter() - started
+
+    total = args.clients * args.messages
+    print(f"clients      : {args.clients}")
+    print(f"messages     : {total} ({sum(results)} durable)")
+    print(f"elapsed      : {elapsed:.2f} s")
+    print(f"throughput   : {total / elapsed:.1f} msg/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--token", required=True, help="JWT of a member of the conversation")
+    parser.add_argument("--conversation-id", required=True, help="Conversation to post into")
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent sending clients")
+    parser.add_argument("--messages", type=int, default=500, help="Messages sent per client")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
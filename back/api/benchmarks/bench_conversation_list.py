@@ -0,0 +1,133 @@
+"""Measure loading the conversation list: one summary query vs one call per conversation
+
+Usage:
+    python benchmarks/bench_conversation_list.py \
+        --base-url http://127.0.0.1:8080 --conversations 50 --messages 2000
+
+WARNING: this inserts a "bench_inbox" user with matched conversations full
+of messages into the database configured for the API (DATABASE_URL). Run
+it against a scratch database only; the server must use the same
+JWT_SECRET. Compares GET /api/v1/me/conversations with the previous page
+load (GET /api/v1/matches/me/matches, then the latest message of every
+conversation).
+"""
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import List
+
+import httpx
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from bench_projects_idle_websockets import percentile  # noqa: E402
+
+
+def seed(conversations: int, messages: int) -> str:
+    """Create the inbox user's conversations and return its user ID"""
+    with engine.begin() as conn:
+        user_id = conn.execute(text(
+            "INSERT INTO users (id, handle, github_login, created_at, updated_at) "
+            "VALUES (gen_random_uuid(), 'bench_inbox', 'bench_inbox', now(), now()) "
+            "ON CONFLICT (handle) DO UPDATE SET handle = EXCLUDED.handle RETURNING id"
+        )).scalar()
+        missing = conversations - conn.execute(
+            text("SELECT count(*) FROM matches WHERE user_a = :user_id"), {"user_id": user_id}
+        ).scalar()
+        if missing <= 0:
+            return str(user_id)
+
+        project_id = conn.execute(text("SELECT id FROM projects LIMIT 1")).scalar()
+        conn.execute(text("""
+            WITH peers AS (
+                SELECT id FROM users WHERE id <> :user_id AND deleted_at IS NULL
+                AND id NOT IN (SELECT user_b FROM matches WHERE user_a = :user_id)
+                LIMIT :missing
+            ), new_matches AS (
+                INSERT INTO matches (id, project_id, user_a, user_b, created_at)
+                SELECT gen_random_uuid(), :project_id, :user_id, id, now() FROM peers
+                RETURNING id, user_b
+            ), new_conversations AS (
+                INSERT INTO conversations (id, match_id, created_at)
+                SELECT gen_random_uuid(), id, now() FROM new_matches
+                RETURNING id, match_id
+            )
+            INSERT INTO messages (conversation_id, sender_id, body, created_at)
+            SELECT c.id, CASE WHEN g % 3 = 0 THEN :user_id ELSE m.user_b END,
+                   'message ' || g, now() - ((:messages - g) || ' seconds')::interval
+            FROM new_conversations c
+            JOIN new_matches m ON m.id = c.match_id
+            CROSS JOIN generate_series(1, :messages) AS g
+        """), {"user_id": user_id, "project_id": project_id, "missing": missing, "messages": messages})
+
+        # Summaries as the message writer would have left them
+        conn.execute(text("""
+            UPDATE conversations c
+            SET message_count = s.message_count, last_message_id = s.last_message_id,
+                last_sender_id = m.sender_id, last_message_preview = left(m.body, 200),
+                last_message_at = m.created_at
+            FROM (
+                SELECT conversation_id AS id, count(*) AS message_count, max(id) AS last_message_id
+                FROM messages GROUP BY conversation_id
+            ) s
+            JOIN messages m ON m.id = s.last_message_id
+            WHERE c.id = s.id AND c.last_message_id IS NULL
+        """))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE matches, conversations, messages"))
+    return str(user_id)
+
+
+async def summary_list(client: httpx.AsyncClient) -> int:
+    """One request for the whole list"""
+    response = await client.get("/api/v1/me/conversations")
+    response.raise_for_status()
+    return 1
+
+
+async def per_conversation(client: httpx.AsyncClient) -> int:
+    """The matches list, then the latest message of each conversation"""
+    response = await client.get("/api/v1/matches/me/matches")
+    response.raise_for_status()
+    matches = response.json()["matches"]
+    for match in matches:
+        page = await client.get(f"/api/v1/matches/{match['id']}/conversation", params={"limit": 1})
+        page.raise_for_status()
+    return 1 + len(matches)
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    user_id = seed(args.conversations, args.messages)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': user_id})}"}
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=120) as client:
+        for name, load in [("summary", summary_list), ("per-conversation", per_conversation)]:
+            await load(client)  # warm up
+            samples: List[float] = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                calls = await load(client)
+                samples.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{name:<17} {calls:4d} HTTP calls  p50={statistics.median(samples):8.2f} ms  "
+                f"p95={percentile(samples, 95):8.2f} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--conversations", type=int, default=50, help="Conversations of the inbox user")
+    parser.add_argument("--messages", type=int, default=2000, help="Messages per conversation")
+    parser.add_argument("--requests", type=int, default=20, help="Page loads per variant")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Measure chat fan-out latency of ConnectionManager with one slow client
+
+Usage:
+    python benchmarks/bench_fanout.py --recipients 10 100 1000 --messages 50
+
+Every room has one client whose send takes --slow-ms. The "sequential"
+baseline awaits send_json on each socket in turn (the previous behaviour),
+so every message waits for the slow client; the queued manager should keep
+the time until all healthy clients have received a message flat.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.backplane import InProcessBackplane  # noqa: E402
+from app.services.chat_service import ConnectionManager  # noqa: E402
+
+
+class SimulatedWebSocket:
+    """WebSocket stand-in with a fixed per-frame send latency"""
+
+    def __init__(self, delay: float, expected: int, done: asyncio.Event = None):
+        self.delay = delay
+        self.received = 0
+        self.expected = expected
+        self.done = done
+
+    async def accept(self):
+        pass
+
+    async def _send(self):
+        await asyncio.sleep(self.delay)
+        self.received += 1
+        if self.done is not None and self.received >= self.expected:
+            self.done.set()
+
+    async def send_text(self, data: str):
+        await self._send()
+
+    async def send_json(self, data):
+        json.dumps(data)
+        await self._send()
+
+    async def close(self, code: int = 1000, reason: str = None):
+        pass
+
+
+def make_sockets(recipients: int, args: argparse.Namespace):
+    """Create healthy sockets plus one slow socket"""
+    healthy = [
+        SimulatedWebSocket(args.send_ms / 1000, args.messages, asyncio.Event())
+        for _ in range(recipients - 1)
+    ]
+    slow = SimulatedWebSocket(args.slow_ms / 1000, args.messages)
+    return healthy, slow
+
+
+async def bench_sequential(recipients: int, args: argparse.Namespace) -> List[float]:
+    """Await each socket in turn, as a naive broadcast would"""
+    healthy, slow = make_sockets(recipients, args)
+    sockets = [slow] + healthy
+    samples = []
+    for i in range(args.messages):
+        start = time.perf_counter()
+        for ws in sockets:
+            await ws.send_json({"type": "message", "body": f"message {i}"})
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def bench_queued(recipients: int, args: argparse.Namespace) -> List[float]:
+    """Broadcast through ConnectionManager's per-socket send queues"""
+    manager = ConnectionManager(InProcessBackplane())
+    await manager.start()
+    healthy, slow = make_sockets(recipients, args)
+    await manager.connect(slow, "slow-user", "room")
+    for i, ws in enumerate(healthy):
+        await manager.connect(ws, f"user-{i}", "room")
+
+    samples = []
+    for i in range(args.messages):
+        target = i + 1
+        start = time.perf_counter()
+        await manager.send_to_conversation("room", {"type": "message", "body": f"message {i}"})
+        # Wait until every healthy socket has this message
+        while any(ws.received < target for ws in healthy):
+            await asyncio.sleep(0)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    await manager.stop()
+    return samples
+
+
+def report(label: str, recipients: int, samples: List[float]):
+    """Print one result line"""
+    print(
+        f"{label:<10} recipients={recipients:<5} "
+        f"p50={statistics.median(samples):8.2f} ms  max={max(samples):8.2f} ms"
+    )
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    for recipients in args.recipients:
+        if not args.skip_sequential:
+            report("sequential", recipients, await bench_sequential(recipients, args))
+        report("queued", recipients, await bench_queued(recipients, args))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipients", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--messages", type=int, default=50, help="Messages sent per room")
+    parser.add_argument("--send-ms", type=float, default=0.0, help="Send latency of healthy clients")
+    parser.add_argument("--slow-ms", type=float, default=50.0, help="Send latency of the slow client")
+    parser.add_argument("--skip-sequential", action="store_true", help="Only run the queued manager")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Measure the GitHub side of an OAuth login against a local mock GitHub
+
+Usage:
+    python benchmarks/bench_github_login.py --logins 200 --latency-ms 30
+
+Serves the GitHub stand-in from tests/mock_github.py over real TCP on
+localhost (every request delayed by --latency-ms, standing in for the
+round trip to GitHub), then times the token exchange + user + emails
+sequence of a login two ways:
+
+  per-request clients  a new httpx.AsyncClient per call, calls in sequence
+                       (the previous GitHubService behaviour)
+  pooled               GitHubService: one keep-alive client, user and
+                       emails fetched concurrently
+
+Against the real GitHub each new connection also pays DNS and a TLS
+handshake, which the pooled client skips after the first login; on
+localhost only the saved round trip shows.
+"""
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import settings  # noqa: E402
+from app.services.github_service import GitHubService  # noqa: E402
+from tests.mock_github import MockGitHub  # noqa: E402
+from bench_projects_idle_websockets import percentile  # noqa: E402
+
+
+async def login_per_request_clients(base_url: str, code: str):
+    """Token exchange, user and emails with a fresh client per call, in sequence"""
+    async with httpx.AsyncClient() as client:
+        response = await client.post(f"{base_url}/login/oauth/access_token", data={"code": code})
+        token = response.json()["access_token"]
+    for path in ("/user", "/user/emails"):
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"{base_url}{path}", headers={"Authorization": f"Bearer {token}"})
+            response.raise_for_status()
+
+
+async def login_pooled(base_url: str, code: str):
+    """Token exchange, then user and emails concurrently, through GitHubService"""
+    token = (await GitHubService.exchange_code_for_token(code))["access_token"]
+    await asyncio.gather(GitHubService.get_user_info(token), GitHubService.get_user_emails(token))
+
+
+async def measure(login: Callable[[str, str], Awaitable[None]], base_url: str, logins: int) -> List[float]:
+    """Run logins one after another and collect latencies in milliseconds"""
+    samples = []
+    for i in range(logins):
+        start = time.perf_counter()
+        await login(base_url, f"code{i}")
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    github = MockGitHub(latency=args.latency_ms / 1000)
+    server = uvicorn.Server(uvicorn.Config(github.app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    settings.github_oauth_url = f"{base_url}/login/oauth"
+    settings.github_api_url = base_url
+    settings.github_http2 = False  # the mock server speaks HTTP/1.1 only
+    await GitHubService.start()
+    try:
+        for name, login in (("per-request clients", login_per_request_clients), ("pooled", login_pooled)):
+            await measure(login, base_url, 5)  # warm up
+            samples = await measure(login, base_url, args.logins)
+            print(
+                f"{name:20s} p50={statistics.median(samples):7.2f} ms  "
+                f"p95={percentile(samples, 95):7.2f} ms"
+            )
+    finally:
+        await GitHubService.stop()
+        server.should_exit = True
+        await serving
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200, help="Logins per variant")
+    parser.add_argument("--latency-ms", type=float, default=30, help="Delay of every mock GitHub response")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Measure per-request middleware overhead on GET /healthz
+
+Usage:
+    python benchmarks/bench_healthz.py --requests 20000 --concurrency 50 2>/dev/null
+
+Drives the ASGI app in-process (no server, socket or HTTP client), so the
+requests per second reflect the middleware stack, routing and the JSON
+response of /healthz only. Request logs go to stderr; redirect it so the
+terminal does not slow the run down.
+"""
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import app  # noqa: E402
+from bench_projects_idle_websockets import percentile  # noqa: E402
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/healthz",
+    "raw_path": b"/healthz",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench"), (b"user-agent", b"bench_healthz")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("127.0.0.1", 8080),
+}
+
+
+async def call() -> float:
+    """Issue one request and return its latency in milliseconds"""
+    sent = []
+    done = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            done.set()
+
+    start = time.perf_counter()
+    await app(dict(SCOPE), receive, send)
+    elapsed = (time.perf_counter() - start) * 1000
+    assert sent[0]["status"] == 200
+    return elapsed
+
+
+async def measure(requests: int, concurrency: int) -> List[float]:
+    """Issue requests from concurrent workers and collect latencies"""
+    samples: List[float] = []
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            samples.append(await call())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    await measure(args.concurrency * 10, args.concurrency)  # warm up (builds the middleware stack)
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        samples = await measure(args.requests, args.concurrency)
+        elapsed = time.perf_counter() - start
+        print(
+            f"healthz  p50={statistics.median(samples):6.3f} ms  p95={percentile(samples, 95):6.3f} ms  "
+            f"{len(samples) / elapsed:7.0f} req/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per round")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent requests")
+    parser.add_argument("--rounds", type=int, default=3, help="Measured rounds")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Measure authenticated request overhead with the identity cache
+
+Usage:
+    python benchmarks/bench_identity_cache.py \
+        --base-url http://127.0.0.1:8080 --token <JWT> --requests 1000 --concurrency 20
+
+Run once against a server with the default settings and once with
+IDENTITY_CACHE_MAX_ENTRIES=0 to compare. GET /api/v1/auth/me does nothing
+beyond authentication, so its latency is the per-request cost of
+verifying the token and loading the user.
+"""
+import time
+import asyncio
+import argparse
+import statistics
+
+import httpx
+
+from bench_projects_idle_websockets import percentile
+from bench_project_cache import measure
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    headers = {"Authorization": f"Bearer {args.token}"}
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        await measure(client, "/api/v1/auth/me", args.concurrency, args.concurrency, headers)  # warm up
+        start = time.perf_counter()
+        samples = await measure(client, "/api/v1/auth/me", args.requests, args.concurrency, headers)
+        elapsed = time.perf_counter() - start
+        print(
+            f"auth/me  p50={statistics.median(samples):7.2f} ms  p95={percentile(samples, 95):7.2f} ms  "
+            f"{len(samples) / elapsed:7.0f} req/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--token", required=True, help="Access token of an existing user")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests to issue")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent requests")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Measure the background job queue: enqueue latency and drain throughput
+
+Usage:
+    python benchmarks/bench_jobs.py --jobs 2000 --workers 1 2 4 --work-ms 20
+
+WARNING: this inserts and deletes rows of the jobs table in the database
+configured for the API (DATABASE_URL), which must be migrated to head.
+Run it against a scratch database only.
+
+For every worker count, --jobs jobs are enqueued one transaction each
+(what an endpoint pays before answering 202), then drained by an
+app.services.job_runner.JobRunner with that many workers. Each job
+sleeps --work-ms, standing in for a GitHub round trip; the database
+connection is only held while claiming and recording a job, not while
+the job waits.
+"""
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+
+from sqlalchemy import delete, func, select
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import AsyncSessionLocal  # noqa: E402
+from app.models.job import Job  # noqa: E402
+from app.services.job_runner import JobRunner, SUCCEEDED  # noqa: E402
+from bench_projects_idle_websockets import percentile  # noqa: E402
+
+KIND = "bench_sleep"
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    for workers in args.workers:
+        runner = JobRunner(workers=workers)
+
+        @runner.handler(KIND)
+        async def sleep(job, session_factory):
+            await asyncio.sleep(args.work_ms / 1000)
+            return None
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Job).where(Job.kind == KIND))
+            await db.commit()
+
+        samples = []
+        for _ in range(args.jobs):
+            start = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                await runner.enqueue(db, KIND)
+                await db.commit()
+            samples.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await runner.start()
+        runner.notify()
+        while True:
+            async with AsyncSessionLocal() as db:
+                done = (await db.execute(
+                    select(func.count()).select_from(Job).where(Job.kind == KIND, Job.status == SUCCEEDED)
+                )).scalar()
+            if done >= args.jobs:
+                break
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        await runner.stop()
+
+        print(
+            f"workers={workers:<3d} enqueue p50={statistics.median(samples):6.2f} ms  "
+            f"p95={percentile(samples, 95):6.2f} ms  drain={args.jobs / elapsed:7.1f} jobs/s"
+        )
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Job).where(Job.kind == KIND))
+        await db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=2000, help="Jobs per worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to compare")
+    parser.add_argument("--work-ms", type=float, default=20, help="Duration of every job")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Measure anonymous /api/v1/projects traffic with the response cache
+
+Usage:
+    python benchmarks/bench_project_cache.py \
+        --base-url http://127.0.0.1:8080 --requests 500 --concurrency 20
+
+Run once against a server with the default settings and once with
+PROJECT_CACHE_TTL_SECONDS=0 to compare. Measures the landing-page listing,
+a project detail, and revalidation with If-None-Match (304).
+"""
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Dict, List, Optional
+
+import httpx
+
+from bench_projects_idle_websockets import percentile
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    path: str,
+    requests: int,
+    concurrency: int,
+    headers: Optional[Dict] = None
+) -> List[float]:
+    """Issue concurrent GETs and return latencies in ms"""
+    samples: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            if response.status_code not in (200, 304):
+                response.raise_for_status()
+            samples.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    return samples
+
+
+def report(name: str, samples: List[float], elapsed: float):
+    """Print latency percentiles and throughput"""
+    print(
+        f"{name:<14} p50={statistics.median(samples):7.2f} ms  p95={percentile(samples, 95):7.2f} ms  "
+        f"{len(samples) / elapsed:7.0f} req/s"
+    )
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        listing = await client.get("/api/v1/projects", params={"limit": 20})
+        listing.raise_for_status()
+        detail_path = f"/api/v1/projects/{listing.json()['projects'][0]['id']}"
+        etag = listing.headers.get("etag")
+
+        cells = [
+            ("listing", "/api/v1/projects?limit=20", None),
+            ("detail", detail_path, None),
+        ]
+        if etag:
+            cells.append(("listing 304", "/api/v1/projects?limit=20", {"If-None-Match": etag}))
+
+        for name, path, headers in cells:
+            await measure(client, path, args.concurrency, args.concurrency, headers)  # warm up
+            start = time.perf_counter()
+            samples = await measure(client, path, args.requests, args.concurrency, headers)
+            report(name, samples, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per cell")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent requests")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Measure project search latency at growing table sizes
+
+Usage:
+    python benchmarks/bench_project_search.py \
+        --base-url http://127.0.0.1:8080 \
+        --sizes 10000 100000 1000000 --queries "python api" rust
+
+WARNING: this inserts synthetic projects into the database configured for
+the API (DATABASE_URL), owned by a "bench_search" user. Run it against a
+scratch database only. The table is topped up to each size in turn, then
+every query is run newest-first and by relevance with highlighting.
+"""
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import engine  # noqa: E402
+from bench_projects_idle_websockets import percentile  # noqa: E402
+
+WORDS = [
+    "python", "rust", "go", "typescript", "react", "vue", "api", "backend", "frontend",
+    "mobile", "ios", "android", "game", "unity", "ml", "data", "pipeline", "cli", "web",
+    "cloud", "aws", "docker", "kubernetes", "chat", "realtime", "search", "bot", "design",
+    "startup", "hackathon", "open", "source", "library", "compiler", "database", "graph",
+]
+
+
+def top_up(size: int):
+    """Insert synthetic projects until there are at least size rows"""
+    with engine.begin() as conn:
+        owner_id = conn.execute(text(
+            "INSERT INTO users (id, handle, github_login, created_at, updated_at) "
+            "VALUES (gen_random_uuid(), 'bench_search', 'bench_search', now(), now()) "
+            "ON CONFLICT (handle) DO UPDATE SET handle = EXCLUDED.handle RETURNING id"
+        )).scalar()
+        missing = size - conn.execute(text("SELECT count(*) FROM projects")).scalar()
+        if missing > 0:
+            conn.execute(text("""
+                INSERT INTO projects (id, owner_id, title, description, status, created_at, updated_at)
+                SELECT gen_random_uuid(), :owner_id,
+                       initcap(w[1 + (g * 7) % n] || ' ' || w[1 + (g * 13) % n]),
+                       'We are building a ' || w[1 + (g * 3) % n] || ' ' || w[1 + (g * 11) % n] ||
+                       ' project with ' || w[1 + (g * 17) % n] || ' and ' || w[1 + (g * 19) % n] ||
+                       '. Looking for people who enjoy ' || w[1 + (g * 23) % n] || '.',
+                       'open', now() - (g || ' seconds')::interval, now()
+                FROM generate_series(1, :missing) AS g,
+                     (SELECT CAST(:words AS text[]) AS w, :n AS n) AS vocab
+            """), {"owner_id": owner_id, "missing": missing, "words": WORDS, "n": len(WORDS)})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE projects"))
+
+
+async def measure(client: httpx.AsyncClient, params: Dict, requests: int) -> List[float]:
+    """Issue sequential requests and return latencies in ms"""
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get("/api/v1/projects", params=params)
+        response.raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=120) as client:
+        for size in args.sizes:
+            top_up(size)
+            for query in args.queries:
+                for label, extra in [
+                    ("newest", {}),
+                    ("relevance", {"sort": "relevance", "highlight": "true"}),
+                ]:
+                    params = {"query": query, "limit": 20, **extra}
+                    await measure(client, params, 2)  # warm up
+                    samples = await measure(client, params, args.requests)
+                    print(
+                        f"size={size:<8} query={query!r:<14} {label:<10} "
+                        f"p50={statistics.median(samples):8.2f} ms  p95={percentile(samples, 95):8.2f} ms"
+                    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--queries", nargs="+", default=["python api", "rust"])
+    parser.add_argument("--requests", type=int, default=20, help="Requests per cell")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Measure /api/v1/projects latency while many idle WebSocket clients are connected
+
+Usage:
+    python benchmarks/bench_projects_idle_websockets.py \
+        --base-url http://127.0.0.1:8080 \
+        --token <JWT> --conversation-id <UUID> \
+        --clients 500 --requests 1000
+
+Run it once with no idle clients (--clients 0) and once with --clients 500;
+with the async database layer the p99 of both runs should stay flat.
+"""
+import time
+import asyncio
+import argparse
+import statistics
+from typing import List
+
+import httpx
+import websockets
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile of samples (nearest-rank)"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def hold_idle_socket(url: str, stop: asyncio.Event):
+    """Open a chat socket and keep it idle until stop is set"""
+    async with websockets.connect(url, open_timeout=30) as ws:
+        await stop.wait()
+        await ws.close()
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    ws_base = args.base_url.replace("http://", "ws://").replace("https://", "wss://")
+    ws_url = f"{ws_base}/ws/chat?conversation_id={args.conversation_id}&token={args.token}"
+
+    stop = asyncio.Event()
+    sockets = [asyncio.create_task(hold_idle_socket(ws_url, stop)) for _ in range(args.clients)]
+    # Give the server time to finish all handshakes
+    await asyncio.sleep(args.warmup)
+
+    headers = {"Authorization": f"Bearer {args.token}"}
+    samples: List[float] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=30) as client:
+        async def one_request():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/api/v1/projects", params={"limit": 20})
+                response.raise_for_status()
+                samples.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    stop.set()
+    await asyncio.gather(*sockets, return_exceptions=True)
+
+    print(f"idle sockets : {args.clients}")
+    print(f"requests     : {len(samples)} ({len(samples) / elapsed:.1f} req/s)")
+    print(f"p50          : {statistics.median(samples):.2f} ms")
+    print(f"p95          : {percentile(samples, 95):.2f} ms")
+    print(f"p99          : {percentile(samples, 99):.2f} ms")
+    print(f"max          : {max(samples):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--token", required=True, help="JWT of a member of the conversation")
+    parser.add_argument("--conversation-id", required=True, help="Conversation the idle sockets join")
+    parser.add_argument("--clients", type=int, default=500, help="Number of idle WebSocket clients")
+    parser.add_argument("--requests", type=int, default=1000, help="Number of /api/v1/projects requests")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent HTTP requests")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds to wait after opening sockets")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare /api/v1/projects latency for each total_mode
+
+Usage:
+    python benchmarks/bench_projects_total.py \
+        --base-url http://127.0.0.1:8080 --requests 200 \
+        --query python --skill-id 1
+
+Runs the listing with no filters, with --query and with --skill-id, once
+per total_mode (exact, estimated, none), and prints p50/p95 per cell along
+with the reported total.
+"""
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Dict, List
+
+import httpx
+
+from bench_projects_idle_websockets import percentile
+
+
+async def measure(client: httpx.AsyncClient, params: Dict, requests: int, concurrency: int):
+    """Issue requests with the given params and return (samples, last body)"""
+    samples: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    body = {}
+
+    async def one_request():
+        nonlocal body
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get("/api/v1/projects", params=params)
+            response.raise_for_status()
+            samples.append((time.perf_counter() - start) * 1000)
+            body = response.json()
+
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    return samples, body
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    filters = {"unfiltered": {}}
+    if args.query:
+        filters["query"] = {"query": args.query}
+    if args.skill_id:
+        filters["skill_id"] = {"skill_id": args.skill_id}
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        for name, params in filters.items():
+            for mode in ["exact", "estimated", "none"]:
+                samples, body = await measure(
+                    client,
+                    {**params, "limit": 20, "total_mode": mode},
+                    args.requests,
+                    args.concurrency
+                )
+                print(
+                    f"{name:<11} {mode:<10} p50={statistics.median(samples):8.2f} ms  "
+                    f"p95={percentile(samples, 95):8.2f} ms  total={body.get('total')}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--query", help="Full-text query to benchmark")
+    parser.add_argument("--skill-id", type=int, help="Skill filter to benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per cell")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent requests")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Measure recommended-project ranking latency of ProjectIndex on synthetic projects
+
+Usage:
+    python benchmarks/bench_recommended_projects.py --projects 10000 100000 --skills 500
+
+Builds the in-memory project x skill matrix from random data (no database),
+then times rank() for developers with 3-15 skills and a few favorited
+projects, plus the incremental update applied by create/update_project.
+"""
+import sys
+import time
+import uuid
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.project_index import ProjectIndex  # noqa: E402
+from bench_projects_idle_websockets import percentile  # noqa: E402
+
+
+def build(projects: int, args: argparse.Namespace, rng: random.Random) -> ProjectIndex:
+    """Build an index with skewed skill popularity, like a real skill table"""
+    skill_ids = list(range(1, args.skills + 1))
+    weights = [1 / rank for rank in skill_ids]
+    owners = [uuid.uuid4() for _ in range(max(projects // 5, 1))]
+    rows = []
+    for _ in range(projects):
+        project_id, owner_id = uuid.uuid4(), rng.choice(owners)
+        for skill_id in set(rng.choices(skill_ids, weights, k=rng.randint(1, 6))):
+            rows.append((project_id, owner_id, skill_id, rng.randint(1, 5)))
+
+    index = ProjectIndex(ttl_seconds=3600, feed_ttl_seconds=0)
+    start = time.perf_counter()
+    index.build(rows)
+    print(f"projects={projects:<7} build={time.perf_counter() - start:6.2f} s")
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--skills", type=int, default=500, help="Skill table size")
+    parser.add_argument("--requests", type=int, default=200, help="Rankings per cell")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    for projects in args.projects:
+        index = build(projects, args, rng)
+        project_ids = index.matrix.keys
+        for skill_count in (3, 8, 15):
+            samples = []
+            for _ in range(args.requests):
+                skills = {skill_id: rng.randint(1, 5) for skill_id in rng.sample(range(1, 101), skill_count)}
+                favorites = rng.sample(project_ids, 5)
+                start = time.perf_counter()
+                index.rank(uuid.uuid4(), skills, favorites, set(favorites[:2]))
+                samples.append((time.perf_counter() - start) * 1000)
+            print(
+                f"projects={projects:<7} skills={skill_count:<3} "
+                f"p50={statistics.median(samples):7.2f} ms  p95={percentile(samples, 95):7.2f} ms"
+            )
+
+        samples = []
+        for _ in range(args.requests):
+            skills = {skill_id: rng.randint(1, 5) for skill_id in rng.sample(range(1, 101), 4)}
+            start = time.perf_counter()
+            index.set_project(rng.choice(project_ids), uuid.uuid4(), skills, is_open=True)
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"projects={projects:<7} update     p50={statistics.median(samples):7.2f} ms  p95={percentile(samples, 95):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
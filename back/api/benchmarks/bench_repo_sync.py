@@ -0,0 +1,150 @@
+"""Measure a GitHub repository sync: full refresh vs incremental, conditional sync
+
+Usage:
+    python benchmarks/bench_repo_sync.py --repos 1000 --latency-ms 30 --syncs 20
+
+WARNING: this inserts a "bench_repo_sync" user and its repositories into
+the database configured for the API (DATABASE_URL), which must be
+migrated to head. Run it against a scratch database only.
+
+GitHub is the in-process stand-in from tests/mock_github.py, every
+response delayed by --latency-ms. Each variant syncs the same listing
+repeatedly and reports the time of one sync:
+
+  full refresh         every page fetched in turn, all rows deleted and
+                       re-inserted (the previous endpoint behaviour)
+  incremental          app.services.repo_sync with nothing changed: all
+                       pages answer 304 concurrently, no repository writes
+  incremental, 1 edit  one repository starred between syncs: one page is
+                       fetched in full and one row upserted
+"""
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+import httpx
+from sqlalchemy import delete, select, text
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import settings  # noqa: E402
+from app.database import AsyncSessionLocal  # noqa: E402
+from app.models.github_repo import GitHubRepo, GitHubSyncState  # noqa: E402
+from app.services.github_service import GitHubService  # noqa: E402
+from app.services.repo_sync import load_sync_state, fetch_repo_listing, apply_repo_listing  # noqa: E402
+from tests.mock_github import MOCK_GITHUB_URL, MockGitHub, mock_repo  # noqa: E402
+from bench_projects_idle_websockets import percentile  # noqa: E402
+
+LOGIN = "bench_repo_sync"
+
+
+async def seed() -> str:
+    """Create the bench user and return its user ID"""
+    async with AsyncSessionLocal() as db:
+        user_id = (await db.execute(text(
+            "INSERT INTO users (id, handle, github_login, created_at, updated_at) "
+            "VALUES (gen_random_uuid(), :login, :login, now(), now()) "
+            "ON CONFLICT (handle) DO UPDATE SET handle = EXCLUDED.handle RETURNING id"
+        ), {"login": LOGIN})).scalar()
+        await db.execute(delete(GitHubRepo).where(GitHubRepo.user_id == user_id))
+        await db.execute(delete(GitHubSyncState).where(GitHubSyncState.user_id == user_id))
+        await db.commit()
+        return user_id
+
+
+async def sync_full_refresh(user_id):
+    """Fetch every page in turn, then replace all of the user's rows"""
+    repos = []
+    page = 1
+    while True:
+        listing = await GitHubService.get_user_repos_page("token", LOGIN, page)
+        repos.extend(listing.repos)
+        if listing.last_page is None or page >= listing.last_page:
+            break
+        page += 1
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(GitHubRepo).where(GitHubRepo.user_id == user_id))
+        for repo in repos:
+            db.add(GitHubRepo(
+                user_id=user_id,
+                repo_full_name=repo["full_name"],
+                stars=repo["stargazers_count"],
+                language=repo["language"],
+                url=repo["html_url"]
+            ))
+        await db.commit()
+
+
+async def sync_incremental(user_id):
+    """The endpoint's sync: conditional pages, upsert of changes only"""
+    async with AsyncSessionLocal() as db:
+        stored = await load_sync_state(db, user_id)
+        await db.commit()
+        listing = await fetch_repo_listing("token", LOGIN, stored)
+        await apply_repo_listing(db, user_id, listing)
+        await db.commit()
+
+
+async def measure(
+    sync: Callable[[str], Awaitable[None]],
+    user_id: str,
+    syncs: int,
+    between: Callable[[], None] = lambda: None
+) -> List[float]:
+    """Run syncs one after another and collect latencies in milliseconds"""
+    samples = []
+    for _ in range(syncs):
+        between()
+        start = time.perf_counter()
+        await sync(user_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    github = MockGitHub(latency=args.latency_ms / 1000)
+    github.repos = [mock_repo(LOGIN, f"repo{i:05d}") for i in range(args.repos)]
+    settings.github_api_url = MOCK_GITHUB_URL
+    await GitHubService.start(httpx.ASGITransport(app=github.app))
+
+    def star():
+        github.repos[args.repos // 2]["stargazers_count"] += 1
+
+    user_id = await seed()
+    try:
+        await sync_incremental(user_id)  # initial sync, stores the ETags
+        variants = (
+            ("full refresh", sync_full_refresh, lambda: None),
+            ("incremental", sync_incremental, lambda: None),
+            ("incremental, 1 edit", sync_incremental, star),
+        )
+        for name, sync, between in variants:
+            samples = await measure(sync, user_id, args.syncs, between)
+            print(
+                f"{name:20s} p50={statistics.median(samples):8.2f} ms  "
+                f"p95={percentile(samples, 95):8.2f} ms"
+            )
+        async with AsyncSessionLocal() as db:
+            count = len((await db.execute(
+                select(GitHubRepo.id).where(GitHubRepo.user_id == user_id)
+            )).all())
+        print(f"{count} repositories stored, {github.not_modified} pages answered 304")
+    finally:
+        await GitHubService.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=1000, help="Repositories of the bench user")
+    parser.add_argument("--latency-ms", type=float, default=30, help="Delay of every mock GitHub response")
+    parser.add_argument("--syncs", type=int, default=20, help="Syncs per variant")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Measure skill autocomplete latency
+
+Usage:
+    python benchmarks/bench_skill_search.py \
+        --base-url http://127.0.0.1:8080 --skills 5000 --queries p py pyt script
+
+Run once against a server with the default settings (in-memory index) and
+once with SKILL_INDEX_MAX_SIZE=0 (pg_trgm fallback) to compare.
+
+WARNING: this inserts synthetic skills ("bench-skill-<n> ...") into the
+database configured for the API (DATABASE_URL). Run it against a scratch
+database only.
+"""
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import List
+
+import httpx
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import engine  # noqa: E402
+from bench_projects_idle_websockets import percentile  # noqa: E402
+
+WORDS = [
+    "python", "rust", "go", "typescript", "javascript", "react", "vue", "django", "flask",
+    "fastapi", "postgres", "redis", "docker", "kubernetes", "aws", "gcp", "swift", "kotlin",
+    "unity", "pytorch", "tensorflow", "pandas", "graphql", "grpc", "script", "design",
+]
+
+
+def seed(count: int):
+    """Insert synthetic skills until there are at least count rows"""
+    with engine.begin() as conn:
+        missing = count - conn.execute(text("SELECT count(*) FROM skills")).scalar()
+        if missing > 0:
+            conn.execute(text("""
+                INSERT INTO skills (name)
+                SELECT initcap(w[1 + (g * 7) % n]) || ' ' || w[1 + (g * 13) % n] || ' ' || g
+                FROM generate_series(1, :missing) AS g,
+                     (SELECT CAST(:words AS text[]) AS w, :n AS n) AS vocab
+                ON CONFLICT (name) DO NOTHING
+            """), {"missing": missing, "words": WORDS, "n": len(WORDS)})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE skills"))
+
+
+async def measure(client: httpx.AsyncClient, query: str, requests: int) -> List[float]:
+    """Issue sequential requests and return latencies in ms"""
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get("/api/v1/skills", params={"query": query, "limit": 10})
+        response.raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    seed(args.skills)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        for query in args.queries:
+            await measure(client, query, 3)  # warm up (loads the index)
+            samples = await measure(client, query, args.requests)
+            print(
+                f"query={query!r:<10} p50={statistics.median(samples):7.2f} ms  "
+                f"p95={percentile(samples, 95):7.2f} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--skills", type=int, default=5000, help="Skill table size")
+    parser.add_argument("--queries", nargs="+", default=["p", "py", "pyt", "script"])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per query")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
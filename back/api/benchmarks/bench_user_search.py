@@ -0,0 +1,88 @@
+"""Measure /api/v1/users/search latency on a large user table
+
+Usage:
+    python benchmarks/bench_user_search.py \
+        --base-url http://127.0.0.1:8080 --token <JWT> \
+        --users 1000000 --queries ja jam kenji_12 zz9
+
+WARNING: this inserts synthetic users ("<name>_<n>") into the database
+configured for the API (DATABASE_URL). Run it against a scratch database
+only, after applying the migrations (the prefix and trigram indexes).
+"""
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import engine  # noqa: E402
+from bench_projects_idle_websockets import percentile  # noqa: E402
+
+NAMES = [
+    "james", "mary", "kenji", "yuki", "sato", "suzuki", "takahashi", "tanaka", "li", "wang",
+    "maria", "jose", "anna", "ivan", "olga", "ahmed", "fatima", "chen", "kim", "park",
+    "emma", "noah", "liam", "mia", "sofia", "lucas", "hana", "ren", "sora", "yuto",
+]
+
+
+def seed(count: int):
+    """Insert synthetic users until there are at least count rows"""
+    with engine.begin() as conn:
+        missing = count - conn.execute(text("SELECT count(*) FROM users")).scalar()
+        if missing > 0:
+            conn.execute(text("""
+                INSERT INTO users (id, handle, created_at, updated_at)
+                SELECT gen_random_uuid(), w[1 + (g * 7) % n] || '_' || g, now(), now()
+                FROM generate_series(1, :missing) AS g,
+                     (SELECT CAST(:names AS text[]) AS w, :n AS n) AS vocab
+                ON CONFLICT (handle) DO NOTHING
+            """), {"missing": missing, "names": NAMES, "n": len(NAMES)})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE users"))
+
+
+async def measure(client: httpx.AsyncClient, params: Dict, requests: int) -> List[float]:
+    """Issue sequential requests and return latencies in ms"""
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get("/api/v1/users/search", params=params)
+        response.raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    seed(args.users)
+    headers = {"Authorization": f"Bearer {args.token}"}
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=60) as client:
+        for query in args.queries:
+            params = {"q": query, "limit": 10}
+            await measure(client, params, 3)  # warm up
+            samples = await measure(client, params, args.requests)
+            print(
+                f"query={query!r:<12} p50={statistics.median(samples):7.2f} ms  "
+                f"p95={percentile(samples, 95):7.2f} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--token", required=True, help="JWT of any user")
+    parser.add_argument("--users", type=int, default=1000000, help="User table size")
+    parser.add_argument("--queries", nargs="+", default=["ja", "jam", "kenji_12", "zz9"])
+    parser.add_argument("--requests", type=int, default=50, help="Requests per query")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
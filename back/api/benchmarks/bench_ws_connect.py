@@ -0,0 +1,74 @@
+"""Measure WebSocket handshake throughput of /ws/chat or /ws/group-chat
+
+Usage:
+    python benchmarks/bench_ws_connect.py \
+        --base-url http://127.0.0.1:8080 \
+        --token <JWT> --conversation-id <UUID> \
+        --connections 2000 --concurrency 50
+
+Each connection authenticates, exchanges one ping/pong and closes, as a
+client reconnecting after a deploy would. Start the server once with
+WS_AUTH_CACHE_TTL_SECONDS=0 to measure the uncached handshake and once with
+the default TTL to measure the cached one.
+"""
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from typing import List
+
+import websockets
+
+from bench_projects_idle_websockets import percentile
+
+
+async def run(args: argparse.Namespace):
+    """Run the benchmark"""
+    ws_base = args.base_url.replace("http://", "ws://").replace("https://", "wss://")
+    if args.group:
+        url = f"{ws_base}/ws/group-chat?group_conversation_id={args.conversation_id}&token={args.token}"
+    else:
+        url = f"{ws_base}/ws/chat?conversation_id={args.conversation_id}&token={args.token}"
+
+    samples: List[float] = []
+    failures = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one_connection():
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with websockets.connect(url, open_timeout=30) as ws:
+                    await ws.send(json.dumps({"type": "ping"}))
+                    await ws.recv()
+            except Exception:
+                failures += 1
+                return
+            samples.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_connection() for _ in range(args.connections)))
+    elapsed = time.perf_counter() - started
+
+    print(f"connections  : {len(samples)} ok, {failures} failed")
+    print(f"throughput   : {len(samples) / elapsed:.1f} conn/s")
+    if samples:
+        print(f"p50          : {statistics.median(samples):.2f} ms")
+        print(f"p99          : {percentile(samples, 99):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--token", required=True, help="JWT of a member of the conversation")
+    parser.add_argument("--conversation-id", required=True, help="Conversation (or group conversation) ID")
+    parser.add_argument("--group", action="store_true", help="Connect to /ws/group-chat instead of /ws/chat")
+    parser.add_argument("--connections", type=int, default=2000, help="Number of connections to open")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent handshakes")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,29 @@
 """FastAPI application entry point"""
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.database import engine, Base
+from app.core.logging_config import configure_logging
 from app.core.middleware import RequestIDMiddleware
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+from app.core.identity_cache import identity_cache
+from app.core.metrics import install_sql_hooks, metrics
+from app.services.backplane import create_backplane
+from app.services.chat_service import manager
+from app.services.github_service import GitHubService
+from app.services.message_writer import message_writer
+from app.services.job_runner import job_runner
+from app.services.audit import audit_sink
+
+# Configure logging (request IDs on every record, written by a background thread)
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Attribute SQL statements, DB time and rows to the current request
+install_sql_hooks()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -22,9 +31,22 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {settings.app_name} API")
     logger.info(f"Environment: {settings.app_env}")
+    await manager.start(create_backplane())
+    await message_writer.start()
+    await audit_sink.start()
+    await GitHubService.start()
+    await job_runner.start()
     yield
     # Shutdown
     logger.info("Shutting down API")
+    logger.info(f"Identity cache: {identity_cache.stats()}")
+    await job_runner.stop()
+    await GitHubService.stop()
+    await message_writer.stop()
+    # After everything that records events: nothing buffered is lost
+    await audit_sink.stop()
+    logger.info(f"Audit log: {audit_sink.stats()}")
+    await manager.stop()
 
 
 # Create FastAPI application
@@ -55,6 +77,15 @@ async def health_check():
     return {"status": "ok", "app": settings.app_name}
 
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Per-route request latency, SQL statements, DB time and rows (Prometheus text format)"""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 # Root endpoint
 @app.get("/")
 async def root():
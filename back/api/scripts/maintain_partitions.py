@@ -0,0 +1,95 @@
+"""Create upcoming monthly partitions and detach (or archive) expired ones
+
+Usage:
+    python scripts/maintain_partitions.py [--months-ahead 3] [--archive-dir /var/backups/buildup] [--dry-run]
+
+Run it daily (cron, scheduled job): a missing month only means rows land in
+the table's DEFAULT partition until the next run moves them out.
+Retention comes from AUDIT_LOG_RETENTION_MONTHS and MESSAGE_RETENTION_MONTHS
+(0 keeps everything); --archive-dir (PARTITION_ARCHIVE_DIR) writes every
+expired partition to <dir>/<partition>.csv.gz before dropping it, otherwise
+it stays in the database as a plain table outside of the parent.
+"""
+import sys
+import asyncio
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import async_engine
+from app.core.partitions import PARTITIONED_TABLES, detach_old_partitions, ensure_partitions, expired_partitions
+
+# Longest wait for the table locks taken by CREATE/DETACH PARTITION before giving up until the next run
+LOCK_TIMEOUT = "5s"
+
+
+def retention_months(table: str) -> int:
+    """Configured retention of a partitioned table, in months (0 keeps everything)"""
+    if table == "audit_logs":
+        return settings.audit_log_retention_months
+    return settings.message_retention_months
+
+
+async def maintain_partitions(months_ahead: int, archive_dir: Path = None, dry_run: bool = False) -> bool:
+    """
+    Maintain the partitions of every partitioned table
+
+    Upcoming partitions are created in one transaction per table; expired
+    ones are then detached one per transaction and archived afterwards
+    (see detach_old_partitions).
+
+    Args:
+        months_ahead: Future months to pre-create
+        archive_dir: Directory to archive expired partitions to
+        dry_run: Report the changes without making them
+
+    Returns:
+        Whether every table was maintained
+    """
+    ok = True
+    for table in PARTITIONED_TABLES:
+        try:
+            async with async_engine.connect() as conn:
+                transaction = await conn.begin()
+                await conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+                created = await ensure_partitions(conn, table, months_ahead)
+                if dry_run:
+                    detached = await expired_partitions(conn, table, retention_months(table))
+                    await transaction.rollback()
+                else:
+                    await transaction.commit()
+            if not dry_run:
+                detached = await detach_old_partitions(
+                    async_engine, table, retention_months(table), archive_dir, lock_timeout=LOCK_TIMEOUT
+                )
+            prefix = "[dry run] " if dry_run else ""
+            print(f"{prefix}{table}: created {created or 'none'}, detached {detached or 'none'}")
+        except Exception as e:
+            print(f"Error maintaining {table} partitions: {str(e)}")
+            ok = False
+    await async_engine.dispose()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--months-ahead", type=int, default=settings.partition_months_ahead, help="Future months to pre-create"
+    )
+    parser.add_argument(
+        "--archive-dir", default=settings.partition_archive_dir or None, help="Archive expired partitions here"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Report the changes without keeping them")
+    args = parser.parse_args()
+    archive_dir = Path(args.archive_dir) if args.archive_dir else None
+    if not asyncio.run(maintain_partitions(args.months_ahead, archive_dir, args.dry_run)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
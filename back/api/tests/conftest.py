@@ -1,10 +1,13 @@
 """Pytest configuration and fixtures"""
 import pytest
 import os
-from typing import Generator
+from typing import Generator, List
+import httpx
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 # Set test database URL before importing app
 # Use port 5433 for Docker test database
@@ -14,13 +17,25 @@ os.environ["GITHUB_CLIENT_ID"] = "test_client_id"
 os.environ["GITHUB_CLIENT_SECRET"] = "test_client_secret"
 os.environ["GITHUB_REDIRECT_URI"] = "http://localhost/api/v1/auth/github/callback"
 os.environ["APP_ENV"] = "test"
+# Background jobs only run when a test calls job_runner.run_pending()
+os.environ["JOB_WORKERS"] = "0"
 
-from app.database import Base, get_db
+from app.config import settings
+from app.database import Base, get_async_db
 from app.core.security import create_access_token
 from app.models.user import User
 from app.models.skill import Skill
 from app.models.project import Project
+from app.services.skill_index import skill_index
+from app.services.candidate_index import candidate_index
+from app.services.github_service import GitHubService
+from app.services.job_runner import job_runner
+from app.services.audit import audit_sink
+from app.services.project_index import project_index
+from app.services.response_cache import project_cache
+from app.core.identity_cache import identity_cache
 from main import app
+from tests.mock_github import MOCK_GITHUB_URL, MockGitHub
 
 
 # Create test database engine
@@ -31,25 +46,52 @@ test_engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in TEST_DATABASE_URL else {}
 )
 
+# Async engine used by the app under test.
+# NullPool: every TestClient runs its own event loop, so connections must not be reused across tests.
+test_async_engine = create_async_engine(settings.database_url_async, poolclass=NullPool)
+TestAsyncSessionLocal = async_sessionmaker(
+    bind=test_async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 
 @pytest.fixture(scope="function")
 def db_session() -> Generator[Session, None, None]:
     """Create a test database session"""
+    # Enable PostgreSQL extensions (projects.search_vector needs unaccent_immutable,
+    # user search ranks substring matches with pg_trgm similarity())
+    for statement in [
+        "CREATE EXTENSION IF NOT EXISTS unaccent",
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        """
+        CREATE OR REPLACE FUNCTION unaccent_immutable(text)
+        RETURNS text AS $$
+        SELECT unaccent('unaccent', $1);
+        $$ LANGUAGE sql IMMUTABLE
+        """,
+    ]:
+        try:
+            with test_engine.begin() as conn:
+                conn.execute(text(statement))
+        except Exception:
+            # If it already exists or cannot be created, continue
+            pass
+    
     # Create tables
     Base.metadata.create_all(bind=test_engine)
     
+    # IDs are reassigned for every test, so start from empty in-memory indexes and caches
+    skill_index.clear()
+    candidate_index.clear()
+    project_index.clear()
+    project_cache.clear()
+    identity_cache.clear()
+    
     # Create session
     TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
     session = TestSessionLocal()
     
-    # Enable PostgreSQL extensions
-    try:
-        session.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
-        session.commit()
-    except Exception:
-        # If extension already exists or cannot be created, continue
-        session.rollback()
-    
     try:
         yield session
     finally:
@@ -62,13 +104,15 @@ def db_session() -> Generator[Session, None, None]:
 @pytest.fixture(scope="function")
 def client(db_session: Session) -> Generator[TestClient, None, None]:
     """Create a test client"""
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+    async def override_get_async_db():
+        async with TestAsyncSessionLocal() as session:
+            yield session
     
-    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    job_runner.session_factory = TestAsyncSessionLocal
+    audit_sink.session_factory = TestAsyncSessionLocal
+    candidate_index.session_factory = TestAsyncSessionLocal
+    project_index.session_factory = TestAsyncSessionLocal
     
     with TestClient(app) as test_client:
         yield test_client
@@ -76,6 +120,21 @@ def client(db_session: Session) -> Generator[TestClient, None, None]:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def query_counter() -> Generator[List[str], None, None]:
+    """Record every SQL statement the app runs during a test"""
+    statements: List[str] = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(test_async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(test_async_engine.sync_engine, "before_cursor_execute", record)
+
+
 @pytest.fixture
 def test_user(db_session: Session) -> User:
     """Create a test user"""
@@ -127,6 +186,14 @@ def test_skill2(db_session: Session) -> Skill:
     return skill
 
 
+@pytest.fixture
+def pg_trgm(db_session: Session):
+    """Skip the test when the test database cannot load pg_trgm"""
+    installed = db_session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+    if installed is None:
+        pytest.skip("pg_trgm is not available in the test database")
+
+
 @pytest.fixture
 def test_project(db_session: Session, test_user: User, test_skill: Skill) -> Project:
     """Create a test project"""
@@ -163,3 +230,22 @@ def auth_headers(auth_token: str) -> dict:
     """Create authorization headers"""
     return {"Authorization": f"Bearer {auth_token}"}
 
+
+@pytest.fixture
+def mock_github(client: TestClient, monkeypatch) -> Generator[MockGitHub, None, None]:
+    """GitHubService talking to an in-process GitHub stand-in"""
+    github = MockGitHub(latency=0.05)
+    monkeypatch.setattr(settings, "github_oauth_url", f"{MOCK_GITHUB_URL}/login/oauth")
+    monkeypatch.setattr(settings, "github_api_url", MOCK_GITHUB_URL)
+    monkeypatch.setattr(settings, "github_retry_backoff_seconds", 0.01)
+    client.portal.call(GitHubService.start, httpx.ASGITransport(app=github.app))
+    yield github
+    client.portal.call(GitHubService.stop)
+
+
+def receive_chat_json(ws) -> dict:
+    """Next frame of a test WebSocket, skipping presence and typing events"""
+    while True:
+        frame = ws.receive_json()
+        if frame["type"] not in ("presence", "typing"):
+            return frame
@@ -0,0 +1,109 @@
+"""ASGI stand-in for the GitHub OAuth and REST endpoints used by GitHubService"""
+import json
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Form, Request, Response
+from fastapi.responses import JSONResponse
+
+MOCK_GITHUB_URL = "http://github.mock"
+
+
+class MockGitHub:
+    """
+    Minimal GitHub: token exchange, /user, /user/emails and /users/{login}/repos
+
+    Every request waits `latency` seconds (a stand-in for the network round
+    trip). `failures` maps a path to the number of 503 responses it returns
+    before succeeding. Paths served, and the highest number of requests in
+    flight at once, are recorded.
+
+    The repository listing serves `repos` (one repository per login if
+    unset) sorted by name, paginated with Link headers, with an ETag per
+    page and 304 for a matching If-None-Match; `not_modified` counts those.
+    """
+
+    def __init__(self, latency: float = 0.0, user_id: int = 424242, login: str = "mockuser"):
+        self.latency = latency
+        self.user_id = user_id
+        self.login = login
+        self.failures: Dict[str, int] = {}
+        self.calls: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.repos: Optional[List[Dict[str, Any]]] = None
+        self.not_modified = 0
+        self.app = self._build()
+
+    def _build(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def simulate_network(request: Request, call_next):
+            self.calls.append(request.url.path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if self.failures.get(request.url.path, 0) > 0:
+                    self.failures[request.url.path] -= 1
+                    return JSONResponse({"message": "Service Unavailable"}, status_code=503)
+                return await call_next(request)
+            finally:
+                self.in_flight -= 1
+
+        @app.post("/login/oauth/access_token")
+        async def access_token(code: str = Form(...)):
+            if code == "bad_code":
+                return {"error": "bad_verification_code"}
+            return {"access_token": f"gho_{code}", "token_type": "bearer", "scope": "read:user,user:email"}
+
+        @app.get("/user")
+        async def user():
+            return {
+                "id": self.user_id,
+                "login": self.login,
+                "avatar_url": f"https://avatars.githubusercontent.com/u/{self.user_id}",
+                "bio": "Mock bio"
+            }
+
+        @app.get("/user/emails")
+        async def emails():
+            return [
+                {"email": f"{self.login}@users.noreply.github.com", "primary": False, "verified": True},
+                {"email": f"{self.login}@example.com", "primary": True, "verified": True}
+            ]
+
+        @app.get("/users/{login}/repos")
+        async def repos(request: Request, login: str, page: int = 1, per_page: int = 30):
+            listing = self.repos if self.repos is not None else [mock_repo(login, "mock")]
+            listing = sorted(listing, key=lambda repo: repo["full_name"])
+            last = max(1, -(-len(listing) // per_page))
+            body = json.dumps(listing[(page - 1) * per_page:page * per_page])
+            etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+            if request.headers.get("if-none-match") == etag:
+                self.not_modified += 1
+                return Response(status_code=304, headers={"ETag": etag})
+
+            headers = {"ETag": etag}
+            if page < last:
+                headers["Link"] = ", ".join([
+                    f'<{request.url.include_query_params(page=page + 1)}>; rel="next"',
+                    f'<{request.url.include_query_params(page=last)}>; rel="last"'
+                ])
+            return Response(body, media_type="application/json", headers=headers)
+
+        return app
+
+
+def mock_repo(login: str, name: str, stars: int = 3, language: Optional[str] = "Python") -> Dict[str, Any]:
+    """A repository as listed by the GitHub REST API"""
+    return {
+        "full_name": f"{login}/{name}",
+        "stargazers_count": stars,
+        "language": language,
+        "html_url": f"https://github.com/{login}/{name}",
+        "pushed_at": "2026-01-01T00:00:00Z"
+    }
@@ -0,0 +1,97 @@
+"""Tests for the audit log sink"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.audit import AuditLog
+from app.services.audit import AuditSink, audit_sink
+from tests.conftest import TestAsyncSessionLocal
+
+
+@pytest.fixture
+def buffered(db_session: Session, monkeypatch):
+    """Audit events go through the background writer"""
+    monkeypatch.setattr(settings, "audit_mode", "buffered")
+
+
+async def _audit_count() -> int:
+    async with TestAsyncSessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(AuditLog))).scalar()
+
+
+def _unavailable():
+    raise ConnectionError("database unavailable")
+
+
+async def test_buffered_events_follow_the_transaction(buffered):
+    """Committed events are written in a batch; rolled back ones are dropped"""
+    sink = AuditSink(session_factory=TestAsyncSessionLocal, batch_size=100, flush_interval_ms=20)
+    await sink.start()
+
+    async with TestAsyncSessionLocal() as db:
+        await sink.record(db, action="A", resource="tests")
+        await sink.record(db, action="B", resource="tests", payload={"n": 1})
+        assert sink.pending == []  # nothing until the transaction commits
+        await db.commit()
+    async with TestAsyncSessionLocal() as db:
+        await sink.record(db, action="C", resource="tests")
+        await db.rollback()
+
+    for _ in range(50):
+        if sink.written == 2:
+            break
+        await asyncio.sleep(0.02)
+    assert sink.written == 2
+    async with TestAsyncSessionLocal() as db:
+        rows = (await db.execute(select(AuditLog.action, AuditLog.payload).order_by(AuditLog.id))).all()
+    assert [tuple(row) for row in rows] == [("A", None), ("B", {"n": 1})]
+    await sink.stop()
+
+
+async def test_full_buffer_blocks_writers_and_shutdown_drains(buffered):
+    """With the database down, record() waits at max_pending; stop() writes everything once it is back"""
+    sink = AuditSink(session_factory=_unavailable, batch_size=100, flush_interval_ms=1, max_pending=2)
+    await sink.start()
+    async with TestAsyncSessionLocal() as db:
+        await sink.record(db, action="A")
+        await sink.record(db, action="B")
+        await db.commit()
+
+    async with TestAsyncSessionLocal() as db:
+        blocked = asyncio.create_task(sink.record(db, action="C"))
+        await asyncio.sleep(0.2)
+        assert not blocked.done()
+        assert sink.failed_flushes >= 1
+
+        sink.session_factory = TestAsyncSessionLocal
+        await asyncio.wait_for(blocked, timeout=5)
+        await db.commit()
+
+    await sink.stop()
+    assert sink.stats()["pending"] == 0
+    assert await _audit_count() == 3
+
+
+def test_endpoint_audit_is_written_by_the_writer(
+    client: TestClient,
+    db_session: Session,
+    test_skill,
+    auth_headers: dict,
+    buffered
+):
+    """A mutating endpoint's audit event reaches the table through the buffered writer"""
+    client.portal.call(audit_sink.start)
+    project_data = {
+        "title": "Audited",
+        "description": "Audited project",
+        "required_skills": [{"skill_id": test_skill.id, "required_level": 3}]
+    }
+    assert client.post("/api/v1/projects", json=project_data, headers=auth_headers).status_code == 201
+    client.portal.call(audit_sink.stop)
+
+    actions = [a for (a,) in db_session.query(AuditLog.action).all()]
+    assert actions == ["CREATE_PROJECT"]
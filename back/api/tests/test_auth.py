@@ -1,13 +1,17 @@
 """Tests for authentication endpoints"""
+from datetime import datetime
 from urllib.parse import urlparse, parse_qsl
 
+import pytest
 from fastapi.testclient import TestClient
 from httpx import Response
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.core.identity_cache import identity_cache
 from app.models.user import OAuthAccount, User
 from app.services.github_service import GitHubService
+from tests.mock_github import MockGitHub
 
 
 def _assert_profile_redirect(response: Response) -> dict:
@@ -40,6 +44,14 @@ def test_github_login_redirect(client: TestClient):
     assert "github.com" in response.headers.get("location", "")
 
 
+def test_github_login_redirect_follows_oauth_url_setting(client: TestClient, mock_github):
+    """The authorize URL uses the same OAuth base URL as the token exchange"""
+    from tests.mock_github import MOCK_GITHUB_URL
+    
+    response = client.get("/api/v1/auth/github/login", follow_redirects=False)
+    assert response.headers["location"].startswith(f"{MOCK_GITHUB_URL}/login/oauth/authorize?")
+
+
 def test_get_current_user_unauthorized(client: TestClient):
     """Test getting current user without authentication"""
     response = client.get("/api/v1/auth/me")
@@ -166,3 +178,68 @@ def test_github_callback_generates_unique_handle(client: TestClient, db_session:
     )
     assert oauth_record.user_id == new_user.id
 
+
+
+def test_current_user_is_cached_per_token(client: TestClient, test_user, auth_headers: dict, query_counter):
+    """A repeat request skips the users lookup until the profile changes"""
+    counts = []
+    for _ in range(2):
+        query_counter.clear()
+        response = client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.status_code == 200
+        counts.append(sum("FROM users" in statement for statement in query_counter))
+    assert counts == [1, 0]
+
+    response = client.patch("/api/v1/users/me", json={"bio": "Cached bio"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    query_counter.clear()
+    response = client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.json()["bio"] == "Cached bio"
+    assert sum("FROM users" in statement for statement in query_counter) == 1
+
+    stats = identity_cache.stats()
+    assert stats["saved_queries"] >= 2
+    assert stats["token_hits"] >= 3
+
+
+def test_soft_deleted_user_is_rejected_after_invalidation(
+    client: TestClient,
+    db_session: Session,
+    test_user,
+    auth_headers: dict
+):
+    """Soft deletes take effect once the user's cache entries are invalidated"""
+    assert client.get("/api/v1/auth/me", headers=auth_headers).status_code == 200
+
+    test_user.deleted_at = datetime.utcnow()
+    db_session.commit()
+    identity_cache.invalidate_user(test_user.id)
+
+    response = client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 401
+
+
+def test_github_login_against_mock_server(client: TestClient, db_session: Session, mock_github: MockGitHub):
+    """A login takes two round trips: the token exchange, then user and emails concurrently"""
+    mock_github.failures["/user/emails"] = 1  # retried with backoff
+
+    response = client.get("/api/v1/auth/github/callback", params={"code": "mock_code"}, follow_redirects=False)
+    _assert_profile_redirect(response)
+
+    assert mock_github.calls[0] == "/login/oauth/access_token"
+    assert sorted(mock_github.calls[1:]) == ["/user", "/user/emails", "/user/emails"]
+    assert mock_github.max_in_flight == 2
+
+    user = db_session.query(User).filter(User.github_login == "mockuser").one()
+    assert user.email == "mockuser@example.com"
+    assert db_session.query(OAuthAccount).filter(OAuthAccount.user_id == user.id).one().access_token == "gho_mock_code"
+
+
+def test_github_token_exchange_is_not_retried(client: TestClient, mock_github: MockGitHub):
+    """A failed token exchange is not repeated (the code is single-use)"""
+    mock_github.failures["/login/oauth/access_token"] = 1
+
+    response = client.get("/api/v1/auth/github/callback", params={"code": "mock_code"}, follow_redirects=False)
+    assert response.status_code == 500
+    assert mock_github.calls == ["/login/oauth/access_token"]
@@ -0,0 +1,134 @@
+"""Tests for cross-worker chat fan-out through the backplane"""
+import os
+import json
+import uuid
+import asyncio
+import pytest
+
+from app.services.backplane import InProcessBackplane, PayloadTooLarge, PostgresBackplane
+from app.services.chat_service import ConnectionManager
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a Starlette WebSocket (presence events are kept apart)"""
+
+    def __init__(self):
+        self.sent = []
+        self.presence = []
+        self.received = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        message = json.loads(data)
+        if message["type"] == "presence":
+            self.presence.append(message)
+            return
+        self.sent.append(message)
+        self.received.set()
+
+
+@pytest.fixture
+async def two_workers():
+    """Two connection managers sharing one database, as two workers would"""
+    channel = f"test_chat_{uuid.uuid4().hex[:8]}"
+    worker_a = ConnectionManager(PostgresBackplane(channel=channel))
+    worker_b = ConnectionManager(PostgresBackplane(channel=channel))
+    await worker_a.start()
+    await worker_b.start()
+    try:
+        yield worker_a, worker_b
+    finally:
+        await worker_a.stop()
+        await worker_b.stop()
+
+
+async def test_in_process_backplane_delivers_locally():
+    """The default backplane delivers straight to local sockets"""
+    manager = ConnectionManager(InProcessBackplane())
+    await manager.start()
+    ws = FakeWebSocket()
+    await manager.connect(ws, "user-1", "conv-1")
+
+    await manager.send_to_conversation("conv-1", {"type": "message", "body": "hi"})
+    await asyncio.wait_for(ws.received.wait(), timeout=5)
+
+    assert ws.sent == [{"type": "message", "body": "hi"}]
+    await manager.stop()
+
+
+async def test_conversation_message_reaches_other_worker(two_workers):
+    """A message published on worker A is delivered to a socket held by worker B"""
+    worker_a, worker_b = two_workers
+    ws_a = FakeWebSocket()
+    ws_b = FakeWebSocket()
+    await worker_a.connect(ws_a, "user-a", "conv-1")
+    await worker_b.connect(ws_b, "user-b", "conv-1")
+
+    await worker_a.send_to_conversation("conv-1", {"type": "message", "body": "hello"})
+    await asyncio.wait_for(ws_b.received.wait(), timeout=5)
+
+    # Each socket receives the message exactly once
+    await asyncio.sleep(0.2)
+    assert ws_a.sent == [{"type": "message", "body": "hello"}]
+    assert ws_b.sent == [{"type": "message", "body": "hello"}]
+
+
+async def test_signaling_reaches_user_on_other_worker(two_workers):
+    """WebRTC signaling sent to a user is delivered by the worker holding their socket"""
+    worker_a, worker_b = two_workers
+    ws_b = FakeWebSocket()
+    await worker_b.connect(ws_b, "user-b", "conv-1")
+
+    # Large SDP payloads are compressed to fit in a NOTIFY
+    offer = {"type": "offer", "sender_id": "user-a", "sdp": "v=0\r\n" * 3000}
+    await worker_a.send_to_user("user-b", offer)
+    await asyncio.wait_for(ws_b.received.wait(), timeout=5)
+
+    assert ws_b.sent == [offer]
+
+
+async def test_oversized_event_is_refused(two_workers):
+    """An event that does not fit in a NOTIFY even compressed is refused, not delivered locally only"""
+    worker_a, worker_b = two_workers
+    ws_a = FakeWebSocket()
+    await worker_a.connect(ws_a, "user-a", "conv-1")
+
+    message = {"type": "message", "body": os.urandom(8000).hex()}
+    assert worker_a.fits("conversation", "conv-1", {"type": "message", "body": "hello"})
+    assert not worker_a.fits("conversation", "conv-1", message)
+    with pytest.raises(PayloadTooLarge):
+        await worker_a.send_to_conversation("conv-1", message)
+
+    await asyncio.sleep(0.2)
+    assert ws_a.sent == []
+
+
+async def test_presence_of_user_on_other_worker(two_workers):
+    """A user connected to worker A is reported online by worker B"""
+    worker_a, worker_b = two_workers
+    ws_a = FakeWebSocket()
+    ws_b = FakeWebSocket()
+    await worker_b.connect(ws_b, "user-b", "conv-1")
+    await worker_a.connect(ws_a, "user-a", "conv-1")
+
+    for _ in range(50):
+        if worker_b.get_presence(["user-a"])["user-a"] == "online":
+            break
+        await asyncio.sleep(0.1)
+    assert worker_b.get_presence(["user-a"]) == {"user-a": "online"}
+    assert {"type": "presence", "user_id": "user-a", "status": "online"} in ws_b.presence
+
+
+async def test_backplane_stops_without_traffic():
+    """stop() returns promptly while the listener is idle, however often it is restarted"""
+    backplane = PostgresBackplane(channel=f"test_chat_{uuid.uuid4().hex[:8]}")
+
+    async def deliver(target, key, message):
+        pass
+
+    for _ in range(10):
+        await backplane.start(deliver)
+        await asyncio.wait_for(backplane.stop(), timeout=5)
+        assert backplane._listener is None
@@ -0,0 +1,140 @@
+"""Tests for ConnectionManager fan-out"""
+import json
+import asyncio
+
+from app.services.backplane import InProcessBackplane
+from app.services.chat_service import ConnectionManager
+
+
+class RecordingWebSocket:
+    """WebSocket stand-in that records frames and can be made slow (presence events are kept apart)"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.frames = []
+        self.presence = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        if '"type":"presence"' in data:
+            self.presence.append(json.loads(data))
+            return
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames.append(data)
+
+    async def close(self, code: int = 1000, reason: str = None):
+        self.closed_with = code
+
+
+async def _started_manager() -> ConnectionManager:
+    manager = ConnectionManager(InProcessBackplane())
+    await manager.start()
+    return manager
+
+
+async def test_broadcast_encodes_once_and_is_not_blocked_by_slow_client():
+    """A slow socket does not hold up the other members of the room"""
+    manager = await _started_manager()
+    slow = RecordingWebSocket(delay=1.0)
+    fast = [RecordingWebSocket() for _ in range(5)]
+    await manager.connect(slow, "slow-user", "room")
+    for i, ws in enumerate(fast):
+        await manager.connect(ws, f"user-{i}", "room")
+
+    await manager.send_to_conversation("room", {"type": "message", "body": "hi"})
+    await asyncio.sleep(0.05)
+
+    assert all(len(ws.frames) == 1 for ws in fast)
+    assert slow.frames == []
+    # Every socket gets the very same encoded frame
+    assert len({id(ws.frames[0]) for ws in fast}) == 1
+    assert json.loads(fast[0].frames[0]) == {"type": "message", "body": "hi"}
+    await manager.stop()
+
+
+async def test_send_queue_overflow_disconnects_client(monkeypatch):
+    """A client whose queue overflows is dropped instead of stalling the room"""
+    from app.config import settings
+    monkeypatch.setattr(settings, "chat_send_queue_size", 2)
+    manager = await _started_manager()
+    stuck = RecordingWebSocket(delay=10)
+    healthy = RecordingWebSocket()
+    await manager.connect(stuck, "stuck-user", "room")
+    await manager.connect(healthy, "healthy-user", "room")
+    await asyncio.sleep(0.01)  # let the presence announcements go out first
+
+    for i in range(5):
+        await manager.send_to_conversation("room", {"type": "message", "body": str(i)})
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.05)
+
+    assert stuck.closed_with == 1013
+    assert manager.get_user_id(stuck) is None
+    assert manager._close_tasks == set()  # the close task was kept until it finished
+    assert "room" in manager.active_connections
+    assert [json.loads(f)["body"] for f in healthy.frames] == ["0", "1", "2", "3", "4"]
+    await manager.stop()
+
+
+async def test_presence_is_announced_to_the_room(monkeypatch):
+    """Peers see a user come online, go away, and go offline after the grace period"""
+    from app.config import settings
+    monkeypatch.setattr(settings, "presence_min_interval_seconds", 0)
+    monkeypatch.setattr(settings, "presence_offline_grace_seconds", 0.05)
+    manager = await _started_manager()
+    peer = RecordingWebSocket()
+    user = RecordingWebSocket()
+    await manager.connect(peer, "peer", "room")
+    await manager.connect(user, "user", "room")
+    await asyncio.sleep(0.01)
+    assert {"type": "presence", "user_id": "user", "status": "online"} in peer.presence
+
+    manager.set_status(user, "away")
+    await asyncio.sleep(0.01)
+    assert peer.presence[-1] == {"type": "presence", "user_id": "user", "status": "away"}
+    assert manager.get_presence(["user", "peer", "nobody"]) == {
+        "user": "away", "peer": "online", "nobody": "offline"
+    }
+
+    # A reconnect within the grace period is not announced
+    manager.disconnect(user)
+    await manager.connect(user, "user", "room")
+    await asyncio.sleep(0.1)
+    assert [p["status"] for p in peer.presence if p["user_id"] == "user"] == ["online", "away", "online"]
+
+    manager.disconnect(user)
+    await asyncio.sleep(0.1)
+    assert peer.presence[-1] == {"type": "presence", "user_id": "user", "status": "offline"}
+    await manager.stop()
+
+
+async def test_typing_is_coalesced_and_rate_limited(monkeypatch):
+    """A typing storm yields one event per room and flush window"""
+    from app.config import settings
+    monkeypatch.setattr(settings, "chat_typing_flush_ms", 50)
+    manager = await _started_manager()
+    peer = RecordingWebSocket()
+    await manager.connect(peer, "peer", "room")
+    for i in range(20):
+        await manager.connect(RecordingWebSocket(), f"typist-{i}", "room")
+    await asyncio.sleep(0.01)
+
+    for _ in range(10):
+        for i in range(20):
+            manager.typing.update("room", f"typist-{i}", True)
+    assert manager.typing.update("room", "typist-0", True) is False  # within the refresh interval
+    await asyncio.sleep(0.1)
+
+    events = [json.loads(f) for f in peer.frames]
+    assert len(events) == 1
+    assert events[0]["type"] == "typing"
+    assert len(events[0]["typing"]) == 20 and events[0]["stopped"] == []
+
+    manager.typing.update("room", "typist-0", False)
+    await asyncio.sleep(0.1)
+    assert json.loads(peer.frames[-1])["stopped"] == ["typist-0"]
+    await manager.stop()
@@ -1,5 +1,6 @@
 """Tests for group chat endpoints"""
 import pytest
+from datetime import datetime
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from app.models.user import User
@@ -238,6 +239,56 @@ def test_get_group_conversation_pagination(
     assert result["has_more"] is True
 
 
+def test_get_group_conversation_cursor_pagination(
+    client: TestClient,
+    db_session: Session,
+    test_group_conversation: GroupConversation,
+    test_user: User,
+    auth_headers: dict
+):
+    """Test walking message history with before cursors across equal timestamps"""
+    same_time = datetime(2025, 1, 1, 12, 0, 0)
+    for i in range(7):
+        db_session.add(GroupMessage(
+            group_conversation_id=test_group_conversation.id,
+            sender_id=test_user.id,
+            body=f"Message {i}",
+            created_at=same_time
+        ))
+    db_session.commit()
+    
+    bodies = []
+    params = {"limit": 3}
+    while True:
+        response = client.get(
+            f"/api/v1/group-chats/{test_group_conversation.id}",
+            params=params,
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        result = response.json()
+        bodies = [m["body"] for m in result["messages"]] + bodies
+        if not result["has_more"]:
+            break
+        params = {"limit": 3, "before": result["before_cursor"]}
+    
+    assert bodies == [f"Message {i}" for i in range(7)]
+
+
+def test_get_group_conversation_invalid_cursor(
+    client: TestClient,
+    test_group_conversation: GroupConversation,
+    auth_headers: dict
+):
+    """Test that a malformed cursor is rejected"""
+    response = client.get(
+        f"/api/v1/group-chats/{test_group_conversation.id}",
+        params={"before": "not-a-cursor"},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
 def test_update_group_conversation(
     client: TestClient,
     test_group_conversation: GroupConversation,
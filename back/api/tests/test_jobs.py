@@ -0,0 +1,190 @@
+"""Tests for the background job runner"""
+import asyncio
+
+import pytest
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.job import Job
+from app.services.job_runner import JobRunner, JobFailed
+from tests.conftest import TestAsyncSessionLocal
+
+
+@pytest.fixture
+def runner(db_session: Session, monkeypatch) -> JobRunner:
+    """A runner with no workers, a flaky handler and a broken one"""
+    monkeypatch.setattr(settings, "job_retry_backoff_seconds", 0)
+    runner = JobRunner(session_factory=TestAsyncSessionLocal, workers=0)
+    runner.failures_left = 0
+
+    @runner.handler("flaky")
+    async def flaky(job, session_factory):
+        if runner.failures_left > 0:
+            runner.failures_left -= 1
+            raise RuntimeError("GitHub is down")
+        return {"echo": job.payload["value"]}
+
+    @runner.handler("broken")
+    async def broken(job, session_factory):
+        raise JobFailed("not retryable")
+
+    return runner
+
+
+async def _enqueue(runner: JobRunner, kind: str, **kwargs) -> Job:
+    async with TestAsyncSessionLocal() as db:
+        job = await runner.enqueue(db, kind, **kwargs)
+        await db.commit()
+        return job
+
+
+async def _get(job_id) -> Job:
+    async with TestAsyncSessionLocal() as db:
+        return await db.get(Job, job_id)
+
+
+async def test_failed_job_is_retried_until_it_succeeds(runner: JobRunner):
+    """Failures re-queue the job; the result is stored once a run succeeds"""
+    runner.failures_left = 2
+    job = await _enqueue(runner, "flaky", payload={"value": 7})
+
+    assert await runner.run_pending() == 3
+    job = await _get(job.id)
+    assert job.status == "succeeded"
+    assert job.attempts == 3
+    assert job.result == {"echo": 7}
+    assert job.finished_at is not None
+
+
+async def test_job_fails_after_max_attempts_or_job_failed(runner: JobRunner):
+    """Retries stop at max_attempts; JobFailed fails at once"""
+    runner.failures_left = 10
+    flaky = await _enqueue(runner, "flaky", payload={"value": 1}, max_attempts=2)
+    broken = await _enqueue(runner, "broken")
+
+    assert await runner.run_pending() == 3
+    flaky = await _get(flaky.id)
+    assert (flaky.status, flaky.attempts, flaky.error) == ("failed", 2, "GitHub is down")
+    broken = await _get(broken.id)
+    assert (broken.status, broken.attempts, broken.error) == ("failed", 1, "not retryable")
+
+
+async def test_retry_waits_for_backoff(runner: JobRunner, monkeypatch):
+    """A failed job is not due again before its backoff passes"""
+    monkeypatch.setattr(settings, "job_retry_backoff_seconds", 60)
+    runner.failures_left = 1
+    job = await _enqueue(runner, "flaky", payload={"value": 1})
+
+    assert await runner.run_pending() == 1
+    assert (await _get(job.id)).status == "queued"
+    assert await runner.run_pending() == 0
+
+
+async def test_dedupe_key_returns_active_job(runner: JobRunner):
+    """One queued or running job per dedupe key; a finished job does not block a new one"""
+    first = await _enqueue(runner, "flaky", payload={"value": 1}, dedupe_key="k")
+    second = await _enqueue(runner, "flaky", payload={"value": 2}, dedupe_key="k")
+    assert second.id == first.id
+
+    await runner.run_pending()
+    third = await _enqueue(runner, "flaky", payload={"value": 3}, dedupe_key="k")
+    assert third.id != first.id
+
+
+async def test_enqueue_retries_when_the_active_job_finishes_meanwhile(runner: JobRunner, monkeypatch):
+    """A job finishing between the conflicting insert and the lookup makes enqueue insert again"""
+    first = await _enqueue(runner, "flaky", payload={"value": 1}, dedupe_key="k")
+
+    async with TestAsyncSessionLocal() as db:
+        execute = db.execute
+        statements = []
+
+        async def finish_first_job(statement, *args, **kwargs):
+            statements.append(statement)
+            if len(statements) == 2:
+                async with TestAsyncSessionLocal() as other:
+                    await other.execute(update(Job).where(Job.id == first.id).values(status="succeeded"))
+                    await other.commit()
+            return await execute(statement, *args, **kwargs)
+
+        monkeypatch.setattr(db, "execute", finish_first_job)
+        job = await runner.enqueue(db, "flaky", payload={"value": 2}, dedupe_key="k")
+        await db.commit()
+
+    assert len(statements) == 3
+    assert job.id != first.id
+    assert (await _get(job.id)).status == "queued"
+
+
+async def test_expired_lease_is_requeued(runner: JobRunner):
+    """A job left running by a dead worker runs again once its lease expires"""
+    job = await _enqueue(runner, "flaky", payload={"value": 1})
+    claimed = await runner._claim()
+    assert claimed.id == job.id
+
+    async with TestAsyncSessionLocal() as db:
+        await db.execute(
+            update(Job).where(Job.id == job.id).values(locked_until=text("now() - interval '1 second'"))
+        )
+        await db.commit()
+    await runner._maintain()
+
+    assert await runner.run_pending() == 1
+    job = await _get(job.id)
+    assert (job.status, job.attempts) == ("succeeded", 2)
+
+
+async def test_expired_lease_is_requeued_while_workers_are_busy(runner: JobRunner, monkeypatch):
+    """Maintenance runs on its own interval, not only when a worker is idle"""
+    monkeypatch.setattr(settings, "job_maintenance_seconds", 0.05)
+    release = asyncio.Event()
+
+    @runner.handler("slow")
+    async def slow(job, session_factory):
+        await release.wait()
+
+    runner.workers = 1
+    await runner.start()
+    try:
+        busy = await _enqueue(runner, "slow")
+        runner.notify()
+        for _ in range(100):
+            if (await _get(busy.id)).status == "running":
+                break
+            await asyncio.sleep(0.05)
+
+        stuck = await _enqueue(runner, "flaky", payload={"value": 1})
+        assert (await runner._claim()).id == stuck.id
+        async with TestAsyncSessionLocal() as db:
+            await db.execute(
+                update(Job).where(Job.id == stuck.id).values(locked_until=text("now() - interval '1 second'"))
+            )
+            await db.commit()
+        for _ in range(100):
+            stuck = await _get(stuck.id)
+            if stuck.status == "queued":
+                break
+            await asyncio.sleep(0.05)
+        assert (stuck.status, stuck.error) == ("queued", "Lease expired")
+        assert (await _get(busy.id)).status == "running"
+    finally:
+        release.set()
+        await runner.stop()
+
+
+async def test_workers_run_notified_jobs(runner: JobRunner):
+    """Started workers pick up a job as soon as notify() is called"""
+    runner.workers = 2
+    await runner.start()
+    try:
+        job = await _enqueue(runner, "flaky", payload={"value": 5})
+        runner.notify()
+        for _ in range(100):
+            job = await _get(job.id)
+            if job.status == "succeeded":
+                break
+            await asyncio.sleep(0.05)
+        assert job.status == "succeeded"
+    finally:
+        await runner.stop()
@@ -84,3 +84,65 @@ def test_get_conversation(
     assert "messages" in data
     assert data["match_id"] == str(match.id)
 
+
+
+def test_get_conversation_after_cursor(
+    client: TestClient,
+    db_session,
+    test_project,
+    test_user,
+    test_user2,
+    auth_headers: dict
+):
+    """Test catching up on new messages with an after cursor"""
+    from app.models.match import Match
+    from app.models.chat import Conversation, Message
+    
+    match = Match(
+        project_id=test_project.id,
+        user_a=test_user.id,
+        user_b=test_user2.id
+    )
+    db_session.add(match)
+    db_session.flush()
+    conversation = Conversation(match_id=match.id)
+    db_session.add(conversation)
+    db_session.flush()
+    for i in range(3):
+        db_session.add(Message(conversation_id=conversation.id, sender_id=test_user.id, body=f"Old {i}"))
+    db_session.commit()
+    
+    response = client.get(f"/api/v1/matches/{match.id}/conversation", headers=auth_headers)
+    assert response.status_code == 200
+    after_cursor = response.json()["after_cursor"]
+    
+    # Messages arriving while the client was disconnected
+    for i in range(4):
+        db_session.add(Message(conversation_id=conversation.id, sender_id=test_user2.id, body=f"New {i}"))
+    db_session.commit()
+    
+    response = client.get(
+        f"/api/v1/matches/{match.id}/conversation",
+        params={"after": after_cursor, "limit": 3},
+        headers=auth_headers
+    )
+    data = response.json()
+    assert [m["body"] for m in data["messages"]] == ["New 0", "New 1", "New 2"]
+    assert data["has_more"] is True
+    
+    response = client.get(
+        f"/api/v1/matches/{match.id}/conversation",
+        params={"after": data["after_cursor"], "limit": 3},
+        headers=auth_headers
+    )
+    data = response.json()
+    assert [m["body"] for m in data["messages"]] == ["New 3"]
+    assert data["has_more"] is False
+    
+    # One direction per page
+    response = client.get(
+        f"/api/v1/matches/{match.id}/conversation",
+        params={"after": data["after_cursor"], "before": data["before_cursor"]},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
@@ -0,0 +1,198 @@
+"""Tests for current-user endpoints"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.models.application import Application
+from app.models.chat import Conversation
+from app.models.group_chat import GroupConversation, GroupMember, MemberRole
+from app.models.match import Match
+from app.models.project import Project, ProjectSkill
+from app.models.skill import UserSkill
+from tests.conftest import receive_chat_json
+
+
+def add_project(db_session, owner, title, skills):
+    """Create an open project requiring the given {skill: level}"""
+    project = Project(owner_id=owner.id, title=title, description="", status="open")
+    db_session.add(project)
+    db_session.flush()
+    for skill, level in skills.items():
+        db_session.add(ProjectSkill(project_id=project.id, skill_id=skill.id, required_level=level))
+    return project
+
+
+def test_recommended_projects(
+    client: TestClient,
+    db_session,
+    test_user,
+    test_user2,
+    test_skill,
+    test_skill2,
+    auth_headers: dict
+):
+    """Projects are ranked by skill fit and by skills of favorited projects"""
+    db_session.add(UserSkill(user_id=test_user.id, skill_id=test_skill.id, level=5))
+    add_project(db_session, test_user2, "Python", {test_skill: 3})
+    add_project(db_session, test_user2, "Full stack", {test_skill: 5, test_skill2: 3})
+    frontend = add_project(db_session, test_user2, "Frontend", {test_skill2: 3})
+    add_project(db_session, test_user, "Own project", {test_skill: 3})
+    applied = add_project(db_session, test_user2, "Applied", {test_skill: 3})
+    db_session.add(Application(project_id=applied.id, applicant_id=test_user.id, status="pending"))
+    db_session.commit()
+    
+    response = client.get("/api/v1/me/recommended-projects", headers=auth_headers)
+    assert response.status_code == 200
+    assert [p["title"] for p in response.json()["projects"]] == ["Python", "Full stack"]
+    
+    # Favoriting a frontend project surfaces other projects needing its skills
+    response = client.post(f"/api/v1/projects/{frontend.id}/favorite", headers=auth_headers)
+    assert response.status_code == 200
+    
+    response = client.get("/api/v1/me/recommended-projects", headers=auth_headers)
+    projects = response.json()["projects"]
+    assert [p["title"] for p in projects] == ["Python", "Full stack", "Frontend"]
+    assert projects[2]["is_favorited"]
+
+
+def test_recommended_projects_cache_invalidation(
+    client: TestClient,
+    test_user,
+    test_user2,
+    test_skill,
+    auth_headers: dict
+):
+    """The cached feed is rebuilt when the user's skills change"""
+    other_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user2.id)})}"}
+    
+    response = client.get("/api/v1/me/recommended-projects", headers=auth_headers)
+    assert response.json()["projects"] == []
+    
+    response = client.post(
+        "/api/v1/projects",
+        json={"title": "New", "description": "", "required_skills": [{"skill_id": test_skill.id, "required_level": 2}]},
+        headers=other_headers
+    )
+    assert response.status_code == 201
+    
+    response = client.put(
+        "/api/v1/users/me/skills",
+        json=[{"skill_id": test_skill.id, "level": 4}],
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    
+    response = client.get("/api/v1/me/recommended-projects", headers=auth_headers)
+    assert [p["title"] for p in response.json()["projects"]] == ["New"]
+
+
+async def test_project_index_reloads_once_in_the_background(db_session, test_user, test_user2, test_skill):
+    """Concurrent callers share one reload; a stale index keeps ranking while it runs"""
+    import asyncio
+    from app.services.project_index import ProjectIndex
+    from tests.conftest import TestAsyncSessionLocal
+    
+    project = add_project(db_session, test_user2, "Python", {test_skill: 3})
+    db_session.commit()
+    skills = {test_skill.id: 4}
+    
+    index = ProjectIndex(ttl_seconds=0, feed_ttl_seconds=60, session_factory=TestAsyncSessionLocal)
+    await asyncio.gather(index.ensure_loaded(), index.ensure_loaded())
+    assert [project_id for project_id, _ in index.rank(test_user.id, skills)] == [project.id]
+    
+    # Stale (TTL 0): callers return at once with the current index
+    await asyncio.gather(index.ensure_loaded(), index.ensure_loaded())
+    reload = index._reload
+    assert reload is not None
+    assert [project_id for project_id, _ in index.rank(test_user.id, skills)] == [project.id]
+    
+    # A project closed during the reload stays closed after the swap
+    index.set_project(project.id, test_user2.id, None, is_open=False)
+    await reload
+    assert index._reload is None
+    assert index.rank(test_user.id, skills) == []
+
+
+def send_messages(client: TestClient, url: str, bodies):
+    """Send chat messages over a WebSocket and wait for each to be stored"""
+    with client.websocket_connect(url) as ws:
+        for body in bodies:
+            ws.send_json({"type": "message", "body": body})
+            assert receive_chat_json(ws)["body"] == body
+
+
+def test_conversation_list_unread_and_read_cursors(
+    client: TestClient,
+    db_session,
+    test_project,
+    test_user,
+    test_user2,
+    auth_headers: dict,
+    query_counter
+):
+    """The list carries last message and unread counts, and marking read resets them"""
+    match = Match(project_id=test_project.id, user_a=test_user.id, user_b=test_user2.id)
+    group = GroupConversation(project_id=test_project.id, name="Team")
+    db_session.add_all([match, group])
+    db_session.flush()
+    conversation = Conversation(match_id=match.id)
+    db_session.add_all([
+        conversation,
+        GroupMember(group_conversation_id=group.id, user_id=test_user.id, role=MemberRole.owner),
+        GroupMember(group_conversation_id=group.id, user_id=test_user2.id, role=MemberRole.member),
+    ])
+    db_session.commit()
+    
+    token2 = create_access_token(data={"sub": str(test_user2.id)})
+    send_messages(client, f"/ws/group-chat?group_conversation_id={group.id}&token={token2}", ["standup?"])
+    send_messages(client, f"/ws/chat?conversation_id={conversation.id}&token={token2}", ["hi", "are you there?"])
+    
+    query_counter.clear()
+    response = client.get("/api/v1/me/conversations", headers=auth_headers)
+    assert response.status_code == 200
+    assert sum("conversations" in statement for statement in query_counter) == 1
+    direct, team = response.json()["conversations"]
+    assert direct["type"] == "direct"
+    assert direct["match_id"] == str(match.id)
+    assert direct["name"] == test_user2.handle
+    assert direct["unread_count"] == 2
+    assert direct["last_message"]["preview"] == "are you there?"
+    assert direct["last_message"]["sender_id"] == str(test_user2.id)
+    assert team["type"] == "group"
+    assert team["name"] == "Team"
+    assert team["unread_count"] == 1
+    
+    # The sender has read their own messages
+    response = client.get("/api/v1/me/conversations", headers={"Authorization": f"Bearer {token2}"})
+    assert [c["unread_count"] for c in response.json()["conversations"]] == [0, 0]
+    
+    assert client.post(f"/api/v1/matches/{match.id}/conversation/read", headers=auth_headers).status_code == 200
+    assert client.post(f"/api/v1/group-chats/{group.id}/read", headers=auth_headers).status_code == 200
+    response = client.get("/api/v1/me/conversations", headers=auth_headers)
+    assert [c["unread_count"] for c in response.json()["conversations"]] == [0, 0]
+    
+    # Replying keeps the sender's cursor current and bumps the other side
+    token = create_access_token(data={"sub": str(test_user.id)})
+    send_messages(client, f"/ws/chat?conversation_id={conversation.id}&token={token}", ["yes"])
+    response = client.get("/api/v1/me/conversations", headers=auth_headers)
+    assert response.json()["conversations"][0]["unread_count"] == 0
+    response = client.get("/api/v1/me/conversations", headers={"Authorization": f"Bearer {token2}"})
+    assert response.json()["conversations"][0]["unread_count"] == 1
+
+
+def test_mark_conversation_read_requires_membership(
+    client: TestClient,
+    db_session,
+    test_project,
+    test_user2,
+    auth_headers: dict
+):
+    """Only members can move a read cursor"""
+    group = GroupConversation(project_id=test_project.id, name="Private")
+    db_session.add(group)
+    db_session.flush()
+    db_session.add(GroupMember(group_conversation_id=group.id, user_id=test_user2.id, role=MemberRole.owner))
+    db_session.commit()
+    
+    response = client.post(f"/api/v1/group-chats/{group.id}/read", headers=auth_headers)
+    assert response.status_code == 403
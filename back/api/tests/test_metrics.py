@@ -0,0 +1,92 @@
+"""Tests for per-request SQL instrumentation and /metrics"""
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core.logging_config import JsonFormatter, RequestIDFilter, log_formatter
+from app.core.metrics import RequestStats, current_request, metrics
+
+
+def test_sql_stats_headers_and_metrics(client: TestClient, test_user, auth_headers: dict):
+    """Statements, DB time and rows are attributed to the request and exported per route"""
+    metrics.clear()
+    response = client.get(f"/api/v1/users/{test_user.id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Queries"]) >= 2
+    assert int(response.headers["X-DB-Rows"]) >= 1
+    assert float(response.headers["X-DB-Time-Ms"]) > 0
+    
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert '# TYPE buildup_db_queries_per_request histogram' in body
+    assert 'buildup_http_request_duration_seconds_count{method="GET",route="/api/v1/users/{user_id}"} 1' in body
+    assert 'buildup_db_time_seconds_bucket{method="GET",route="/api/v1/users/{user_id}",le="+Inf"} 1' in body
+    assert "buildup_identity_cache_user_misses_total" in body
+
+
+def test_slow_query_log_names_route(client: TestClient, test_user, auth_headers: dict, monkeypatch, caplog):
+    """Slow statements are logged with the route that ran them"""
+    monkeypatch.setattr(settings, "slow_query_ms", 0.001)
+    with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+        client.get("/api/v1/auth/me", headers=auth_headers)
+    assert any("Slow query" in r.message and "GET /api/v1/auth/me" in r.message for r in caplog.records)
+
+
+def test_metrics_endpoint_can_be_disabled(client: TestClient, monkeypatch):
+    """METRICS_ENABLED=false hides /metrics"""
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    assert client.get("/metrics").status_code == 404
+
+
+def test_request_id_header_and_log(client: TestClient, caplog):
+    """The X-Request-ID header is echoed and attached to the request's log line"""
+    with caplog.at_level(logging.INFO, logger="app.core.middleware"):
+        response = client.get("/healthz", headers={"X-Request-ID": "req-123"})
+    assert response.headers["X-Request-ID"] == "req-123"
+    assert response.headers["X-DB-Queries"] == "0"
+    completed = [r for r in caplog.records if r.getMessage().startswith("Request completed: GET /healthz")]
+    assert completed and completed[-1].request_id == "req-123"
+
+
+def test_request_id_filter_uses_current_request():
+    """Records logged while serving a request carry its ID; others get "-" """
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+    RequestIDFilter().filter(record)
+    assert record.request_id == "-"
+
+    token = current_request.set(RequestStats(request_id="req-456", method="GET"))
+    try:
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+        RequestIDFilter().filter(record)
+    finally:
+        current_request.reset(token)
+    assert record.request_id == "req-456"
+
+
+def test_json_log_format_emits_extra_fields(monkeypatch):
+    """LOG_FORMAT=json writes the record's extra= fields as JSON keys"""
+    import json
+    from logging.handlers import QueueHandler
+
+    monkeypatch.setattr(settings, "log_format", "json")
+    formatter = log_formatter()
+    assert isinstance(formatter, JsonFormatter)
+
+    record = logging.getLogger("app.core.middleware").makeRecord(
+        "app.core.middleware", logging.INFO, __file__, 1, "Request completed: %s", ("GET /",), None,
+        extra={"request_id": "req-789", "route": "/api/v1/users/{user_id}", "status_code": 200, "db_queries": 3}
+    )
+    # As on the way through the logging queue
+    record = QueueHandler(None).prepare(record)
+    entry = json.loads(formatter.format(record))
+
+    assert entry["message"] == "Request completed: GET /"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.core.middleware"
+    assert (entry["request_id"], entry["route"], entry["status_code"], entry["db_queries"]) == (
+        "req-789", "/api/v1/users/{user_id}", 200, 3
+    )
+    assert "args" not in entry and "msg" not in entry
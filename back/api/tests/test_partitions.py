@@ -0,0 +1,100 @@
+"""Tests for the monthly partitions of the append-only tables"""
+import gzip
+import uuid
+from datetime import date, datetime, timezone
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.pagination import message_page_query
+from app.core.partitions import (
+    create_partition, detach_old_partitions, ensure_partitions, expired_partitions, monthly_partitions
+)
+from app.models.chat import Message
+from tests.conftest import test_async_engine, test_engine
+
+TODAY = date(2026, 10, 5)
+
+
+async def _insert_audit(conn, action: str, created_at: str):
+    await conn.execute(
+        text("INSERT INTO audit_logs (action, created_at) VALUES (:action, CAST(:created_at AS timestamptz))"),
+        {"action": action, "created_at": created_at}
+    )
+
+
+async def _audit_partitions(conn) -> dict:
+    result = await conn.execute(text("SELECT action, tableoid::regclass::text FROM audit_logs"))
+    return dict(result.all())
+
+
+async def test_new_partitions_take_their_rows_from_the_default_partition(db_session: Session):
+    """Rows written before their month's partition existed move into it; later rows go straight there"""
+    async with test_async_engine.begin() as conn:
+        await _insert_audit(conn, "september", "2026-09-30 23:59:59+00")
+        await _insert_audit(conn, "october", "2026-10-01 00:00:00+00")
+
+        created = await ensure_partitions(conn, "audit_logs", months_ahead=1, today=TODAY)
+        assert created == ["audit_logs_p2026_10", "audit_logs_p2026_11"]
+        assert await ensure_partitions(conn, "audit_logs", months_ahead=1, today=TODAY) == []
+
+        await _insert_audit(conn, "november", "2026-11-15 12:00:00+00")
+        assert await _audit_partitions(conn) == {
+            "september": "audit_logs_default",
+            "october": "audit_logs_p2026_10",
+            "november": "audit_logs_p2026_11",
+        }
+
+
+async def test_expired_partitions_are_detached_or_archived(db_session: Session, tmp_path):
+    """Partitions past retention leave the table: kept as tables, or archived to gzip and dropped"""
+    async with test_async_engine.begin() as conn:
+        for month in (6, 7, 8, 9, 10):
+            await create_partition(conn, "audit_logs", date(2026, month, 1))
+        await _insert_audit(conn, "june", "2026-06-10 00:00:00+00")
+        await _insert_audit(conn, "july", "2026-07-10 00:00:00+00")
+        await _insert_audit(conn, "august", "2026-08-10 00:00:00+00")
+        assert await expired_partitions(conn, "audit_logs", 2, today=TODAY) == [
+            "audit_logs_p2026_06", "audit_logs_p2026_07"
+        ]
+
+    # Each step commits on its own: the parent is only locked while detaching
+    assert await detach_old_partitions(test_async_engine, "audit_logs", 0, today=TODAY) == []
+    assert await detach_old_partitions(test_async_engine, "audit_logs", 3, today=TODAY) == ["audit_logs_p2026_06"]
+    assert await detach_old_partitions(
+        test_async_engine, "audit_logs", 2, tmp_path, today=TODAY, lock_timeout="5s"
+    ) == ["audit_logs_p2026_07"]
+
+    async with test_async_engine.begin() as conn:
+        assert set(await _audit_partitions(conn)) == {"august"}
+        assert list(await monthly_partitions(conn, "audit_logs")) == [date(2026, month, 1) for month in (8, 9, 10)]
+        detached = await conn.execute(text("SELECT action FROM audit_logs_p2026_06"))
+        assert detached.scalars().all() == ["june"]
+        dropped = await conn.execute(text("SELECT to_regclass('audit_logs_p2026_07')"))
+        assert dropped.scalar() is None
+        await conn.execute(text("DROP TABLE audit_logs_p2026_06"))
+
+    with gzip.open(tmp_path / "audit_logs_p2026_07.csv.gz", "rt") as archive:
+        lines = archive.read().splitlines()
+    assert lines[0] == "id,user_id,action,resource,payload,created_at"
+    assert [line.split(",")[2] for line in lines[1:]] == ["july"]
+
+
+async def test_cursor_pages_only_scan_the_months_they_reach(db_session: Session):
+    """A before cursor skips newer partitions, an after cursor older ones"""
+    async with test_async_engine.begin() as conn:
+        for month in (8, 9, 10):
+            await create_partition(conn, "messages", date(2026, month, 1))
+
+    cursor = (datetime(2026, 9, 15, tzinfo=timezone.utc), 42)
+    query = select(Message).filter(Message.conversation_id == uuid.uuid4())
+
+    def scanned(before=None, after=None) -> set:
+        compiled = message_page_query(query, Message, 20, before=before, after=after).compile(bind=test_engine)
+        with test_engine.connect() as conn:
+            plan = conn.exec_driver_sql("EXPLAIN " + str(compiled), compiled.params).scalars().all()
+        return {p for p in ("messages_p2026_08", "messages_p2026_09", "messages_p2026_10", "messages_default")
+                if any(p in line for line in plan)}
+
+    assert scanned(before=cursor) == {"messages_p2026_08", "messages_p2026_09", "messages_default"}
+    assert scanned(after=cursor) == {"messages_p2026_09", "messages_p2026_10", "messages_default"}
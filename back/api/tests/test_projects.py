@@ -52,6 +52,51 @@ def test_list_projects_with_query(client: TestClient, test_project, auth_headers
     assert len(data["projects"]) > 0
 
 
+def test_list_projects_relevance_and_highlight(
+    client: TestClient,
+    db_session,
+    test_user,
+    auth_headers: dict
+):
+    """Test ranked search puts title matches first and highlights matches"""
+    from app.models.project import Project
+    db_session.add(Project(
+        owner_id=test_user.id,
+        title="Rust compiler",
+        description="Compiler internals"
+    ))
+    db_session.flush()
+    db_session.add(Project(
+        owner_id=test_user.id,
+        title="Mobile app",
+        description="Fast & safe mobile client for our rust backend"
+    ))
+    db_session.commit()
+    
+    response = client.get(
+        "/api/v1/projects",
+        params={"query": "rust", "sort": "relevance", "highlight": "true"},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    projects = response.json()["projects"]
+    # The older project matches in its title (weight A) and ranks first
+    assert [p["title"] for p in projects] == ["Rust compiler", "Mobile app"]
+    # Descriptions are escaped; only the match is marked up
+    assert "<mark>rust</mark>" in projects[1]["snippet"]
+    assert "&amp;" in projects[1]["snippet"]
+    
+    # Default order stays newest first, without snippets
+    response = client.get(
+        "/api/v1/projects",
+        params={"query": "rust"},
+        headers=auth_headers
+    )
+    projects = response.json()["projects"]
+    assert [p["title"] for p in projects] == ["Mobile app", "Rust compiler"]
+    assert projects[0]["snippet"] is None
+
+
 def test_list_projects_with_skill_filter(
     client: TestClient,
     test_project,
@@ -68,6 +113,58 @@ def test_list_projects_with_skill_filter(
     assert "projects" in data
 
 
+@pytest.mark.parametrize("total_mode", ["exact", "estimated", "none"])
+def test_list_projects_total_modes(
+    client: TestClient,
+    db_session,
+    test_user,
+    auth_headers: dict,
+    total_mode: str
+):
+    """Test each total_mode over a listing that spans several pages"""
+    from app.models.project import Project
+    for i in range(3):
+        db_session.add(Project(owner_id=test_user.id, title=f"Paged {i}", description="Paged project"))
+    db_session.commit()
+    
+    response = client.get(
+        "/api/v1/projects",
+        params={"limit": 2, "total_mode": total_mode},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["projects"]) == 2
+    assert data["has_more"] is True
+    assert data["total_mode"] == total_mode
+    assert data["total"] == (None if total_mode == "none" else 3)
+    
+    # Past the last page
+    response = client.get(
+        "/api/v1/projects",
+        params={"limit": 2, "offset": 2, "total_mode": total_mode},
+        headers=auth_headers
+    )
+    data = response.json()
+    assert len(data["projects"]) == 1
+    assert data["has_more"] is False
+
+
+def test_list_projects_default_total_mode(client: TestClient, test_project, auth_headers: dict):
+    """Test the default total_mode follows the filters"""
+    response = client.get("/api/v1/projects", headers=auth_headers)
+    assert response.json()["total_mode"] == "estimated"
+    assert response.json()["total"] == 1
+    
+    response = client.get("/api/v1/projects", params={"query": "Test"}, headers=auth_headers)
+    assert response.json()["total_mode"] == "exact"
+    assert response.json()["total"] == 1
+    
+    # A blank query is no query (and served from the same cached page)
+    response = client.get("/api/v1/projects", params={"query": "   "}, headers=auth_headers)
+    assert response.json()["total_mode"] == "estimated"
+
+
 def test_get_project(client: TestClient, test_project, auth_headers: dict):
     """Test getting project by ID"""
     response = client.get(
@@ -115,6 +212,32 @@ def test_update_project(
     assert data["status"] == "closed"
 
 
+def test_update_project_skills(
+    client: TestClient,
+    test_project,
+    test_skill,
+    test_skill2,
+    auth_headers: dict
+):
+    """Test replacing required skills, with a repeated skill ID"""
+    update_data = {
+        "required_skills": [
+            {"skill_id": test_skill2.id, "required_level": 2},
+            {"skill_id": test_skill2.id, "required_level": 4}
+        ]
+    }
+    response = client.patch(
+        f"/api/v1/projects/{test_project.id}",
+        json=update_data,
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    
+    response = client.get(f"/api/v1/projects/{test_project.id}", headers=auth_headers)
+    skills = [(s["skill_name"], s["required_level"]) for s in response.json()["required_skills"]]
+    assert skills == [("JavaScript", 4)]
+
+
 def test_update_project_unauthorized(
     client: TestClient,
     test_project,
@@ -164,3 +287,182 @@ def test_unfavorite_project(client: TestClient, test_project, auth_headers: dict
     data = response.json()
     assert "message" in data
 
+
+
+def test_project_candidates_ranking(
+    client: TestClient,
+    db_session,
+    test_project,
+    test_user,
+    test_skill,
+    test_skill2,
+    auth_headers: dict
+):
+    """Candidates are ranked by skill coverage, then repo language and stars"""
+    from app.models.user import User
+    from app.models.skill import UserSkill
+    from app.models.github_repo import GitHubRepo
+    
+    users = {handle: User(handle=handle) for handle in ["alice", "bob", "carol", "dave"]}
+    db_session.add_all(users.values())
+    db_session.flush()
+    db_session.add_all([
+        UserSkill(user_id=test_user.id, skill_id=test_skill.id, level=5),
+        UserSkill(user_id=users["alice"].id, skill_id=test_skill.id, level=5),
+        UserSkill(user_id=users["bob"].id, skill_id=test_skill.id, level=2),
+        UserSkill(user_id=users["carol"].id, skill_id=test_skill.id, level=3),
+        UserSkill(user_id=users["dave"].id, skill_id=test_skill2.id, level=5),
+        GitHubRepo(
+            user_id=users["carol"].id,
+            repo_full_name="carol/api",
+            stars=40,
+            language="Python",
+            url="https://github.com/carol/api"
+        ),
+    ])
+    db_session.commit()
+    
+    response = client.get(f"/api/v1/projects/{test_project.id}/candidates", headers=auth_headers)
+    assert response.status_code == 200
+    candidates = response.json()["candidates"]
+    
+    # The owner and users without a required skill are not recommended
+    assert [c["user"]["handle"] for c in candidates] == ["carol", "alice", "bob"]
+    assert candidates[0]["matched_skill_ids"] == [test_skill.id]
+
+
+def test_project_candidates_follow_skill_updates(
+    client: TestClient,
+    test_project,
+    test_user2,
+    test_skill,
+    auth_headers: dict
+):
+    """A skill update is reflected without reloading the index"""
+    from app.core.security import create_access_token
+    other_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user2.id)})}"}
+    
+    response = client.get(f"/api/v1/projects/{test_project.id}/candidates", headers=auth_headers)
+    assert response.json()["candidates"] == []
+    
+    response = client.put(
+        "/api/v1/users/me/skills",
+        json=[{"skill_id": test_skill.id, "level": 4}],
+        headers=other_headers
+    )
+    assert response.status_code == 200
+    
+    response = client.get(f"/api/v1/projects/{test_project.id}/candidates", headers=auth_headers)
+    assert [c["user"]["handle"] for c in response.json()["candidates"]] == ["testuser2"]
+    
+    # Only the owner may see candidates
+    response = client.get(f"/api/v1/projects/{test_project.id}/candidates", headers=other_headers)
+    assert response.status_code == 403
+
+
+def test_list_projects_etag_and_invalidation(client: TestClient, test_project, test_skill, auth_headers: dict):
+    """Listings revalidate with If-None-Match until a project is created"""
+    response = client.get("/api/v1/projects")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "public, no-cache"
+    
+    response = client.get("/api/v1/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    
+    response = client.post(
+        "/api/v1/projects",
+        json={"title": "Fresh", "description": "", "required_skills": []},
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+    
+    response = client.get("/api/v1/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [p["title"] for p in response.json()["projects"]] == ["Fresh", "Test Project"]
+
+
+def test_cached_project_favorites_overlay(client: TestClient, test_project, auth_headers: dict):
+    """is_favorited is per caller even when the response comes from the cache"""
+    anonymous = client.get(f"/api/v1/projects/{test_project.id}")
+    assert anonymous.json()["is_favorited"] is False
+    
+    response = client.post(f"/api/v1/projects/{test_project.id}/favorite", headers=auth_headers)
+    assert response.status_code == 200
+    
+    response = client.get(f"/api/v1/projects/{test_project.id}", headers=auth_headers)
+    assert response.json()["is_favorited"] is True
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert response.headers["etag"] != anonymous.headers["etag"]
+    
+    response = client.get("/api/v1/projects", headers=auth_headers)
+    assert [p["is_favorited"] for p in response.json()["projects"]] == [True]
+    
+    response = client.get(f"/api/v1/projects/{test_project.id}")
+    assert response.json()["is_favorited"] is False
+    assert response.headers["etag"] == anonymous.headers["etag"]
+
+
+def test_listing_computed_across_a_write_is_not_cached(client: TestClient, test_project, monkeypatch):
+    """A write clearing the cache while a listing is queried keeps that listing out of it"""
+    from app.api.v1 import projects as projects_module
+    from app.services.response_cache import project_cache
+    
+    query_project_list = projects_module._query_project_list
+    
+    async def query_during_write(*args):
+        listing = await query_project_list(*args)
+        project_cache.clear()
+        return listing
+    
+    monkeypatch.setattr(projects_module, "_query_project_list", query_during_write)
+    response = client.get("/api/v1/projects")
+    assert [p["title"] for p in response.json()["projects"]] == ["Test Project"]
+    assert len(project_cache._entries) == 0
+
+
+async def test_candidate_index_reloads_once_in_the_background(db_session, test_user, test_skill):
+    """Concurrent callers share one reload; a stale index keeps serving while it runs"""
+    import asyncio
+    from app.models.skill import UserSkill
+    from app.services.candidate_index import CandidateIndex
+    from tests.conftest import TestAsyncSessionLocal
+    
+    db_session.add(UserSkill(user_id=test_user.id, skill_id=test_skill.id, level=3))
+    db_session.commit()
+    required = [(test_skill.id, 3, test_skill.name)]
+    
+    index = CandidateIndex(ttl_seconds=0, session_factory=TestAsyncSessionLocal)
+    await asyncio.gather(index.ensure_loaded(), index.ensure_loaded())
+    assert [user_id for user_id, _, _ in index.rank(required, 10)] == [test_user.id]
+    
+    # Stale (TTL 0): callers return at once with the current index
+    await asyncio.gather(index.ensure_loaded(), index.ensure_loaded())
+    reload = index._reload
+    assert reload is not None
+    assert [user_id for user_id, _, _ in index.rank(required, 10)] == [test_user.id]
+    
+    # An update made during the reload survives the swap
+    index.set_user_skills(test_user.id, {})
+    await reload
+    assert index._reload is None
+    assert index.rank(required, 10) == []
+
+
+async def test_candidate_index_reload_is_not_charged_to_the_request(db_session):
+    """A reload started from a request runs outside of its SQL accounting"""
+    from app.core.metrics import RequestStats, current_request
+    from app.services.candidate_index import CandidateIndex
+    from tests.conftest import TestAsyncSessionLocal
+    
+    index = CandidateIndex(ttl_seconds=60, session_factory=TestAsyncSessionLocal)
+    stats = RequestStats(request_id="req-1", method="GET")
+    token = current_request.set(stats)
+    try:
+        await index.ensure_loaded()
+    finally:
+        current_request.reset(token)
+    
+    assert index._loaded_at is not None
+    assert stats.queries == 0
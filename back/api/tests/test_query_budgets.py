@@ -0,0 +1,125 @@
+"""SQL statement budgets per endpoint
+
+Every endpoint below is called against data with several rows in each
+collection it returns, and must not run more statements than its budget
+(including the user lookup of authentication). Loading a relationship
+per row makes the count grow with the data and fails the budget.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.identity_cache import identity_cache
+from app.models.user import User
+from app.models.skill import UserSkill
+from app.models.project import Project, ProjectSkill, Favorite
+from app.models.application import Application
+from app.models.offer import Offer
+from app.models.match import Match
+from app.models.chat import Conversation, Message
+from app.models.group_chat import GroupConversation, GroupMember, GroupMessage, MemberRole
+
+# Rows per collection; large enough that a per-row query exceeds any budget
+ROWS = 4
+
+# (path, budget); {placeholders} are filled from the seeded data
+BUDGETS = [
+    ("/api/v1/auth/me", 1),
+    ("/api/v1/users/{peer_id}", 4),
+    ("/api/v1/users/presence?ids={peer_id}", 0),
+    ("/api/v1/users/search?q=budget", 3),
+    ("/api/v1/skills?q=sk", 2),
+    ("/api/v1/projects", 5),
+    ("/api/v1/projects/{project_id}", 5),
+    ("/api/v1/projects/{own_project_id}/candidates", 6),
+    ("/api/v1/me/applications", 2),
+    ("/api/v1/me/offers/sent", 2),
+    ("/api/v1/me/offers/received", 2),
+    ("/api/v1/me/recommended-projects", 5),
+    ("/api/v1/me/conversations", 2),
+    ("/api/v1/applications/me?type=submitted", 2),
+    ("/api/v1/applications/me?type=received", 2),
+    ("/api/v1/matches/me/matches", 2),
+    ("/api/v1/matches/{match_id}/conversation", 4),
+    ("/api/v1/group-chats", 3),
+    ("/api/v1/group-chats/{group_id}", 4),
+]
+
+
+@pytest.fixture
+def seeded(db_session, test_user, test_skill, test_skill2) -> dict:
+    """Several rows of everything the current user can list"""
+    peers = [User(handle=f"budget{i}", github_login=f"budget{i}") for i in range(ROWS)]
+    db_session.add_all(peers)
+    db_session.flush()
+
+    for user in [test_user, *peers]:
+        db_session.add(UserSkill(user_id=user.id, skill_id=test_skill.id, level=3))
+
+    own_project = Project(owner_id=test_user.id, title="Own", description="Own project", status="open")
+    projects = [
+        Project(owner_id=peer.id, title=f"Project {i}", description="Budget project", status="open")
+        for i, peer in enumerate(peers)
+    ]
+    db_session.add_all([own_project, *projects])
+    db_session.flush()
+    for project in [own_project, *projects]:
+        db_session.add(ProjectSkill(project_id=project.id, skill_id=test_skill.id, required_level=2))
+        db_session.add(ProjectSkill(project_id=project.id, skill_id=test_skill2.id, required_level=1))
+
+    groups = []
+    for i, (peer, project) in enumerate(zip(peers, projects)):
+        db_session.add(Favorite(user_id=test_user.id, project_id=project.id))
+        db_session.add(Application(project_id=project.id, applicant_id=test_user.id, status="pending"))
+        db_session.add(Application(project_id=own_project.id, applicant_id=peer.id, status="pending"))
+        db_session.add(Offer(project_id=own_project.id, sender_id=test_user.id, receiver_id=peer.id))
+        db_session.add(Offer(project_id=project.id, sender_id=peer.id, receiver_id=test_user.id))
+
+        match = Match(project_id=project.id, user_a=test_user.id, user_b=peer.id)
+        group = GroupConversation(project_id=project.id, name=f"Group {i}")
+        db_session.add_all([match, group])
+        db_session.flush()
+        groups.append(group)
+
+        conversation = Conversation(match_id=match.id)
+        db_session.add(conversation)
+        db_session.flush()
+        db_session.add(GroupMember(group_conversation_id=group.id, user_id=test_user.id, role=MemberRole.member))
+        for member in peers:
+            role = MemberRole.owner if member is peer else MemberRole.member
+            db_session.add(GroupMember(group_conversation_id=group.id, user_id=member.id, role=role))
+        for n in range(ROWS):
+            db_session.add(Message(conversation_id=conversation.id, sender_id=peer.id, body=f"hi {n}"))
+            db_session.add(GroupMessage(group_conversation_id=group.id, sender_id=peer.id, body=f"hi {n}"))
+    db_session.commit()
+
+    return {
+        "peer_id": peers[0].id,
+        "project_id": projects[0].id,
+        "own_project_id": own_project.id,
+        "match_id": match.id,
+        "group_id": groups[0].id,
+    }
+
+
+@pytest.mark.parametrize("path,budget", BUDGETS, ids=[path for path, _ in BUDGETS])
+def test_endpoint_query_budget(
+    client: TestClient,
+    seeded: dict,
+    auth_headers: dict,
+    query_counter,
+    path: str,
+    budget: int,
+    request
+):
+    """An endpoint stays within its SQL statement budget"""
+    if path.startswith("/api/v1/users/search"):
+        request.getfixturevalue("pg_trgm")  # substring matches are ranked with similarity()
+    identity_cache.clear()
+    query_counter.clear()
+    response = client.get(path.format(**seeded), headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    statements = "\n\n".join(query_counter)
+    assert len(query_counter) <= budget, (
+        f"{path} ran {len(query_counter)} SQL statements (budget {budget}):\n\n{statements}"
+    )
@@ -2,6 +2,9 @@
 import pytest
 from fastapi.testclient import TestClient
 
+from app.models.skill import Skill
+from app.services.skill_index import skill_index
+
 
 def test_search_skills_empty(client: TestClient):
     """Test searching skills with no query"""
@@ -29,3 +32,46 @@ def test_search_skills_with_limit(client: TestClient):
     assert "skills" in data
     assert len(data["skills"]) <= 5
 
+
+
+def test_search_skills_prefix_matches_first(client: TestClient, db_session):
+    """Names starting with the query rank above names only containing it"""
+    for name in ["TypeScript", "Script Kiddie", "JavaScript", "Scala"]:
+        db_session.add(Skill(name=name))
+    db_session.commit()
+    
+    response = client.get("/api/v1/skills?query=sc")
+    assert response.status_code == 200
+    names = [s["name"] for s in response.json()["skills"]]
+    assert names == ["Scala", "Script Kiddie", "JavaScript", "TypeScript"]
+
+
+def test_created_skill_is_searchable_immediately(client: TestClient, auth_headers: dict, test_skill):
+    """A skill created on this worker shows up without waiting for a reload"""
+    # Load the index first
+    assert client.get("/api/v1/skills?query=py").status_code == 200
+    
+    response = client.post("/api/v1/skills", json={"name": "PyTorch"}, headers=auth_headers)
+    assert response.status_code == 201
+    
+    response = client.get("/api/v1/skills?query=py")
+    names = [s["name"] for s in response.json()["skills"]]
+    assert names == ["Python", "PyTorch"]
+
+
+def test_search_skills_database_fallback(client: TestClient, db_session, monkeypatch):
+    """Large skill tables are searched in the database with the same ranking"""
+    monkeypatch.setattr(skill_index, "max_size", 1)
+    for name in ["TypeScript", "Scala", "100%_done"]:
+        db_session.add(Skill(name=name))
+    db_session.commit()
+    
+    response = client.get("/api/v1/skills?query=sc")
+    names = [s["name"] for s in response.json()["skills"]]
+    assert names == ["Scala", "TypeScript"]
+    assert skill_index.too_large
+    
+    # LIKE wildcards in the query are matched literally
+    response = client.get("/api/v1/skills?query=%25_")
+    names = [s["name"] for s in response.json()["skills"]]
+    assert names == ["100%_done"]
@@ -2,6 +2,14 @@
 import pytest
 from fastapi.testclient import TestClient
 
+from app.models.user import User, OAuthAccount
+from app.models.skill import Skill, UserSkill
+from app.models.github_repo import GitHubRepo, GitHubSyncState
+from app.models.audit import AuditLog
+from app.core.security import create_access_token
+from app.services.job_runner import job_runner
+from tests.mock_github import mock_repo
+
 
 def test_get_user(client: TestClient, test_user, auth_headers: dict):
     """Test getting user by ID"""
@@ -93,3 +101,189 @@ def test_update_user_skills_nonexistent_skill(client: TestClient, auth_headers:
     )
     assert response.status_code == 404
 
+
+
+def test_search_users_ranking_and_pages(client: TestClient, db_session, test_user, auth_headers: dict, pg_trgm):
+    """Exact, then prefix, then substring matches by similarity, walked with next_cursor"""
+    for handle in ["ann", "annabelle", "anna", "joanna", "hanna", "bigann", "xxann", "bob"]:
+        db_session.add(User(handle=handle))
+    db_session.commit()
+
+    handles = []
+    cursor = None
+    while True:
+        params = {"q": "Ann", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/users/search", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        handles.extend(u["handle"] for u in data["users"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    # Substring matches: trigram similarity to "ann" (xxann 0.25, bigann 0.22, hanna 0.11, joanna 0.1)
+    assert handles == ["ann", "anna", "annabelle", "xxann", "bigann", "hanna", "joanna"]
+
+
+def test_search_users_skill_filter(
+    client: TestClient, db_session, test_user, test_user2, test_skill, test_skill2, auth_headers: dict, pg_trgm
+):
+    """Only users having every requested skill are returned"""
+    db_session.add_all([
+        UserSkill(user_id=test_user.id, skill_id=test_skill.id, level=3),
+        UserSkill(user_id=test_user2.id, skill_id=test_skill.id, level=3),
+        UserSkill(user_id=test_user2.id, skill_id=test_skill2.id, level=2),
+    ])
+    db_session.commit()
+
+    response = client.get(
+        "/api/v1/users/search",
+        params={"q": "testuser", "skill_ids": [test_skill.id, test_skill2.id]},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert [u["handle"] for u in response.json()["users"]] == ["testuser2"]
+
+
+def test_search_users_invalid_cursor(client: TestClient, auth_headers: dict):
+    """A malformed cursor is rejected"""
+    response = client.get("/api/v1/users/search?q=test&cursor=bogus", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_update_skills_query_count(client: TestClient, db_session, test_user, auth_headers: dict, query_counter):
+    """Saving a skill set costs the same number of queries for 3 or 30 skills"""
+    skills = [Skill(name=f"skill-{i}") for i in range(30)]
+    db_session.add_all(skills)
+    db_session.commit()
+
+    # Authenticate once so both requests find the user in the identity cache
+    client.get("/api/v1/auth/me", headers=auth_headers)
+    counts = []
+    for size in (3, 30):
+        payload = [{"skill_id": skill.id, "level": 3} for skill in skills[:size]]
+        query_counter.clear()
+        response = client.put("/api/v1/users/me/skills", json=payload, headers=auth_headers)
+        assert response.status_code == 200
+        counts.append(len(query_counter))
+
+    assert counts[0] == counts[1]
+
+
+def test_update_skills_writes_only_changes(client: TestClient, db_session, test_user, test_skill, test_skill2, auth_headers: dict):
+    """Changed levels are updated, missing skills removed, and unknown IDs rejected"""
+    third = Skill(name="Go")
+    db_session.add(third)
+    db_session.commit()
+
+    payload = [
+        {"skill_id": test_skill.id, "level": 2},
+        {"skill_id": test_skill2.id, "level": 4},
+    ]
+    assert client.put("/api/v1/users/me/skills", json=payload, headers=auth_headers).status_code == 200
+
+    payload = [
+        {"skill_id": test_skill.id, "level": 5},
+        {"skill_id": third.id, "level": 1},
+    ]
+    assert client.put("/api/v1/users/me/skills", json=payload, headers=auth_headers).status_code == 200
+
+    response = client.get(f"/api/v1/users/{test_user.id}", headers=auth_headers)
+    levels = {s["skill_name"]: s["level"] for s in response.json()["skills"]}
+    assert levels == {"Python": 5, "Go": 1}
+
+    # A missing skill fails the whole update
+    payload = [{"skill_id": test_skill.id, "level": 1}, {"skill_id": 999999, "level": 1}]
+    response = client.put("/api/v1/users/me/skills", json=payload, headers=auth_headers)
+    assert response.status_code == 404
+    response = client.get(f"/api/v1/users/{test_user.id}", headers=auth_headers)
+    assert {s["skill_name"]: s["level"] for s in response.json()["skills"]} == {"Python": 5, "Go": 1}
+
+
+def _sync_repos(client: TestClient, auth_headers: dict) -> dict:
+    """Queue a repository sync, run it, and return the finished job"""
+    response = client.post("/api/v1/users/me/repos/sync", headers=auth_headers)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    client.portal.call(job_runner.run_pending)
+    response = client.get(f"/api/v1/me/jobs/{job['id']}", headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_sync_github_repos_incremental(
+    client: TestClient,
+    db_session,
+    test_user,
+    auth_headers: dict,
+    mock_github,
+    query_counter
+):
+    """Unchanged pages cost a 304 and no writes; only changed repos are upserted or deleted"""
+    db_session.add(OAuthAccount(
+        user_id=test_user.id,
+        provider="github",
+        provider_account_id="1",
+        access_token="gho_test"
+    ))
+    db_session.commit()
+    mock_github.repos = [mock_repo("testuser", f"repo{i:03d}") for i in range(250)]
+
+    job = _sync_repos(client, auth_headers)
+    assert job["status"] == "succeeded"
+    assert job["result"]["repo_count"] == 250
+    assert mock_github.calls.count("/users/testuser/repos") == 3
+    assert db_session.query(GitHubRepo).filter(GitHubRepo.user_id == test_user.id).count() == 250
+
+    # Nothing changed: every page answers 304 and no repository row is written
+    query_counter.clear()
+    job = _sync_repos(client, auth_headers)
+    assert job["result"]["upserted"] == 0
+    assert mock_github.not_modified == 3
+    assert not [s for s in query_counter if "github_repos" in s and not s.startswith("SELECT")]
+
+    # One repository deleted on GitHub, one starred: the later pages shift
+    del mock_github.repos[10]
+    mock_github.repos[200]["stargazers_count"] = 7
+    job = _sync_repos(client, auth_headers)
+    assert job["result"]["repo_count"] == 249
+    assert job["result"]["deleted"] == 1
+
+    db_session.expire_all()
+    repos = {r.repo_full_name: r for r in db_session.query(GitHubRepo).filter(GitHubRepo.user_id == test_user.id)}
+    assert len(repos) == 249
+    assert "testuser/repo010" not in repos
+    assert repos["testuser/repo201"].stars == 7
+
+    state = db_session.get(GitHubSyncState, test_user.id)
+    assert state.repo_count == 249
+    assert [len(page["repos"]) for page in state.pages] == [100, 100, 49]
+    audit = db_session.query(AuditLog).filter(AuditLog.action == "SYNC_REPOS").order_by(AuditLog.id.desc()).first()
+    assert audit.payload["deleted"] == 1
+
+
+def test_sync_github_repos_is_deduplicated(client: TestClient, db_session, test_user, test_user2, auth_headers: dict):
+    """A second request while a sync is queued returns the same job; other users cannot poll it"""
+    db_session.add(OAuthAccount(
+        user_id=test_user.id,
+        provider="github",
+        provider_account_id="1",
+        access_token="gho_test"
+    ))
+    db_session.commit()
+
+    first = client.post("/api/v1/users/me/repos/sync", headers=auth_headers).json()
+    second = client.post("/api/v1/users/me/repos/sync", headers=auth_headers).json()
+    assert first["id"] == second["id"]
+
+    other_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user2.id)})}"}
+    assert client.get(f"/api/v1/me/jobs/{first['id']}", headers=other_headers).status_code == 404
+
+
+def test_sync_github_repos_requires_linked_account(client: TestClient, auth_headers: dict):
+    """Users without a GitHub account get 400 and no job"""
+    response = client.post("/api/v1/users/me/repos/sync", headers=auth_headers)
+    assert response.status_code == 400
@@ -1,12 +1,22 @@
 """End-to-end tests for WebSocket chat endpoints."""
+import time
+import uuid
 import pytest
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 from sqlalchemy.orm import Session
 
 from app.core.security import create_access_token
 from app.models.chat import Conversation, Message
 from app.models.match import Match
 from app.models.group_chat import GroupConversation, GroupMember, MemberRole
+from app.config import settings
+from app.services import membership_cache as membership_cache_module
+from app.services.backplane import PostgresBackplane
+from app.services.chat_service import manager
+from app.services.message_writer import message_writer
+from tests.conftest import TestAsyncSessionLocal, receive_chat_json
+from app.services.membership_cache import ChatIdentity, MembershipCache
 
 
 @pytest.fixture
@@ -81,7 +91,7 @@ def test_chat_websocket_message_and_signaling(
     with client.websocket_connect(url_owner) as ws_owner, client.websocket_connect(url_member) as ws_member:
         # Send a plain chat message
         ws_owner.send_json({"type": "message", "body": "Hello via WebSocket!"})
-        delivered_message = ws_member.receive_json()
+        delivered_message = receive_chat_json(ws_member)
 
         assert delivered_message["type"] == "message"
         assert delivered_message["body"] == "Hello via WebSocket!"
@@ -102,7 +112,7 @@ def test_chat_websocket_message_and_signaling(
             "is_video": False
         }
         ws_owner.send_json(signaling_payload)
-        forwarded_signal = ws_member.receive_json()
+        forwarded_signal = receive_chat_json(ws_member)
 
         assert forwarded_signal["type"] == "offer"
         assert forwarded_signal["sdp"] == "dummy-sdp"
@@ -112,6 +122,35 @@ def test_chat_websocket_message_and_signaling(
         assert forwarded_signal["is_video"] is False
 
 
+def test_chat_websocket_refuses_messages_too_large_for_the_backplane(
+    client: TestClient,
+    db_session: Session,
+    conversation_with_match: Conversation,
+    test_user,
+    test_user2,
+    monkeypatch
+):
+    """With the Postgres backplane's size limit, oversized messages get an error frame and are not stored."""
+    monkeypatch.setattr(manager.backplane, "fits", PostgresBackplane().fits)
+    conversation_id = str(conversation_with_match.id)
+    token_owner = create_access_token(data={"sub": str(test_user.id)})
+    url_owner = f"/ws/chat?conversation_id={conversation_id}&token={token_owner}"
+    huge = uuid.uuid4().hex * 1000  # compressible, so one NOTIFY would be enough
+    random_sdp = "".join(uuid.uuid4().hex for _ in range(1000))
+
+    with client.websocket_connect(url_owner) as ws_owner:
+        ws_owner.send_json({"type": "message", "body": huge})
+        assert receive_chat_json(ws_owner)["body"] == huge
+
+        ws_owner.send_json({"type": "message", "body": random_sdp})
+        assert receive_chat_json(ws_owner) == {"type": "error", "message": "Message is too large"}
+
+        ws_owner.send_json({"type": "offer", "target_user_id": str(test_user2.id), "sdp": random_sdp})
+        assert receive_chat_json(ws_owner) == {"type": "error", "message": "Message is too large"}
+
+    assert [m.body for m in db_session.query(Message).all()] == [huge]
+
+
 def test_group_chat_websocket_signaling_flow(
     client: TestClient,
     group_conversation_with_members: GroupConversation,
@@ -129,7 +168,7 @@ def test_group_chat_websocket_signaling_flow(
     with client.websocket_connect(url_owner) as ws_owner, client.websocket_connect(url_member) as ws_member:
         # Broadcast a group chat message
         ws_owner.send_json({"type": "message", "body": "Hello group!"})
-        delivered_message = ws_member.receive_json()
+        delivered_message = receive_chat_json(ws_member)
 
         assert delivered_message["type"] == "message"
         assert delivered_message["body"] == "Hello group!"
@@ -145,7 +184,7 @@ def test_group_chat_websocket_signaling_flow(
             }
         }
         ws_owner.send_json(ice_payload)
-        forwarded_signal = ws_member.receive_json()
+        forwarded_signal = receive_chat_json(ws_member)
 
         assert forwarded_signal["type"] == "ice-candidate"
         assert forwarded_signal["candidate"]["candidate"].startswith("candidate:")
@@ -153,3 +192,185 @@ def test_group_chat_websocket_signaling_flow(
         assert forwarded_signal["sender_name"] == test_user.handle
         assert forwarded_signal["conversation_id"] == group_id
 
+
+
+def test_chat_websocket_batched_persistence_acks_in_order(
+    client: TestClient,
+    db_session: Session,
+    conversation_with_match: Conversation,
+    test_user,
+    test_user2,
+    monkeypatch
+):
+    """Batched messages are broadcast immediately and acked once stored."""
+    monkeypatch.setattr(settings, "chat_persist_mode", "batched")
+    monkeypatch.setattr(message_writer, "session_factory", TestAsyncSessionLocal)
+
+    conversation_id = str(conversation_with_match.id)
+    token_owner = create_access_token(data={"sub": str(test_user.id)})
+    token_member = create_access_token(data={"sub": str(test_user2.id)})
+    url_owner = f"/ws/chat?conversation_id={conversation_id}&token={token_owner}"
+    url_member = f"/ws/chat?conversation_id={conversation_id}&token={token_member}"
+
+    with client.websocket_connect(url_owner) as ws_owner, client.websocket_connect(url_member) as ws_member:
+        for body in ["first", "second", "third"]:
+            ws_owner.send_json({"type": "message", "body": body})
+
+        delivered = [receive_chat_json(ws_member) for _ in range(3)]
+        assert [m["body"] for m in delivered] == ["first", "second", "third"]
+        assert all(m["provisional"] for m in delivered)
+
+        # The sender sees its own broadcasts and an ack per message
+        frames = [receive_chat_json(ws_owner) for _ in range(6)]
+        acks = [f for f in frames if f["type"] == "ack"]
+        assert [a["provisional_id"] for a in acks] == [m["id"] for m in delivered]
+
+    stored = db_session.query(Message).order_by(Message.id).all()
+    assert [m.body for m in stored] == ["first", "second", "third"]
+    assert [m.id for m in stored] == [a["id"] for a in acks]
+
+
+async def test_message_writer_fails_only_the_rejected_row(
+    db_session: Session,
+    conversation_with_match: Conversation,
+    test_user
+):
+    """A constraint violation in a batch fails that message alone."""
+    from datetime import datetime
+    from sqlalchemy.exc import IntegrityError
+    from app.services.message_writer import MessageWriter
+
+    writer = MessageWriter(session_factory=TestAsyncSessionLocal, flush_interval_ms=50)
+    await writer.start()
+    futures = [
+        writer.submit(Message, {
+            "conversation_id": conversation_id,
+            "sender_id": test_user.id,
+            "body": body,
+            "created_at": datetime.utcnow()
+        })
+        for conversation_id, body in [
+            (conversation_with_match.id, "first"),
+            (uuid.uuid4(), "orphan"),
+            (conversation_with_match.id, "second")
+        ]
+    ]
+    await writer.stop()
+
+    assert isinstance(futures[1].exception(), IntegrityError)
+    stored = db_session.query(Message).order_by(Message.id).all()
+    assert [m.body for m in stored] == ["first", "second"]
+    assert [m.id for m in stored] == [futures[0].result(), futures[2].result()]
+
+
+async def test_message_writer_retries_connection_errors(
+    db_session: Session,
+    conversation_with_match: Conversation,
+    test_user,
+    monkeypatch
+):
+    """A batch failing on a lost connection is written on retry."""
+    from datetime import datetime
+    from sqlalchemy.exc import OperationalError
+    from app.services.message_writer import MessageWriter
+
+    monkeypatch.setattr(settings, "chat_persist_retry_backoff_seconds", 0.0)
+    attempts = []
+
+    def flaky_session():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OperationalError("INSERT", {}, ConnectionError("server closed the connection"))
+        return TestAsyncSessionLocal()
+
+    writer = MessageWriter(session_factory=flaky_session)
+    await writer.start()
+    saved = writer.submit(Message, {
+        "conversation_id": conversation_with_match.id,
+        "sender_id": test_user.id,
+        "body": "hello",
+        "created_at": datetime.utcnow()
+    })
+    await writer.stop()
+
+    assert len(attempts) == 2
+    stored = db_session.query(Message).one()
+    assert stored.id == saved.result()
+
+
+def test_group_chat_websocket_rejects_removed_member(
+    client: TestClient,
+    group_conversation_with_members: GroupConversation,
+    test_user,
+    test_user2
+):
+    """A removed member cannot reconnect on a cached authorization."""
+    group_id = str(group_conversation_with_members.id)
+    token_member = create_access_token(data={"sub": str(test_user2.id)})
+    token_owner = create_access_token(data={"sub": str(test_user.id)})
+    url_member = f"/ws/group-chat?group_conversation_id={group_id}&token={token_member}"
+
+    # First connect populates the membership cache
+    with client.websocket_connect(url_member) as ws_member:
+        ws_member.send_json({"type": "ping"})
+        assert receive_chat_json(ws_member) == {"type": "pong"}
+
+    response = client.delete(
+        f"/api/v1/group-chats/{group_id}/members/{test_user2.id}",
+        headers={"Authorization": f"Bearer {token_owner}"}
+    )
+    assert response.status_code == 200
+
+    with pytest.raises(WebSocketDisconnect) as exc_info:
+        with client.websocket_connect(url_member) as ws_member:
+            receive_chat_json(ws_member)
+    assert exc_info.value.code == 1003
+
+
+def test_membership_cache_expires_entries(monkeypatch):
+    """Cached authorizations are dropped once their TTL has passed."""
+    cache = MembershipCache(ttl_seconds=30)
+    identity = ChatIdentity(user_id=uuid.uuid4(), handle="someone")
+    cache.set(str(identity.user_id), "conv-1", identity)
+    assert cache.get(str(identity.user_id), "conv-1") == identity
+
+    now = time.monotonic()
+    monkeypatch.setattr(membership_cache_module.time, "monotonic", lambda: now + 31)
+    assert cache.get(str(identity.user_id), "conv-1") is None
+
+
+def test_presence_endpoint_reads_memory_only(
+    client: TestClient,
+    conversation_with_match: Conversation,
+    test_user,
+    test_user2,
+    query_counter
+):
+    """Presence of a batch of users is served without touching the database."""
+    token_owner = create_access_token(data={"sub": str(test_user.id)})
+    url_owner = f"/ws/chat?conversation_id={conversation_with_match.id}&token={token_owner}"
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user2.id)})}"}
+
+    with client.websocket_connect(url_owner) as ws_owner:
+        ws_owner.send_json({"type": "ping"})
+        assert receive_chat_json(ws_owner) == {"type": "pong"}
+
+        query_counter.clear()
+        response = client.get(
+            "/api/v1/users/presence",
+            params={"ids": [str(test_user.id), str(test_user2.id)]},
+            headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["presence"] == [
+            {"user_id": str(test_user.id), "status": "online"},
+            {"user_id": str(test_user2.id), "status": "offline"}
+        ]
+        assert query_counter == []
+
+    response = client.get(
+        "/api/v1/users/presence",
+        params={"ids": [str(uuid.uuid4()) for _ in range(101)]},
+        headers=headers
+    )
+    assert response.status_code == 400